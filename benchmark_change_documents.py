@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Change Document Join Benchmark
+
+This script compares the previous CDHDR-CDPOS join (pd.merge on the change
+number alone) and a plain composite-key pd.merge with the guarded join
+engine on synthetic extracts.
+
+Key features:
+- Synthetic CDHDR/CDPOS extracts of configurable size (default 1M CDPOS rows)
+- Change numbers shared by several objects, as in real multi-object extracts
+- Join time and output size of both approaches
+- Time of the cardinality estimate on its own
+
+Usage:
+    python benchmark_change_documents.py [--rows N] [--items-per-document N] [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sap_audit_config import COLUMNS
+from sap_audit_change_documents import CHANGE_DOCUMENT_KEY, composite_key_codes, estimate_join, join_change_documents
+
+OBJECT_CLASSES = ["LIEFERUNG", "EINKBELEG", "MATERIAL", "KRED", "DEBI", "VERKBELEG"]
+
+
+def make_extracts(cdpos_rows, items_per_document, seed=0):
+    """
+    Build synthetic CDHDR and CDPOS extracts.
+    
+    Every change number is used by two object classes, so a join on the
+    change number alone pairs each header with the other object's items too.
+    
+    Args:
+        cdpos_rows: Number of CDPOS rows
+        items_per_document: Average CDPOS items per change document
+        seed: Random seed
+        
+    Returns:
+        Tuple of (cdhdr, cdpos) DataFrames
+    """
+    rng = np.random.default_rng(seed)
+    documents = max(cdpos_rows // items_per_document, 2)
+    change_numbers = np.arange(documents) // 2 + 1000000
+    objects = np.array(OBJECT_CLASSES, dtype=object)[rng.integers(0, len(OBJECT_CLASSES), documents)]
+    objects[1::2] = np.where(objects[1::2] == objects[0::2][:len(objects[1::2])], "CHANGE_DOC", objects[1::2])
+    object_ids = rng.integers(1, 10**9, documents).astype(str)
+    
+    cdhdr = pd.DataFrame({
+        COLUMNS["cdhdr"]["object"]: objects,
+        COLUMNS["cdhdr"]["object_id"]: object_ids,
+        COLUMNS["cdhdr"]["change_number"]: change_numbers,
+        COLUMNS["cdhdr"]["user"]: rng.choice(["USER1", "USER2", "FF_ADMIN"], documents),
+        COLUMNS["cdhdr"]["tcode"]: rng.choice(["VL02N", "ME22N", "MM02"], documents)
+    })
+    
+    owner = rng.integers(0, documents, cdpos_rows)
+    cdpos = pd.DataFrame({
+        COLUMNS["cdpos"]["object"]: objects[owner],
+        COLUMNS["cdpos"]["object_id"]: object_ids[owner],
+        COLUMNS["cdpos"]["change_number"]: change_numbers[owner],
+        COLUMNS["cdpos"]["table_name"]: rng.choice(["LIKP", "EKPO", "MARA"], cdpos_rows),
+        COLUMNS["cdpos"]["field_name"]: rng.choice(["TDUHR", "MENGE", "MATKL"], cdpos_rows),
+        COLUMNS["cdpos"]["change_indicator"]: rng.choice(["U", "I", "D"], cdpos_rows),
+        COLUMNS["cdpos"]["value_new"]: rng.integers(0, 10**6, cdpos_rows).astype(str)
+    })
+    return cdhdr, cdpos
+
+
+def median_time(func, runs):
+    """Return the median wall time of func() in seconds and its last result."""
+    timings, result = [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CDHDR-CDPOS join")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="CDPOS rows")
+    parser.add_argument("--items-per-document", type=int, default=5, help="Average CDPOS items per change document")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per approach")
+    args = parser.parse_args()
+    
+    cdhdr, cdpos = make_extracts(args.rows, args.items_per_document)
+    print(f"CDHDR rows: {len(cdhdr):,}  CDPOS rows: {len(cdpos):,}\n")
+    
+    change_number = COLUMNS["cdhdr"]["change_number"]
+    legacy_time, legacy = median_time(
+        lambda: pd.merge(cdhdr, cdpos, on=change_number, how="left"), args.runs)
+    
+    key_columns = [col for col in CHANGE_DOCUMENT_KEY if col in cdhdr.columns]
+    composite_time, composite = median_time(
+        lambda: pd.merge(cdhdr, cdpos, on=key_columns, how="left"), args.runs)
+    estimate_time, estimate = median_time(
+        lambda: estimate_join(*composite_key_codes(cdhdr, cdpos, key_columns)), args.runs)
+    
+    # Silence the join's log lines while timing
+    stdout, sys.stdout = sys.stdout, StringIO()
+    try:
+        engine_time, (joined, _) = median_time(lambda: join_change_documents(cdhdr, cdpos), args.runs)
+    finally:
+        sys.stdout = stdout
+    
+    print(f"{'Approach':<40} {'Seconds':>9} {'Rows':>12}")
+    print("-" * 63)
+    print(f"{'pd.merge on change number':<40} {legacy_time:>9.2f} {len(legacy):>12,}")
+    print(f"{'pd.merge on composite key (no guard)':<40} {composite_time:>9.2f} {len(composite):>12,}")
+    print(f"{'Cardinality estimate only':<40} {estimate_time:>9.2f} {estimate['rows']:>12,}")
+    print(f"{'Composite-key join engine':<40} {engine_time:>9.2f} {len(joined):>12,}")
+    print(f"\nRows added by joining on the change number alone: {len(legacy) - len(joined):,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
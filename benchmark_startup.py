@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Startup Benchmark
+
+This script measures the cold start of the command line entry points using
+"python -X importtime" and wall-clock timing.
+
+Key features:
+- Median wall time per command over several runs
+- Cumulative import time per command, parsed from -X importtime output
+- Slowest top-level imports for each command
+- Flags commands that import heavy processing packages (pandas, numpy, ...)
+- Optional budget check for use in CI (--check)
+
+Usage:
+    python benchmark_startup.py [--runs N] [--top N] [--budget-ms MS] [--check]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Non-processing commands that must start quickly
+STARTUP_COMMANDS = {
+    "sap_audit_tool --help": ["sap_audit_tool.py", "--help"],
+    "run_sap_audit --help": ["run_sap_audit.py", "--help"],
+    "sap_analyzer.run --help": ["-m", "sap_analyzer.run", "--help"],
+    "import sap_audit_config": ["-c", "import sap_audit_config"],
+    "import sap_audit_controller": ["-c", "import sap_audit_controller"],
+}
+
+# Packages that non-processing commands should not import
+HEAVY_PACKAGES = ["pandas", "numpy", "xlsxwriter", "openpyxl", "requests", "matplotlib"]
+
+# Startup budget for non-processing commands
+DEFAULT_BUDGET_MS = 200
+
+
+def parse_importtime(stderr):
+    """
+    Parse "python -X importtime" output.
+
+    Args:
+        stderr: Captured standard error of the traced process
+
+    Returns:
+        list: (module, self_us, cumulative_us, depth) tuples in import order
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        self_us, cumulative_us, name = fields
+        # Nested imports are indented by two spaces per level after one separator space
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+
+def trace_command(args):
+    """
+    Run a command once with -X importtime.
+
+    Args:
+        args: Arguments passed to the Python interpreter
+
+    Returns:
+        list: Parsed imports (see parse_importtime)
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=SCRIPT_DIR,
+                            capture_output=True, text=True)
+    return parse_importtime(result.stderr)
+
+
+def time_command(args, runs):
+    """
+    Measure the median wall time of a command.
+
+    Args:
+        args: Arguments passed to the Python interpreter
+        runs: Number of runs
+
+    Returns:
+        float: Median wall time in milliseconds
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=SCRIPT_DIR,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def heavy_imports(imports):
+    """Return the heavy packages present in a list of parsed imports."""
+    imported = {name.split(".")[0] for name, _, _, _ in imports}
+    return [package for package in HEAVY_PACKAGES if package in imported]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SAP Audit Tool startup")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per command")
+    parser.add_argument("--top", type=int, default=5, help="Slowest top-level imports to list")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Startup budget in ms")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if a command exceeds the budget")
+    args = parser.parse_args()
+
+    print(f"{'Command':<30} {'Wall ms':>9} {'Import ms':>10}  Heavy imports")
+    print("-" * 80)
+
+    over_budget = []
+    for label, command in STARTUP_COMMANDS.items():
+        imports = trace_command(command)
+        wall_ms = time_command(command, args.runs)
+        import_ms = sum(cumulative for _, _, cumulative, depth in imports if depth == 0) / 1000
+        heavy = heavy_imports(imports)
+
+        print(f"{label:<30} {wall_ms:>9.1f} {import_ms:>10.1f}  {', '.join(heavy) or '-'}")
+        top_level = sorted((i for i in imports if i[3] == 0), key=lambda i: i[2], reverse=True)
+        for name, _, cumulative, _ in top_level[:args.top]:
+            print(f"    {name:<40} {cumulative / 1000:>8.1f} ms")
+
+        # Only non-processing commands are held to the budget
+        if not label.startswith("import sap_audit_controller") and wall_ms > args.budget_ms:
+            over_budget.append(label)
+
+    if over_budget:
+        print(f"\nOver the {args.budget_ms:.0f} ms budget: {', '.join(over_budget)}")
+        if args.check:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
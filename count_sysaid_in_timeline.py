@@ -1,37 +1,21 @@
-import pandas as pd
 import os
 import re
 from datetime import datetime
 
+from sap_audit_utils import standardize_sysaid_series, SYSAID_UNKNOWN
+from sap_audit_timeline_sidecar import read_timeline
+
 def log_message(message):
     """Log a message with timestamp."""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {message}")
 
-def standardize_sysaid(value):
-    """Standardize SysAid numbers by removing prefixes and commas."""
-    if not value or pd.isna(value) or str(value).strip() == '':
-        return "UNKNOWN"
-    
-    value = str(value).strip()
-    
-    # Remove hash prefix
-    value = re.sub(r'^#', '', value)
-    
-    # Remove SR- or CR- prefixes
-    value = re.sub(r'^(SR|CR)-', '', value)
-    
-    # Remove commas
-    value = value.replace(',', '')
-    
-    return value
-
 def analyze_timeline_file(file_path):
     """Analyze the session timeline Excel file for SysAid values."""
     log_message(f"Reading timeline file: {file_path}")
     
     try:
-        df = pd.read_excel(file_path)
+        df = read_timeline(file_path)
         log_message(f"Successfully read file with {len(df)} rows")
         
         # Check for session and SysAid columns
@@ -53,9 +37,9 @@ def analyze_timeline_file(file_path):
         sysaid_values = df[sysaid_col].unique()
         log_message(f"Found {len(sysaid_values)} unique raw SysAid values")
         
-        # Standardize SysAid values
-        standardized_values = [standardize_sysaid(val) for val in sysaid_values]
-        unique_standardized = set(standardized_values)
+        # Standardize SysAid values (once per distinct value)
+        std_col = standardize_sysaid_series(df[sysaid_col])
+        unique_standardized = set(std_col.unique())
         log_message(f"After standardization: {len(unique_standardized)} unique values")
         
         # Show all unique values
@@ -72,17 +56,10 @@ def analyze_timeline_file(file_path):
         # Map sessions to SysAid values
         session_to_sysaid = {}
         for session_id in df[session_col].unique():
-            subset = df[df[session_col] == session_id]
-            sysaids = subset[sysaid_col].unique()
-            # Take the most common non-UNKNOWN value if multiple exist
-            if len(sysaids) > 1 and "UNKNOWN" in [standardize_sysaid(s) for s in sysaids]:
-                non_unknown = [s for s in sysaids if standardize_sysaid(s) != "UNKNOWN"]
-                if non_unknown:
-                    session_to_sysaid[session_id] = standardize_sysaid(non_unknown[0])
-                else:
-                    session_to_sysaid[session_id] = "UNKNOWN"
-            else:
-                session_to_sysaid[session_id] = standardize_sysaid(sysaids[0])
+            std_values = std_col[df[session_col] == session_id].unique()
+            # Take the first non-UNKNOWN value if multiple exist
+            non_unknown = [s for s in std_values if s != SYSAID_UNKNOWN]
+            session_to_sysaid[session_id] = non_unknown[0] if non_unknown else SYSAID_UNKNOWN
                 
         log_message("\nSession to SysAid mapping:")
         for session, sysaid in session_to_sysaid.items():
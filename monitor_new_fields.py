@@ -6,19 +6,15 @@ This script monitors SAP session timeline data for new fields that might need de
 Run it periodically after processing new SAP log files to ensure all fields have descriptions.
 """
 
-import pandas as pd
 import os
 import sys
-from datetime import datetime
+
+from sap_audit_logging import log_message
+from sap_audit_timeline_sidecar import read_timeline
 
 # Import the field descriptions
 from sap_audit_tool_risk_assessment import get_common_field_descriptions
 
-def log_message(message, level="INFO"):
-    """Log a message with timestamp and level."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] {level}: {message}")
-
 def monitor_fields(file_path):
     """
     Monitor for new fields in the session timeline.
@@ -29,8 +25,8 @@ def monitor_fields(file_path):
     log_message(f"Analyzing file: {file_path}")
     
     try:
-        # Read the session timeline
-        df = pd.read_excel(file_path, sheet_name='Session_Timeline')
+        # Read the session timeline (from its typed sidecar when current)
+        df = read_timeline(file_path, sheet_name='Session_Timeline')
         log_message(f"Loaded {len(df)} rows of data")
         
         # Get current field descriptions
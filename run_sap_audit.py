@@ -20,16 +20,16 @@ Options:
 """
 
 import argparse
-import os
 import sys
 from datetime import datetime
 
-# Import the configuration module
-from sap_audit_config import PATHS, SETTINGS, CONFIG, VERSION, load_config_file, log_message
+# The configuration module is imported by main() after the command line has
+# been parsed, so that variables from --env-file are in the environment before
+# the configuration reads it. All other options go into the run's AuditContext.
 
 def parse_args():
     """Parse command line arguments."""
-    parser = argparse.ArgumentParser(description=f"SAP Audit Tool v{VERSION}")
+    parser = argparse.ArgumentParser(description="SAP Audit Tool")
     
     parser.add_argument("--input-dir", help="Directory containing input files")
     parser.add_argument("--output-dir", help="Directory for output files")
@@ -42,55 +42,101 @@ def parse_args():
     
     return parser.parse_args()
 
-def main():
-    """Main entry point for the SAP Audit Tool."""
-    start_time = datetime.now()
-    args = parse_args()
+def apply_environment(args):
+    """
+    Load the --env-file into the environment before configuration is loaded.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        List of (message, level) tuples to log once logging is available
+    """
+    messages = []
     
     # Load .env file if specified
     if args.env_file:
         try:
             from dotenv import load_dotenv
             if load_dotenv(args.env_file):
-                log_message(f"Loaded environment variables from {args.env_file}")
+                messages.append((f"Loaded environment variables from {args.env_file}", "INFO"))
             else:
-                log_message(f"Could not load .env file: {args.env_file}", "WARNING")
+                messages.append((f"Could not load .env file: {args.env_file}", "WARNING"))
         except ImportError:
-            log_message("python-dotenv package not installed. Cannot load .env file.", "ERROR")
+            messages.append(("python-dotenv package not installed. Cannot load .env file.", "ERROR"))
+    
+    return messages
+
+def build_context(args):
+    """
+    Build the AuditContext of the run from the command line.
+    
+    The module-level configuration is left untouched; folders, the
+    configuration file, --sysaid and --debug only apply to this run.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        AuditContext: Context of the run
+    """
+    from sap_audit_config import PATHS
+    from sap_audit_context import AuditContext
+    
+    overrides = {"enable_sysaid": True} if args.sysaid else {}
+    if args.input_dir or args.output_dir:
+        # Caches keep their configured location, as for a default run
+        context = AuditContext.for_folder(args.input_dir or PATHS["input_dir"],
+                                          args.output_dir or PATHS["output_dir"],
+                                          overrides, cache_dir=PATHS["cache_dir"])
+    else:
+        context = AuditContext()
+        context.config.update(overrides)
+    
+    if args.config_file:
+        context.load_config_file(args.config_file)
+    if args.debug:
+        context.settings["debug"] = True
+    return context
+
+def main():
+    """Main entry point for the SAP Audit Tool."""
+    start_time = datetime.now()
+    args = parse_args()
+    messages = apply_environment(args)
+    
+    # Import the configuration module
+    from sap_audit_config import VERSION, log_message, export_env_sample, export_config_sample
+    from sap_audit_logging import configure_logging
+    for message, level in messages:
+        log_message(message, level)
     
     # Export sample configuration if requested
     if args.export_env:
-        os.system(f"python {os.path.join(PATHS['script_dir'], 'sap_audit_config.py')} --export-env")
-        return
+        export_env_sample()
+        return 0
     
     if args.export_config:
-        os.system(f"python {os.path.join(PATHS['script_dir'], 'sap_audit_config.py')} --export-config")
-        return
-    
-    # Override config with command line arguments
-    if args.input_dir:
-        os.environ["SAP_AUDIT_INPUT_DIR"] = args.input_dir
-    if args.output_dir:
-        os.environ["SAP_AUDIT_OUTPUT_DIR"] = args.output_dir
-    if args.config_file:
-        load_config_file(args.config_file)
-    if args.debug:
-        os.environ["SAP_AUDIT_DEBUG"] = "true"
-        SETTINGS["debug"] = True
-    if args.sysaid:
-        CONFIG["enable_sysaid"] = True
+        export_config_sample()
+        return 0
+    
+    # Apply the command line to this run's context; logging follows its settings
+    context = build_context(args)
+    configure_logging(context.settings)
     
     # Import the controller after all configuration is set
     try:
         from sap_audit_controller import AuditController
         
         log_message(f"Starting SAP Audit Tool v{VERSION}")
-        log_message(f"Input directory: {PATHS['input_dir']}")
-        log_message(f"Output directory: {PATHS['output_dir']}")
+        log_message(f"Input directory: {context.paths['input_dir']}")
+        log_message(f"Output directory: {context.paths['output_dir']}")
         
         # Run the audit controller
-        controller = AuditController()
-        controller.run()
+        controller = AuditController(context=context)
+        if not controller.run_full_audit():
+            log_message("Audit completed with errors", "ERROR")
+            return 1
         
         elapsed_time = datetime.now() - start_time
         log_message(f"Audit completed successfully in {elapsed_time}")
@@ -101,7 +147,7 @@ def main():
         return 1
     except Exception as e:
         log_message(f"An error occurred: {str(e)}", "ERROR")
-        if SETTINGS["debug"]:
+        if context.settings["debug"]:
             import traceback
             traceback.print_exc()
         return 1
@@ -5,18 +5,39 @@ This package provides functionality for analyzing SAP audit logs.
 It includes tools for risk detection, pattern analysis, and reporting.
 """
 
-from .utils import log_message, load_audit_report, extract_field_value
-from .analysis import (
-    analyze_risk_distribution,
-    analyze_high_risk_items,
-    analyze_key_users,
-    analyze_debug_activities,
-    analyze_session_patterns,
-    analyze_algorithm_improvements
-)
-from .metadata import load_metadata, save_metadata, update_metadata
-from .reporting import generate_text_summary, generate_html_report
-from .run import run_analysis, run_analysis_from_audit_tool
+from importlib import import_module
+
+# Public components are imported from their submodule on first access, so
+# importing the package (e.g. for "python -m sap_analyzer.run --help") does
+# not import pandas.
+_LAZY_EXPORTS = {
+    'log_message': 'utils',
+    'load_audit_report': 'utils',
+    'extract_field_value': 'utils',
+    'analyze_risk_distribution': 'analysis',
+    'analyze_high_risk_items': 'analysis',
+    'analyze_key_users': 'analysis',
+    'analyze_debug_activities': 'analysis',
+    'analyze_session_patterns': 'analysis',
+    'analyze_algorithm_improvements': 'analysis',
+    'load_metadata': 'metadata',
+    'save_metadata': 'metadata',
+    'update_metadata': 'metadata',
+    'generate_text_summary': 'reporting',
+    'generate_html_report': 'reporting',
+    'run_analysis': 'run',
+    'run_analysis_from_audit_tool': 'run',
+}
+
+
+def __getattr__(name):
+    """Import public components from their submodule on first access."""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
 
 # Configuration and constants
 VERSION = "1.0.0"
@@ -0,0 +1,18 @@
+"""
+Default file locations for SAP audit log analysis.
+
+This module has no third-party dependencies so that entry points can resolve
+their defaults without importing pandas.
+"""
+
+import os
+
+# Default paths
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_DIR = os.path.join(SCRIPT_DIR, "output")
+
+# Default file paths
+DEFAULT_REPORT_PATH = os.path.join(OUTPUT_DIR, "SAP_Audit_Report.xlsx")
+DEFAULT_ANALYSIS_PATH = os.path.join(OUTPUT_DIR, "SAP_Audit_Analysis.html")
+DEFAULT_SUMMARY_PATH = os.path.join(OUTPUT_DIR, "SAP_Audit_Summary.txt")
+DEFAULT_METADATA_PATH = os.path.join(OUTPUT_DIR, "SAP_Audit_Metadata.json")
@@ -9,17 +9,12 @@ import os
 import sys
 from datetime import datetime
 
-from .utils import (
-    log_message, load_audit_report, load_sysaid_data,
-    DEFAULT_REPORT_PATH, DEFAULT_ANALYSIS_PATH, DEFAULT_SUMMARY_PATH, DEFAULT_METADATA_PATH
+from .paths import (
+    OUTPUT_DIR, DEFAULT_REPORT_PATH, DEFAULT_ANALYSIS_PATH, DEFAULT_SUMMARY_PATH, DEFAULT_METADATA_PATH
 )
-from .analysis import (
-    analyze_risk_distribution, analyze_high_risk_items,
-    analyze_key_users, analyze_debug_activities, analyze_session_patterns,
-    analyze_algorithm_improvements, enrich_with_sysaid_data
-)
-from .metadata import load_metadata, update_metadata
-from .reporting import generate_text_summary, generate_html_report
+
+# The analysis modules depend on pandas and are imported by run_analysis(),
+# so argument parsing and --help do not pay for them.
 
 def run_analysis(
     report_path=DEFAULT_REPORT_PATH,
@@ -41,8 +36,18 @@ def run_analysis(
     Returns:
         A dictionary containing analysis results and output paths
     """
+    from .utils import log_message, load_audit_report, load_sysaid_data
+    from .analysis import (
+        analyze_risk_distribution, analyze_high_risk_items,
+        analyze_key_users, analyze_debug_activities, analyze_session_patterns,
+        analyze_algorithm_improvements, enrich_with_sysaid_data
+    )
+    from .metadata import load_metadata, update_metadata
+    from .reporting import generate_text_summary, generate_html_report
+    
     start_time = datetime.now()
     log_message("Starting SAP Audit Analysis...")
+    os.makedirs(os.path.dirname(os.path.abspath(summary_path)), exist_ok=True)
     
     # Step 1: Load the audit report
     report_data = load_audit_report(report_path)
@@ -124,8 +129,9 @@ def run_analysis_from_audit_tool(excel_path=None, output_dir=None, sysaid_path=N
     Returns:
         A dictionary containing analysis results and output paths
     """
+    from .utils import log_message
+    
     if output_dir is None:
-        from .utils import OUTPUT_DIR
         output_dir = OUTPUT_DIR
     
     # Ensure output directory exists
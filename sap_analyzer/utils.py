@@ -6,26 +6,15 @@ import os
 import json
 import pandas as pd
 import re
-from datetime import datetime
 import traceback
 
-# Default paths
-SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-OUTPUT_DIR = os.path.join(SCRIPT_DIR, "output")
-
-# Ensure output directory exists
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+from sap_audit_logging import log_message
 
-# Default file paths
-DEFAULT_REPORT_PATH = os.path.join(OUTPUT_DIR, "SAP_Audit_Report.xlsx")
-DEFAULT_ANALYSIS_PATH = os.path.join(OUTPUT_DIR, "SAP_Audit_Analysis.html")
-DEFAULT_SUMMARY_PATH = os.path.join(OUTPUT_DIR, "SAP_Audit_Summary.txt")
-DEFAULT_METADATA_PATH = os.path.join(OUTPUT_DIR, "SAP_Audit_Metadata.json")
-
-def log_message(message, level="INFO"):
-    """Log a message with timestamp and level."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] {level}: {message}")
+# Default paths
+from .paths import (
+    SCRIPT_DIR, OUTPUT_DIR,
+    DEFAULT_REPORT_PATH, DEFAULT_ANALYSIS_PATH, DEFAULT_SUMMARY_PATH, DEFAULT_METADATA_PATH
+)
 
 def load_audit_report(report_path=DEFAULT_REPORT_PATH):
     """
@@ -21,15 +21,171 @@ with more detailed information for audit analysis.
 
 import os
 import sys
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import re
 
 # Import configuration
-from sap_audit_config import PATHS, COLUMNS, SETTINGS
+from sap_audit_config import COLUMNS
+from sap_audit_context import AuditContext
 from sap_audit_utils import (
     log_message, log_section, log_error, handle_exception
 )
+from sap_audit_text_features import TextFeatureCache
+
+# Candidate column names for fields that differ between data sources
+TCODE_COLUMNS = ['TCode', 'TCODE', 'SOURCE TA']
+EVENT_COLUMNS = ['Event', 'EVENT']
+MESSAGE_COLUMNS = ['AUDIT LOG MSG. TEXT', 'MESSAGE', 'MSG']
+CHANGE_INDICATOR_COLUMNS = ['Change_Indicator', 'CHANGE INDICATOR', 'CHANGE_INDICATOR']
+VARIABLE_COLUMNS = ['VARIABLE 1', 'VARIABLE 2', 'VARIABLE', 'VAR', 'NOTE']
+
+# Transaction code and event code families
+TABLE_MAINTENANCE_TCODES = ['SM30', 'SM31', 'SM34', 'SE16', 'SE16N', 'SM32', 'SE11', 'SE13']
+TRANSPORT_TCODES = ['STMS', 'SE01', 'SE09', 'SE10', 'SE03', 'SE38', 'SE80']
+TRANSPORT_EVENTS = ['EU1', 'EU2', 'EU3', 'EU4', 'CL', 'CT']
+DEBUG_TCODES = ['/H', 'ABAPDBG', 'SE24', 'SE37', 'SE38', 'SE80']
+DEBUG_EVENTS = ['DB', 'DB1', 'DB2', 'DB3', 'DBC', 'DBG', 'DBI']
+DISPLAY_TCODES = ['VA03', 'MM03', 'ME23', 'FK03', 'BP03', 'XD01', 'XD02', 'XD03', 'FD03', 'IW33']
+
+CHANGE_INDICATOR_MAP = {
+    "U": "02 - Update",  # Update
+    "I": "01 - Insert",  # Insert
+    "D": "06 - Delete",  # Delete
+    "C": "04 - Create",  # Create
+    "M": "02 - Update",  # Modify
+}
+
+# BD is listed as both a creation and a deletion event; creation takes precedence
+CHANGE_EVENT_MAP = {
+    **dict.fromkeys(["BD1", "BD2"], "06 - Delete"),
+    **dict.fromkeys(["BC", "BE", "BW", "BW1"], "02 - Update"),
+    **dict.fromkeys(["BU", "BD", "BU1", "BU2", "BU3"], "01 - Insert"),
+}
+
+BENIGN_EVENT_MAP = {
+    "AU1": "Logon",
+    "AUC": "Logoff",
+    "AUE": "Logoff",
+    "AU6": "Session Manager",
+    "AUG": "Session Manager",
+}
+
+# Change keyword families (registered text features), checked in order;
+# the first matching family wins
+CHANGE_KEYWORD_FAMILIES = [
+    ("change_insert", "01 - Insert"),
+    ("change_update", "02 - Update"),
+    ("change_delete", "06 - Delete"),
+]
+
+
+def _first_column(df, candidates):
+    """Return the first candidate column present in df, or None."""
+    return next((col for col in candidates if col in df.columns), None)
+
+
+def _yes_series(flags, index):
+    """Convert a boolean array into a "Yes"/"" flag Series."""
+    return pd.Series(np.where(flags, "Yes", ""), index=index)
+
+
+# Sample reference data used when a reference CSV file is not available
+SAMPLE_REFERENCE_DATA = {
+    "tcode_descriptions": {
+        'SE38': 'ABAP Editor',
+        'SE37': 'Function Builder',
+        'SE24': 'Class Builder',
+        'SE80': 'Object Navigator',
+        'SU01': 'User Maintenance',
+        'PFCG': 'Role Maintenance',
+        'SM30': 'Table Maintenance',
+        'SE16': 'Data Browser',
+        'SE16N': 'Enhanced Data Browser',
+        'VA01': 'Create Sales Order',
+        'VA02': 'Change Sales Order',
+        'VA03': 'Display Sales Order',
+        'MM01': 'Create Material',
+        'MM02': 'Change Material',
+        'MM03': 'Display Material',
+        'ME21': 'Create Purchase Order',
+        'ME23': 'Display Purchase Order',
+        'STMS': 'Transport Management System',
+        'FK01': 'Create Vendor (Accounting)',
+        'FK03': 'Display Vendor (Accounting)'
+    },
+    "event_descriptions": {
+        'AU1': 'User Login',
+        'AUC': 'User Logout',
+        'AUE': 'User Logout (Explicit)',
+        'AU6': 'Session Manager Start',
+        'AUG': 'Session Manager Restart',
+        'BU': 'Record Created',
+        'BC': 'Record Changed',
+        'BD': 'Record Deleted',
+        'TX': 'Transaction Started'
+    },
+    "table_descriptions": {
+        'MARA': 'General Material Data',
+        'MARC': 'Plant Material Data',
+        'KNA1': 'Customer Master (General Section)',
+        'LFA1': 'Vendor Master (General Section)',
+        'VBAK': 'Sales Document: Header Data',
+        'VBAP': 'Sales Document: Item Data',
+        'EKKO': 'Purchasing Document Header',
+        'EKPO': 'Purchasing Document Item',
+        'USR02': 'User Master Password Data',
+        'LIKP': 'Delivery Header'
+    },
+    "high_risk_tcode_categories": {
+        'SE38': 'Development',
+        'SE37': 'Development',
+        'SE24': 'Development',
+        'SE80': 'Development',
+        'SU01': 'Security',
+        'PFCG': 'Security',
+        'SM30': 'Table Maintenance',
+        'SE16': 'Table Maintenance',
+        'SE16N': 'Table Maintenance',
+        'STMS': 'Transport'
+    },
+    "high_risk_table_categories": {
+        'USR02': 'Security - User Password',
+        'USR01': 'Security - User Master',
+        'USGRP': 'Security - User Groups',
+        'USOBT': 'Security - Authorization Objects',
+        'AGR_USERS': 'Security - Role Assignments',
+        'AGR_DEFINE': 'Security - Role Definitions',
+        'USOBX_C': 'Security - Authorization Checks',
+        'KNA1': 'Master Data - Customer',
+        'LFA1': 'Master Data - Vendor'
+    },
+}
+
+
+def _lazy_reference(name):
+    """
+    Create a property for a reference attribute that loads on first access.
+    
+    Args:
+        name: Attribute name; the value is stored in "_<name>"
+        
+    Returns:
+        property: Lazy-loading property that can also be assigned directly
+    """
+    private_name = f"_{name}"
+    
+    def getter(self):
+        if getattr(self, private_name) is None:
+            self._load_reference_data()
+        return getattr(self, private_name)
+    
+    def setter(self, value):
+        setattr(self, private_name, value)
+    
+    return property(getter, setter, doc=f"{name} reference data, loaded on first use.")
+
 
 class SAPAuditAnalyzer:
     """
@@ -39,31 +195,41 @@ class SAPAuditAnalyzer:
     including descriptive information and risk flag columns.
     """
     
-    def __init__(self, config=None):
+    def __init__(self, config=None, context=None):
         """
         Initialize the analyzer with configuration.
         
+        Reference data is not loaded here; it is loaded from the reference
+        data service the first time any reference attribute is used.
+        
         Args:
             config: Optional configuration dictionary
+            context: Optional AuditContext providing the reference data
         """
         self.config = config or {}
-        
-        # Initialize reference dictionaries
-        self.tcode_descriptions = {}
-        self.event_descriptions = {}
-        self.table_descriptions = {}
-        self.high_risk_tcodes = set()
-        self.high_risk_tcode_categories = {}
-        self.high_risk_tables = set()
-        self.high_risk_table_categories = {}
-        
-        # Load reference data
-        self._load_reference_data()
+        self.context = context or AuditContext.default()
+        
+        # Reference dictionaries, populated on first use
+        self._tcode_descriptions = None
+        self._event_descriptions = None
+        self._table_descriptions = None
+        self._high_risk_tcodes = None
+        self._high_risk_tcode_categories = None
+        self._high_risk_tables = None
+        self._high_risk_table_categories = None
+    
+    tcode_descriptions = _lazy_reference("tcode_descriptions")
+    event_descriptions = _lazy_reference("event_descriptions")
+    table_descriptions = _lazy_reference("table_descriptions")
+    high_risk_tcodes = _lazy_reference("high_risk_tcodes")
+    high_risk_tcode_categories = _lazy_reference("high_risk_tcode_categories")
+    high_risk_tables = _lazy_reference("high_risk_tables")
+    high_risk_table_categories = _lazy_reference("high_risk_table_categories")
     
     @handle_exception
     def _load_reference_data(self):
         """
-        Load reference data from CSV files.
+        Load reference data from the reference data service.
         
         Loads:
         - Transaction code descriptions
@@ -71,156 +237,40 @@ class SAPAuditAnalyzer:
         - Table descriptions
         - High-risk transaction codes
         - High-risk tables
+        
+        Sample data is used for any reference file that does not exist.
+        Attributes that were already assigned are left untouched.
         """
         log_section("Loading Reference Data for Enhanced Analysis")
-        
-        # Load transaction code descriptions
-        try:
-            tcodes_file = PATHS.get("tcodes_reference")
-            if tcodes_file and os.path.exists(tcodes_file):
-                df_tcodes = pd.read_csv(tcodes_file)
-                self.tcode_descriptions = dict(zip(df_tcodes["TCode"], df_tcodes["TCode Description"]))
-                log_message(f"Loaded {len(self.tcode_descriptions)} transaction code descriptions")
+        loaded = {}
+        
+        for name, label in [("tcode_descriptions", "transaction code descriptions"),
+                            ("event_descriptions", "event code descriptions"),
+                            ("table_descriptions", "table descriptions")]:
+            descriptions = self.context.reference_data.get(name)
+            if descriptions is not None:
+                loaded[name] = dict(descriptions)
+                log_message(f"Loaded {len(descriptions)} {label}")
             else:
-                # Create demo data for testing
-                demo_tcodes = {
-                    'SE38': 'ABAP Editor',
-                    'SE37': 'Function Builder',
-                    'SE24': 'Class Builder',
-                    'SE80': 'Object Navigator',
-                    'SU01': 'User Maintenance',
-                    'PFCG': 'Role Maintenance',
-                    'SM30': 'Table Maintenance',
-                    'SE16': 'Data Browser',
-                    'SE16N': 'Enhanced Data Browser',
-                    'VA01': 'Create Sales Order',
-                    'VA02': 'Change Sales Order',
-                    'VA03': 'Display Sales Order',
-                    'MM01': 'Create Material',
-                    'MM02': 'Change Material',
-                    'MM03': 'Display Material',
-                    'ME21': 'Create Purchase Order',
-                    'ME23': 'Display Purchase Order',
-                    'STMS': 'Transport Management System',
-                    'FK01': 'Create Vendor (Accounting)',
-                    'FK03': 'Display Vendor (Accounting)'
-                }
-                self.tcode_descriptions = demo_tcodes
-                log_message(f"Created {len(self.tcode_descriptions)} sample transaction code descriptions for testing")
-        except Exception as e:
-            log_error(e, "Error loading transaction code descriptions")
-        
-        # Load event code descriptions
-        try:
-            events_file = PATHS.get("events_reference")
-            if events_file and os.path.exists(events_file):
-                df_events = pd.read_csv(events_file)
-                self.event_descriptions = dict(zip(df_events["Event Code"], df_events["Event Code Description"]))
-                log_message(f"Loaded {len(self.event_descriptions)} event code descriptions")
-            else:
-                # Create demo data for testing
-                demo_events = {
-                    'AU1': 'User Login',
-                    'AUC': 'User Logout',
-                    'AUE': 'User Logout (Explicit)',
-                    'AU6': 'Session Manager Start',
-                    'AUG': 'Session Manager Restart',
-                    'BU': 'Record Created',
-                    'BC': 'Record Changed',
-                    'BD': 'Record Deleted',
-                    'TX': 'Transaction Started'
-                }
-                self.event_descriptions = demo_events
-                log_message(f"Created {len(self.event_descriptions)} sample event descriptions for testing")
-        except Exception as e:
-            log_error(e, "Error loading event descriptions")
-        
-        # Load table descriptions
-        try:
-            tables_file = PATHS.get("tables_reference")
-            if tables_file and os.path.exists(tables_file):
-                df_tables = pd.read_csv(tables_file)
-                self.table_descriptions = dict(zip(df_tables["Table"], df_tables["Table Description"]))
-                log_message(f"Loaded {len(self.table_descriptions)} table descriptions")
-            else:
-                # Create demo data for testing
-                demo_tables = {
-                    'MARA': 'General Material Data',
-                    'MARC': 'Plant Material Data',
-                    'KNA1': 'Customer Master (General Section)',
-                    'LFA1': 'Vendor Master (General Section)',
-                    'VBAK': 'Sales Document: Header Data',
-                    'VBAP': 'Sales Document: Item Data',
-                    'EKKO': 'Purchasing Document Header',
-                    'EKPO': 'Purchasing Document Item',
-                    'USR02': 'User Master Password Data',
-                    'LIKP': 'Delivery Header'
-                }
-                self.table_descriptions = demo_tables
-                log_message(f"Created {len(self.table_descriptions)} sample table descriptions for testing")
-        except Exception as e:
-            log_error(e, "Error loading table descriptions")
-        
-        # Load high-risk transaction codes
-        try:
-            high_risk_tcodes_file = PATHS.get("high_risk_tcodes")
-            if high_risk_tcodes_file and os.path.exists(high_risk_tcodes_file):
-                df_hr_tcodes = pd.read_csv(high_risk_tcodes_file)
-                self.high_risk_tcodes = set(df_hr_tcodes["TCode"].str.upper())
-                
-                # Create category mapping if Category column exists
-                if "Category" in df_hr_tcodes.columns:
-                    self.high_risk_tcode_categories = dict(zip(df_hr_tcodes["TCode"].str.upper(), df_hr_tcodes["Category"]))
-                
-                log_message(f"Loaded {len(self.high_risk_tcodes)} high-risk transaction codes")
-            else:
-                # Create demo data for testing
-                self.high_risk_tcodes = {'SE38', 'SE37', 'SE24', 'SE80', 'SU01', 'PFCG', 'SM30', 'SE16', 'SE16N', 'STMS'}
-                self.high_risk_tcode_categories = {
-                    'SE38': 'Development',
-                    'SE37': 'Development',
-                    'SE24': 'Development',
-                    'SE80': 'Development',
-                    'SU01': 'Security',
-                    'PFCG': 'Security',
-                    'SM30': 'Table Maintenance',
-                    'SE16': 'Table Maintenance',
-                    'SE16N': 'Table Maintenance',
-                    'STMS': 'Transport'
-                }
-                log_message(f"Created {len(self.high_risk_tcodes)} sample high-risk transaction codes for testing")
-        except Exception as e:
-            log_error(e, "Error loading high-risk transaction codes")
-        
-        # Load high-risk tables
-        try:
-            high_risk_tables_file = PATHS.get("high_risk_tables")
-            if high_risk_tables_file and os.path.exists(high_risk_tables_file):
-                df_hr_tables = pd.read_csv(high_risk_tables_file)
-                self.high_risk_tables = set(df_hr_tables["Table"].str.upper())
-                
-                # Create category mapping if Category column exists
-                if "Category" in df_hr_tables.columns:
-                    self.high_risk_table_categories = dict(zip(df_hr_tables["Table"].str.upper(), df_hr_tables["Category"]))
-                
-                log_message(f"Loaded {len(self.high_risk_tables)} high-risk tables")
+                loaded[name] = dict(SAMPLE_REFERENCE_DATA[name])
+                log_message(f"Created {len(loaded[name])} sample {label} for testing")
+        
+        for name, label in [("high_risk_tcodes", "high-risk transaction codes"),
+                            ("high_risk_tables", "high-risk tables")]:
+            high_risk = self.context.reference_data.get(name)
+            if high_risk is not None:
+                loaded[name] = set(high_risk["codes"])
+                loaded[f"{name[:-1]}_categories"] = dict(high_risk["categories"])
+                log_message(f"Loaded {len(loaded[name])} {label}")
             else:
-                # Create demo data for testing
-                self.high_risk_tables = {'USR02', 'USR01', 'USGRP', 'USOBT', 'AGR_USERS', 'AGR_DEFINE', 'USOBX_C', 'KNA1', 'LFA1'}
-                self.high_risk_table_categories = {
-                    'USR02': 'Security - User Password',
-                    'USR01': 'Security - User Master',
-                    'USGRP': 'Security - User Groups',
-                    'USOBT': 'Security - Authorization Objects',
-                    'AGR_USERS': 'Security - Role Assignments',
-                    'AGR_DEFINE': 'Security - Role Definitions',
-                    'USOBX_C': 'Security - Authorization Checks',
-                    'KNA1': 'Master Data - Customer',
-                    'LFA1': 'Master Data - Vendor'
-                }
-                log_message(f"Created {len(self.high_risk_tables)} sample high-risk tables for testing")
-        except Exception as e:
-            log_error(e, "Error loading high-risk tables")
+                categories = SAMPLE_REFERENCE_DATA[f"{name[:-1]}_categories"]
+                loaded[name] = set(categories)
+                loaded[f"{name[:-1]}_categories"] = dict(categories)
+                log_message(f"Created {len(loaded[name])} sample {label} for testing")
+        
+        for name, value in loaded.items():
+            if getattr(self, f"_{name}") is None:
+                setattr(self, name, value)
     
     @handle_exception
     def analyze(self, session_data):
@@ -311,488 +361,276 @@ class SAPAuditAnalyzer:
     def _add_analysis_flag_columns(self, df):
         """
         Add analysis flag columns that identify specific risk categories.
-        
+
+        All flags share one TextFeatureCache, so each text column is factorized
+        and lowercased once and each keyword regex runs on unique values only.
+
         Args:
             df: DataFrame to enhance
-            
+
         Returns:
             Enhanced DataFrame with analysis flag columns
         """
         log_message("Adding analysis flag columns")
-        
+        text = TextFeatureCache(df)
+
         # Add Table Maintenance flag
-        df["Table_Maintenance"] = self._identify_table_maintenance(df)
-        
+        df["Table_Maintenance"] = self._identify_table_maintenance(df, text)
+
         # Add High Risk TCode flag
-        df["High_Risk_TCode"] = self._identify_high_risk_tcodes(df)
-        
+        df["High_Risk_TCode"] = self._identify_high_risk_tcodes(df, text)
+
         # Add Change Activity flag
-        df["Change_Activity"] = self._identify_change_activity(df)
-        
+        df["Change_Activity"] = self._identify_change_activity(df, text)
+
         # Add Transport Related Event flag
-        df["Transport_Related_Event"] = self._identify_transport_events(df)
-        
+        df["Transport_Related_Event"] = self._identify_transport_events(df, text)
+
         # Add Debugging Related Event flag
-        df["Debugging_Related_Event"] = self._identify_debugging_events(df)
-        
+        df["Debugging_Related_Event"] = self._identify_debugging_events(df, text)
+
         # Add Benign Activity flag
-        df["Benign_Activity"] = self._identify_benign_activities(df)
-        
+        df["Benign_Activity"] = self._identify_benign_activities(df, text)
+
         return df
-    
-    def _identify_table_maintenance(self, df):
+
+    def _identify_table_maintenance(self, df, text=None):
         """
         Identify table maintenance activities.
-        
+
         Args:
             df: Input DataFrame
-            
+            text: Optional shared TextFeatureCache for df
+
         Returns:
             Series with "Yes" for table maintenance activities, "" otherwise
         """
-        # Initialize with empty strings
-        table_maintenance = pd.Series("", index=df.index)
-        
+        text = text or TextFeatureCache(df)
+        flagged = np.zeros(len(df), dtype=bool)
+
         # Check for table maintenance transaction codes
-        table_maint_tcodes = ['SM30', 'SM31', 'SM34', 'SE16', 'SE16N', 'SM32', 'SE11', 'SE13']
-        
-        # Handle multiple possible column names
-        tcode_col = next((col for col in ['TCode', 'TCODE', 'SOURCE TA'] if col in df.columns), None)
+        tcode_col = _first_column(df, TCODE_COLUMNS)
         if tcode_col:
-            table_maintenance = table_maintenance.mask(
-                df[tcode_col].fillna('').astype(str).isin(table_maint_tcodes), 
-                "Yes"
-            )
-            
+            flagged |= text.isin(tcode_col, TABLE_MAINTENANCE_TCODES)
+
         # Check for table maintenance in risk description
         if "risk_description" in df.columns:
-            table_maintenance = table_maintenance.mask(
-                df["risk_description"].str.contains("table maintenance|modify table|database table|data dictionary", 
-                                                   case=False, na=False, regex=True),
-                "Yes"
-            )
-            
+            flagged |= text.contains("risk_description", "table_maintenance_risk")
+
         # Look for direct table changes in the system logs
         if "Description" in df.columns:
-            table_maintenance = table_maintenance.mask(
-                df["Description"].str.contains("table|field", 
-                                              case=False, na=False, regex=True) &
-                df["Description"].str.contains("change|update|modify|create|delete|insert", 
-                                              case=False, na=False, regex=True),
-                "Yes"
-            )
-        
+            flagged |= text.contains("Description", "table_object", require="change_verb")
+
         # Look for table changes in the audit message
-        msg_col = next((col for col in ['AUDIT LOG MSG. TEXT', 'MESSAGE', 'MSG'] if col in df.columns), None)
+        msg_col = _first_column(df, MESSAGE_COLUMNS)
         if msg_col:
-            table_maintenance = table_maintenance.mask(
-                df[msg_col].fillna('').astype(str).str.contains("table|maintenance|field|data dictionary", 
-                                                               case=False, regex=True),
-                "Yes"
-            )
-            
-        # Check for table-related activities in CDPOS
+            flagged |= text.contains(msg_col, "table_maintenance_message")
+
+        # Any operations on CDPOS tables are considered table maintenance
         if 'TABLE NAME' in df.columns:
-            # Any operations on tables are considered table maintenance
-            table_maintenance = table_maintenance.mask(
-                (df['TABLE NAME'] != '') & df['TABLE NAME'].notna(),
-                "Yes"
-            )
-            
-        return table_maintenance
-    
-    def _identify_high_risk_tcodes(self, df):
+            flagged |= ((df['TABLE NAME'] != '') & df['TABLE NAME'].notna()).to_numpy()
+
+        return _yes_series(flagged, df.index)
+
+    def _identify_high_risk_tcodes(self, df, text=None):
         """
         Identify high-risk transaction codes.
-        
+
         Args:
             df: Input DataFrame
-            
+            text: Optional shared TextFeatureCache for df
+
         Returns:
             Series with category name for high risk tcodes, "" otherwise
         """
-        # Initialize with empty strings
-        high_risk = pd.Series("", index=df.index)
-        
-        # Handle multiple possible column names
-        tcode_col = next((col for col in ['TCode', 'TCODE', 'SOURCE TA'] if col in df.columns), None)
-        
-        if tcode_col and self.high_risk_tcodes:
-            # Use categories if available, otherwise just "Yes"
-            if self.high_risk_tcode_categories:
-                for idx, row in df.iterrows():
-                    tcode = str(row[tcode_col]).upper() if pd.notna(row[tcode_col]) else ""
-                    if tcode and tcode in self.high_risk_tcode_categories:
-                        high_risk.iloc[idx] = self.high_risk_tcode_categories[tcode]
-            else:
-                # Handle possible NaNs and convert to uppercase safely
-                high_risk = high_risk.mask(
-                    df[tcode_col].fillna('').astype(str).str.upper().isin([t.upper() for t in self.high_risk_tcodes]),
-                    "Yes"
-                )
-        
-        return high_risk
-    
-    def _identify_change_activity(self, df):
+        text = text or TextFeatureCache(df)
+        tcode_col = _first_column(df, TCODE_COLUMNS)
+
+        if not tcode_col or not self.high_risk_tcodes:
+            return pd.Series("", index=df.index)
+
+        # Use categories if available, otherwise just "Yes"
+        if self.high_risk_tcode_categories:
+            return text.map_upper(tcode_col, self.high_risk_tcode_categories)
+
+        high_risk = {tcode.upper(): "Yes" for tcode in self.high_risk_tcodes}
+        return text.map_upper(tcode_col, high_risk)
+
+    def _identify_change_activity(self, df, text=None):
         """
         Identify change activities based on change indicators and other fields.
-        
+
+        Sources are checked in priority order; a record keeps the activity
+        type from the first source that classifies it.
+
         Args:
             df: Input DataFrame
-            
+            text: Optional shared TextFeatureCache for df
+
         Returns:
             Series with change activity type or "" if not a change activity
         """
-        # Initialize with empty strings
-        change_activity = pd.Series("", index=df.index)
-        
+        text = text or TextFeatureCache(df)
+        change_activity = np.full(len(df), "", dtype=object)
+
+        def fill(labels):
+            unset = change_activity == ""
+            change_activity[unset] = np.asarray(labels, dtype=object)[unset]
+
         # Check Change_Indicator column with multiple possible names
-        indicator_col = next((col for col in ['Change_Indicator', 'CHANGE INDICATOR', 'CHANGE_INDICATOR'] 
-                               if col in df.columns), None)
-        
+        indicator_col = _first_column(df, CHANGE_INDICATOR_COLUMNS)
         if indicator_col:
-            # Create mapping for common change indicators
-            change_map = {
-                "U": "02 - Update",  # Update
-                "I": "01 - Insert",  # Insert
-                "D": "06 - Delete",  # Delete
-                "C": "04 - Create",  # Create
-                "M": "02 - Update",  # Modify
-            }
-            
-            # Apply mapping to change indicators
-            for idx, row in df.iterrows():
-                indicator = row[indicator_col] if pd.notna(row[indicator_col]) else ""
-                indicator = str(indicator).upper() if indicator else ""
-                
-                if indicator in change_map:
-                    change_activity.iloc[idx] = change_map[indicator]
-        
-        # Check Event column for change-related events with multiple possible names
-        event_col = next((col for col in ['Event', 'EVENT'] if col in df.columns), None)
-        
+            fill(text.map_upper(indicator_col, CHANGE_INDICATOR_MAP).to_numpy())
+
+        # Check Event column for change-related events
+        event_col = _first_column(df, EVENT_COLUMNS)
         if event_col:
-            # These events indicate changes
-            insert_events = ["BU", "BD", "BU1", "BU2", "BU3"]  # Record creation events
-            update_events = ["BC", "BE", "BW", "BW1"]  # Record modification events
-            delete_events = ["BD", "BD1", "BD2"]  # Record deletion events
-            
-            # Mark change activities based on event codes
-            change_activity = change_activity.mask(
-                (change_activity == "") & df[event_col].isin(insert_events), 
-                "01 - Insert"
-            )
-            change_activity = change_activity.mask(
-                (change_activity == "") & df[event_col].isin(update_events), 
-                "02 - Update"
-            )
-            change_activity = change_activity.mask(
-                (change_activity == "") & df[event_col].isin(delete_events), 
-                "06 - Delete"
-            )
-        
-        # Check risk_description for change indicators
-        if "risk_description" in df.columns:
-            # Look for insert-related terms in risk description
-            change_activity = change_activity.mask(
-                (change_activity == "") & df["risk_description"].str.contains(
-                    r"insert|create|new|add", case=False, na=False, regex=True
-                ),
-                "01 - Insert"
-            )
-            
-            # Look for update-related terms in risk description
-            change_activity = change_activity.mask(
-                (change_activity == "") & df["risk_description"].str.contains(
-                    r"update|modif|change", case=False, na=False, regex=True
-                ),
-                "02 - Update"
-            )
-            
-            # Look for delete-related terms in risk description
-            change_activity = change_activity.mask(
-                (change_activity == "") & df["risk_description"].str.contains(
-                    r"delete|remov", case=False, na=False, regex=True
-                ), 
-                "06 - Delete"
-            )
-        
-        # Check message text for change indicators
-        msg_col = next((col for col in ['AUDIT LOG MSG. TEXT', 'MESSAGE', 'MSG'] if col in df.columns), None)
-        if msg_col:
-            # Look for insert-related terms
-            change_activity = change_activity.mask(
-                (change_activity == "") & df[msg_col].fillna('').astype(str).str.contains(
-                    r"insert|create|new|add", case=False, regex=True
-                ),
-                "01 - Insert"
-            )
-            
-            # Look for update-related terms
-            change_activity = change_activity.mask(
-                (change_activity == "") & df[msg_col].fillna('').astype(str).str.contains(
-                    r"update|modif|change", case=False, regex=True
-                ),
-                "02 - Update"
-            )
-            
-            # Look for delete-related terms
-            change_activity = change_activity.mask(
-                (change_activity == "") & df[msg_col].fillna('').astype(str).str.contains(
-                    r"delete|remov", case=False, regex=True
-                ), 
-                "06 - Delete"
-            )
-        
+            fill(df[event_col].map(CHANGE_EVENT_MAP).fillna("").to_numpy())
+
+        # Check risk description and message text for change keywords
+        for col_name in ["risk_description", _first_column(df, MESSAGE_COLUMNS)]:
+            if col_name and col_name in df.columns:
+                fill(text.classify(col_name, CHANGE_KEYWORD_FAMILIES))
+
         # Check for change values in CDPOS data
         if 'NEW VALUE' in df.columns and 'OLD VALUE' in df.columns:
-            # If there's a new value and no old value, it's an insert
-            change_activity = change_activity.mask(
-                (change_activity == "") & 
-                (df['NEW VALUE'].notna()) & (df['NEW VALUE'] != '') & 
-                ((df['OLD VALUE'].isna()) | (df['OLD VALUE'] == '')),
-                "01 - Insert"
-            )
-            
-            # If there's an old value and a new value, it's an update
-            change_activity = change_activity.mask(
-                (change_activity == "") & 
-                (df['NEW VALUE'].notna()) & (df['NEW VALUE'] != '') & 
-                (df['OLD VALUE'].notna()) & (df['OLD VALUE'] != ''),
-                "02 - Update"
-            )
-            
-            # If there's an old value and no new value, it's a delete
-            change_activity = change_activity.mask(
-                (change_activity == "") & 
-                ((df['NEW VALUE'].isna()) | (df['NEW VALUE'] == '')) & 
-                (df['OLD VALUE'].notna()) & (df['OLD VALUE'] != ''),
-                "06 - Delete"
-            )
-        
-        # Check source column for CDPOS/CDHDR data
+            has_new = (df['NEW VALUE'].notna() & (df['NEW VALUE'] != '')).to_numpy()
+            has_old = (df['OLD VALUE'].notna() & (df['OLD VALUE'] != '')).to_numpy()
+            fill(np.select(
+                [has_new & ~has_old, has_new & has_old, ~has_new & has_old],
+                ["01 - Insert", "02 - Update", "06 - Delete"],
+                default=""
+            ))
+
+        # CDHDR and CDPOS both represent change documents
         if 'Source' in df.columns:
-            # CDHDR and CDPOS both represent change documents
-            change_activity = change_activity.mask(
-                (change_activity == "") & 
-                df['Source'].isin(['CDHDR', 'CDPOS']),
-                "02 - Update"
-            )
-            
-        return change_activity
-    
-    def _identify_transport_events(self, df):
+            fill(np.where(df['Source'].isin(['CDHDR', 'CDPOS']).to_numpy(), "02 - Update", ""))
+
+        return pd.Series(change_activity, index=df.index)
+
+    def _identify_transport_events(self, df, text=None):
         """
         Identify transport-related events.
-        
+
         Args:
             df: Input DataFrame
-            
+            text: Optional shared TextFeatureCache for df
+
         Returns:
             Series with "Yes" for transport events, "" otherwise
         """
-        # Initialize with empty strings
-        transport_related = pd.Series("", index=df.index)
-        
+        text = text or TextFeatureCache(df)
+        flagged = np.zeros(len(df), dtype=bool)
+
         # Check for transport-related transaction codes
-        transport_tcodes = ['STMS', 'SE01', 'SE09', 'SE10', 'SE03', 'SE38', 'SE80']
-        
         if "TCode" in df.columns:
-            transport_related = transport_related.mask(
-                df["TCode"].isin(transport_tcodes), 
-                "Yes"
-            )
-        
+            flagged |= df["TCode"].isin(TRANSPORT_TCODES).to_numpy()
+
         # Check for transport-related terms in risk description
         if "risk_description" in df.columns:
-            transport_related = transport_related.mask(
-                df["risk_description"].str.contains(
-                    "transport|release|import|STMS|development|request|package|TR", 
-                    case=False, na=False, regex=True
-                ),
-                "Yes"
-            )
-        
+            flagged |= text.contains("risk_description", "transport_risk")
+
         # Check for transport-related events
         if "Event" in df.columns:
-            transport_events = ['EU1', 'EU2', 'EU3', 'EU4', 'CL', 'CT']  # Transport-related event codes
-            transport_related = transport_related.mask(
-                df["Event"].isin(transport_events), 
-                "Yes"
-            )
-        
+            flagged |= df["Event"].isin(TRANSPORT_EVENTS).to_numpy()
+
         # Check for transport-related keywords in Description
         if "Description" in df.columns:
-            transport_related = transport_related.mask(
-                df["Description"].str.contains(
-                    "transport|release|import|STMS|development|request|package|workbench|TR", 
-                    case=False, na=False, regex=True
-                ),
-                "Yes"
-            )
-            
-        return transport_related
-    
-    def _identify_debugging_events(self, df):
+            flagged |= text.contains("Description", "transport_description")
+
+        return _yes_series(flagged, df.index)
+
+    def _identify_debugging_events(self, df, text=None):
         """
         Identify debugging-related events.
-        
+
         Args:
             df: Input DataFrame
-            
+            text: Optional shared TextFeatureCache for df
+
         Returns:
             Series with "Yes" for debugging events, "" otherwise
         """
-        # Initialize with empty strings
-        debugging_related = pd.Series("", index=df.index)
-        
+        text = text or TextFeatureCache(df)
+        flagged = np.zeros(len(df), dtype=bool)
+
         # Check for debugging transaction codes
-        debug_tcodes = ['/H', 'ABAPDBG', 'SE24', 'SE37', 'SE38', 'SE80']
-        
-        # Handle multiple possible column names
-        tcode_col = next((col for col in ['TCode', 'TCODE', 'SOURCE TA'] if col in df.columns), None)
+        tcode_col = _first_column(df, TCODE_COLUMNS)
         if tcode_col:
-            debugging_related = debugging_related.mask(
-                df[tcode_col].fillna('').astype(str).isin(debug_tcodes), 
-                "Yes"
-            )
-        
+            flagged |= text.isin(tcode_col, DEBUG_TCODES)
+
         # Check for debugging-related terms in risk description
         if "risk_description" in df.columns:
-            debugging_related = debugging_related.mask(
-                df["risk_description"].str.contains(
-                    "debug|breakpoint|code inspection|trace|ABAP|function module", 
-                    case=False, na=False, regex=True
-                ),
-                "Yes"
-            )
-        
+            flagged |= text.contains("risk_description", "debug_risk")
+
         # Check for debugging-related events
-        event_col = next((col for col in ['Event', 'EVENT'] if col in df.columns), None)
+        event_col = _first_column(df, EVENT_COLUMNS)
         if event_col:
-            debug_events = ['DB', 'DB1', 'DB2', 'DB3', 'DBC', 'DBG', 'DBI']  # Debug-related event codes
-            debugging_related = debugging_related.mask(
-                df[event_col].isin(debug_events), 
-                "Yes"
-            )
-        
+            flagged |= df[event_col].isin(DEBUG_EVENTS).to_numpy()
+
         # Check for debugging keywords in Description or message
-        for col_name in ['Description', 'AUDIT LOG MSG. TEXT', 'MESSAGE', 'MSG']:
+        for col_name in ['Description'] + MESSAGE_COLUMNS:
             if col_name in df.columns:
-                debugging_related = debugging_related.mask(
-                    df[col_name].fillna('').astype(str).str.contains(
-                        "debug|breakpoint|trace|ABAP|development|function module", 
-                        case=False, regex=True
-                    ),
-                    "Yes"
-                )
-        
+                flagged |= text.contains(col_name, "debug_text")
+
         # Check for debug markers in variables
-        for col_name in ['VARIABLE 1', 'VARIABLE 2', 'VARIABLE', 'VAR', 'NOTE']:
+        for col_name in VARIABLE_COLUMNS:
             if col_name in df.columns:
-                debugging_related = debugging_related.mask(
-                    df[col_name].fillna('').astype(str).str.contains(
-                        "DEBUG|D!DEBUG|BREAK|TRACE", 
-                        case=False, regex=True
-                    ),
-                    "Yes"
-                )
-            
-        return debugging_related
-    
-    def _identify_benign_activities(self, df):
+                flagged |= text.contains(col_name, "debug_variable")
+
+        return _yes_series(flagged, df.index)
+
+    def _identify_benign_activities(self, df, text=None):
         """
         Identify benign activities like display, logon/logoff, etc.
-        
+
         Args:
             df: Input DataFrame
-            
+            text: Optional shared TextFeatureCache for df
+
         Returns:
             Series with activity type for benign activities, "" otherwise
         """
-        # Initialize with empty strings
-        benign_activity = pd.Series("", index=df.index)
-        
-        # Check for login/logout events
-        event_col = next((col for col in ['Event', 'EVENT'] if col in df.columns), None)
+        text = text or TextFeatureCache(df)
+        benign_activity = np.full(len(df), "", dtype=object)
+
+        # Check for login/logout and session manager events
+        event_col = _first_column(df, EVENT_COLUMNS)
         if event_col:
-            # Login events
-            benign_activity = benign_activity.mask(
-                df[event_col].isin(['AU1']), 
-                "Logon"
-            )
-            
-            # Logout events
-            benign_activity = benign_activity.mask(
-                df[event_col].isin(['AUC', 'AUE']), 
-                "Logoff"
-            )
-            
-            # Session manager events
-            benign_activity = benign_activity.mask(
-                df[event_col].isin(['AU6', 'AUG']), 
-                "Session Manager"
-            )
-        
-        # Check for display transactions
-        tcode_col = next((col for col in ['TCode', 'TCODE', 'SOURCE TA'] if col in df.columns), None)
+            benign_activity = df[event_col].map(BENIGN_EVENT_MAP).fillna("").to_numpy(dtype=object)
+
+        def fill(mask, label):
+            benign_activity[(benign_activity == "") & mask] = label
+
+        # Check for display transactions (many display transactions end with 03)
+        tcode_col = _first_column(df, TCODE_COLUMNS)
         if tcode_col:
-            # Define display transaction patterns
-            display_tcodes = ['VA03', 'MM03', 'ME23', 'FK03', 'BP03', 'XD01', 'XD02', 'XD03', 'FD03', 'IW33']
-            tcode_starts_with_display = df[tcode_col].fillna('').astype(str).str.endswith('03')  # Many display transactions end with 03
-            
-            # Identify display activities (read-only)
-            benign_activity = benign_activity.mask(
-                (benign_activity == "") & 
-                ((df[tcode_col].fillna('').astype(str).isin(display_tcodes)) | tcode_starts_with_display) &
-                ~df[tcode_col].fillna('').astype(str).str.upper().isin([t.upper() for t in self.high_risk_tcodes]),
-                "Display"
-            )
-        
+            tcodes = text.values(tcode_col)
+            is_display = tcodes.isin(DISPLAY_TCODES) | tcodes.str.endswith('03')
+            is_high_risk = text.map_upper(tcode_col, dict.fromkeys(
+                (t.upper() for t in self.high_risk_tcodes), "Yes")) != ""
+            fill((is_display & ~is_high_risk).to_numpy(), "Display")
+
         # Check risk level for low risk activities
         if "risk_level" in df.columns:
-            benign_activity = benign_activity.mask(
-                (benign_activity == "") & 
-                (df["risk_level"] == "Low") & 
-                ~(df["Change_Activity"].str.len() > 0) &  # No change activity
-                ~(df["High_Risk_TCode"].str.len() > 0) &  # Not a high-risk transaction
-                ~(df["Table_Maintenance"].str.len() > 0),  # Not table maintenance
-                "Low Risk"
-            )
-        
+            fill(((df["risk_level"] == "Low") &
+                  ~(df["Change_Activity"].str.len() > 0) &  # No change activity
+                  ~(df["High_Risk_TCode"].str.len() > 0) &  # Not a high-risk transaction
+                  ~(df["Table_Maintenance"].str.len() > 0)  # Not table maintenance
+                  ).to_numpy(), "Low Risk")
+
         # Check for display terms in message text
-        msg_col = next((col for col in ['AUDIT LOG MSG. TEXT', 'MESSAGE', 'MSG'] if col in df.columns), None)
+        msg_col = _first_column(df, MESSAGE_COLUMNS)
         if msg_col:
-            benign_activity = benign_activity.mask(
-                (benign_activity == "") & 
-                df[msg_col].fillna('').astype(str).str.contains(
-                    "display|view|show|read|query|report", 
-                    case=False, regex=True
-                ) &
-                ~df[msg_col].fillna('').astype(str).str.contains(
-                    "change|update|modify|create|delete|sensitive|critical|high risk", 
-                    case=False, regex=True
-                ),
-                "Display"
-            )
-        
+            fill(text.contains(msg_col, "display_message", exclude="sensitive_message"), "Display")
+
         # Further check risk description for display indicators
         if "risk_description" in df.columns:
-            benign_activity = benign_activity.mask(
-                (benign_activity == "") & 
-                df["risk_description"].str.contains(
-                    "view|display|information viewing|standard system usage|read-only", 
-                    case=False, na=False, regex=True
-                ) &
-                ~df["risk_description"].str.contains(
-                    "sensitive|critical|high risk|unusual|suspicious", 
-                    case=False, na=False, regex=True
-                ),
-                "Display"
-            )
-        
-        return benign_activity
-    
+            fill(text.contains("risk_description", "display_risk", exclude="sensitive_risk"),
+                 "Display")
+
+        return pd.Series(benign_activity, index=df.index)
+
     def _populate_conclusions_for_benign_activities(self, df):
         """
         Auto-populate conclusions for benign activities based on SysAid ticket.
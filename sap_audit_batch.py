@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Multi-Period Batch Runner
+
+This script audits several period folders (for example "FEB- Good",
+"Mar FF" and "MAr DEBUG" below input/) in parallel and writes a
+consolidated index of the results.
+
+Key features:
+- Period folders given as paths or glob patterns, resolved against the
+  input directory; all of its subfolders by default
+- Periods audited in parallel on a process pool
+- Per-run isolation: each period runs with its own AuditContext (input,
+  output and cache folders, configuration and record counter), so no
+  state of one period leaks into another
+- Folders that only hold prepared SM20/CDHDR/CDPOS CSV files are audited
+  from those files
+- Consolidated cross-period index (JSON and CSV) with record counts,
+  completeness, risk levels, report paths and errors
+
+Usage:
+    python sap_audit_batch.py [FOLDER_OR_GLOB ...] [--output-dir DIR] [--workers N] [--format excel|csv]
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from sap_audit_config import PATHS, SETTINGS
+from sap_audit_utils import log_message, log_section, log_error, process_pool_context
+
+# Risk levels summarized per period
+RISK_LEVELS = ["Critical", "High", "Medium", "Low"]
+
+# Columns of the CSV index
+INDEX_COLUMNS = [
+    "period", "success", "records", "completeness_score", "sm20_records", "cdhdr_records", "cdpos_records",
+    "critical", "high", "medium", "low", "elapsed_seconds", "report", "input_dir", "output_dir", "error"
+]
+
+
+def resolve_period_folders(patterns=None, input_dir=None):
+    """
+    Resolve period folder paths and glob patterns.
+
+    Relative patterns that match nothing from the current directory are
+    resolved against the input directory.
+
+    Args:
+        patterns: Folder paths or glob patterns (defaults to every subfolder
+                  of the input directory)
+        input_dir: Input directory (defaults to PATHS["input_dir"])
+
+    Returns:
+        list: Sorted absolute folder paths
+    """
+    input_dir = input_dir or PATHS["input_dir"]
+    folders = set()
+
+    for pattern in patterns or [os.path.join(input_dir, "*")]:
+        matches = [pattern] if os.path.isdir(pattern) else glob.glob(pattern)
+        if not matches and not os.path.isabs(pattern):
+            matches = glob.glob(os.path.join(input_dir, pattern))
+        folders.update(os.path.abspath(path) for path in matches if os.path.isdir(path))
+
+    return sorted(folders)
+
+
+def audit_period(input_dir, output_dir, config=None):
+    """
+    Audit one period folder in the current (worker) process.
+
+    Args:
+        input_dir: Period folder
+        output_dir: Output folder of the period
+        config: Configuration overrides
+
+    Returns:
+        dict: Index entry of the period
+    """
+    from sap_audit_context import AuditContext
+    from sap_audit_controller import AuditController
+
+    start = time.time()
+    entry = {"period": os.path.basename(os.path.normpath(input_dir)), "input_dir": input_dir,
+             "output_dir": output_dir, "success": False, "error": ""}
+
+    try:
+        context = AuditContext.for_folder(input_dir, output_dir, config)
+        controller = AuditController(context=context)
+        entry["success"] = bool(controller.run_full_audit())
+        entry["report"] = context.config["output_path"] if entry["success"] else ""
+
+        entry["completeness_score"] = context.record_counter.counts["timeline"]["completeness_score"]
+
+        timeline = controller.session_data
+        if timeline is not None:
+            entry["records"] = len(timeline)
+            if "Source" in timeline.columns:
+                source_counts = timeline["Source"].astype(str).str.upper().value_counts()
+                for source_type in ["sm20", "cdhdr", "cdpos"]:
+                    entry[f"{source_type}_records"] = int(source_counts.get(source_type.upper(), 0))
+            if "risk_level" in timeline.columns:
+                risk_counts = timeline["risk_level"].value_counts()
+                for level in RISK_LEVELS:
+                    entry[level.lower()] = int(risk_counts.get(level, 0))
+        entry["stages"] = controller.stage_timeline
+    except Exception as e:
+        log_error(e, f"Error auditing period {input_dir}")
+        entry["error"] = str(e)
+
+    entry["elapsed_seconds"] = round(time.time() - start, 1)
+    return entry
+
+
+def write_index(entries, output_root):
+    """
+    Write the consolidated cross-period index.
+
+    Args:
+        entries: Index entries of all periods
+        output_root: Batch output folder
+
+    Returns:
+        Tuple of (JSON path, CSV path)
+    """
+    os.makedirs(output_root, exist_ok=True)
+    json_path = os.path.join(output_root, "batch_index.json")
+    csv_path = os.path.join(output_root, "batch_index.csv")
+
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump({"created": datetime.now().isoformat(timespec="seconds"), "periods": entries},
+                  f, indent=2, default=str)
+
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=INDEX_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(entries)
+
+    return json_path, csv_path
+
+
+def run_batch(folders, output_root=None, workers=None, config=None):
+    """
+    Audit period folders in parallel.
+
+    Args:
+        folders: Period folder paths
+        output_root: Batch output folder (one subfolder per period)
+        workers: Worker processes (defaults to SETTINGS["batch"]["workers"])
+        config: Configuration overrides applied to every period
+
+    Returns:
+        list: Index entries in folder order
+    """
+    output_root = os.path.abspath(output_root or os.path.join(PATHS["output_dir"], "batch"))
+    workers = max(1, min(workers or SETTINGS["batch"]["workers"], len(folders) or 1))
+
+    log_section(f"Auditing {len(folders)} Periods with {workers} Workers")
+    entries = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context()) as executor:
+        futures = {
+            executor.submit(audit_period, folder,
+                            os.path.join(output_root, os.path.basename(os.path.normpath(folder))), config): folder
+            for folder in folders
+        }
+        for future in as_completed(futures):
+            folder = futures[future]
+            try:
+                entries[folder] = future.result()
+            except Exception as e:
+                # The worker process itself failed (e.g. it ran out of memory)
+                log_error(e, f"Error auditing period {folder}")
+                entries[folder] = {"period": os.path.basename(os.path.normpath(folder)), "input_dir": folder,
+                                   "success": False, "error": str(e)}
+            status = "completed" if entries[folder]["success"] else "failed"
+            log_message(f"Period {entries[folder]['period']} {status}")
+
+    results = [entries[folder] for folder in folders]
+    json_path, csv_path = write_index(results, output_root)
+    log_message(f"Batch index written to {json_path} and {csv_path}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit several SAP period folders in parallel")
+    parser.add_argument("folders", nargs="*", help="Period folders or glob patterns (default: all input subfolders)")
+    parser.add_argument("--output-dir", help="Batch output folder")
+    parser.add_argument("--workers", type=int, help="Worker processes")
+    parser.add_argument("--format", choices=["excel", "csv"], help="Output format")
+    args = parser.parse_args()
+
+    folders = resolve_period_folders(args.folders)
+    if not folders:
+        log_message("No period folders found", "ERROR")
+        return False
+
+    config = {"output_format": args.format} if args.format else None
+    results = run_batch(folders, args.output_dir, args.workers, config)
+
+    failed = [entry["period"] for entry in results if not entry["success"]]
+    if failed:
+        log_message(f"Failed periods: {', '.join(failed)}", "ERROR")
+    return not failed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
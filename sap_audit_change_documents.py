@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Change Document Join Module
+
+This module joins CDHDR change document headers with their CDPOS items on the
+real change document key (OBJECTCLAS, OBJECTID, CHANGENR) instead of the
+change number alone.
+
+Key features:
+- Composite key built from the key columns both extracts share
+- Dtype-aligned keys: numeric and text change numbers (with or without
+  leading zeros) compare equal
+- Key columns are factorized jointly into one integer key; the join itself
+  is a vectorized take over CDPOS sorted once by that key
+- The size of the join is computed from key counts before it runs, with a
+  warning or abort when duplicate headers would multiply the items
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import take
+
+from sap_audit_config import COLUMNS, SETTINGS
+from sap_audit_utils import log_message
+
+# Change document key in CDHDR and CDPOS, in key order. The source system
+# column only exists when several systems are ingested together.
+CHANGE_DOCUMENT_KEY = [
+    SETTINGS["ingestion"]["source_system_column"],
+    COLUMNS["cdhdr"]["object"],
+    COLUMNS["cdhdr"]["object_id"],
+    COLUMNS["cdhdr"]["change_number"]
+]
+
+
+class JoinExplosionError(Exception):
+    """Raised when a join would multiply rows beyond the configured limit."""
+
+
+def _is_text(values):
+    """Check whether a column holds text (object or string dtype)."""
+    return values.dtype == object or isinstance(values.dtype, pd.StringDtype)
+
+
+def _normalize_key(value):
+    """
+    Normalize one distinct key value for comparison across extracts.
+    
+    Values are compared as stripped text with leading zeros (and a float
+    ".0" suffix) removed from numeric values, since SAP NUMC fields lose
+    their zero padding in Excel exports.
+    """
+    text = str(value).strip()
+    if text.endswith(".0") and text[:-2].isdigit():
+        text = text[:-2]
+    if text.isdigit():
+        return text.lstrip("0") or "0"
+    return text
+
+
+def _shared_codes(left, right):
+    """
+    Encode one key column of both tables with shared integer codes.
+    
+    Columns of the same non-text dtype are factorized together as they are.
+    Otherwise both sides are factorized together and only the distinct
+    values are normalized, so equal keys of different dtypes (e.g. numeric
+    and zero-padded text change numbers) get equal codes.
+    
+    Args:
+        left: Key column of the left table
+        right: Key column of the right table
+        
+    Returns:
+        Tuple of (left codes, right codes); missing values get -1
+    """
+    if left.dtype == right.dtype and not _is_text(left):
+        codes, _ = pd.factorize(pd.concat([left, right], ignore_index=True))
+    else:
+        codes, uniques = pd.factorize(np.concatenate([left.to_numpy(dtype=object), right.to_numpy(dtype=object)]))
+        
+        # Map through the codes of the normalized distinct values; -1 stays missing
+        normalized = np.array([_normalize_key(value) for value in uniques], dtype=object)
+        normalized_codes, _ = pd.factorize(normalized)
+        codes = np.append(normalized_codes, -1)[codes]
+    return codes[:len(left)], codes[len(left):]
+
+
+def composite_key_codes(left, right, key_columns):
+    """
+    Encode the composite key of both tables as one integer per row.
+    
+    Args:
+        left: Left DataFrame
+        right: Right DataFrame
+        key_columns: Key columns present in both
+        
+    Returns:
+        Tuple of (left codes, right codes, number of distinct keys); equal
+        keys get equal codes on both sides
+    """
+    n_left = len(left)
+    codes = np.zeros(n_left + len(right), dtype=np.int64)
+    
+    for col in key_columns:
+        left_codes, right_codes = _shared_codes(left[col], right[col])
+        col_codes = np.concatenate([left_codes, right_codes])
+        codes, _ = pd.factorize(codes * (int(col_codes.max(initial=-1)) + 2) + col_codes + 1)
+    
+    return codes[:n_left], codes[n_left:], int(codes.max(initial=-1)) + 1
+
+
+def estimate_join(left_codes, right_codes, n_keys):
+    """
+    Compute the size of a left join from key counts, without running it.
+    
+    Args:
+        left_codes: Key code per left row
+        right_codes: Key code per right row
+        n_keys: Number of distinct key codes
+        
+    Returns:
+        dict: rows (joined rows), one_to_many_rows (rows if every left key
+        were unique), matched_right_rows and expansion (their ratio)
+    """
+    left_counts = np.bincount(left_codes, minlength=n_keys)
+    right_counts = np.bincount(right_codes, minlength=n_keys)
+    present = left_counts > 0
+    
+    rows = int((left_counts * np.maximum(right_counts, 1))[present].sum())
+    one_to_many_rows = int(np.maximum(left_counts, right_counts)[present].sum())
+    return {
+        "rows": rows,
+        "one_to_many_rows": one_to_many_rows,
+        "matched_right_rows": int(right_counts[present].sum()),
+        "expansion": rows / one_to_many_rows if one_to_many_rows else 1.0
+    }
+
+
+def _left_join_indexers(left_codes, right_codes, n_keys):
+    """
+    Build row indexers for a left join on integer key codes.
+    
+    CDPOS rows are sorted by key once; each left row then takes the
+    contiguous block of matching right rows (or -1 when there is none).
+    
+    Returns:
+        Tuple of (left indexer, right indexer)
+    """
+    right_order = np.argsort(right_codes, kind="stable")
+    right_counts = np.bincount(right_codes, minlength=n_keys)
+    block_start = np.concatenate(([0], np.cumsum(right_counts)[:-1]))
+    
+    matches = right_counts[left_codes]
+    repeats = np.maximum(matches, 1)
+    total = int(repeats.sum())
+    
+    left_indexer = np.repeat(np.arange(len(left_codes)), repeats)
+    offsets = np.arange(total) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    positions = np.repeat(block_start[left_codes], repeats) + offsets
+    matched = np.repeat(matches > 0, repeats)
+    
+    right_indexer = np.full(total, -1, dtype=np.int64)
+    right_indexer[matched] = right_order[positions[matched]]
+    return left_indexer, right_indexer
+
+
+def _take(values, indexer, allow_fill=False):
+    """Take rows of a column, keeping extension dtypes; -1 yields missing values when allow_fill is set."""
+    array = values.array if isinstance(values.dtype, pd.api.extensions.ExtensionDtype) else values.to_numpy()
+    return take(array, indexer, allow_fill=allow_fill)
+
+
+def join_change_documents(cdhdr, cdpos, key_columns=None, max_expansion=None, on_explosion=None):
+    """
+    Left-join CDHDR headers with their CDPOS items on the change document key.
+    
+    Args:
+        cdhdr: CDHDR DataFrame
+        cdpos: CDPOS DataFrame
+        key_columns: Key columns to use (defaults to CHANGE_DOCUMENT_KEY)
+        max_expansion: Tolerated ratio of joined rows to a one-to-many join
+        on_explosion: "warn" to join anyway or "abort" to raise JoinExplosionError
+        
+    Returns:
+        Tuple of (joined DataFrame, join estimate dict)
+        
+    Raises:
+        ValueError: If the tables share no key column
+        JoinExplosionError: If the estimate exceeds max_expansion in abort mode
+    """
+    config = SETTINGS["change_document_join"]
+    max_expansion = config["max_expansion"] if max_expansion is None else max_expansion
+    on_explosion = on_explosion or config["on_explosion"]
+    
+    key_columns = [col for col in (key_columns or CHANGE_DOCUMENT_KEY) if col in cdhdr.columns and col in cdpos.columns]
+    if not key_columns:
+        raise ValueError("CDHDR and CDPOS share no change document key column")
+    log_message(f"Joining CDHDR and CDPOS on {', '.join(key_columns)}")
+    
+    left_codes, right_codes, n_keys = composite_key_codes(cdhdr, cdpos, key_columns)
+    estimate = estimate_join(left_codes, right_codes, n_keys)
+    estimate["key_columns"] = key_columns
+    
+    if estimate["expansion"] > max_expansion:
+        message = (f"CDHDR/CDPOS join would produce {estimate['rows']} rows, "
+                   f"{estimate['expansion']:.2f}x a one-to-many join ({estimate['one_to_many_rows']} rows); "
+                   f"CDHDR has duplicate change document keys")
+        if on_explosion == "abort":
+            raise JoinExplosionError(message)
+        log_message(message, "WARNING")
+    
+    left_indexer, right_indexer = _left_join_indexers(left_codes, right_codes, n_keys)
+    
+    # Key columns come from CDHDR; other shared columns get pandas' merge suffixes
+    right_columns = [col for col in cdpos.columns if col not in key_columns]
+    shared = set(right_columns) & set(cdhdr.columns)
+    joined = {(f"{col}_x" if col in shared else col): _take(cdhdr[col], left_indexer)
+              for col in cdhdr.columns}
+    for col in right_columns:
+        joined[f"{col}_y" if col in shared else col] = _take(cdpos[col], right_indexer, allow_fill=True)
+    
+    return pd.DataFrame(joined), estimate
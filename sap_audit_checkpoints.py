@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Checkpoint Module
+
+This module stores durable checkpoints after each controller stage so a
+failed run (for example an Excel limit hit while writing the report) can
+resume from the last good stage instead of starting over.
+
+Key features:
+- Timeline snapshots stored as pickled DataFrames, which keep every column
+  dtype (datetimes, categoricals, numbers) without an extra dependency
+- A JSON manifest with row/column counts, record counts and the signatures
+  of files a stage wrote (the prepared CSV files of data preparation)
+- Atomic writes, so an interrupted save never replaces a good checkpoint
+- Resume point found by walking the stages in order and stopping at the
+  first missing or stale checkpoint
+- Checkpoints tied to the run that wrote them (input folder, raw export
+  signatures, result-relevant configuration), so a resume after switching
+  folders, adding exports or changing settings starts over
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+
+import pandas as pd
+
+from sap_audit_config import PATHS
+from sap_audit_utils import log_message, log_error
+
+# Bump when the checkpoint layout changes
+CHECKPOINT_VERSION = 1
+
+
+def _file_signature(path):
+    """Return the mtime and size of a file, or None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def run_fingerprint(input_dir, source_files, config=None):
+    """
+    Describe the inputs of a run so its checkpoints are not reused by another.
+
+    Args:
+        input_dir: Input folder of the run
+        source_files: Paths of the raw SAP export files
+        config: Configuration values that change stage results
+
+    Returns:
+        dict: JSON-compatible fingerprint
+    """
+    fingerprint = {
+        "input_dir": os.path.abspath(input_dir),
+        "sources": {os.path.abspath(path): _file_signature(path) for path in sorted(source_files)},
+        "config": config or {}
+    }
+    # Normalize through JSON so it compares equal to the stored copy
+    return json.loads(json.dumps(fingerprint, default=str))
+
+
+class CheckpointStore:
+    """
+    Stage checkpoints in a directory below the cache directory.
+    """
+
+    def __init__(self, directory=None):
+        """
+        Initialize the store without touching the disk.
+
+        Args:
+            directory: Checkpoint directory (defaults to <cache_dir>/checkpoints)
+        """
+        self.directory = directory or os.path.join(PATHS["cache_dir"], "checkpoints")
+        self.manifest_path = os.path.join(self.directory, "manifest.json")
+
+    def _read_manifest(self):
+        """Read the manifest, returning an empty one if it is missing or unusable."""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") == CHECKPOINT_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return {"version": CHECKPOINT_VERSION, "stages": {}}
+
+    def _write_manifest(self, manifest):
+        """Atomically write the manifest."""
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # Record counts may hold NumPy integers
+            json.dump(manifest, f, indent=2,
+                      default=lambda value: value.item() if hasattr(value, "item") else str(value))
+        os.replace(tmp_path, self.manifest_path)
+
+    def clear(self):
+        """Remove all checkpoints, e.g. at the start of a fresh run."""
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def save(self, stage, df=None, files=None, counts=None, run=None):
+        """
+        Save a checkpoint for a completed stage.
+
+        Args:
+            stage: Stage name
+            df: Timeline DataFrame produced by the stage, if any
+            files: Paths of files written by the stage
+            counts: Record counts to restore on resume
+            run: Fingerprint of the run (see run_fingerprint)
+
+        Returns:
+            bool: Success status (a failed save only costs a rerun later)
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            entry = {
+                "saved_at": datetime.now().isoformat(timespec="seconds"),
+                "data": None,
+                "rows": None,
+                "columns": None,
+                "files": {path: _file_signature(path) for path in files or []},
+                "counts": counts
+            }
+
+            if df is not None:
+                entry["data"] = f"{stage}.pkl"
+                data_path = os.path.join(self.directory, entry["data"])
+                df.to_pickle(f"{data_path}.tmp")
+                os.replace(f"{data_path}.tmp", data_path)
+                entry["rows"], entry["columns"] = df.shape
+
+            manifest = self._read_manifest()
+            if run is not None and manifest.get("run") != run:
+                # Checkpoints of another run must not be combined with this one
+                manifest["stages"] = {}
+                manifest["run"] = run
+            manifest["stages"][stage] = entry
+            self._write_manifest(manifest)
+            log_message(f"Saved checkpoint for stage {stage}")
+            return True
+        except Exception as e:
+            log_error(e, f"Could not save checkpoint for stage {stage}")
+            return False
+
+    def is_valid(self, stage, manifest=None):
+        """
+        Check that a stage checkpoint exists and the files it wrote are unchanged.
+
+        Args:
+            stage: Stage name
+            manifest: Manifest to check against (read from disk if omitted)
+
+        Returns:
+            bool: Whether the checkpoint can be resumed from
+        """
+        entry = (manifest or self._read_manifest())["stages"].get(stage)
+        if entry is None:
+            return False
+        if entry["data"] and not os.path.exists(os.path.join(self.directory, entry["data"])):
+            return False
+        return all(_file_signature(path) == signature for path, signature in entry["files"].items())
+
+    def resume_point(self, stages, run=None):
+        """
+        Find the last stage that can be resumed from.
+
+        Stages are checked in order; a later checkpoint is ignored once an
+        earlier one is missing or stale, because it was built from older data.
+        Nothing is resumed when the checkpoints were written by a run with a
+        different fingerprint.
+
+        Args:
+            stages: Checkpointed stage names in pipeline order
+            run: Fingerprint of the current run (see run_fingerprint)
+
+        Returns:
+            str: Stage name, or None if there is nothing to resume
+        """
+        manifest = self._read_manifest()
+        if run is not None and manifest["stages"]:
+            stored = manifest.get("run") or {}
+            changed = [key for key in ("input_dir", "sources", "config") if stored.get(key) != run.get(key)]
+            if changed:
+                log_message(f"Checkpoints were written for different inputs ({', '.join(changed)} changed), "
+                            "not resuming", "WARNING")
+                return None
+        last = None
+        for stage in stages:
+            if not self.is_valid(stage, manifest):
+                break
+            last = stage
+        return last
+
+    def load(self, stage):
+        """
+        Load a stage checkpoint.
+
+        Args:
+            stage: Stage name
+
+        Returns:
+            Tuple of (DataFrame or None, manifest entry)
+        """
+        entry = self._read_manifest()["stages"][stage]
+        df = None
+        if entry["data"]:
+            df = pd.read_pickle(os.path.join(self.directory, entry["data"]))
+        return df, entry
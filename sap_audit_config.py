@@ -29,29 +29,28 @@ USAGE:
 import os
 import sys
 import json
-from datetime import datetime
+from importlib.util import find_spec
 
-# Try to import optional dependencies
-try:
-    import yaml
-    YAML_AVAILABLE = True
-except ImportError:
-    YAML_AVAILABLE = False
+from sap_audit_logging import log_message
+
+# Check optional dependencies without importing them
+YAML_AVAILABLE = find_spec("yaml") is not None
 
 # Environment variable prefix
 ENV_PREFIX = "SAP_AUDIT_"
 
-# Try to load .env file if dotenv is installed
-try:
-    from dotenv import load_dotenv
-    # Load from .env file if it exists
-    env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
-    if os.path.exists(env_path):
+# Load a .env file next to this module, if one exists. Environment values are
+# read while the settings below are built, so this must happen first; dotenv
+# is only imported when there is a file to load.
+env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
+if os.path.exists(env_path):
+    try:
+        from dotenv import load_dotenv
         load_dotenv(env_path)
         print(f"Loaded environment variables from {env_path}")
-except ImportError:
-    # Optional dependency, just skip if not installed
-    pass
+    except ImportError:
+        # Optional dependency, just skip if not installed
+        pass
 
 def get_env_value(env_var, default_value):
     """Get value from environment variable or use default."""
@@ -117,15 +116,21 @@ PATHS = {
     # Output files
     "session_timeline": get_env_path("SESSION_TIMELINE", os.path.join(SCRIPT_DIR, "SAP_Session_Timeline.xlsx")),
     "audit_report": get_env_path("AUDIT_REPORT", os.path.join(SCRIPT_DIR, "output", "SAP_Audit_Report.xlsx")),
+    "quality_report": get_env_path("QUALITY_REPORT", os.path.join(SCRIPT_DIR, "output", "data_quality_report.json")),
+    
+    # Cross-run audit warehouse (shared by all runs, including batch periods)
+    "warehouse": get_env_path("WAREHOUSE", os.path.join(SCRIPT_DIR, "output", "SAP_Audit_Warehouse.db")),
     
     # Cache files
     "sysaid_session_cache": get_env_path("SYSAID_CACHE", os.path.join(SCRIPT_DIR, "cache", "sysaid_session_map.json")),
-    "record_counts_file": get_env_path("RECORD_COUNTS", os.path.join(SCRIPT_DIR, "cache", "record_counts.json"))
+    "record_counts_file": get_env_path("RECORD_COUNTS", os.path.join(SCRIPT_DIR, "cache", "record_counts.json")),
+    "reference_snapshot": get_env_path("REFERENCE_SNAPSHOT", os.path.join(SCRIPT_DIR, "cache", "reference_snapshot.pkl"))
 }
 
-# Create necessary directories
-for dir_path in [PATHS["input_dir"], PATHS["output_dir"], PATHS["cache_dir"]]:
-    os.makedirs(dir_path, exist_ok=True)
+def ensure_directories():
+    """Create the input, output and cache directories if they do not exist."""
+    for dir_path in [PATHS["input_dir"], PATHS["output_dir"], PATHS["cache_dir"]]:
+        os.makedirs(dir_path, exist_ok=True)
 
 # =========================================================================
 # INPUT FILE PATTERNS
@@ -137,6 +142,52 @@ PATTERNS = {
     "sysaid": os.path.join(PATHS["input_dir"], "*sysaid*.xlsx")
 }
 
+def folder_paths(input_dir, output_dir, cache_dir=None, paths=None, patterns=None):
+    """
+    Build the paths and input patterns of an audit run on one folder.
+    
+    Nothing global is modified; the result is meant for an AuditContext.
+    Reference files keep their configured locations.
+    
+    Args:
+        input_dir: Folder holding the SM20/CDHDR/CDPOS exports of the run
+        output_dir: Folder for the run's reports
+        cache_dir: Folder for the run's caches and checkpoints
+                   (defaults to <output_dir>/cache)
+        paths: Base paths (defaults to PATHS)
+        patterns: Base input patterns (defaults to PATTERNS)
+        
+    Returns:
+        Tuple of (paths dict, patterns dict)
+    """
+    input_dir = os.path.abspath(input_dir)
+    output_dir = os.path.abspath(output_dir)
+    cache_dir = os.path.abspath(cache_dir or os.path.join(output_dir, "cache"))
+    
+    run_paths = dict(PATHS if paths is None else paths)
+    run_paths.update({
+        "input_dir": input_dir,
+        "output_dir": output_dir,
+        "cache_dir": cache_dir,
+        "sm20_input": os.path.join(input_dir, "SM20.csv"),
+        "cdhdr_input": os.path.join(input_dir, "CDHDR.csv"),
+        "cdpos_input": os.path.join(input_dir, "CDPOS.csv"),
+        "session_timeline": os.path.join(output_dir, "SAP_Session_Timeline.xlsx"),
+        "audit_report": os.path.join(output_dir, "SAP_Audit_Report.xlsx"),
+        "quality_report": os.path.join(output_dir, "data_quality_report.json"),
+        "sysaid_session_cache": os.path.join(cache_dir, "sysaid_session_map.json"),
+        "record_counts_file": os.path.join(cache_dir, "record_counts.json")
+    })
+    
+    # A SysAid export in the run folder replaces the configured one
+    sysaid_input = os.path.join(input_dir, "SysAid.xlsx")
+    if os.path.exists(sysaid_input):
+        run_paths["sysaid_input"] = sysaid_input
+    
+    run_patterns = {source_type: os.path.join(input_dir, os.path.basename(pattern))
+                    for source_type, pattern in (PATTERNS if patterns is None else patterns).items()}
+    return run_paths, run_patterns
+
 # =========================================================================
 # COLUMN MAPPINGS
 # =========================================================================
@@ -174,6 +225,8 @@ COLUMNS = {
     
     # CDPOS Change Document Item columns (UPPERCASE)
     "cdpos": {
+        "object": "OBJECT",
+        "object_id": "OBJECT VALUE",
         "change_number": "DOC.NUMBER",
         "table_name": "TABLE NAME",
         "table_key": "TABLE KEY",
@@ -227,7 +280,26 @@ SYSAID = {
         "request_user": "Request user",
         "process_manager": "Process manager",
         "request_time": "Request time"
-    }
+    },
+
+    # SysAid REST API settings (used by the "api" data source strategy)
+    "api_url": get_env_value("SYSAID_API_URL", ""),
+    "api_key": get_env_value("SYSAID_API_KEY", ""),
+    "page_size": int(get_env_value("SYSAID_PAGE_SIZE", "100")),          # Tickets per request
+    "max_concurrency": int(get_env_value("SYSAID_MAX_CONCURRENCY", "8")),  # Parallel requests / pooled connections
+    "max_retries": int(get_env_value("SYSAID_MAX_RETRIES", "3")),
+    "retry_delay": float(get_env_value("SYSAID_RETRY_DELAY", "2")),      # Base back-off delay in seconds
+    "request_timeout": float(get_env_value("SYSAID_REQUEST_TIMEOUT", "30")),
+    "max_pages": int(get_env_value("SYSAID_MAX_PAGES", "1000")),          # Paging guard for full/delta fetches
+
+    # Per-ticket API cache (cache/sysaid_ticket_cache.db)
+    "cache_ttl": int(get_env_value("SYSAID_CACHE_TTL", "86400")),        # TTL for open tickets in seconds
+    "sync_interval": int(get_env_value("SYSAID_SYNC_INTERVAL", "3600")), # Minimum seconds between delta syncs
+    "not_found_ttl": int(get_env_value("SYSAID_NOT_FOUND_TTL", "3600")), # Seconds before re-requesting unknown tickets
+    "status_ttl": {},                                                    # Optional {status: ttl_seconds} overrides
+    "closed_statuses": ["Closed", "Verified closed", "Cancelled", "Canceled"],  # Never expire
+    "status_column": "Status",
+    "modified_column": "Modify time"
 }
 
 # =========================================================================
@@ -274,6 +346,44 @@ SETTINGS = {
     # Debug mode for verbose logging
     "debug": get_env_value("DEBUG", "false").lower() in ["true", "1", "yes", "y"],
     
+    # Logging backend (sap_audit_logging.py)
+    "logging": {
+        # Lowest level shown when debug mode is off
+        "level": get_env_value("LOG_LEVEL", "INFO").upper(),
+        
+        # Console format: "text" or "json" (JSON lines)
+        "format": get_env_value("LOG_FORMAT", "text").lower(),
+        
+        # Optional JSON lines log file
+        "file": get_env_value("LOG_FILE", ""),
+        
+        # Write through a background thread so logging stays off the processing path
+        "queue": get_env_value("LOG_QUEUE", "true").lower() in ["true", "1", "yes", "y"],
+        
+        # Levels for messages logged while a pipeline stage runs, e.g.
+        # SAP_AUDIT_LOG_STAGE_LEVELS="data_preparation=WARNING,risk_assessment=DEBUG"
+        "stage_levels": {
+            stage.strip(): level.strip().upper()
+            for stage, _, level in (item.partition("=") for item in get_env_value("LOG_STAGE_LEVELS", "").split(","))
+            if stage.strip() and level.strip()
+        }
+    },
+    
+    # Progress and throughput telemetry (sap_audit_telemetry.py)
+    "telemetry": {
+        # Progress display on stderr
+        "progress": get_env_value("PROGRESS", "false").lower() in ["true", "1", "yes", "y"],
+        
+        # Metrics file for a local scraper (empty to disable)
+        "metrics_file": get_env_value("METRICS_FILE", ""),
+        
+        # Metrics file format: "prometheus" (text exposition format) or "json"
+        "metrics_format": get_env_value("METRICS_FORMAT", "prometheus").lower(),
+        
+        # Seconds between metrics file updates
+        "interval": float(get_env_value("METRICS_INTERVAL", "5"))
+    },
+    
     # Record count validation thresholds
     "count_validation": {
         "error_threshold": float(get_env_value("ERROR_THRESHOLD", "0.1")),    # Error if more than 10% records lost
@@ -284,6 +394,69 @@ SETTINGS = {
     "column_renaming": {
         "case_sensitive": get_env_value("CASE_SENSITIVE", "false").lower() in ["true", "1", "yes", "y"],
         "fuzzy_matching": get_env_value("FUZZY_MATCHING", "true").lower() in ["true", "1", "yes", "y"]
+    },
+    
+    # Input file ingestion
+    "ingestion": {
+        # Read every matching export (e.g. weekly files of several systems) instead of the latest one
+        "all_files": get_env_value("INGEST_ALL_FILES", "false").lower() in ["true", "1", "yes", "y"],
+        
+        # Worker processes used to read several files
+        "max_workers": int(get_env_value("INGEST_WORKERS", str(min(4, os.cpu_count() or 1)))),
+        
+        # Columns tagging each record with its export file and system
+        "source_file_column": "SOURCE FILE",
+        "source_system_column": "SOURCE SYSTEM"
+    },
+    
+    # Local audit service (sap_audit_service.py)
+    "service": {
+        "host": get_env_value("SERVICE_HOST", "127.0.0.1"),
+        "port": int(get_env_value("SERVICE_PORT", "8765")),
+        
+        # Worker processes; each keeps its own warm reference and SysAid state
+        "workers": int(get_env_value("SERVICE_WORKERS", "2"))
+    },
+    
+    # Multi-period batch runner (sap_audit_batch.py)
+    "batch": {
+        # Period folders audited at the same time, one worker process each
+        "workers": int(get_env_value("BATCH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    },
+    
+    # Correlation of change documents with preceding SM20 events
+    "correlation": {
+        "enabled": get_env_value("CORRELATE_CHANGES", "true").lower() in ["true", "1", "yes", "y"],
+        
+        # Longest gap between an SM20 event and the change document it produced
+        "window_seconds": int(get_env_value("CORRELATION_WINDOW", "900")),
+        
+        # Require the same transaction code in addition to the same user
+        "match_tcode": get_env_value("CORRELATION_MATCH_TCODE", "true").lower() in ["true", "1", "yes", "y"]
+    },
+    
+    # CDHDR-CDPOS change document join
+    "change_document_join": {
+        # Largest tolerated ratio of joined rows to rows of a one-to-many join
+        "max_expansion": float(get_env_value("JOIN_MAX_EXPANSION", "1.5")),
+        
+        # What to do when the estimate exceeds it: "warn" joins anyway, "abort" skips the join
+        "on_explosion": get_env_value("JOIN_ON_EXPLOSION", "warn").lower()
+    },
+    
+    # Duplicate event detection on per-source natural keys
+    "deduplication": {
+        # Drop repeated events (otherwise they are only counted)
+        "enabled": get_env_value("DEDUPLICATE", "false").lower() in ["true", "1", "yes", "y"],
+        
+        # Columns identifying one event; trailing columns such as NOTE are ignored
+        "natural_keys": {
+            "sm20": ["SAP SYSTEM", "AS INSTANCE", "DATETIME", "USER", "EVENT", "TERMINAL NAME",
+                     "SOURCE TA", "AUDIT LOG MSG. TEXT"],
+            "cdhdr": ["SOURCE SYSTEM", "CL.", "OBJECT", "OBJECT VALUE", "DOC.NUMBER"],
+            "cdpos": ["SOURCE SYSTEM", "CL.", "OBJECT", "OBJECT VALUE", "DOC.NUMBER", "TABLE NAME",
+                      "TABLE KEY", "FIELD NAME", "CHANGE INDICATOR"]
+        }
     }
 }
 
@@ -302,6 +475,8 @@ REPORTING = {
         "Debugging_Related_Event", "Benign_Activity", "Observations", "Questions",
         "Response", "Conclusion", "Table", "Table_Description", "Field", "Change_Indicator", 
         "Old_Value", "New_Value", "Description", "Object", "Object_ID", 
+        "Linked_Event_Datetime", "Linked_Event", "Linked_Event_Description", "Linked_Session_ID",
+        "Link_Gap_Seconds", "Linked_Debug_Session",
         "risk_description", "risk_factors"
     ],
     
@@ -372,12 +547,18 @@ CONFIG = {
     # Enable/disable SysAid integration
     "enable_sysaid": get_env_value("ENABLE_SYSAID", "false").lower() in ["true", "1", "yes", "y"],
     
+    # Store each run's timeline and findings in the audit warehouse
+    "enable_warehouse": get_env_value("ENABLE_WAREHOUSE", "true").lower() in ["true", "1", "yes", "y"],
+    
     # Default path overrides (None means use paths from PATHS)
     "output_path": get_env_value("OUTPUT_PATH", None),
     
     # Performance settings
     "caching_enabled": get_env_value("CACHING_ENABLED", "true").lower() in ["true", "1", "yes", "y"],
-    "parallel_processing": get_env_value("PARALLEL_PROCESSING", "false").lower() in ["true", "1", "yes", "y"],
+    "parallel_processing": get_env_value("PARALLEL_PROCESSING", "true").lower() in ["true", "1", "yes", "y"],
+    
+    # Pipeline stages run at the same time when parallel processing is enabled
+    "pipeline_workers": int(get_env_value("PIPELINE_WORKERS", "3")),
     
     # Risk assessment settings
     "risk_threshold": {
@@ -391,17 +572,24 @@ CONFIG = {
 # =========================================================================
 # CONFIGURATION FILE LOADING
 # =========================================================================
-def load_config_file(config_file_path):
+def load_config_file(config_file_path, paths=None, settings=None, config=None):
     """
     Load configuration from an external file (YAML or JSON).
     Overrides default settings with values from the file.
     
     Args:
         config_file_path: Path to configuration file (YAML or JSON)
+        paths: Paths dict to update (defaults to PATHS)
+        settings: Settings dict to update (defaults to SETTINGS)
+        config: Config dict to update (defaults to CONFIG)
         
     Returns:
         True if config was loaded successfully, False otherwise
     """
+    paths = PATHS if paths is None else paths
+    settings = SETTINGS if settings is None else settings
+    config = CONFIG if config is None else config
+    
     if not os.path.exists(config_file_path):
         log_message(f"Config file not found: {config_file_path}", "ERROR")
         return False
@@ -411,13 +599,13 @@ def load_config_file(config_file_path):
         if config_file_path.lower().endswith('.yaml') or config_file_path.lower().endswith('.yml'):
             try:
                 import yaml
-                with open(config_file_path, 'r', encoding=SETTINGS['encoding']) as f:
+                with open(config_file_path, 'r', encoding=settings['encoding']) as f:
                     config_data = yaml.safe_load(f)
             except ImportError:
                 log_message("YAML module not found. Install with: pip install pyyaml", "ERROR")
                 return False
         elif config_file_path.lower().endswith('.json'):
-            with open(config_file_path, 'r', encoding=SETTINGS['encoding']) as f:
+            with open(config_file_path, 'r', encoding=settings['encoding']) as f:
                 config_data = json.load(f)
         else:
             log_message(f"Unsupported config file format: {config_file_path}", "ERROR")
@@ -428,21 +616,21 @@ def load_config_file(config_file_path):
             section_upper = section.upper()
             if section_upper == "PATHS":
                 for key, value in config_data[section].items():
-                    PATHS[key] = value
+                    paths[key] = value
             elif section_upper == "SETTINGS":
                 for key, value in config_data[section].items():
-                    if isinstance(value, dict) and key in SETTINGS and isinstance(SETTINGS[key], dict):
+                    if isinstance(value, dict) and key in settings and isinstance(settings[key], dict):
                         # Merge nested dictionaries
-                        SETTINGS[key].update(value)
+                        settings[key].update(value)
                     else:
-                        SETTINGS[key] = value
+                        settings[key] = value
             elif section_upper == "CONFIG":
                 for key, value in config_data[section].items():
-                    if isinstance(value, dict) and key in CONFIG and isinstance(CONFIG[key], dict):
+                    if isinstance(value, dict) and key in config and isinstance(config[key], dict):
                         # Merge nested dictionaries
-                        CONFIG[key].update(value)
+                        config[key].update(value)
                     else:
-                        CONFIG[key] = value
+                        config[key] = value
         
         log_message(f"Loaded configuration from {config_file_path}", "INFO")
         return True
@@ -459,11 +647,6 @@ if config_file_env:
 # =========================================================================
 # HELPER FUNCTIONS
 # =========================================================================
-def log_message(message, level="INFO"):
-    """Log a message with timestamp and level."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] {level}: {message}")
-
 def get_sysaid_column(df):
     """
     Find the best column to use for SysAid ticket numbers.
@@ -507,73 +690,113 @@ def print_config_summary():
     print(f"Debug Mode: {SETTINGS['debug']}")
     print("===========================================\n")
 
+def export_env_sample(env_file_path=None):
+    """
+    Write a sample .env file with the current configuration values.
+    
+    Args:
+        env_file_path: Target path (defaults to .env.sample next to this module)
+        
+    Returns:
+        Path of the written file
+    """
+    env_file_path = env_file_path or os.path.join(SCRIPT_DIR, '.env.sample')
+    with open(env_file_path, 'w', encoding='utf-8') as f:
+        f.write("# SAP Audit Tool Environment Variables\n")
+        f.write("# Copy this file to .env and modify as needed\n\n")
+        
+        # Paths
+        f.write("# Path Configuration\n")
+        for key in PATHS:
+            f.write(f"SAP_AUDIT_{key.upper()}={PATHS[key]}\n")
+        
+        # Settings
+        f.write("\n# General Settings\n")
+        f.write(f"SAP_AUDIT_DEBUG={str(SETTINGS['debug']).lower()}\n")
+        f.write(f"SAP_AUDIT_LOG_LEVEL={SETTINGS['logging']['level']}\n")
+        f.write(f"SAP_AUDIT_LOG_FORMAT={SETTINGS['logging']['format']}\n")
+        f.write(f"SAP_AUDIT_PROGRESS={str(SETTINGS['telemetry']['progress']).lower()}\n")
+        f.write(f"SAP_AUDIT_METRICS_FILE={SETTINGS['telemetry']['metrics_file']}\n")
+        f.write(f"SAP_AUDIT_METRICS_FORMAT={SETTINGS['telemetry']['metrics_format']}\n")
+        f.write(f"SAP_AUDIT_ENCODING={SETTINGS['encoding']}\n")
+        f.write(f"SAP_AUDIT_DEDUPLICATE={str(SETTINGS['deduplication']['enabled']).lower()}\n")
+        f.write(f"SAP_AUDIT_INGEST_ALL_FILES={str(SETTINGS['ingestion']['all_files']).lower()}\n")
+        f.write(f"SAP_AUDIT_INGEST_WORKERS={SETTINGS['ingestion']['max_workers']}\n")
+        
+        # Config
+        f.write("\n# Application Configuration\n")
+        f.write(f"SAP_AUDIT_OUTPUT_FORMAT={CONFIG['output_format']}\n")
+        f.write(f"SAP_AUDIT_ENABLE_SYSAID={str(CONFIG['enable_sysaid']).lower()}\n")
+        f.write(f"SAP_AUDIT_ENABLE_WAREHOUSE={str(CONFIG['enable_warehouse']).lower()}\n")
+        f.write(f"SAP_AUDIT_CACHING_ENABLED={str(CONFIG['caching_enabled']).lower()}\n")
+        f.write(f"SAP_AUDIT_PARALLEL_PROCESSING={str(CONFIG['parallel_processing']).lower()}\n")
+        f.write(f"SAP_AUDIT_PIPELINE_WORKERS={CONFIG['pipeline_workers']}\n")
+        
+    print(f"Sample environment variables exported to {env_file_path}")
+    return env_file_path
+
+def export_config_sample(output_dir=None):
+    """
+    Write sample JSON (and YAML, if available) configuration files.
+    
+    Args:
+        output_dir: Target directory (defaults to the directory of this module)
+        
+    Returns:
+        List of written file paths
+    """
+    output_dir = output_dir or SCRIPT_DIR
+    sample_config = {
+        "paths": {
+            "input_dir": PATHS["input_dir"],
+            "output_dir": PATHS["output_dir"],
+            "cache_dir": PATHS["cache_dir"]
+        },
+        "settings": {
+            "debug": SETTINGS["debug"],
+            "logging": SETTINGS["logging"],
+            "telemetry": SETTINGS["telemetry"],
+            "encoding": SETTINGS["encoding"],
+            "count_validation": SETTINGS["count_validation"]
+        },
+        "config": {
+            "output_format": CONFIG["output_format"],
+            "enable_sysaid": CONFIG["enable_sysaid"],
+            "enable_warehouse": CONFIG["enable_warehouse"],
+            "caching_enabled": CONFIG["caching_enabled"],
+            "parallel_processing": CONFIG["parallel_processing"],
+            "pipeline_workers": CONFIG["pipeline_workers"],
+            "risk_threshold": CONFIG["risk_threshold"]
+        }
+    }
+    written = []
+    
+    # Save as JSON
+    json_path = os.path.join(output_dir, 'config.sample.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(sample_config, f, indent=2)
+    print(f"Sample JSON configuration exported to {json_path}")
+    written.append(json_path)
+    
+    # Save as YAML if available
+    if YAML_AVAILABLE:
+        import yaml
+        yaml_path = os.path.join(output_dir, 'config.sample.yaml')
+        with open(yaml_path, 'w', encoding='utf-8') as f:
+            yaml.dump(sample_config, f, default_flow_style=False)
+        print(f"Sample YAML configuration exported to {yaml_path}")
+        written.append(yaml_path)
+    
+    return written
+
 # Call this function when the module is run directly
 if __name__ == "__main__":
     print_config_summary()
     
     # If --export-env flag is provided, generate a sample .env file
     if len(sys.argv) > 1 and sys.argv[1] == "--export-env":
-        env_file_path = os.path.join(SCRIPT_DIR, '.env.sample')
-        with open(env_file_path, 'w', encoding='utf-8') as f:
-            f.write("# SAP Audit Tool Environment Variables\n")
-            f.write("# Copy this file to .env and modify as needed\n\n")
-            
-            # Paths
-            f.write("# Path Configuration\n")
-            for key in PATHS:
-                f.write(f"SAP_AUDIT_{key.upper()}={PATHS[key]}\n")
-            
-            # Settings
-            f.write("\n# General Settings\n")
-            f.write(f"SAP_AUDIT_DEBUG={str(SETTINGS['debug']).lower()}\n")
-            f.write(f"SAP_AUDIT_ENCODING={SETTINGS['encoding']}\n")
-            
-            # Config
-            f.write("\n# Application Configuration\n")
-            f.write(f"SAP_AUDIT_OUTPUT_FORMAT={CONFIG['output_format']}\n")
-            f.write(f"SAP_AUDIT_ENABLE_SYSAID={str(CONFIG['enable_sysaid']).lower()}\n")
-            f.write(f"SAP_AUDIT_CACHING_ENABLED={str(CONFIG['caching_enabled']).lower()}\n")
-            f.write(f"SAP_AUDIT_PARALLEL_PROCESSING={str(CONFIG['parallel_processing']).lower()}\n")
-            
-        print(f"Sample environment variables exported to {env_file_path}")
+        export_env_sample()
         
     # If --export-config flag is provided, generate a sample config file
     if len(sys.argv) > 1 and sys.argv[1] == "--export-config":
-        try:
-            import yaml
-            have_yaml = True
-        except ImportError:
-            have_yaml = False
-            
-        sample_config = {
-            "paths": {
-                "input_dir": PATHS["input_dir"],
-                "output_dir": PATHS["output_dir"],
-                "cache_dir": PATHS["cache_dir"]
-            },
-            "settings": {
-                "debug": SETTINGS["debug"],
-                "encoding": SETTINGS["encoding"],
-                "count_validation": SETTINGS["count_validation"]
-            },
-            "config": {
-                "output_format": CONFIG["output_format"],
-                "enable_sysaid": CONFIG["enable_sysaid"],
-                "caching_enabled": CONFIG["caching_enabled"],
-                "parallel_processing": CONFIG["parallel_processing"],
-                "risk_threshold": CONFIG["risk_threshold"]
-            }
-        }
-        
-        # Save as JSON
-        json_path = os.path.join(SCRIPT_DIR, 'config.sample.json')
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(sample_config, f, indent=2)
-        print(f"Sample JSON configuration exported to {json_path}")
-        
-        # Save as YAML if available
-        if have_yaml:
-            yaml_path = os.path.join(SCRIPT_DIR, 'config.sample.yaml')
-            with open(yaml_path, 'w', encoding='utf-8') as f:
-                yaml.dump(sample_config, f, default_flow_style=False)
-            print(f"Sample YAML configuration exported to {yaml_path}")
+        export_config_sample()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Audit Context Module
+
+This module provides AuditContext, the state of one audit run. Components
+receive it through their constructors instead of reading the module-level
+PATHS, PATTERNS, SETTINGS and CONFIG dicts and the record_counter singleton,
+so several audits can run in one process, including in threads.
+
+Key features:
+- AuditContext.default() wraps the module-level objects, so components
+  created without a context behave exactly as before
+- AuditContext.for_folder() builds an isolated context for one input folder
+  with its own copies of the configuration and its own record counter
+- Per-context configuration files (load_config_file) without touching the
+  module-level dicts
+- Shared, read-only reference data service and a caches dict for state
+  that may be reused between runs (e.g. a loaded SysAid export)
+- Progress telemetry of the run that stages and detectors report to
+"""
+
+import copy
+import os
+
+from sap_audit_config import CONFIG, PATHS, PATTERNS, SETTINGS, SYSAID, folder_paths, load_config_file
+
+# Context wrapping the module-level objects, created on first use
+_default_context = None
+
+
+class AuditContext:
+    """
+    Configuration, paths, counters and caches of one audit run.
+    """
+
+    def __init__(self, config=None, paths=None, patterns=None, settings=None, sysaid=None,
+                 record_counter=None, reference_data=None, caches=None):
+        """
+        Initialize a context; omitted parts are independent copies of the defaults.
+
+        Args:
+            config: Main configuration (CONFIG)
+            paths: File and directory paths (PATHS)
+            patterns: Input file patterns (PATTERNS)
+            settings: Processing settings (SETTINGS)
+            sysaid: SysAid settings (SYSAID)
+            record_counter: RecordCounter of the run (a new one if omitted)
+            reference_data: Reference data service (the shared one if omitted)
+            caches: Dict for state that may be shared between runs
+        """
+        self.config = copy.deepcopy(CONFIG) if config is None else config
+        self.paths = dict(PATHS) if paths is None else paths
+        self.patterns = dict(PATTERNS) if patterns is None else patterns
+        self.settings = copy.deepcopy(SETTINGS) if settings is None else settings
+        self.sysaid = copy.deepcopy(SYSAID) if sysaid is None else sysaid
+        if record_counter is None:
+            from sap_audit_record_counts import RecordCounter
+            record_counter = RecordCounter()
+        self.record_counter = record_counter
+        self._reference_data = reference_data
+        self._telemetry = None
+        self.caches = {} if caches is None else caches
+
+    @classmethod
+    def default(cls):
+        """
+        Return the context wrapping the module-level configuration objects.
+
+        Returns:
+            AuditContext: The shared default context
+        """
+        global _default_context
+        if _default_context is None:
+            from sap_audit_record_counts import record_counter
+            _default_context = cls(config=CONFIG, paths=PATHS, patterns=PATTERNS, settings=SETTINGS,
+                                   sysaid=SYSAID, record_counter=record_counter)
+        return _default_context
+
+    @classmethod
+    def for_folder(cls, input_dir, output_dir, config=None, cache_dir=None, caches=None):
+        """
+        Build an isolated context for an audit of one input folder.
+
+        Args:
+            input_dir: Folder with the SAP exports (or prepared CSV files)
+            output_dir: Folder for the run's reports
+            config: Configuration overrides for the run
+            cache_dir: Folder for caches and checkpoints (defaults to <output_dir>/cache)
+            caches: Dict for state shared with other runs
+
+        Returns:
+            AuditContext: New context
+        """
+        paths, patterns = folder_paths(input_dir, output_dir, cache_dir)
+        run_config = copy.deepcopy(CONFIG)
+        run_config.update(config or {})
+        # The global output path belongs to the default context; only an explicit override applies here
+        run_config["output_path"] = (config or {}).get("output_path") or paths["audit_report"]
+        return cls(config=run_config, paths=paths, patterns=patterns, caches=caches)
+
+    @property
+    def reference_data(self):
+        """Reference data service (read-only and safe to share between runs)."""
+        if self._reference_data is None:
+            from sap_audit_reference_service import reference_data
+            self._reference_data = reference_data
+        return self._reference_data
+
+    @property
+    def telemetry(self):
+        """Progress telemetry of the run (reporters are added by the controller)."""
+        if self._telemetry is None:
+            from sap_audit_telemetry import Telemetry
+            self._telemetry = Telemetry()
+        return self._telemetry
+
+    def load_config_file(self, config_file_path):
+        """
+        Apply a YAML or JSON configuration file to this context only.
+
+        Args:
+            config_file_path: Path to configuration file
+
+        Returns:
+            bool: True if the file was loaded
+        """
+        return load_config_file(config_file_path, self.paths, self.settings, self.config)
+
+    def ensure_directories(self):
+        """Create the context's input, output and cache directories."""
+        for key in ["input_dir", "output_dir", "cache_dir"]:
+            os.makedirs(self.paths[key], exist_ok=True)
+
+    def __getstate__(self):
+        # Worker processes get the configuration and counts, not the shared
+        # reference service (it holds a lock), the telemetry or the caches
+        state = self.__dict__.copy()
+        state["_reference_data"] = None
+        state["_telemetry"] = None
+        state["caches"] = {}
+        return state
@@ -8,49 +8,47 @@ connecting all refactored modules into a cohesive pipeline.
 Key features:
 - Central AuditController class to orchestrate workflow
 - Pipeline architecture connecting all refactored modules
+- Stage scheduler overlapping independent stages (SysAid and reference
+  data loading run alongside data preparation)
+- Stage checkpoints with resume from the last good stage
+- Each run's timeline and findings stored in the cross-run audit warehouse
+- Run state (paths, configuration, record counts) taken from an
+  AuditContext, so several controllers can run in one process
 - Validation between processing steps
-- Progress tracking and reporting
+- Progress tracking and reporting: stage events and detector progress go to
+  the run's telemetry (terminal progress display, metrics file)
 - Unified error handling system
 - Configuration validation at startup
 """
 
 import os
-import pandas as pd
 from datetime import datetime
 import time
 from typing import Dict, List, Optional, Union, Any, Tuple
 
 # Import configuration and utilities
-from sap_audit_config import CONFIG, PATHS, SETTINGS
+from sap_audit_context import AuditContext
 from sap_audit_utils import (
     log_message, log_section, log_error, handle_exception,
     clean_whitespace, validate_required_columns
 )
 
-# Import refactored modules
-from sap_audit_data_prep import DataPrepManager
-from sap_audit_session_merger import SessionMerger
-from sap_audit_risk import RiskAssessor
-from sap_audit_analyzer import SAPAuditAnalyzer
-from sap_audit_sysaid_integrator import SysAidIntegrator
-from sap_audit_output import ExcelOutputGenerator, CsvOutputGenerator
+# Pipeline modules (data prep, session merger, risk, analyzer, SysAid, output)
+# are imported when their component is first used, so a run only pays for the
+# stages it executes.
 
-# Import record counter if available
-try:
-    from sap_audit_record_counts import record_counter
-except ImportError:
-    # Placeholder if record counter is not available
-    class RecordCounter:
-        def update_source_counts(self, source_type, file_name, original_count, final_count):
-            pass
-        
-        def update_timeline_count(self, total_records, source_counts=None):
-            pass
-        
-        def get_counts_for_report(self):
-            return {"completeness_score": 0, "source_files": []}
-    
-    record_counter = RecordCounter()
+# Stages checkpointed after they complete, in pipeline order
+CHECKPOINT_STAGES = [
+    "data_preparation", "session_merging", "risk_assessment", "sysaid_integration", "enhanced_analysis"
+]
+
+# Files written by data preparation and read by the session merger
+PREPARED_FILE_KEYS = ["sm20_input", "cdhdr_input", "cdpos_input"]
+
+# Configuration and settings that change checkpointed results; a checkpoint
+# written with other values is not resumed
+CHECKPOINT_CONFIG_KEYS = ["enable_sysaid", "sysaid_source", "risk_threshold"]
+CHECKPOINT_SETTINGS_KEYS = ["deduplication", "exclude_fields"]
 
 
 class AuditController:
@@ -61,88 +59,273 @@ class AuditController:
     and provides methods for running the full audit or individual steps.
     """
     
-    def __init__(self, config=None):
+    def __init__(self, config=None, components=None, context=None):
         """
         Initialize controller with optional config override.
         
         Args:
-            config: Dictionary with configuration overrides
+            config: Dictionary with configuration overrides (defaults to the
+                    context's configuration)
+            components: Optional prebuilt components by name (e.g. warm
+                        risk assessor and analyzer instances to reuse)
+            context: AuditContext of the run; without one the controller
+                     uses the global configuration, paths and record counter
         """
-        self.config = config or CONFIG
-        self.paths = PATHS
-        self.settings = SETTINGS
+        self.context = context or AuditContext.default()
+        self.config = config or self.context.config
+        self.paths = self.context.paths
+        self.settings = self.context.settings
+        self.record_counter = self.context.record_counter
+        self.context.ensure_directories()
         
         # Initialize session state
         self.session_data = None
         
-        # Initialize components
-        self.data_prep = DataPrepManager()
-        self.session_merger = SessionMerger()
-        self.risk_assessor = RiskAssessor()
-        self.analyzer = SAPAuditAnalyzer()
-        self.sysaid_integrator = SysAidIntegrator(
-            data_source_strategy=self.config.get("sysaid_source", "file")
-        )
+        # Components are created on first use, so partial runs such as
+        # prep-only mode do not build (or load reference data for) the rest
+        self._components = dict(components or {})
         
-        # Initialize output generator based on configured format
-        output_format = self.config.get("output_format", "excel")
-        if output_format.lower() == "csv":
-            self.output_generator = CsvOutputGenerator()
-        else:
-            self.output_generator = ExcelOutputGenerator()
+        # Per-stage timeline of the last full run, and an optional callable
+        # receiving stage events (start, completion) while it runs
+        self.stage_timeline = []
+        self.stage_listener = None
+        
+        # Stage checkpoints; a resumed run continues from the last good stage
+        self.resume = self.config.get("resume", False)
+        self._checkpoints = None
+        self._run_fingerprint = None
         
         # Initialize timing metrics
         self.start_time = None
         self.end_time = None
         self.elapsed_time = None
     
+    def _component(self, name, factory):
+        """
+        Return a pipeline component, creating it on first use.
+        
+        Args:
+            name: Component name
+            factory: Callable that creates the component
+            
+        Returns:
+            The component instance
+        """
+        if name not in self._components:
+            self._components[name] = factory()
+        return self._components[name]
+    
+    @property
+    def checkpoints(self):
+        """Checkpoint store in the cache directory."""
+        if self._checkpoints is None:
+            from sap_audit_checkpoints import CheckpointStore
+            self._checkpoints = CheckpointStore(os.path.join(self.paths["cache_dir"], "checkpoints"))
+        return self._checkpoints
+    
+    def _fingerprint_run(self):
+        """
+        Fingerprint the inputs of this run for its checkpoints.
+        
+        Returns:
+            dict: Input folder, raw export signatures and result-relevant configuration
+        """
+        from sap_audit_checkpoints import run_fingerprint
+        
+        source_files = [path for processor in self.data_prep.processors.values()
+                        for path in processor.find_input_files()]
+        config = {key: self.config.get(key, self.context.config.get(key)) for key in CHECKPOINT_CONFIG_KEYS}
+        config.update({key: self.settings.get(key) for key in CHECKPOINT_SETTINGS_KEYS})
+        return run_fingerprint(self.paths["input_dir"], source_files, config)
+    
+    @property
+    def data_prep(self):
+        """Data preparation manager."""
+        def create_data_prep():
+            from sap_audit_data_prep import DataPrepManager
+            return DataPrepManager(context=self.context)
+        return self._component("data_prep", create_data_prep)
+    
+    @property
+    def session_merger(self):
+        """Session merger."""
+        def create_session_merger():
+            from sap_audit_session_merger import SessionMerger
+            return SessionMerger(self.context)
+        return self._component("session_merger", create_session_merger)
+    
+    @property
+    def risk_assessor(self):
+        """Risk assessor."""
+        def create_risk_assessor():
+            from sap_audit_risk import RiskAssessor
+            return RiskAssessor(context=self.context)
+        return self._component("risk_assessor", create_risk_assessor)
+    
+    @property
+    def analyzer(self):
+        """Enhanced analyzer."""
+        def create_analyzer():
+            from sap_audit_analyzer import SAPAuditAnalyzer
+            return SAPAuditAnalyzer(context=self.context)
+        return self._component("analyzer", create_analyzer)
+    
+    @property
+    def sysaid_integrator(self):
+        """SysAid integrator using the configured data source strategy."""
+        def create_sysaid_integrator():
+            from sap_audit_sysaid_integrator import SysAidIntegrator
+            return SysAidIntegrator(data_source_strategy=self.config.get("sysaid_source", "file"),
+                                    context=self.context)
+        return self._component("sysaid_integrator", create_sysaid_integrator)
+    
+    @property
+    def output_generator(self):
+        """Output generator for the configured output format."""
+        def create_output_generator():
+            from sap_audit_output import ExcelOutputGenerator, CsvOutputGenerator
+            output_format = self.config.get("output_format", "excel")
+            if output_format.lower() == "csv":
+                return CsvOutputGenerator(context=self.context)
+            return ExcelOutputGenerator(context=self.context)
+        return self._component("output_generator", create_output_generator)
+    
+    def _build_stages(self):
+        """
+        Declare the pipeline stages and the artifacts they exchange.
+        
+        SysAid file loading and reference data loading only depend on the
+        configuration, so they overlap with data preparation and session
+        merging instead of blocking risk assessment.
+        
+        Returns:
+            list: Stage objects in their sequential order
+        """
+        from sap_audit_pipeline import Stage
+        stages = [
+            Stage("validate_configuration", self._validate_configuration, outputs=["configuration"],
+                  failure_message="Configuration validation failed, cannot continue"),
+            Stage("data_preparation", self.run_data_preparation, inputs=["configuration"],
+                  outputs=["prepared_files"], failure_message="Data preparation failed, cannot continue"),
+            Stage("sysaid_loading", self.load_sysaid_data, inputs=["configuration"],
+                  outputs=["sysaid_data"], required=False,
+                  failure_message="SysAid data loading failed, loading during integration"),
+            Stage("reference_loading", self.load_reference_data, inputs=["configuration"],
+                  outputs=["reference_data"], required=False,
+                  failure_message="Reference data loading failed, loading on first use"),
+            Stage("session_merging", self.run_session_merging, inputs=["prepared_files"],
+                  outputs=["timeline"], failure_message="Session merging failed, cannot continue"),
+            Stage("risk_assessment", self.run_risk_assessment, inputs=["timeline", "reference_data"],
+                  outputs=["risk_timeline"], failure_message="Risk assessment failed"),
+            Stage("sysaid_integration", self.run_sysaid_integration, inputs=["risk_timeline", "sysaid_data"],
+                  outputs=["sysaid_timeline"], required=False,
+                  failure_message="SysAid integration failed or skipped"),
+            Stage("enhanced_analysis", self.run_enhanced_analysis, inputs=["sysaid_timeline"],
+                  outputs=["analyzed_timeline"], required=False,
+                  failure_message="Enhanced analysis failed"),
+            Stage("output_generation", self.generate_output, inputs=["analyzed_timeline"],
+                  outputs=["report"], failure_message="Output generation failed"),
+            Stage("warehouse_loading", self.load_warehouse, inputs=["report"],
+                  outputs=["warehouse"], required=False,
+                  failure_message="Storing the run in the audit warehouse failed"),
+        ]
+        for stage in stages:
+            if stage.name in CHECKPOINT_STAGES:
+                stage.func = self._checkpointed(stage.name, stage.func)
+        return stages
+    
+    def _checkpointed(self, name, func):
+        """
+        Wrap a stage function so a successful run saves a checkpoint.
+        
+        Args:
+            name: Stage name
+            func: Stage function
+            
+        Returns:
+            Callable: Wrapped stage function
+        """
+        def run_and_checkpoint():
+            success = func()
+            if success:
+                if name == "data_preparation":
+                    files = [self.paths[key] for key in PREPARED_FILE_KEYS if os.path.exists(self.paths[key])]
+                    self.checkpoints.save(name, files=files, counts=getattr(self.record_counter, "counts", None),
+                                          run=self._run_fingerprint)
+                else:
+                    self.checkpoints.save(name, df=self.session_data, counts=getattr(self.record_counter, "counts", None),
+                                          run=self._run_fingerprint)
+            return success
+        return run_and_checkpoint
+    
+    def _restore_checkpoint(self, scheduler):
+        """
+        Restore the state of the last good checkpointed stage.
+        
+        Args:
+            scheduler: Stage scheduler of the run
+            
+        Returns:
+            set: Names of the stages that do not need to run again
+        """
+        stage = self.checkpoints.resume_point(CHECKPOINT_STAGES, run=self._run_fingerprint)
+        if stage is None:
+            log_message("No usable checkpoint found, running all stages")
+            return set()
+        
+        session_data, entry = self.checkpoints.load(stage)
+        if session_data is not None:
+            self.session_data = session_data
+        if entry.get("counts") and hasattr(self.record_counter, "counts"):
+            self.record_counter.counts = entry["counts"]
+        
+        log_message(f"Resuming after stage {stage} (checkpoint saved {entry['saved_at']})")
+        # The configuration is always validated again
+        return (scheduler.ancestors(stage) | {stage}) - {"validate_configuration"}
+    
     @handle_exception
     def run_full_audit(self):
         """
         Run the complete audit process from data prep to output.
         
+        Stages run through the stage scheduler; independent stages run
+        concurrently when parallel processing is enabled. Completed stages
+        are checkpointed, and a resumed run (config "resume") continues
+        after the last good checkpoint.
+        
         Returns:
             bool: Success status
         """
+        from sap_audit_pipeline import StageScheduler
+        
         # Start timing
         self.start_time = time.time()
         
         log_section("Starting Full SAP Audit")
-        log_message(f"Using configuration: {self.config}")
+        log_message("Using configuration: %s", "DEBUG", self.config)
         
-        # Step 1: Validate configuration
-        if not self._validate_configuration():
-            log_message("Configuration validation failed, cannot continue", "ERROR")
-            return False
+        parallel = self.config.get("parallel_processing", self.context.config.get("parallel_processing", True))
+        workers = self.config.get("pipeline_workers", self.context.config.get("pipeline_workers", 1)) if parallel else 1
+        scheduler = StageScheduler(self._build_stages(), max_workers=workers, listener=self._stage_event)
         
-        # Step 2: Data preparation
-        if not self.run_data_preparation():
-            log_message("Data preparation failed, cannot continue", "ERROR")
-            return False
-            
-        # Step 3: Session merging
-        if not self.run_session_merging():
-            log_message("Session merging failed, cannot continue", "ERROR")
-            return False
-            
-        # Step 4: Risk assessment
-        if not self.run_risk_assessment():
-            log_message("Risk assessment failed", "ERROR")
-            return False
-            
-        # Step 5: SysAid integration
-        if not self.run_sysaid_integration():
-            log_message("SysAid integration failed or skipped", "WARNING")
-            # Continue anyway, as SysAid is optional
-            
-        # Step 6: Enhanced analysis
-        if not self.run_enhanced_analysis():
-            log_message("Enhanced analysis failed", "WARNING")
-            # Continue anyway, as this is an enhancement
-            
-        # Step 7: Output generation
-        if not self.generate_output():
-            log_message("Output generation failed", "ERROR")
+        # Taken before any stage runs, so a resume compares like with like
+        self._run_fingerprint = self._fingerprint_run()
+        completed = set()
+        if self.resume:
+            completed = self._restore_checkpoint(scheduler)
+        else:
+            # Checkpoints of an earlier run must not mix with this one
+            self.checkpoints.clear()
+        
+        self._start_telemetry()
+        try:
+            success = scheduler.run(completed)
+        finally:
+            self.context.telemetry.close()
+        self.stage_timeline = scheduler.timeline
+        scheduler.log_timeline()
+        
+        if not success:
             return False
         
         # End timing
@@ -156,6 +339,57 @@ class AuditController:
         
         return True
     
+    def _start_telemetry(self):
+        """Attach the progress display and metrics file enabled for this run."""
+        from sap_audit_telemetry import create_reporters
+        
+        settings = dict(self.settings.get("telemetry", {}))
+        for key in ["progress", "metrics_file", "metrics_format"]:
+            if self.config.get(key):
+                settings[key] = self.config[key]
+        for reporter in create_reporters(settings):
+            self.context.telemetry.add_reporter(reporter)
+    
+    def _stage_event(self, event):
+        """Pass a stage event to the telemetry and the stage listener."""
+        rows = None
+        if event["status"] != "started" and self.session_data is not None:
+            rows = len(self.session_data)
+        self.context.telemetry.stage_event(event, rows)
+        if self.stage_listener is not None:
+            self.stage_listener(event)
+    
+    @handle_exception
+    def load_sysaid_data(self):
+        """
+        Load the SysAid export ahead of SysAid integration.
+        
+        Only the file strategy is loaded early; the API strategy fetches the
+        tickets referenced by the timeline during integration.
+        
+        Returns:
+            bool: Success status
+        """
+        if not self.config.get("enable_sysaid", True):
+            return True
+        if self.config.get("sysaid_source", "file").lower() != "file":
+            return True
+        
+        self.sysaid_integrator.load_sysaid_data()
+        return True
+    
+    @handle_exception
+    def load_reference_data(self):
+        """
+        Load the reference data used by risk assessment and enhanced analysis.
+        
+        Returns:
+            bool: Success status
+        """
+        self.risk_assessor.sensitive_tables
+        self.analyzer.tcode_descriptions
+        return True
+    
     @handle_exception
     def run_data_preparation(self):
         """
@@ -169,6 +403,10 @@ class AuditController:
         # Data preparation is done independently, no need to return data
         success = self.data_prep.process_input_files()
         
+        if not success and self._has_prepared_files():
+            log_message("No SAP exports found; using the prepared files in the input folder", "WARNING")
+            return True
+        
         if not success:
             log_message("Data preparation failed", "ERROR")
             return False
@@ -176,6 +414,19 @@ class AuditController:
         log_message("Data preparation completed successfully")
         return True
     
+    def _has_prepared_files(self):
+        """
+        Check whether the input folder only holds already prepared files.
+        
+        Returns:
+            bool: True if no source exports were found and every prepared
+                  CSV file read by the session merger exists
+        """
+        found_files = getattr(self.data_prep, "found_files", {})
+        if any(found_files.values()):
+            return False
+        return all(os.path.exists(self.paths[key]) for key in PREPARED_FILE_KEYS)
+    
     @handle_exception
     def run_session_merging(self):
         """
@@ -316,6 +567,39 @@ class AuditController:
         log_message(f"Output generated successfully: {output_path}")
         return True
     
+    @handle_exception
+    def load_warehouse(self):
+        """
+        Store the timeline and findings of the run in the audit warehouse.
+        
+        Returns:
+            bool: Success status
+        """
+        if not self.config.get("enable_warehouse", self.context.config.get("enable_warehouse", True)):
+            return True
+        if self.session_data is None:
+            log_message("No session data available for the audit warehouse", "WARNING")
+            return False
+        
+        from sap_audit_warehouse import store_run
+        
+        # A period folder names the period; runs on the default input folder
+        # are named after the month they start in
+        input_dir = os.path.normpath(self.paths["input_dir"])
+        period = None
+        if input_dir != os.path.normpath(AuditContext.default().paths["input_dir"]):
+            period = os.path.basename(input_dir)
+        
+        store_run(
+            self.session_data,
+            period=period,
+            input_dir=self.paths["input_dir"],
+            report_path=self.config.get("output_path") or self.paths.get("audit_report"),
+            summary={"counts": getattr(self.record_counter, "counts", None)},
+            path=self.paths.get("warehouse")
+        )
+        return True
+    
     def _validate_configuration(self):
         """
         Validate the configuration at startup.
@@ -350,7 +634,7 @@ class AuditController:
                     log_message(f"SysAid file not found: {sysaid_file}", "WARNING")
                     # Don't fail, just warn - SysAid is optional
             elif sysaid_source == "api":
-                if not self.config.get("sysaid_api_url"):
+                if not self.config.get("sysaid_api_url") and not self.context.sysaid.get("api_url"):
                     log_message("SysAid API URL not configured", "WARNING")
                     # Don't fail, just warn - will use cache if available
         
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Change Correlation Module
+
+This module links every change document (CDHDR/CDPOS row) in the unified
+timeline to the SM20 event that most likely produced it: the nearest
+preceding event of the same user and transaction within a time window.
+
+Key features:
+- pd.merge_asof over time-sorted events, grouped by user (and tcode)
+- O(n log n) instead of manual review of stacked SM20 and CDPOS rows
+- Configurable window and tcode matching (SETTINGS["correlation"])
+- Linkage columns with the event time, event, session and gap, plus a
+  flag for events in debugging sessions
+"""
+
+import numpy as np
+import pandas as pd
+
+from sap_audit_config import SETTINGS
+from sap_audit_utils import log_message
+from sap_audit_analyzer import DEBUG_EVENTS, DEBUG_TCODES
+from sap_audit_text_features import TextFeatureCache
+
+# Linkage columns added to change document rows
+LINK_COLUMNS = {
+    "datetime": "Linked_Event_Datetime",
+    "event": "Linked_Event",
+    "description": "Linked_Event_Description",
+    "session": "Linked_Session_ID",
+    "gap": "Link_Gap_Seconds",
+    "debug": "Linked_Debug_Session"
+}
+
+# Timeline sources holding change documents
+CHANGE_SOURCES = ["CDHDR", "CDPOS"]
+
+
+def _match_key(values):
+    """Normalize user/tcode values for matching."""
+    return values.fillna("").astype(str).str.strip().str.upper()
+
+
+def debug_event_mask(events):
+    """
+    Flag SM20 events that belong to debugging activity.
+    
+    Args:
+        events: SM20 timeline rows
+        
+    Returns:
+        numpy.ndarray: Boolean mask
+    """
+    mask = np.zeros(len(events), dtype=bool)
+    if "Event" in events.columns:
+        mask |= _match_key(events["Event"]).isin(DEBUG_EVENTS).to_numpy()
+    if "TCode" in events.columns:
+        mask |= _match_key(events["TCode"]).isin(DEBUG_TCODES).to_numpy()
+    if "Variable_2" in events.columns:
+        mask |= TextFeatureCache(events).feature("Variable_2", "debug_marker")
+    return mask
+
+
+def correlate_change_documents(timeline, window_seconds=None, match_tcode=None, user_col="User",
+                               tcode_col="TCode", time_col="Datetime", session_col="Session ID"):
+    """
+    Link change documents to the nearest preceding SM20 event.
+    
+    Args:
+        timeline: Unified timeline with a Source column
+        window_seconds: Longest tolerated gap (defaults to the configured window)
+        match_tcode: Require the same TCode (defaults to the configured setting)
+        user_col: User column name
+        tcode_col: Transaction code column name
+        time_col: Datetime column name
+        session_col: Session ID column name
+        
+    Returns:
+        DataFrame: The timeline with linkage columns (empty for unlinked rows)
+    """
+    config = SETTINGS["correlation"]
+    window_seconds = config["window_seconds"] if window_seconds is None else window_seconds
+    match_tcode = config["match_tcode"] if match_tcode is None else match_tcode
+    
+    timeline = timeline.copy()
+    for key, column in LINK_COLUMNS.items():
+        timeline[column] = {"datetime": pd.NaT, "gap": np.nan}.get(key)
+    
+    if timeline.empty or "Source" not in timeline.columns or time_col not in timeline.columns:
+        return timeline
+    
+    by = ["_user"] + (["_tcode"] if match_tcode and tcode_col in timeline.columns else [])
+    source = timeline["Source"].astype(str).str.upper()
+    valid_time = timeline[time_col].notna()
+    
+    frame = pd.DataFrame({"_row": np.arange(len(timeline)), time_col: timeline[time_col].to_numpy(),
+                          "_user": _match_key(timeline[user_col]).to_numpy()})
+    if "_tcode" in by:
+        frame["_tcode"] = _match_key(timeline[tcode_col]).to_numpy()
+    
+    events = frame[(source == "SM20").to_numpy() & valid_time.to_numpy()].sort_values(time_col, kind="stable")
+    changes = frame[source.isin(CHANGE_SOURCES).to_numpy() & valid_time.to_numpy()].sort_values(time_col, kind="stable")
+    if events.empty or changes.empty:
+        return timeline
+    
+    events = events.rename(columns={"_row": "_event_row"})
+    events["_event_time"] = events[time_col]
+    linked = pd.merge_asof(changes, events, on=time_col, by=by, direction="backward",
+                           tolerance=pd.Timedelta(seconds=window_seconds))
+    linked = linked[linked["_event_row"].notna()]
+    
+    change_rows = linked["_row"].to_numpy()
+    event_rows = linked["_event_row"].to_numpy(dtype=np.int64)
+    
+    # Write the linkage columns back by position
+    positions = {key: timeline.columns.get_loc(column) for key, column in LINK_COLUMNS.items()}
+    timeline.iloc[change_rows, positions["datetime"]] = linked["_event_time"].to_numpy()
+    timeline.iloc[change_rows, positions["gap"]] = (
+        (linked[time_col] - linked["_event_time"]).dt.total_seconds().to_numpy())
+    for key, column in [("event", "Event"), ("description", "Description"), ("session", session_col)]:
+        if column in timeline.columns:
+            timeline.iloc[change_rows, positions[key]] = timeline[column].to_numpy()[event_rows]
+    
+    # A change comes from debugging if its event, or any event of that event's session, debugged
+    sm20_positions = np.flatnonzero((source == "SM20").to_numpy())
+    debug_positions = sm20_positions[debug_event_mask(timeline.iloc[sm20_positions])]
+    debug = np.isin(event_rows, debug_positions)
+    if session_col in timeline.columns:
+        sessions = timeline[session_col].to_numpy()
+        debug |= pd.Series(sessions[event_rows]).isin(set(sessions[debug_positions])).to_numpy()
+    timeline.iloc[change_rows, positions["debug"]] = np.where(debug, "Yes", "No")
+    
+    log_message(f"Linked {len(linked)} of {len(changes)} change documents to SM20 events "
+                f"within {window_seconds} seconds")
+    return timeline
@@ -3,12 +3,14 @@
 SAP Audit Data Preparation Module
 
 This module prepares SAP log data files for the main audit tool by:
-1. Finding input files matching specific patterns in the input folder
+1. Finding input files matching specific patterns in the input folder, reading
+   every export of several systems in parallel when multi-file ingestion is enabled
 2. Converting all column headers to UPPERCASE
-3. Creating datetime columns from date and time fields
-4. Sorting data by user and datetime
-5. Saving the processed files as CSV with UTF-8-sig encoding in the same input folder
-6. Tracking record counts for completeness verification
+3. Cleaning values in a single pass while collecting a data quality report
+4. Creating datetime columns from date and time fields
+5. Sorting data by user and datetime
+6. Saving the processed files as CSV with UTF-8-sig encoding in the same input folder
+7. Tracking record counts for completeness verification
 
 The module implements the Factory pattern for data source processing,
 with specialized processors for each data source type (SM20, CDHDR, CDPOS).
@@ -16,26 +18,45 @@ Each processor handles validation, transformation, and output generation.
 """
 
 import os
+import re
 import sys
 import glob
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
 # Import configuration and utilities
-from sap_audit_config import PATHS, COLUMNS, PATTERNS, SETTINGS
+from sap_audit_config import COLUMNS
+from sap_audit_context import AuditContext
 from sap_audit_utils import (
     log_message, log_error, log_section, log_stats,
-    handle_exception, validate_required_columns, validate_data_quality,
-    clean_whitespace, find_latest_file
+    handle_exception, validate_required_columns, find_latest_file, find_matching_files,
+    build_datetime_series, clean_and_profile, log_quality_report, save_quality_reports,
+    process_pool_context
 )
 
-# Import the record counter
-from sap_audit_record_counts import record_counter
+# Import duplicate detection
+from sap_audit_duplicates import DuplicateDetector
 
 # =========================================================================
 # DATA SOURCE PROCESSOR BASE CLASS
 # =========================================================================
 
+def source_system_from_filename(input_file, source_type):
+    """
+    Get the SAP system from an export file name such as PRD_sm20_2025-W10.xlsx.
+    
+    Args:
+        input_file: Path to the export file
+        source_type: Source type embedded in the file name (sm20, cdhdr, cdpos)
+        
+    Returns:
+        str: File name prefix before the source type, or "" if there is none
+    """
+    match = re.match(rf"(.+?)_{source_type}_", os.path.basename(input_file), re.IGNORECASE)
+    return match.group(1).upper() if match else ""
+
 class DataSourceProcessor:
     """
     Base class for data source processors.
@@ -45,14 +66,19 @@ class DataSourceProcessor:
     that all data source processors must implement.
     """
     
-    def __init__(self, source_type):
+    def __init__(self, source_type, context=None):
         """
         Initialize a data source processor.
         
         Args:
             source_type: Type of data source (sm20, cdhdr, cdpos)
+            context: AuditContext of the run (defaults to the global configuration)
         """
         self.source_type = source_type
+        self.context = context or AuditContext.default()
+        self.quality_report = None
+        self.duplicate_detector = DuplicateDetector(source_type, settings=self.context.settings)
+        self.file_counts = []
         
     def find_input_file(self):
         """
@@ -61,8 +87,23 @@ class DataSourceProcessor:
         Returns:
             Path to the most recent file, or None if no matches
         """
-        pattern = PATTERNS.get(self.source_type)
+        pattern = self.context.patterns.get(self.source_type)
         return find_latest_file(pattern)
+    
+    def find_input_files(self):
+        """
+        Find the input files for this source.
+        
+        Returns every matching file when multi-file ingestion is enabled,
+        otherwise only the most recent one.
+        
+        Returns:
+            List of file paths (empty if no matches)
+        """
+        if self.context.settings["ingestion"]["all_files"]:
+            return find_matching_files(self.context.patterns.get(self.source_type))
+        input_file = self.find_input_file()
+        return [input_file] if input_file else []
         
     def process(self, input_file, output_file):
         """
@@ -109,6 +150,84 @@ class DataSourceProcessor:
             log_error(e, f"Error reading {self.source_type.upper()} file")
             return None
     
+    def read_source_files(self, input_files):
+        """
+        Read one or more source files into a single DataFrame.
+        
+        Several files are read in a pool of worker processes, tagged with
+        their file name and SAP system, and concatenated in one step. Per-file
+        record counts are kept in self.file_counts.
+        
+        Args:
+            input_files: Path or list of paths to the input files
+            
+        Returns:
+            DataFrame with the source data, or None if no file could be read
+        """
+        input_files = [input_files] if isinstance(input_files, str) else list(input_files)
+        self.file_counts = []
+        if not input_files:
+            return None
+        
+        workers = min(self.context.settings["ingestion"]["max_workers"], len(input_files))
+        if workers > 1:
+            log_message(f"Reading {len(input_files)} {self.source_type.upper()} files with {workers} workers")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context()) as pool:
+                frames = list(pool.map(self.read_source_file, input_files))
+        else:
+            frames = [self.read_source_file(input_file) for input_file in input_files]
+        
+        loaded = [(input_file, df) for input_file, df in zip(input_files, frames) if df is not None]
+        self.file_counts = [{
+            "file_name": os.path.basename(input_file),
+            "system": source_system_from_filename(input_file, self.source_type),
+            "original_count": len(df)
+        } for input_file, df in loaded]
+        
+        if not loaded:
+            return None
+        if len(input_files) == 1:
+            return loaded[0][1]
+        
+        # Tag records with their origin; categoricals avoid one string object per row
+        lengths = [len(df) for _, df in loaded]
+        df = pd.concat([df for _, df in loaded], ignore_index=True)
+        file_codes = np.repeat(np.arange(len(loaded)), lengths)
+        df[self.context.settings["ingestion"]["source_file_column"]] = pd.Categorical.from_codes(
+            file_codes, categories=[entry["file_name"] for entry in self.file_counts])
+        df[self.context.settings["ingestion"]["source_system_column"]] = pd.Categorical(
+            np.array([entry["system"] for entry in self.file_counts], dtype=object)[file_codes])
+        
+        log_message(f"Combined {len(df)} {self.source_type.upper()} records from {len(loaded)} files")
+        return df
+    
+    def update_record_counts(self, input_files, original_count, after_cleaning_count, df):
+        """
+        Record source and per-file counts in the record counter.
+        
+        Args:
+            input_files: Path or list of paths of the processed files
+            original_count: Records read from all files
+            after_cleaning_count: Records after cleaning
+            df: Final DataFrame
+        """
+        source_file_column = self.context.settings["ingestion"]["source_file_column"]
+        if source_file_column in df.columns:
+            final_counts = df[source_file_column].value_counts()
+        else:
+            final_counts = {entry["file_name"]: len(df) for entry in self.file_counts}
+        for entry in self.file_counts:
+            entry["final_count"] = int(final_counts.get(entry["file_name"], 0))
+        
+        self.context.record_counter.update_source_counts(
+            source_type=self.source_type,
+            file_name=input_files,
+            original_count=original_count,
+            after_cleaning=after_cleaning_count,
+            final_count=len(df)
+        )
+        self.context.record_counter.update_file_counts(self.source_type, self.file_counts)
+    
     def standardize_columns(self, df):
         """
         Standardize column names to uppercase.
@@ -148,15 +267,9 @@ class DataSourceProcessor:
             
         log_message("Creating datetime column from date and time fields")
         try:
-            # Convert date and time columns to string to handle potential non-standard formats
-            date_str = df[date_col].astype(str)
-            time_str = df[time_col].astype(str)
-            
-            # Combine date and time
-            datetime_str = date_str + ' ' + time_str
-            
-            # Convert to datetime 
-            df['DATETIME'] = pd.to_datetime(datetime_str, errors='coerce')
+            # Reuse an existing DATETIME column, combining date and time only where it is empty
+            datetimes = build_datetime_series(df, date_col, time_col, datetime_col='DATETIME')
+            df['DATETIME'] = pd.NaT if datetimes is None else datetimes
             
             return df
             
@@ -184,7 +297,7 @@ class DataSourceProcessor:
         for old_name, new_name in field_mapping.items():
             if old_name in df.columns and new_name not in df.columns:
                 df = df.rename(columns={old_name: new_name})
-                log_message(f"Mapped {old_name} to {new_name}")
+                log_message("Mapped %s to %s", "DEBUG", old_name, new_name)
         
         return df
     
@@ -224,13 +337,46 @@ class DataSourceProcessor:
             return df
             
         # Filter out excluded fields
-        for field in SETTINGS["exclude_fields"]:
+        for field in self.context.settings["exclude_fields"]:
             if field in df.columns:
                 log_message(f"Removing excluded field '{field}' from {self.source_type.upper()} data")
                 df = df.drop(columns=[field])
         
         return df
     
+    def clean_data(self, df):
+        """
+        Clean the data and collect its quality report in a single pass.
+        
+        Strips whitespace, replaces non-breaking spaces, normalizes missing
+        values and removes excluded fields without copying the DataFrame.
+        
+        Args:
+            df: DataFrame to clean (modified in place)
+            
+        Returns:
+            Cleaned DataFrame
+        """
+        df, self.quality_report = clean_and_profile(
+            df, self.source_type.upper(), drop_columns=self.context.settings["exclude_fields"]
+        )
+        log_quality_report(self.quality_report)
+        return df
+    
+    def detect_duplicates(self, df):
+        """
+        Count duplicate events on the source's natural key, dropping them in dedupe mode.
+        
+        Args:
+            df: DataFrame to check
+            
+        Returns:
+            DataFrame, without duplicates if dedupe mode is enabled
+        """
+        df, stats = self.duplicate_detector.apply(df)
+        self.context.record_counter.update_duplicate_counts(self.source_type, stats["duplicates"], stats["removed"])
+        return df
+    
     def save_processed_file(self, df, output_file):
         """
         Save the processed DataFrame to CSV.
@@ -248,7 +394,7 @@ class DataSourceProcessor:
             
         try:
             log_message(f"Saving processed {self.source_type.upper()} file to: {output_file}")
-            df.to_csv(output_file, index=False, encoding=SETTINGS["encoding"])
+            df.to_csv(output_file, index=False, encoding=self.context.settings["encoding"])
             
             # Record final count
             final_count = len(df)
@@ -273,9 +419,9 @@ class SM20Processor(DataSourceProcessor):
     - Sorting by user and datetime
     """
     
-    def __init__(self):
+    def __init__(self, context=None):
         """Initialize the SM20 processor."""
-        super().__init__("sm20")
+        super().__init__("sm20", context)
         
     def validate_sm20_data(self, df):
         """
@@ -387,14 +533,17 @@ class SM20Processor(DataSourceProcessor):
         Process SM20 security audit log file with enhanced data preparation.
         
         Args:
-            input_file: Path to the input SM20 Excel file
+            input_file: Path or list of paths to the input SM20 Excel files
             output_file: Path where the processed CSV file will be saved
         
         Returns:
             bool: True if processing was successful, False otherwise
         """
-        # Read the source file
-        df = self.read_source_file(input_file)
+        # Each run detects duplicates across its own files only
+        self.duplicate_detector.reset()
+        
+        # Read the source file(s)
+        df = self.read_source_files(input_file)
         if df is None:
             return False
         
@@ -404,26 +553,23 @@ class SM20Processor(DataSourceProcessor):
         # Standardize column names
         df = self.standardize_columns(df)
         
-        # Clean whitespace and handle NaN values
-        df = clean_whitespace(df)
+        # Apply field mapping for different SAP export formats
+        field_mapping = self.get_sm20_field_mapping()
+        df = self.apply_field_mapping(df, field_mapping)
+        
+        # Clean values, remove excluded fields and collect quality metrics
+        df = self.clean_data(df)
         
         # Record count after cleaning
         after_cleaning_count = len(df)
         log_message(f"SM20 records after cleaning: {after_cleaning_count}")
         
-        # Apply field mapping for different SAP export formats
-        field_mapping = self.get_sm20_field_mapping()
-        df = self.apply_field_mapping(df, field_mapping)
-        
         # Validate required columns are present
         is_valid, missing_columns = self.validate_sm20_data(df)
         if not is_valid:
             log_message(f"SM20 data validation failed. Missing columns: {', '.join(missing_columns)}", "ERROR")
             # Continue with best effort approach
         
-        # Run data quality validation
-        df = validate_data_quality(df, "SM20")
-        
         # Add missing required columns if any
         required_columns = [
             COLUMNS["sm20"]["user"], 
@@ -438,12 +584,12 @@ class SM20Processor(DataSourceProcessor):
         ]
         df = self.add_missing_columns(df, required_columns)
         
-        # Remove excluded fields
-        df = self.remove_excluded_fields(df)
-        
         # Create datetime column from date and time fields
         df = self.create_datetime_column(df, COLUMNS["sm20"]["date"], COLUMNS["sm20"]["time"])
         
+        # Detect duplicate events on the natural key
+        df = self.detect_duplicates(df)
+        
         # Sort by user and datetime
         log_message("Sorting SM20 data by user and datetime")
         df = df.sort_values(by=[COLUMNS["sm20"]["user"], 'DATETIME'])
@@ -453,13 +599,7 @@ class SM20Processor(DataSourceProcessor):
         
         if success:
             # Update record counter
-            record_counter.update_source_counts(
-                source_type="sm20",
-                file_name=input_file,
-                original_count=original_count,
-                after_cleaning=after_cleaning_count,
-                final_count=len(df)
-            )
+            self.update_record_counts(input_file, original_count, after_cleaning_count, df)
             return True
         else:
             return False
@@ -479,9 +619,9 @@ class CDHDRProcessor(DataSourceProcessor):
     - Sorting by user and datetime
     """
     
-    def __init__(self):
+    def __init__(self, context=None):
         """Initialize the CDHDR processor."""
-        super().__init__("cdhdr")
+        super().__init__("cdhdr", context)
         
     def validate_cdhdr_data(self, df):
         """
@@ -571,14 +711,17 @@ class CDHDRProcessor(DataSourceProcessor):
         Process CDHDR change document header file with enhanced data preparation.
         
         Args:
-            input_file: Path to the input CDHDR Excel file
+            input_file: Path or list of paths to the input CDHDR Excel files
             output_file: Path where the processed CSV file will be saved
         
         Returns:
             bool: True if processing was successful, False otherwise
         """
-        # Read the source file
-        df = self.read_source_file(input_file)
+        # Each run detects duplicates across its own files only
+        self.duplicate_detector.reset()
+        
+        # Read the source file(s)
+        df = self.read_source_files(input_file)
         if df is None:
             return False
         
@@ -588,26 +731,23 @@ class CDHDRProcessor(DataSourceProcessor):
         # Standardize column names
         df = self.standardize_columns(df)
         
-        # Clean whitespace and handle NaN values
-        df = clean_whitespace(df)
+        # Apply field mapping for different SAP export formats
+        field_mapping = self.get_cdhdr_field_mapping()
+        df = self.apply_field_mapping(df, field_mapping)
+        
+        # Clean values, remove excluded fields and collect quality metrics
+        df = self.clean_data(df)
         
         # Record count after cleaning
         after_cleaning_count = len(df)
         log_message(f"CDHDR records after cleaning: {after_cleaning_count}")
         
-        # Apply field mapping for different SAP export formats
-        field_mapping = self.get_cdhdr_field_mapping()
-        df = self.apply_field_mapping(df, field_mapping)
-        
         # Validate required columns are present
         is_valid, missing_columns = self.validate_cdhdr_data(df)
         if not is_valid:
             log_message(f"CDHDR data validation failed. Missing columns: {', '.join(missing_columns)}", "ERROR")
             # Continue with best effort approach
         
-        # Run data quality validation
-        df = validate_data_quality(df, "CDHDR")
-        
         # Add missing required columns if any
         required_columns = [
             COLUMNS["cdhdr"]["user"], 
@@ -620,12 +760,12 @@ class CDHDRProcessor(DataSourceProcessor):
         ]
         df = self.add_missing_columns(df, required_columns)
         
-        # Remove excluded fields
-        df = self.remove_excluded_fields(df)
-        
         # Create datetime column from date and time fields
         df = self.create_datetime_column(df, COLUMNS["cdhdr"]["date"], COLUMNS["cdhdr"]["time"])
         
+        # Detect duplicate events on the natural key
+        df = self.detect_duplicates(df)
+        
         # Sort by user and datetime
         log_message("Sorting CDHDR data by user and datetime")
         df = df.sort_values(by=[COLUMNS["cdhdr"]["user"], 'DATETIME'])
@@ -635,13 +775,7 @@ class CDHDRProcessor(DataSourceProcessor):
         
         if success:
             # Update record counter
-            record_counter.update_source_counts(
-                source_type="cdhdr",
-                file_name=input_file,
-                original_count=original_count,
-                after_cleaning=after_cleaning_count,
-                final_count=len(df)
-            )
+            self.update_record_counts(input_file, original_count, after_cleaning_count, df)
             return True
         else:
             return False
@@ -660,9 +794,9 @@ class CDPOSProcessor(DataSourceProcessor):
     - Sorting by change document number
     """
     
-    def __init__(self):
+    def __init__(self, context=None):
         """Initialize the CDPOS processor."""
-        super().__init__("cdpos")
+        super().__init__("cdpos", context)
         
     def validate_cdpos_data(self, df):
         """
@@ -722,14 +856,17 @@ class CDPOSProcessor(DataSourceProcessor):
         Process CDPOS change document items file with enhanced data preparation.
         
         Args:
-            input_file: Path to the input CDPOS Excel file
+            input_file: Path or list of paths to the input CDPOS Excel files
             output_file: Path where the processed CSV file will be saved
         
         Returns:
             bool: True if processing was successful, False otherwise
         """
-        # Read the source file
-        df = self.read_source_file(input_file)
+        # Each run detects duplicates across its own files only
+        self.duplicate_detector.reset()
+        
+        # Read the source file(s)
+        df = self.read_source_files(input_file)
         if df is None:
             return False
         
@@ -739,8 +876,8 @@ class CDPOSProcessor(DataSourceProcessor):
         # Standardize column names
         df = self.standardize_columns(df)
         
-        # Clean whitespace and handle NaN values
-        df = clean_whitespace(df)
+        # Clean values, remove excluded fields and collect quality metrics
+        df = self.clean_data(df)
         
         # Record count after cleaning
         after_cleaning_count = len(df)
@@ -752,9 +889,6 @@ class CDPOSProcessor(DataSourceProcessor):
             log_message(f"CDPOS data validation failed. Missing columns: {', '.join(missing_columns)}", "ERROR")
             # Continue with best effort approach
         
-        # Run data quality validation
-        df = validate_data_quality(df, "CDPOS")
-        
         # Add missing required columns if any
         required_columns = [
             COLUMNS["cdpos"]["change_number"],
@@ -768,12 +902,12 @@ class CDPOSProcessor(DataSourceProcessor):
         ]
         df = self.add_missing_columns(df, required_columns)
         
-        # Remove excluded fields
-        df = self.remove_excluded_fields(df)
-        
         # Standardize change indicators
         df = self.standardize_change_indicators(df)
         
+        # Detect duplicate change items on the natural key
+        df = self.detect_duplicates(df)
+        
         # Sort by change document number
         log_message("Sorting CDPOS data by change document number")
         df = df.sort_values(by=[COLUMNS["cdpos"]["change_number"]])
@@ -783,13 +917,7 @@ class CDPOSProcessor(DataSourceProcessor):
         
         if success:
             # Update record counter
-            record_counter.update_source_counts(
-                source_type="cdpos",
-                file_name=input_file,
-                original_count=original_count,
-                after_cleaning=after_cleaning_count,
-                final_count=len(df)
-            )
+            self.update_record_counts(input_file, original_count, after_cleaning_count, df)
             return True
         else:
             return False
@@ -812,16 +940,18 @@ class DataPrepManager:
     a unified interface for the controller to interact with.
     """
     
-    def __init__(self, config=None):
+    def __init__(self, config=None, context=None):
         """
         Initialize the data preparation manager.
         
         Args:
             config: Optional configuration dictionary that can override
                    default settings and paths.
+            context: AuditContext of the run (defaults to the global configuration)
         """
         self.config = config or {}
-        self.paths = PATHS.copy()
+        self.context = context or AuditContext.default()
+        self.paths = self.context.paths.copy()
         
         # Override paths if specified in config
         if config and "paths" in config:
@@ -830,13 +960,15 @@ class DataPrepManager:
                 
         # Initialize processors
         self.processors = {
-            "sm20": SM20Processor(),
-            "cdhdr": CDHDRProcessor(),
-            "cdpos": CDPOSProcessor()
+            "sm20": SM20Processor(self.context),
+            "cdhdr": CDHDRProcessor(self.context),
+            "cdpos": CDPOSProcessor(self.context)
         }
         
         # Results tracking
         self.results = {}
+        self.quality_reports = {}
+        self.found_files = {}
     
     def process_input_files(self):
         """
@@ -857,22 +989,34 @@ class DataPrepManager:
         
         # Reset results
         self.results = {}
+        self.quality_reports = {}
+        self.found_files = {}
         
         # Process each data source
-        for source_type, processor in self.processors.items():
-            input_file = processor.find_input_file()
-            if input_file:
-                log_message(f"Found {source_type.upper()} file: {input_file}")
-                output_file = os.path.join(self.paths["input_dir"], f"{source_type.upper()}.csv")
-                self.results[source_type] = processor.process(input_file, output_file)
-            else:
-                log_message(f"No {source_type.upper()} file found matching pattern", "WARNING")
-                self.results[source_type] = False
+        with self.context.telemetry.task("data_sources", total=len(self.processors), unit="sources") as progress:
+            for source_type, processor in self.processors.items():
+                input_files = processor.find_input_files()
+                self.found_files[source_type] = input_files
+                if input_files:
+                    log_message(f"Found {source_type.upper()} files: {', '.join(input_files)}")
+                    output_file = os.path.join(self.paths["input_dir"], f"{source_type.upper()}.csv")
+                    processor.quality_report = None
+                    self.results[source_type] = processor.process(input_files, output_file)
+                    if processor.quality_report is not None:
+                        self.quality_reports[source_type] = processor.quality_report
+                else:
+                    log_message(f"No {source_type.upper()} file found matching pattern", "WARNING")
+                    self.results[source_type] = False
+                progress.advance()
         
         # Log overall success/failure
         successful = sum(1 for result in self.results.values() if result)
         log_message(f"Data preparation completed. {successful} of {len(self.processors)} sources processed successfully.")
         
+        # Save the data quality report for all processed sources
+        if self.quality_reports:
+            save_quality_reports(self.quality_reports, self.paths["quality_report"])
+        
         # List output files
         log_message("Output files:")
         for source_type in self.processors.keys():
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Duplicate Event Detection Module
+
+This module detects repeated events in SAP log exports by hashing a
+configurable natural key per source instead of comparing whole rows.
+SM20 exports, for example, often repeat an event with only a trailing
+NOTE column differing; an all-column comparison misses those repeats.
+
+Key features:
+- Vectorized 64-bit hashing of the natural key (pandas.util.hash_pandas_object)
+- Incremental detection across several files of the same source
+- Optional dedupe mode that drops repeated events
+- Duplicate statistics for the record counter
+"""
+
+import numpy as np
+from pandas.util import hash_pandas_object
+
+from sap_audit_config import SETTINGS
+from sap_audit_utils import log_message
+
+# Key columns that only exist in multi-file ingestion; their absence is not reported
+OPTIONAL_KEY_COLUMNS = [SETTINGS["ingestion"]["source_system_column"]]
+
+def natural_key_hash(df, key_columns):
+    """
+    Hash the natural key of every row.
+    
+    Args:
+        df: DataFrame to hash
+        key_columns: Columns forming the natural key
+        
+    Returns:
+        numpy.ndarray: uint64 hash per row
+    """
+    return hash_pandas_object(df[key_columns], index=False).to_numpy()
+
+
+class DuplicateDetector:
+    """
+    Detects repeated events of one source across one or more files.
+    
+    Hashes of every key seen so far are kept in a sorted array, so a later
+    file is checked against all earlier files without keeping their rows.
+    """
+    
+    def __init__(self, source_type, key_columns=None, dedupe=None, settings=None):
+        """
+        Initialize the detector.
+        
+        Args:
+            source_type: Source name (sm20, cdhdr, cdpos)
+            key_columns: Natural key columns (defaults to the configured key)
+            dedupe: Drop duplicates (defaults to the configured mode)
+            settings: Settings of the run (defaults to SETTINGS)
+        """
+        config = (settings or SETTINGS)["deduplication"]
+        self.source_type = source_type
+        self.key_columns = list(key_columns or config["natural_keys"].get(source_type, []))
+        self.dedupe = config["enabled"] if dedupe is None else dedupe
+        self.reset()
+    
+    def reset(self):
+        """Forget all keys seen so far."""
+        self._seen = np.array([], dtype=np.uint64)
+    
+    def available_key(self, df):
+        """Return the key columns present in a DataFrame, warning about missing ones."""
+        missing = [col for col in self.key_columns if col not in df.columns and col not in OPTIONAL_KEY_COLUMNS]
+        if missing:
+            log_message(f"Natural key columns missing in {self.source_type.upper()} data: {', '.join(missing)}", "WARNING")
+        return [col for col in self.key_columns if col in df.columns]
+    
+    def detect(self, df, key_columns=None):
+        """
+        Flag rows whose natural key occurred earlier in this or a previous file.
+        
+        Args:
+            df: DataFrame to check
+            key_columns: Key columns to hash (defaults to the available configured key)
+            
+        Returns:
+            numpy.ndarray: Boolean duplicate mask (all False if no key column is present)
+        """
+        if df is None or df.empty:
+            return np.zeros(0, dtype=bool)
+        
+        key_columns = self.available_key(df) if key_columns is None else key_columns
+        if not key_columns:
+            return np.zeros(len(df), dtype=bool)
+        
+        hashes = natural_key_hash(df, key_columns)
+        unique_hashes, first_index = np.unique(hashes, return_index=True)
+        
+        # Repeats within this file, then keys already seen in earlier files
+        duplicates = np.ones(len(df), dtype=bool)
+        duplicates[first_index] = False
+        duplicates |= np.isin(hashes, self._seen)
+        
+        self._seen = np.union1d(self._seen, unique_hashes)
+        return duplicates
+    
+    def apply(self, df):
+        """
+        Detect duplicates and drop them when dedupe mode is enabled.
+        
+        Args:
+            df: DataFrame to check
+            
+        Returns:
+            Tuple of (DataFrame, stats dict with key_columns, duplicates and removed)
+        """
+        stats = {"key_columns": [], "duplicates": 0, "removed": 0}
+        if df is None or df.empty:
+            return df, stats
+        
+        stats["key_columns"] = self.available_key(df)
+        duplicates = self.detect(df, stats["key_columns"])
+        stats["duplicates"] = int(duplicates.sum())
+        
+        if stats["duplicates"]:
+            log_message(f"Found {stats['duplicates']} duplicate {self.source_type.upper()} events on natural key "
+                        f"({', '.join(stats['key_columns'])})", "WARNING")
+            if self.dedupe:
+                df = df[~duplicates]
+                stats["removed"] = stats["duplicates"]
+                log_message(f"Removed {stats['removed']} duplicate {self.source_type.upper()} events")
+        
+        return df, stats
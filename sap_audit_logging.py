@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Logging Module
+
+This module is the logging backend behind log_message, log_section and
+log_error. It is built on the standard logging module and replaces the
+print calls those functions used to make.
+
+Key features:
+- Level check before any work: a filtered message costs a few dict lookups,
+  and %-style arguments are only formatted when the message is emitted
+- SETTINGS["debug"] turns on DEBUG output; verbose per-column messages are
+  logged at DEBUG
+- Per-stage log levels (SETTINGS["logging"]["stage_levels"]) for messages
+  logged while a pipeline stage runs
+- Records pass through a queue to a listener thread, so formatting and
+  console/file I/O happen off the processing threads; WARNING and above
+  wait until the queue is written, so they stay in order and are never lost
+- Plain text console output in the familiar "[time] LEVEL: message" layout,
+  or JSON lines (SETTINGS["logging"]["format"] = "json")
+- Optional JSON lines log file (SETTINGS["logging"]["file"])
+- SUCCESS level between INFO and WARNING, so log_message(..., "SUCCESS")
+  keeps its label
+
+This module does not import the rest of the tool, so every module
+(including sap_audit_config) can use it.
+"""
+
+import atexit
+import contextlib
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import traceback
+from datetime import datetime
+
+LOGGER_NAME = "sap_audit"
+
+# Level of log_message(..., "SUCCESS") lines, shown when INFO is
+SUCCESS = 25
+logging.addLevelName(SUCCESS, "SUCCESS")
+
+# Settings used until sap_audit_config is importable
+DEFAULT_SETTINGS = {
+    "debug": False,
+    "logging": {"level": "INFO", "format": "text", "file": "", "stage_levels": {}}
+}
+
+# Stage of the pipeline running in the current thread
+_current_stage = contextvars.ContextVar("sap_audit_stage", default=None)
+
+_logger = logging.getLogger(LOGGER_NAME)
+_logger.propagate = False
+_logger.setLevel(logging.DEBUG)
+
+_lock = threading.Lock()
+_settings = None
+_queue = None
+_listener = None
+
+
+class TextFormatter(logging.Formatter):
+    """Console format: "[time] LEVEL: message", and banners for sections."""
+
+    def __init__(self):
+        super().__init__("[%(asctime)s] %(levelname)s: %(message)s", "%Y-%m-%d %H:%M:%S")
+
+    def format(self, record):
+        if getattr(record, "section", False):
+            return "\n" + "=" * 80 + "\n" + f" {record.getMessage()} ".center(80, "-") + "\n" + "=" * 80 + "\n"
+        return super().format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "stage": getattr(record, "stage", None),
+            "process": record.process,
+            "thread": record.threadName
+        }
+        if getattr(record, "section", False):
+            entry["section"] = True
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class StdoutHandler(logging.Handler):
+    """Write to the current sys.stdout (which callers and tests may redirect)."""
+
+    def emit(self, record):
+        try:
+            sys.stdout.write(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+
+class AuditQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that leaves timestamp formatting and serialization to the
+    listener; only the message and traceback text are rendered here.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        super().emit(record)
+        # Warnings and errors are written before the caller continues
+        if record.levelno >= logging.WARNING:
+            self.queue.join()
+
+
+def _load_settings():
+    """
+    Return sap_audit_config.SETTINGS.
+
+    Returns:
+        dict: The settings, DEFAULT_SETTINGS if the configuration module is
+              unavailable, or None while it is still being imported
+    """
+    module = sys.modules.get("sap_audit_config")
+    if module is None:
+        try:
+            import sap_audit_config as module
+        except ImportError:
+            return DEFAULT_SETTINGS
+    return getattr(module, "SETTINGS", None)
+
+
+def _in_child_process():
+    """Check whether this is a multiprocessing worker (its atexit hooks may not run)."""
+    multiprocessing = sys.modules.get("multiprocessing")
+    return multiprocessing is not None and multiprocessing.parent_process() is not None
+
+
+def configure_logging(settings=None, use_queue=None):
+    """
+    Set up (or rebuild) the handlers from the settings.
+
+    Levels are read from the settings on every call to log_message, so
+    changing SETTINGS["debug"] or the stage levels needs no reconfiguration;
+    the console format and log file do.
+
+    Args:
+        settings: Settings dict (defaults to sap_audit_config.SETTINGS)
+        use_queue: Write through the listener thread (defaults to the
+                   "queue" setting; worker processes always write directly)
+    """
+    global _settings, _queue, _listener
+    with _lock:
+        settings = settings or _load_settings()
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for handler in list(_logger.handlers):
+            _logger.removeHandler(handler)
+
+        config = (settings or DEFAULT_SETTINGS).get("logging", DEFAULT_SETTINGS["logging"])
+        console = StdoutHandler()
+        console.setFormatter(JsonFormatter() if config.get("format") == "json" else TextFormatter())
+        handlers = [console]
+        if config.get("file"):
+            os.makedirs(os.path.dirname(os.path.abspath(config["file"])), exist_ok=True)
+            log_file = logging.FileHandler(config["file"], encoding="utf-8")
+            log_file.setFormatter(JsonFormatter())
+            handlers.append(log_file)
+
+        if use_queue is None:
+            use_queue = config.get("queue", True) and not _in_child_process()
+        if use_queue:
+            _queue = queue.Queue()
+            _listener = logging.handlers.QueueListener(_queue, *handlers)
+            _listener.start()
+            _logger.addHandler(AuditQueueHandler(_queue))
+        else:
+            _queue = None
+            for handler in handlers:
+                _logger.addHandler(handler)
+        _settings = settings
+
+
+def flush_logging():
+    """Wait until every queued record has been written."""
+    if _queue is not None:
+        _queue.join()
+
+
+def shutdown_logging():
+    """Write the queued records, stop the listener and log directly from now on."""
+    if _listener is not None:
+        configure_logging(_settings, use_queue=False)
+
+
+def _reset_after_fork():
+    """A forked child has no listener thread; set up its handlers on first use."""
+    global _lock, _listener, _queue, _settings
+    _lock = threading.Lock()
+    _listener = None
+    _queue = None
+    _settings = None
+    for handler in list(_logger.handlers):
+        _logger.removeHandler(handler)
+
+
+def _level_value(level):
+    """Convert a level name (or number) to its logging number, INFO if unknown."""
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    return value if isinstance(value, int) else logging.INFO
+
+
+def is_enabled(level="INFO"):
+    """
+    Check whether a message at this level would be emitted.
+
+    Args:
+        level: Level name or number
+
+    Returns:
+        bool: True if the message passes the global and stage levels
+    """
+    if _settings is None:
+        # First use, or the configuration module was still being imported
+        settings = _load_settings()
+        if settings is not None or not _logger.handlers:
+            configure_logging(settings)
+    settings = _settings or DEFAULT_SETTINGS
+    config = settings.get("logging", DEFAULT_SETTINGS["logging"])
+    threshold = logging.DEBUG if settings.get("debug") else _level_value(config.get("level", "INFO"))
+    stage = _current_stage.get()
+    if stage is not None and stage in config.get("stage_levels", {}):
+        threshold = _level_value(config["stage_levels"][stage])
+    return _level_value(level) >= threshold
+
+
+def log_message(message, level="INFO", *args, **fields):
+    """
+    Log a message with timestamp and level.
+
+    Args:
+        message: The message; %-style placeholders are filled from args only
+                 if the message is emitted
+        level: The log level (INFO, WARNING, ERROR, DEBUG)
+        *args: Values for the placeholders in message
+        **fields: Extra fields for JSON output
+    """
+    if not is_enabled(level):
+        return
+    _logger.log(_level_value(level), message, *args,
+                extra={"stage": _current_stage.get(), "fields": fields})
+
+
+def log_section(section_name):
+    """
+    Log a section header for better visual separation in logs.
+
+    Args:
+        section_name: The name of the section
+    """
+    if not is_enabled("INFO"):
+        return
+    _logger.info(section_name, extra={"stage": _current_stage.get(), "section": True, "fields": {}})
+
+
+def log_exception(exception, message):
+    """
+    Log a message at ERROR level with the exception's traceback.
+
+    Args:
+        exception: The exception object
+        message: Message to log
+    """
+    if not is_enabled("ERROR"):
+        return
+    _logger.error(message, exc_info=(type(exception), exception, exception.__traceback__),
+                  extra={"stage": _current_stage.get(), "fields": {}})
+
+
+@contextlib.contextmanager
+def log_stage(name):
+    """
+    Tag the messages logged in this thread with a pipeline stage.
+
+    Args:
+        name: Stage name (looked up in SETTINGS["logging"]["stage_levels"])
+    """
+    token = _current_stage.set(name)
+    try:
+        yield
+    finally:
+        _current_stage.reset(token)
+
+
+def current_stage():
+    """
+    Return the pipeline stage running in this thread.
+
+    Returns:
+        str: Stage name, or None outside a stage
+    """
+    return _current_stage.get()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+atexit.register(shutdown_logging)
@@ -25,25 +25,13 @@ from io import BytesIO
 from typing import Dict, List, Any, Optional, Union, Tuple
 
 # Import configuration and utilities
-from sap_audit_config import PATHS, REPORTING, COLUMNS, SETTINGS, RISK
+from sap_audit_config import REPORTING, COLUMNS, SETTINGS, RISK
+from sap_audit_context import AuditContext
 from sap_audit_utils import (
     log_message, log_section, log_error, handle_exception,
     clean_whitespace, validate_required_columns
 )
-
-# Import record counter if available
-try:
-    from sap_audit_record_counts import record_counter
-except ImportError:
-    # Placeholder if record counter is not available
-    class RecordCounter:
-        def update_source_counts(self, source_type, file_name, original_count, final_count):
-            pass
-        def update_timeline_count(self, total_records, source_counts=None):
-            pass
-        def get_counts_for_report(self):
-            return {"completeness_score": 0, "source_files": []}
-    record_counter = RecordCounter()
+from sap_audit_text_features import TextFeatureCache
 
 # Constants for risk level colors
 RISK_COLORS = {
@@ -74,15 +62,17 @@ class OutputGenerator(ABC):
     methods that subclasses must implement for different output formats.
     """
     
-    def __init__(self, config=None):
+    def __init__(self, config=None, context=None):
         """
         Initialize with optional custom configuration.
         
         Args:
             config: Dictionary with configuration overrides
+            context: AuditContext of the run (defaults to the global configuration)
         """
         self.config = config or REPORTING
-        self.paths = PATHS
+        self.context = context or AuditContext.default()
+        self.paths = self.context.paths
         self.default_output_path = self.paths.get("audit_report")
         self.column_mapping = self._initialize_column_mapping()
     
@@ -318,6 +308,7 @@ class OutputGenerator(ABC):
         
         # If data has already been processed by the analyzer, we don't need to add logic
         # Otherwise, add basic logic for each column
+        text = TextFeatureCache(data)
         
         # Table Maintenance flag
         if 'Table_Maintenance' in data.columns and data['Table_Maintenance'].astype(str).eq('').all():
@@ -401,15 +392,9 @@ class OutputGenerator(ABC):
             
             # Check for transport-related terms in description if available
             if "Description" in data.columns:
-                transport_terms = ['transport', 'release', 'import', 'STMS', 'development', 
-                                  'request', 'package', 'workbench', 'TR']
-                
-                # Create a regex pattern for transport terms
-                transport_pattern = '|'.join(transport_terms)
-                
                 # Flag rows with transport terms in description
                 data.loc[(data["Transport_Related_Event"] == "") & 
-                         (data["Description"].str.contains(transport_pattern, case=False, na=False)), 
+                         text.feature("Description", "transport_description"), 
                          "Transport_Related_Event"] = "Yes"
         
         # Debugging Related Event flag
@@ -424,16 +409,13 @@ class OutputGenerator(ABC):
             
             # Check for debug markers in Variable_2 if available
             if "Variable_2" in data.columns:
-                data.loc[data["Variable_2"].str.contains('I!|D!|G!', na=False), 
+                data.loc[text.feature("Variable_2", "debug_marker"), 
                          "Debugging_Related_Event"] = "Yes"
             
             # Look for debug terms in description
             if "Description" in data.columns:
-                debug_terms = ['debug', 'breakpoint', 'trace', 'ABAP', 'function module']
-                debug_pattern = '|'.join(debug_terms)
-                
                 data.loc[(data["Debugging_Related_Event"] == "") & 
-                         (data["Description"].str.contains(debug_pattern, case=False, na=False)), 
+                         text.feature("Description", "debug_description"), 
                          "Debugging_Related_Event"] = "Yes"
         
         # Benign Activity flag
@@ -594,7 +576,7 @@ class OutputGenerator(ABC):
         
         # Get completeness information from record counter
         try:
-            completeness = record_counter.get_counts_for_report()
+            completeness = self.context.record_counter.get_counts_for_report()
             stats["completeness"] = completeness
         except Exception as e:
             log_message(f"Warning: Could not get completeness stats: {str(e)}", "WARNING")
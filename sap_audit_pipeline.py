@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Pipeline Stage Scheduler Module
+
+This module runs the audit pipeline as a small dependency graph (DAG) of
+stages instead of a fixed sequence, so independent stages overlap.
+
+Key features:
+- Stages declare the artifacts they consume (inputs) and produce (outputs)
+- Ready stages run concurrently on a thread pool
+- Required stage failures stop the run; optional stage failures are logged
+  and their outputs are passed on unchanged
+- Dependency validation (unknown inputs, duplicate outputs, cycles)
+- Per-stage timeline with start/end offsets, duration, status and worker
+- Stages restored from checkpoints are marked completed without running
+- Optional listener receiving stage events for progress reporting
+- Messages logged by a stage are tagged with its name, so per-stage log
+  levels apply to them
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from sap_audit_logging import log_stage
+from sap_audit_utils import log_message, log_section, log_error
+
+# Stage statuses recorded in the timeline (and "started", sent to listeners only)
+STATUS_STARTED = "started"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+STATUS_RESTORED = "restored"
+
+
+class Stage:
+    """
+    A pipeline stage.
+
+    The stage function takes no arguments and returns True on success;
+    artifacts are exchanged through the object that owns the functions.
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), required=True, failure_message=None):
+        """
+        Declare a stage.
+
+        Args:
+            name: Stage name
+            func: Callable returning a success flag
+            inputs: Artifact names the stage consumes
+            outputs: Artifact names the stage produces
+            required: Whether a failure stops the pipeline
+            failure_message: Message logged when the stage fails
+        """
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.required = required
+        self.failure_message = failure_message or f"Stage {name} failed"
+
+
+class StageScheduler:
+    """
+    Run stages as soon as all their inputs are available.
+    """
+
+    def __init__(self, stages, max_workers=1, listener=None):
+        """
+        Initialize the scheduler and validate the stage graph.
+
+        Args:
+            stages: List of Stage objects; the list order breaks ties
+            max_workers: Stages run at the same time (1 runs them in order)
+            listener: Optional callable receiving a dict per stage event
+                      ("started", then the timeline entry when it ends)
+
+        Raises:
+            ValueError: If the stage graph is invalid
+        """
+        self.stages = list(stages)
+        self.max_workers = max(1, int(max_workers or 1))
+        self.timeline = []
+        self.listener = listener
+        self._producers = self._validate()
+
+    def _validate(self):
+        """
+        Check the stage graph.
+
+        Returns:
+            dict: Artifact name -> producing stage name
+        """
+        producers = {}
+        names = set()
+        for stage in self.stages:
+            if stage.name in names:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            names.add(stage.name)
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"Artifact {output} is produced by {producers[output]} and {stage.name}")
+                producers[output] = stage.name
+
+        for stage in self.stages:
+            missing = [name for name in stage.inputs if name not in producers]
+            if missing:
+                raise ValueError(f"Stage {stage.name} needs unknown artifacts: {', '.join(missing)}")
+
+        # Kahn's algorithm: every stage must become ready eventually
+        available = set()
+        pending = list(self.stages)
+        while pending:
+            ready = [stage for stage in pending if set(stage.inputs) <= available]
+            if not ready:
+                raise ValueError(f"Stage dependency cycle among: {', '.join(s.name for s in pending)}")
+            for stage in ready:
+                available.update(stage.outputs)
+                pending.remove(stage)
+
+        return producers
+
+    def ancestors(self, name):
+        """
+        Return the stages a stage depends on, directly or indirectly.
+
+        Args:
+            name: Stage name
+
+        Returns:
+            set: Names of the upstream stages
+        """
+        stages = {stage.name: stage for stage in self.stages}
+        found = set()
+        queue = list(stages[name].inputs)
+        while queue:
+            producer = self._producers[queue.pop()]
+            if producer not in found:
+                found.add(producer)
+                queue.extend(stages[producer].inputs)
+        return found
+
+    def _run_stage(self, stage, origin):
+        """
+        Run one stage and record it in the timeline.
+
+        Args:
+            stage: Stage to run
+            origin: perf_counter value of the scheduler start
+
+        Returns:
+            bool: Success status
+        """
+        start = time.perf_counter()
+        self._notify({"stage": stage.name, "status": STATUS_STARTED, "start": start - origin,
+                      "end": None, "duration": None, "worker": threading.current_thread().name})
+        with log_stage(stage.name):
+            try:
+                success = bool(stage.func())
+            except Exception as e:
+                log_error(e, f"Error in pipeline stage {stage.name}")
+                success = False
+        end = time.perf_counter()
+
+        self._record({
+            "stage": stage.name,
+            "status": STATUS_COMPLETED if success else STATUS_FAILED,
+            "start": start - origin,
+            "end": end - origin,
+            "duration": end - start,
+            "worker": threading.current_thread().name
+        })
+        return success
+
+    def _record(self, entry):
+        """Add an entry to the timeline and pass it to the listener."""
+        self.timeline.append(entry)
+        self._notify(entry)
+
+    def _notify(self, event):
+        """Pass a stage event to the listener; listener errors never fail a stage."""
+        if self.listener is None:
+            return
+        try:
+            self.listener(dict(event))
+        except Exception as e:
+            log_error(e, "Error in pipeline stage listener")
+
+    def run(self, completed=None):
+        """
+        Run all stages.
+
+        Args:
+            completed: Names of stages already completed (e.g. restored from
+                checkpoints); their outputs are available without running them
+
+        Returns:
+            bool: True if every required stage succeeded
+        """
+        origin = time.perf_counter()
+        completed = set(completed or [])
+        self.timeline = []
+        available = set()
+        pending = []
+        for stage in self.stages:
+            if stage.name in completed:
+                available.update(stage.outputs)
+                self._record({"stage": stage.name, "status": STATUS_RESTORED, "start": None,
+                              "end": None, "duration": 0.0, "worker": None})
+            else:
+                pending.append(stage)
+        running = {}
+        success = True
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="audit-stage") as executor:
+            while pending or running:
+                if success:
+                    for stage in [s for s in pending if set(s.inputs) <= available]:
+                        if len(running) >= self.max_workers:
+                            break
+                        pending.remove(stage)
+                        running[executor.submit(self._run_stage, stage, origin)] = stage
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    if future.result():
+                        available.update(stage.outputs)
+                    elif stage.required:
+                        log_message(stage.failure_message, "ERROR")
+                        success = False
+                    else:
+                        # Optional stages pass their inputs on unchanged
+                        log_message(stage.failure_message, "WARNING")
+                        available.update(stage.outputs)
+
+        for stage in pending:
+            self._record({"stage": stage.name, "status": STATUS_SKIPPED, "start": None,
+                          "end": None, "duration": 0.0, "worker": None})
+        return success
+
+    def log_timeline(self):
+        """Log the per-stage timeline."""
+        log_section("Pipeline Stage Timeline")
+        for entry in self.timeline:
+            if entry["start"] is None:
+                log_message(f"  {entry['stage']:<22} {entry['status']}")
+                continue
+            log_message(f"  {entry['stage']:<22} {entry['start']:>8.2f}s - {entry['end']:>8.2f}s "
+                        f"({entry['duration']:.2f}s) {entry['status']} [{entry['worker']}]")
@@ -9,42 +9,51 @@ completeness metrics for the final output.
 
 import os
 import pandas as pd
-from datetime import datetime
 import json
 
+from sap_audit_logging import log_message
+
 # Define the path for the record counts metadata file
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, "output")
 RECORD_COUNTS_FILE = os.path.join(OUTPUT_DIR, "record_counts.json")
 
-def log_message(message, level="INFO"):
-    """Log a message with timestamp and level."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] {level}: {message}")
-
 class RecordCounter:
     """
     Class to track record counts and calculate completeness metrics.
     """
     def __init__(self):
         """Initialize the record counter."""
+        self.reset()
+    
+    def reset(self):
+        """Clear all counts, e.g. before another audit run in the same process."""
         self.counts = {
             "sm20": {
                 "file_name": "",
+                "files": [],
                 "original_count": 0,
                 "after_cleaning": 0,
+                "duplicate_events": 0,
+                "duplicates_removed": 0,
                 "final_count": 0
             },
             "cdhdr": {
                 "file_name": "",
+                "files": [],
                 "original_count": 0,
                 "after_cleaning": 0,
+                "duplicate_events": 0,
+                "duplicates_removed": 0,
                 "final_count": 0
             },
             "cdpos": {
                 "file_name": "",
+                "files": [],
                 "original_count": 0,
                 "after_cleaning": 0,
+                "duplicate_events": 0,
+                "duplicates_removed": 0,
                 "final_count": 0
             },
             "sysaid": {
@@ -64,8 +73,8 @@ class RecordCounter:
         
         Args:
             source_type (str): Type of source (sm20, cdhdr, cdpos, sysaid)
-            file_name (str): Name of the source file
-            original_count (int): Original record count from the file
+            file_name (str or list): Name of the source file, or all files of a multi-file source
+            original_count (int): Original record count from the file(s)
             after_cleaning (int, optional): Record count after cleaning. Defaults to None.
             final_count (int, optional): Final record count in the output. Defaults to None.
         """
@@ -73,7 +82,10 @@ class RecordCounter:
             log_message(f"Invalid source type: {source_type}", "WARNING")
             return
         
-        self.counts[source_type]["file_name"] = os.path.basename(file_name)
+        if isinstance(file_name, (list, tuple)):
+            self.counts[source_type]["file_name"] = ", ".join(os.path.basename(name) for name in file_name)
+        else:
+            self.counts[source_type]["file_name"] = os.path.basename(file_name)
         self.counts[source_type]["original_count"] = original_count
         
         if after_cleaning is not None:
@@ -82,6 +94,54 @@ class RecordCounter:
         if final_count is not None:
             self.counts[source_type]["final_count"] = final_count
     
+    def update_file_counts(self, source_type, file_counts):
+        """
+        Update the per-file record counts of a multi-file source.
+        
+        Args:
+            source_type (str): Type of source (sm20, cdhdr, cdpos)
+            file_counts (list): Dictionaries with file_name, system, original_count and final_count
+        """
+        if source_type not in ["sm20", "cdhdr", "cdpos"]:
+            log_message(f"Invalid source type: {source_type}", "WARNING")
+            return
+        
+        self.counts[source_type]["files"] = [
+            {key: (value.item() if hasattr(value, 'item') else value) for key, value in entry.items()}
+            for entry in file_counts
+        ]
+    
+    def update_duplicate_counts(self, source_type, duplicate_events, duplicates_removed=0):
+        """
+        Update the duplicate event counts for a specific source.
+        
+        Args:
+            source_type (str): Type of source (sm20, cdhdr, cdpos)
+            duplicate_events (int): Events repeating an earlier natural key
+            duplicates_removed (int, optional): Duplicates dropped in dedupe mode. Defaults to 0.
+        """
+        if source_type not in ["sm20", "cdhdr", "cdpos"]:
+            log_message(f"Invalid source type: {source_type}", "WARNING")
+            return
+        
+        self.counts[source_type]["duplicate_events"] = duplicate_events
+        self.counts[source_type]["duplicates_removed"] = duplicates_removed
+    
+    def expected_count(self, source_type):
+        """
+        Get the number of records expected in the output for a source.
+        
+        Duplicates removed on purpose are not counted as lost records.
+        
+        Args:
+            source_type (str): Type of source (sm20, cdhdr, cdpos, sysaid)
+            
+        Returns:
+            int: Original record count minus removed duplicates
+        """
+        source = self.counts[source_type]
+        return source["original_count"] - source.get("duplicates_removed", 0)
+    
     def update_timeline_count(self, total_records, source_counts=None):
         """
         Update the total record count in the final timeline.
@@ -102,9 +162,9 @@ class RecordCounter:
         
         # Only include SAP sources (not SysAid) in completeness calculation
         sap_source_original = (
-            self.counts["sm20"]["original_count"] + 
-            self.counts["cdhdr"]["original_count"] + 
-            self.counts["cdpos"]["original_count"]
+            self.expected_count("sm20") + 
+            self.expected_count("cdhdr") + 
+            self.expected_count("cdpos")
         )
         
         sap_source_final = (
@@ -135,7 +195,7 @@ class RecordCounter:
         if source_type not in self.counts:
             return 0
         
-        original = self.counts[source_type]["original_count"]
+        original = self.expected_count(source_type)
         final = self.counts[source_type]["final_count"]
         
         if original > 0:
@@ -215,7 +275,10 @@ class RecordCounter:
                 report_data["source_files"].append({
                     "source_type": source_type.upper(),
                     "file_name": self.counts[source_type]["file_name"],
+                    "files": self.counts[source_type].get("files", []),
                     "original_count": self.counts[source_type]["original_count"],
+                    "duplicate_events": self.counts[source_type].get("duplicate_events", 0),
+                    "duplicates_removed": self.counts[source_type].get("duplicates_removed", 0),
                     "final_count": self.counts[source_type]["final_count"],
                     "percentage": self.calculate_percentage(source_type)
                 })
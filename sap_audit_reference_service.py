@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Reference Data Service Module
+
+This module provides lazy access to all reference data used by the SAP Audit
+Tool: the reference CSV files (TCodes, Events, Tables, HighRiskTCodes,
+HighRiskTables) and the lookup tables in sap_audit_reference_data.
+
+Key features:
+- Nothing is loaded until a dataset is first requested
+- All sources are compiled into a single on-disk snapshot
+- The snapshot is validated against each source by mtime and size, falling
+  back to a content hash when the mtime changed
+- A valid snapshot is loaded without parsing CSVs or importing pandas
+- Missing CSV files are recorded so callers can fall back to sample data
+"""
+
+import csv
+import hashlib
+import os
+import pickle
+import threading
+
+from sap_audit_config import PATHS
+from sap_audit_utils import log_message, log_error
+
+# Bump when the snapshot layout or the compiled datasets change
+SNAPSHOT_VERSION = 1
+
+# Reference CSV files: dataset name -> (PATHS key, key column, value column).
+# A value column of None compiles the file into a code set plus a category map.
+CSV_SOURCES = {
+    "tcode_descriptions": ("tcodes_reference", "TCode", "TCode Description"),
+    "event_descriptions": ("events_reference", "Event Code", "Event Code Description"),
+    "table_descriptions": ("tables_reference", "Table", "Table Description"),
+    "high_risk_tcodes": ("high_risk_tcodes", "TCode", None),
+    "high_risk_tables": ("high_risk_tables", "Table", None),
+}
+
+# Lookup functions in sap_audit_reference_data compiled into the snapshot
+MODULE_DATASETS = [
+    "sensitive_tables", "sensitive_table_descriptions", "common_table_descriptions",
+    "sensitive_tcodes", "sensitive_tcode_descriptions", "common_tcode_descriptions",
+    "common_field_descriptions", "critical_field_patterns", "critical_field_pattern_descriptions",
+    "sap_event_code_classifications", "sap_event_code_descriptions",
+]
+
+
+def _file_signature(path, with_hash=False):
+    """
+    Describe a source file for snapshot validation.
+
+    Args:
+        path: File path
+        with_hash: Include a SHA-256 content hash
+
+    Returns:
+        dict: mtime_ns, size and optionally sha256; None if the file is missing
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    signature = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        signature["sha256"] = digest.hexdigest()
+    return signature
+
+
+def _read_reference_csv(path, key_col, value_col):
+    """
+    Compile a reference CSV file.
+
+    Args:
+        path: CSV file path
+        key_col: Column holding the code
+        value_col: Description column, or None for a high-risk code list
+
+    Returns:
+        dict: code -> description, or {"codes": [...], "categories": {...}}
+        with upper-cased codes for high-risk lists
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = [row for row in csv.DictReader(f) if row.get(key_col)]
+
+    if value_col is not None:
+        return {row[key_col]: row.get(value_col) or "" for row in rows}
+
+    codes = [row[key_col].upper() for row in rows]
+    categories = {}
+    if rows and "Category" in rows[0]:
+        categories = {row[key_col].upper(): row["Category"] for row in rows}
+    return {"codes": codes, "categories": categories}
+
+
+class ReferenceDataService:
+    """
+    Lazy, snapshot-backed access to reference data.
+
+    Datasets are loaded from the snapshot on first access. When the snapshot
+    is missing, stale or unreadable, every source is recompiled and the
+    snapshot is rewritten.
+    """
+
+    def __init__(self, snapshot_path=None, csv_paths=None):
+        """
+        Initialize the service without loading anything.
+
+        Args:
+            snapshot_path: Snapshot file path (defaults to PATHS["reference_snapshot"])
+            csv_paths: Optional mapping of dataset name to CSV path overrides
+        """
+        self.snapshot_path = snapshot_path or PATHS["reference_snapshot"]
+        self.csv_paths = {name: PATHS.get(source[0]) for name, source in CSV_SOURCES.items()}
+        self.csv_paths.update(csv_paths or {})
+        self._data = None
+        self._lock = threading.Lock()
+
+    def _source_paths(self):
+        """Return every source file the snapshot depends on."""
+        import_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sap_audit_reference_data.py")
+        paths = {name: path for name, path in self.csv_paths.items() if path}
+        paths["sap_audit_reference_data"] = import_path
+        return paths
+
+    def get(self, name, default=None):
+        """
+        Return a reference dataset, loading the snapshot on first use.
+
+        Args:
+            name: Dataset name (see CSV_SOURCES and MODULE_DATASETS)
+            default: Value returned when the dataset is unavailable
+
+        Returns:
+            The dataset, or default if its source file is missing
+        """
+        if self._data is None:
+            # Pipeline stages may request data concurrently; load only once
+            with self._lock:
+                if self._data is None:
+                    self._data = self._load()
+        value = self._data.get(name)
+        return default if value is None else value
+
+    def invalidate(self):
+        """Forget loaded data so the next access revalidates the snapshot."""
+        self._data = None
+
+    def _load(self):
+        """
+        Load the snapshot if it is still valid, otherwise rebuild it.
+
+        Returns:
+            dict: All reference datasets
+        """
+        snapshot = self._read_snapshot()
+        if snapshot is not None:
+            valid, refreshed = self._validate(snapshot["sources"])
+            if valid:
+                if refreshed:
+                    # Contents unchanged but mtimes moved; record the new mtimes
+                    snapshot["sources"] = refreshed
+                    self._write_snapshot(snapshot)
+                log_message(f"Loaded reference data snapshot ({len(snapshot['data'])} datasets)")
+                return snapshot["data"]
+
+        return self._rebuild()
+
+    def _read_snapshot(self):
+        """Read the snapshot file, returning None if it is missing or unusable."""
+        if not os.path.exists(self.snapshot_path):
+            return None
+
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = pickle.load(f)
+        except Exception as e:
+            log_message(f"Ignoring unreadable reference data snapshot: {str(e)}", "WARNING")
+            return None
+
+        if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+            return None
+        if set(snapshot.get("sources", {})) != set(self._source_paths()):
+            return None
+        return snapshot
+
+    def _validate(self, recorded):
+        """
+        Check recorded source signatures against the files on disk.
+
+        A source whose mtime and size are unchanged is trusted without
+        hashing. A source with a new mtime is valid if its hash is unchanged.
+
+        Args:
+            recorded: Source name -> signature stored in the snapshot
+
+        Returns:
+            Tuple of (valid, refreshed signatures or None if nothing changed)
+        """
+        refreshed = {}
+        changed = False
+
+        for name, path in self._source_paths().items():
+            old = recorded.get(name)
+            current = _file_signature(path)
+
+            if old is None or current is None:
+                if old is not current:
+                    return False, None
+                refreshed[name] = None
+                continue
+
+            if current["mtime_ns"] == old["mtime_ns"] and current["size"] == old["size"]:
+                refreshed[name] = old
+                continue
+
+            current = _file_signature(path, with_hash=True)
+            if current["sha256"] != old.get("sha256"):
+                return False, None
+            refreshed[name] = current
+            changed = True
+
+        return True, (refreshed if changed else None)
+
+    def _rebuild(self):
+        """
+        Compile every reference source and write a new snapshot.
+
+        Returns:
+            dict: All reference datasets
+        """
+        log_message("Compiling reference data snapshot")
+        data = {}
+
+        for name, (_, key_col, value_col) in CSV_SOURCES.items():
+            path = self.csv_paths.get(name)
+            if not path or not os.path.exists(path):
+                data[name] = None
+                continue
+            try:
+                data[name] = _read_reference_csv(path, key_col, value_col)
+            except Exception as e:
+                log_error(e, f"Error compiling reference file {path}")
+                data[name] = None
+
+        import sap_audit_reference_data
+        for name in MODULE_DATASETS:
+            data[name] = getattr(sap_audit_reference_data, f"get_{name}")()
+
+        sources = {name: _file_signature(path, with_hash=True) for name, path in self._source_paths().items()}
+        self._write_snapshot({"version": SNAPSHOT_VERSION, "sources": sources, "data": data})
+        return data
+
+    def _write_snapshot(self, snapshot):
+        """Atomically write the snapshot file; failures only cost a rebuild later."""
+        tmp_path = f"{self.snapshot_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            log_message(f"Could not write reference data snapshot: {str(e)}", "WARNING")
+
+
+# Shared service instance used by all components
+reference_data = ReferenceDataService()
@@ -38,14 +38,7 @@ from sap_audit_utils import (
 )
 
 # Import reference data
-from sap_audit_reference_data import (
-    get_sensitive_tables, get_sensitive_table_descriptions,
-    get_common_table_descriptions, get_sensitive_tcodes,
-    get_sensitive_tcode_descriptions, get_common_tcode_descriptions,
-    get_common_field_descriptions, get_critical_field_patterns,
-    get_critical_field_pattern_descriptions, get_sap_event_code_classifications,
-    get_sap_event_code_descriptions
-)
+from sap_audit_context import AuditContext
 
 # Import detector functions
 from sap_audit_detectors import (
@@ -65,14 +58,16 @@ class RiskAssessor:
     debugging activities, and more.
     """
     
-    def __init__(self, config=None):
+    def __init__(self, config=None, context=None):
         """
         Initialize risk assessor with configuration.
         
         Args:
             config (dict, optional): Risk configuration override. If None, use default config.
+            context (AuditContext, optional): Run context providing the reference data.
         """
         self.config = config or RISK
+        self.context = context or AuditContext.default()
         self.column_map = COLUMNS["session"]
         
         # Set up column names from config/column map
@@ -109,77 +104,77 @@ class RiskAssessor:
     def sensitive_tables(self):
         """Lazy-load sensitive tables list."""
         if self._sensitive_tables is None:
-            self._sensitive_tables = get_sensitive_tables()
+            self._sensitive_tables = self.context.reference_data.get("sensitive_tables")
         return self._sensitive_tables
     
     @property
     def sensitive_table_descriptions(self):
         """Lazy-load sensitive table descriptions."""
         if self._sensitive_table_descriptions is None:
-            self._sensitive_table_descriptions = get_sensitive_table_descriptions()
+            self._sensitive_table_descriptions = self.context.reference_data.get("sensitive_table_descriptions")
         return self._sensitive_table_descriptions
     
     @property
     def common_table_descriptions(self):
         """Lazy-load common table descriptions."""
         if self._common_table_descriptions is None:
-            self._common_table_descriptions = get_common_table_descriptions()
+            self._common_table_descriptions = self.context.reference_data.get("common_table_descriptions")
         return self._common_table_descriptions
     
     @property
     def sensitive_tcodes(self):
         """Lazy-load sensitive transaction codes."""
         if self._sensitive_tcodes is None:
-            self._sensitive_tcodes = get_sensitive_tcodes()
+            self._sensitive_tcodes = self.context.reference_data.get("sensitive_tcodes")
         return self._sensitive_tcodes
     
     @property
     def sensitive_tcode_descriptions(self):
         """Lazy-load sensitive transaction code descriptions."""
         if self._sensitive_tcode_descriptions is None:
-            self._sensitive_tcode_descriptions = get_sensitive_tcode_descriptions()
+            self._sensitive_tcode_descriptions = self.context.reference_data.get("sensitive_tcode_descriptions")
         return self._sensitive_tcode_descriptions
     
     @property
     def common_tcode_descriptions(self):
         """Lazy-load common transaction code descriptions."""
         if self._common_tcode_descriptions is None:
-            self._common_tcode_descriptions = get_common_tcode_descriptions()
+            self._common_tcode_descriptions = self.context.reference_data.get("common_tcode_descriptions")
         return self._common_tcode_descriptions
     
     @property
     def common_field_descriptions(self):
         """Lazy-load common field descriptions."""
         if self._common_field_descriptions is None:
-            self._common_field_descriptions = get_common_field_descriptions()
+            self._common_field_descriptions = self.context.reference_data.get("common_field_descriptions")
         return self._common_field_descriptions
     
     @property
     def field_patterns(self):
         """Lazy-load critical field patterns."""
         if self._field_patterns is None:
-            self._field_patterns = get_critical_field_patterns()
+            self._field_patterns = self.context.reference_data.get("critical_field_patterns")
         return self._field_patterns
     
     @property
     def field_descriptions(self):
         """Lazy-load critical field pattern descriptions."""
         if self._field_descriptions is None:
-            self._field_descriptions = get_critical_field_pattern_descriptions()
+            self._field_descriptions = self.context.reference_data.get("critical_field_pattern_descriptions")
         return self._field_descriptions
     
     @property
     def event_code_classifications(self):
         """Lazy-load event code classifications."""
         if self._event_code_classifications is None:
-            self._event_code_classifications = get_sap_event_code_classifications()
+            self._event_code_classifications = self.context.reference_data.get("sap_event_code_classifications")
         return self._event_code_classifications
     
     @property
     def event_code_descriptions(self):
         """Lazy-load event code descriptions."""
         if self._event_code_descriptions is None:
-            self._event_code_descriptions = get_sap_event_code_descriptions()
+            self._event_code_descriptions = self.context.reference_data.get("sap_event_code_descriptions")
         return self._event_code_descriptions
     
     @handle_exception
@@ -219,14 +214,19 @@ class RiskAssessor:
             # Data preparation and initialization
             risk_df = self._prepare_risk_assessment(risk_df)
             
-            # Apply different risk assessment methods
-            risk_df = self._assess_table_risks(risk_df)
-            risk_df = self._assess_tcode_risks(risk_df)
-            risk_df = self._assess_field_risks(risk_df)
-            risk_df = self._assess_change_indicator_risks(risk_df)
-            risk_df = self._assess_display_but_changed_risks(risk_df)
-            risk_df = self._assess_debug_risks(risk_df)
-            risk_df = self._assess_event_code_risks(risk_df)
+            # Apply different risk assessment methods, reporting each to the telemetry
+            detectors = [
+                ("table_risks", self._assess_table_risks),
+                ("tcode_risks", self._assess_tcode_risks),
+                ("field_risks", self._assess_field_risks),
+                ("change_indicator_risks", self._assess_change_indicator_risks),
+                ("display_but_changed_risks", self._assess_display_but_changed_risks),
+                ("debug_risks", self._assess_debug_risks),
+                ("event_code_risks", self._assess_event_code_risks)
+            ]
+            for name, detector in detectors:
+                with self.context.telemetry.task(name, total=len(risk_df)):
+                    risk_df = detector(risk_df)
             
             # Add default descriptions for remaining low-risk items
             risk_df = self._add_default_risk_factors(risk_df)
@@ -596,45 +596,49 @@ class RiskAssessor:
         
         # 1. Apply Variable-based debugging detection (legacy approach)
         if debug_var_fields_present:
-            for idx, row in risk_df.iterrows():
-                debug_risk_level, debug_risk_factors = detect_debug_patterns(row)
+            with self.context.telemetry.task("debug_variable_patterns", total=len(risk_df)) as progress:
+                for idx, row in risk_df.iterrows():
+                    progress.advance()
+                    debug_risk_level, debug_risk_factors = detect_debug_patterns(row)
                 
-                if debug_risk_level and debug_risk_factors:
-                    debug_pattern_count += 1
+                    if debug_risk_level and debug_risk_factors:
+                        debug_pattern_count += 1
                     
-                    # Override risk level if debug risk is higher
-                    current_level = risk_df.loc[idx, risk_level_col]
-                    if (debug_risk_level == 'Critical' or 
-                        (debug_risk_level == 'High' and current_level != 'Critical') or
-                        (debug_risk_level == 'Medium' and current_level not in ['Critical', 'High'])):
-                        risk_df.loc[idx, risk_level_col] = debug_risk_level
+                        # Override risk level if debug risk is higher
+                        current_level = risk_df.loc[idx, risk_level_col]
+                        if (debug_risk_level == 'Critical' or 
+                            (debug_risk_level == 'High' and current_level != 'Critical') or
+                            (debug_risk_level == 'Medium' and current_level not in ['Critical', 'High'])):
+                            risk_df.loc[idx, risk_level_col] = debug_risk_level
                     
-                    # Add debug risk factors to existing ones
-                    current_factors = risk_df.loc[idx, risk_desc_col]
-                    risk_df.loc[idx, risk_desc_col] = current_factors + "; " + "; ".join(debug_risk_factors) if current_factors else "; ".join(debug_risk_factors)
+                        # Add debug risk factors to existing ones
+                        current_factors = risk_df.loc[idx, risk_desc_col]
+                        risk_df.loc[idx, risk_desc_col] = current_factors + "; " + "; ".join(debug_risk_factors) if current_factors else "; ".join(debug_risk_factors)
         
         # 2. Apply Message Code-based debugging detection (new approach)
         if message_id_present:
             log_message("Applying message code-based debugging detection...")
             
-            for idx, row in risk_df.iterrows():
-                detected, risk_level, risk_description = detect_debug_message_codes(row)
+            with self.context.telemetry.task("debug_message_codes", total=len(risk_df)) as progress:
+                for idx, row in risk_df.iterrows():
+                    progress.advance()
+                    detected, risk_level, risk_description = detect_debug_message_codes(row)
                 
-                if detected:
-                    debug_message_count += 1
-                    # Override risk level if higher
-                    current_level = risk_df.loc[idx, risk_level_col]
-                    if (risk_level == 'Critical' or 
-                        (risk_level == 'High' and current_level != 'Critical') or
-                        (risk_level == 'Medium' and current_level not in ['Critical', 'High'])):
-                        risk_df.loc[idx, risk_level_col] = risk_level
+                    if detected:
+                        debug_message_count += 1
+                        # Override risk level if higher
+                        current_level = risk_df.loc[idx, risk_level_col]
+                        if (risk_level == 'Critical' or 
+                            (risk_level == 'High' and current_level != 'Critical') or
+                            (risk_level == 'Medium' and current_level not in ['Critical', 'High'])):
+                            risk_df.loc[idx, risk_level_col] = risk_level
                     
-                    # Add message code risk description
-                    current_factors = risk_df.loc[idx, risk_desc_col]
-                    if current_factors and current_factors.strip():
-                        risk_df.loc[idx, risk_desc_col] = current_factors + "; " + risk_description
-                    else:
-                        risk_df.loc[idx, risk_desc_col] = risk_description
+                        # Add message code risk description
+                        current_factors = risk_df.loc[idx, risk_desc_col]
+                        if current_factors and current_factors.strip():
+                            risk_df.loc[idx, risk_desc_col] = current_factors + "; " + risk_description
+                        else:
+                            risk_df.loc[idx, risk_desc_col] = risk_description
             
             if debug_message_count > 0:
                 log_message(f"Found {debug_message_count} debug events based on message codes", "WARNING")
@@ -647,46 +651,50 @@ class RiskAssessor:
             inv_manip_count = 0
             
             # Group by session ID to analyze patterns within sessions
-            for session_id, session_group in risk_df.groupby('Session ID with Date'):
-                # Check for authorization bypass pattern
-                auth_bypass_detected, auth_bypass_risk, auth_bypass_factors = detect_authorization_bypass(session_group)
+            sessions = risk_df.groupby('Session ID with Date')
+            with self.context.telemetry.task("debug_session_patterns", total=sessions.ngroups,
+                                             unit="sessions") as progress:
+                for session_id, session_group in sessions:
+                    progress.advance(session=session_id)
+                    # Check for authorization bypass pattern
+                    auth_bypass_detected, auth_bypass_risk, auth_bypass_factors = detect_authorization_bypass(session_group)
                 
-                if auth_bypass_detected:
-                    auth_bypass_count += 1
-                    log_message(f"Found authorization bypass pattern in session {session_id}", "WARNING")
+                    if auth_bypass_detected:
+                        auth_bypass_count += 1
+                        log_message(f"Found authorization bypass pattern in session {session_id}", "WARNING")
                     
-                    # Apply to all events in the session
-                    for idx in session_group.index:
-                        # Only upgrade risk level (never downgrade)
-                        if auth_bypass_risk == 'Critical' or risk_df.loc[idx, risk_level_col] != 'Critical':
-                            risk_df.loc[idx, risk_level_col] = auth_bypass_risk
+                        # Apply to all events in the session
+                        for idx in session_group.index:
+                            # Only upgrade risk level (never downgrade)
+                            if auth_bypass_risk == 'Critical' or risk_df.loc[idx, risk_level_col] != 'Critical':
+                                risk_df.loc[idx, risk_level_col] = auth_bypass_risk
                         
-                        # Add risk description
-                        current_factors = risk_df.loc[idx, risk_desc_col]
-                        if current_factors and current_factors.strip():
-                            risk_df.loc[idx, risk_desc_col] = current_factors + "; " + "; ".join(auth_bypass_factors)
-                        else:
-                            risk_df.loc[idx, risk_desc_col] = "; ".join(auth_bypass_factors)
+                            # Add risk description
+                            current_factors = risk_df.loc[idx, risk_desc_col]
+                            if current_factors and current_factors.strip():
+                                risk_df.loc[idx, risk_desc_col] = current_factors + "; " + "; ".join(auth_bypass_factors)
+                            else:
+                                risk_df.loc[idx, risk_desc_col] = "; ".join(auth_bypass_factors)
                 
-                # Check for inventory manipulation with debugging
-                inv_manip_detected, inv_manip_risk, inv_manip_factors = detect_inventory_manipulation(
-                    session_group, INVENTORY_SENSITIVE_TABLES)
+                    # Check for inventory manipulation with debugging
+                    inv_manip_detected, inv_manip_risk, inv_manip_factors = detect_inventory_manipulation(
+                        session_group, INVENTORY_SENSITIVE_TABLES)
                 
-                if inv_manip_detected:
-                    inv_manip_count += 1
-                    log_message(f"Found inventory manipulation pattern in session {session_id}", "WARNING")
-                    # Apply to all events in the session
-                    for idx in session_group.index:
-                        # Only upgrade risk level (never downgrade)
-                        if inv_manip_risk == 'Critical' or risk_df.loc[idx, risk_level_col] != 'Critical':
-                            risk_df.loc[idx, risk_level_col] = inv_manip_risk
+                    if inv_manip_detected:
+                        inv_manip_count += 1
+                        log_message(f"Found inventory manipulation pattern in session {session_id}", "WARNING")
+                        # Apply to all events in the session
+                        for idx in session_group.index:
+                            # Only upgrade risk level (never downgrade)
+                            if inv_manip_risk == 'Critical' or risk_df.loc[idx, risk_level_col] != 'Critical':
+                                risk_df.loc[idx, risk_level_col] = inv_manip_risk
                         
-                        # Add risk description
-                        current_factors = risk_df.loc[idx, risk_desc_col]
-                        if current_factors and current_factors.strip():
-                            risk_df.loc[idx, risk_desc_col] = current_factors + "; " + "; ".join(inv_manip_factors)
-                        else:
-                            risk_df.loc[idx, risk_desc_col] = "; ".join(inv_manip_factors)
+                            # Add risk description
+                            current_factors = risk_df.loc[idx, risk_desc_col]
+                            if current_factors and current_factors.strip():
+                                risk_df.loc[idx, risk_desc_col] = current_factors + "; " + "; ".join(inv_manip_factors)
+                            else:
+                                risk_df.loc[idx, risk_desc_col] = "; ".join(inv_manip_factors)
             
             # Legacy debug + changes detection
             log_message("Analyzing debug activity correlation with data changes...")
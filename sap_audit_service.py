@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Local Audit Service
+
+This module runs the SAP Audit Tool as a long-running local service. Jobs
+for input folders are queued over a small HTTP API and processed by a pool
+of worker processes that stay warm between jobs.
+
+Key features:
+- Worker processes import the processing stack and load the compiled
+  reference data once, then reuse the risk assessor and analyzer for
+  every job
+- SysAid file lookups are kept while the SysAid export is unchanged
+- Each job runs with its own AuditContext: input, output and cache folders,
+  configuration and record counter
+- Per-stage progress events, streamed as JSON lines
+- Binds to localhost by default; the API is meant for local use only
+
+Endpoints:
+    GET  /health               Service status
+    GET  /jobs                 All jobs
+    POST /jobs                 Queue a job: {"input_dir": ..., "output_dir": ..., "config": {...}}
+    GET  /jobs/<id>            Job status and events
+    GET  /jobs/<id>/events     Stream job events until the job ends
+
+Usage:
+    python sap_audit_service.py serve [--host HOST] [--port PORT] [--workers N]
+    python sap_audit_service.py submit INPUT_DIR [--output-dir DIR] [--wait]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sap_audit_config import PATHS, SETTINGS
+from sap_audit_utils import log_message, log_section, log_error, process_pool_context
+
+# Job statuses
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+FINAL_STATUSES = (JOB_COMPLETED, JOB_FAILED)
+
+# Progress queue and warm components of a worker process
+_progress_queue = None
+_warm_components = {}
+_sysaid_key = None
+
+
+def _emit(job_id, event):
+    """Send a progress event from a worker process to the service."""
+    if _progress_queue is not None:
+        _progress_queue.put({"job_id": job_id, "time": datetime.now().isoformat(timespec="seconds"), **event})
+
+
+def _init_worker(progress_queue):
+    """
+    Prepare a worker process: import the processing stack and load the
+    reference data used by risk assessment and analysis.
+
+    Args:
+        progress_queue: Queue receiving progress events
+    """
+    global _progress_queue
+    _progress_queue = progress_queue
+
+    from sap_audit_risk import RiskAssessor
+    from sap_audit_analyzer import SAPAuditAnalyzer
+
+    _warm_components["risk_assessor"] = RiskAssessor()
+    _warm_components["analyzer"] = SAPAuditAnalyzer()
+    _warm_components["risk_assessor"].sensitive_tables
+    _warm_components["analyzer"].tcode_descriptions
+
+
+def _components_for(context):
+    """
+    Return the warm components a job can reuse.
+
+    The risk assessor and analyzer only hold the shared reference data; they
+    are rebound to the job's context so progress is reported to the job. The
+    SysAid integrator is only reused with the file strategy and while the
+    SysAid export is unchanged (API lookups depend on the job's tickets); it
+    is rebound to the job's context so counts and caches go to the job.
+
+    Args:
+        context: AuditContext of the job
+
+    Returns:
+        dict: Component name -> instance
+    """
+    global _sysaid_key
+    components = {name: _warm_components[name] for name in ("risk_assessor", "analyzer")
+                  if name in _warm_components}
+    for component in components.values():
+        component.context = context
+
+    sysaid_input = context.paths["sysaid_input"]
+    if context.config.get("sysaid_source", "file") == "file" and os.path.exists(sysaid_input):
+        stat = os.stat(sysaid_input)
+        key = (sysaid_input, stat.st_mtime_ns, stat.st_size)
+        if key == _sysaid_key and "sysaid_integrator" in _warm_components:
+            integrator = _warm_components["sysaid_integrator"]
+            integrator.bind_context(context)
+            components["sysaid_integrator"] = integrator
+        else:
+            _warm_components.pop("sysaid_integrator", None)
+            _sysaid_key = key
+    return components
+
+
+def _run_job(job_id, spec):
+    """
+    Run one audit job in a worker process and report its end.
+
+    The final event travels through the progress queue behind the job's
+    stage events, so clients always see the stages before the result.
+
+    Args:
+        job_id: Job identifier
+        spec: Job specification (input_dir, output_dir, config)
+
+    Returns:
+        dict: Job result
+    """
+    try:
+        result = _run_audit(job_id, spec)
+    except Exception as e:
+        log_error(e, f"Audit job {job_id} failed")
+        result = {"success": False, "error": str(e)}
+    _emit(job_id, {"type": "job", "status": JOB_COMPLETED if result["success"] else JOB_FAILED,
+                   "result": result})
+    return result
+
+
+def _run_audit(job_id, spec):
+    """
+    Run the audit of one job.
+
+    Args:
+        job_id: Job identifier
+        spec: Job specification (input_dir, output_dir, config)
+
+    Returns:
+        dict: Job result (success, output_path, elapsed_seconds, stages)
+    """
+    from sap_audit_context import AuditContext
+    from sap_audit_controller import AuditController
+
+    context = AuditContext.for_folder(spec["input_dir"], spec["output_dir"], spec.get("config"))
+    config = context.config
+    controller = AuditController(components=_components_for(context), context=context)
+    controller.stage_listener = lambda event: _emit(job_id, {"type": "stage", **event})
+    _emit(job_id, {"type": "job", "status": JOB_RUNNING, "pid": os.getpid()})
+
+    success = bool(controller.run_full_audit())
+
+    # Keep a SysAid integrator that loaded the export for the next job
+    integrator = controller._components.get("sysaid_integrator")
+    if config.get("sysaid_source", "file") == "file" and integrator is not None:
+        _warm_components["sysaid_integrator"] = integrator
+
+    return {
+        "success": success,
+        "output_path": config["output_path"],
+        "elapsed_seconds": controller.elapsed_time,
+        "stages": controller.stage_timeline
+    }
+
+
+class AuditService:
+    """
+    Job queue and worker pool behind the HTTP API.
+    """
+
+    def __init__(self, workers=None, output_root=None, executor=None):
+        """
+        Start the worker pool and the progress collector.
+
+        Args:
+            workers: Worker processes (defaults to SETTINGS["service"]["workers"])
+            output_root: Folder receiving one output folder per job
+            executor: Optional executor replacing the process pool
+        """
+        self.workers = workers or SETTINGS["service"]["workers"]
+        self.output_root = output_root or PATHS["output_dir"]
+        self.jobs = {}
+        self._changed = threading.Condition()
+
+        # Workers start after the collector and HTTP threads, so they must not be forked
+        context = process_pool_context()
+        self._progress = context.Queue()
+        self._executor = executor or ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context,
+            initializer=_init_worker, initargs=(self._progress,))
+        self._collector = threading.Thread(target=self._collect_progress, name="audit-progress", daemon=True)
+        self._collector.start()
+
+    def submit(self, input_dir, output_dir=None, config=None):
+        """
+        Queue an audit job for an input folder.
+
+        Args:
+            input_dir: Folder with the SAP exports
+            output_dir: Output folder (defaults to <output_root>/<folder name>)
+            config: Configuration overrides for the job
+
+        Returns:
+            dict: The queued job
+
+        Raises:
+            ValueError: If the input folder does not exist
+        """
+        if not input_dir or not os.path.isdir(input_dir):
+            raise ValueError(f"Input folder not found: {input_dir}")
+
+        job_id = uuid.uuid4().hex[:12]
+        folder_name = os.path.basename(os.path.normpath(input_dir))
+        spec = {
+            "input_dir": os.path.abspath(input_dir),
+            "output_dir": os.path.abspath(output_dir or os.path.join(self.output_root, folder_name)),
+            "config": config or {}
+        }
+        job = {"id": job_id, "status": JOB_QUEUED, "submitted": datetime.now().isoformat(timespec="seconds"),
+               "finished": None, "result": None, "events": [], **spec}
+
+        with self._changed:
+            self.jobs[job_id] = job
+        self._add_event({"job_id": job_id, "type": "job", "status": JOB_QUEUED})
+
+        future = self._executor.submit(_run_job, job_id, spec)
+        future.add_done_callback(lambda done: self._finish(job_id, done))
+        log_message(f"Queued audit job {job_id} for {spec['input_dir']}")
+        return self.get(job_id)
+
+    def _finish(self, job_id, future):
+        """Fail a job whose worker could not report its end (e.g. a crashed process)."""
+        error = future.exception()
+        if error is not None:
+            log_error(error, f"Audit job {job_id} failed")
+            self._add_event({"job_id": job_id, "type": "job", "status": JOB_FAILED,
+                             "result": {"success": False, "error": str(error)}})
+
+    def _collect_progress(self):
+        """Move progress events from the worker processes to their jobs."""
+        while True:
+            event = self._progress.get()
+            if event is None:
+                return
+            self._add_event(event)
+
+    def _add_event(self, event):
+        """Append an event to its job and wake up streaming clients."""
+        with self._changed:
+            job = self.jobs.get(event["job_id"])
+            if job is None:
+                return
+            event = {"time": datetime.now().isoformat(timespec="seconds"), **event}
+            if "result" in event:
+                job["result"] = event.pop("result")
+                job["finished"] = event["time"]
+            job["events"].append(event)
+            # A late "running" event from the worker never reopens a finished job
+            if event["type"] == "job" and job["status"] not in FINAL_STATUSES:
+                job["status"] = event["status"]
+            self._changed.notify_all()
+
+    def get(self, job_id):
+        """Return a copy of a job, or None if it is unknown."""
+        with self._changed:
+            job = self.jobs.get(job_id)
+            return None if job is None else dict(job, events=list(job["events"]))
+
+    def list_jobs(self):
+        """Return all jobs without their events."""
+        with self._changed:
+            return [{key: value for key, value in job.items() if key != "events"} for job in self.jobs.values()]
+
+    def wait_for_events(self, job_id, start, timeout=30):
+        """
+        Wait for events after a position in the job's event list.
+
+        Args:
+            job_id: Job identifier
+            start: Number of events already seen
+            timeout: Longest wait in seconds
+
+        Returns:
+            Tuple of (new events, whether the job has finished)
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: len(self.jobs[job_id]["events"]) > start
+                                   or self.jobs[job_id]["status"] in FINAL_STATUSES, timeout)
+            job = self.jobs[job_id]
+            events = job["events"][start:]
+            return events, job["status"] in FINAL_STATUSES and job["result"] is not None
+
+    def shutdown(self):
+        """Stop the worker pool after the running jobs."""
+        self._executor.shutdown(wait=True)
+        self._progress.put(None)
+
+
+class AuditRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end of the AuditService."""
+
+    service = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _job_path(self):
+        """Split /jobs/<id>[/events] into (job_id, sub-resource)."""
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        if len(parts) < 2 or parts[0] != "jobs":
+            return None, None
+        return parts[1], (parts[2] if len(parts) > 2 else None)
+
+    def do_GET(self):
+        path = self.path.split("?")[0].rstrip("/")
+        if path == "/health":
+            self._send_json(200, {"status": "ok", "workers": self.service.workers,
+                                  "jobs": len(self.service.jobs)})
+            return
+        if path == "/jobs":
+            self._send_json(200, self.service.list_jobs())
+            return
+
+        job_id, resource = self._job_path()
+        job = self.service.get(job_id) if job_id else None
+        if job is None:
+            self._send_json(404, {"error": "Job not found"})
+        elif resource is None:
+            self._send_json(200, job)
+        elif resource == "events":
+            self._stream_events(job_id)
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path.split("?")[0].rstrip("/") != "/jobs":
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            job = self.service.submit(request.get("input_dir"), request.get("output_dir"), request.get("config"))
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        self._send_json(202, job)
+
+    def _stream_events(self, job_id):
+        """Write the job's events as JSON lines until the job has finished."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+
+        seen = 0
+        finished = False
+        while not finished:
+            events, finished = self.service.wait_for_events(job_id, seen)
+            seen += len(events)
+            for event in events:
+                self.wfile.write((json.dumps(event, default=str) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+    def log_message(self, format, *args):
+        log_message(f"{self.address_string()} {format % args}", "DEBUG")
+
+
+def create_server(service, host=None, port=None):
+    """
+    Create the HTTP server for a service.
+
+    Args:
+        service: AuditService instance
+        host: Bind address (defaults to SETTINGS["service"]["host"])
+        port: Port (defaults to SETTINGS["service"]["port"]; 0 picks a free port)
+
+    Returns:
+        ThreadingHTTPServer: Server ready for serve_forever()
+    """
+    handler = type("BoundAuditRequestHandler", (AuditRequestHandler,), {"service": service})
+    host = host or SETTINGS["service"]["host"]
+    port = SETTINGS["service"]["port"] if port is None else port
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(host=None, port=None, workers=None):
+    """Run the service until interrupted."""
+    service = AuditService(workers)
+    server = create_server(service, host, port)
+    log_section("SAP Audit Service")
+    log_message(f"Listening on http://{server.server_address[0]}:{server.server_address[1]} "
+                f"with {service.workers} worker processes")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log_message("Stopping SAP Audit Service")
+    finally:
+        server.server_close()
+        service.shutdown()
+    return True
+
+
+def submit(input_dir, output_dir=None, wait=False, host=None, port=None):
+    """
+    Queue a job on a running service, optionally streaming its progress.
+
+    Returns:
+        bool: True if the job was queued (and, with wait, completed)
+    """
+    from urllib.request import Request, urlopen
+
+    base_url = f"http://{host or SETTINGS['service']['host']}:{port or SETTINGS['service']['port']}"
+    body = json.dumps({"input_dir": os.path.abspath(input_dir), "output_dir": output_dir}).encode("utf-8")
+    request = Request(f"{base_url}/jobs", data=body, headers={"Content-Type": "application/json"})
+    with urlopen(request) as response:
+        job = json.load(response)
+    print(f"Queued job {job['id']} for {job['input_dir']}")
+    if not wait:
+        return True
+
+    status = None
+    with urlopen(f"{base_url}/jobs/{job['id']}/events") as response:
+        for line in response:
+            event = json.loads(line)
+            if event["type"] == "stage":
+                print(f"  {event['stage']:<22} {event['status']}")
+            else:
+                status = event["status"]
+                print(f"Job {status}")
+    return status == JOB_COMPLETED
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SAP Audit Tool local service")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Run the service")
+    serve_parser.add_argument("--host", help="Bind address")
+    serve_parser.add_argument("--port", type=int, help="Port")
+    serve_parser.add_argument("--workers", type=int, help="Worker processes")
+
+    submit_parser = commands.add_parser("submit", help="Queue a job on a running service")
+    submit_parser.add_argument("input_dir", help="Folder with the SAP exports")
+    submit_parser.add_argument("--output-dir", help="Output folder for the job")
+    submit_parser.add_argument("--wait", action="store_true", help="Stream progress until the job ends")
+    submit_parser.add_argument("--host", help="Service address")
+    submit_parser.add_argument("--port", type=int, help="Service port")
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        return serve(args.host, args.port, args.workers)
+    return submit(args.input_dir, args.output_dir, args.wait, args.host, args.port)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -8,8 +8,10 @@ It creates a chronological view of SAP user activity for internal audit purposes
 Key features:
 - Assigns session IDs based on SysAid ticket numbers (or user+date when SysAid is unavailable)
 - Preserves all relevant fields from each source
-- Joins CDHDR with CDPOS to show field-level changes
-- Creates a formatted Excel output with color-coding by source
+- Joins CDHDR with CDPOS on the change document key to show field-level changes
+- Links each change document to the preceding SM20 event of the same user and tcode
+- Creates a formatted Excel output with color-coding by source, and a
+  typed sidecar of it for tools that reload the timeline
 
 This refactored version uses the centralized configuration and utility modules
 for improved maintainability, error handling, and consistency.
@@ -21,13 +23,19 @@ import pandas as pd
 from datetime import datetime, timedelta
 
 # Import configuration and utilities
-from sap_audit_config import PATHS, COLUMNS, SETTINGS, SYSAID
+from sap_audit_config import COLUMNS
+from sap_audit_context import AuditContext
 from sap_audit_utils import (
     log_message, log_section, log_error, log_stats,
-    handle_exception, validate_required_columns, validate_data_quality,
-    clean_whitespace, find_latest_file
+    handle_exception, validate_required_columns, find_latest_file,
+    build_datetime_series, clean_and_profile, log_quality_report
 )
 
+# Import the change document join and correlation
+from sap_audit_change_documents import join_change_documents
+from sap_audit_correlation import correlate_change_documents
+from sap_audit_timeline_sidecar import write_sidecar
+
 # =========================================================================
 # DATA PROCESSING BASE CLASS
 # =========================================================================
@@ -35,14 +43,16 @@ from sap_audit_utils import (
 class DataSourceProcessor:
     """Base class for data source processors in the session merger."""
     
-    def __init__(self, source_type):
+    def __init__(self, source_type, context=None):
         """
         Initialize a data source processor.
         
         Args:
             source_type (str): Type of data source (SM20, CDHDR, CDPOS)
+            context (AuditContext): Run context (defaults to the global configuration)
         """
         self.source_type = source_type.upper()
+        self.context = context or AuditContext.default()
         self.column_map = COLUMNS.get(source_type.lower(), {})
     
     def load_data(self, file_path):
@@ -57,7 +67,7 @@ class DataSourceProcessor:
         """
         try:
             log_message(f"Loading {self.source_type} file: {file_path}")
-            df = pd.read_csv(file_path, encoding=SETTINGS["encoding"])
+            df = pd.read_csv(file_path, encoding=self.context.settings["encoding"])
             log_message(f"Loaded {len(df)} rows from {self.source_type}")
             return df
         except Exception as e:
@@ -135,9 +145,9 @@ class DataSourceProcessor:
 class SM20Processor(DataSourceProcessor):
     """Processor for SM20 security audit log data."""
     
-    def __init__(self):
+    def __init__(self, context=None):
         """Initialize SM20 processor."""
-        super().__init__("SM20")
+        super().__init__("SM20", context)
     
     @handle_exception
     def validate_sm20_data(self, df):
@@ -183,16 +193,15 @@ class SM20Processor(DataSourceProcessor):
         log_message("Creating datetime column from date and time fields")
         
         try:
-            # Ensure both columns are strings
+            # Parse native values with detected formats, reusing DATETIME from data prep
+            df['Datetime'] = build_datetime_series(
+                df, self.column_map["date"], self.column_map["time"], datetime_col='DATETIME'
+            )
+            
+            # Keep date and time as display strings
             df[self.column_map["date"]] = df[self.column_map["date"]].astype(str)
             df[self.column_map["time"]] = df[self.column_map["time"]].astype(str)
             
-            # Create datetime values
-            df['Datetime'] = pd.to_datetime(
-                df[self.column_map["date"]] + ' ' + df[self.column_map["time"]],
-                errors='coerce'
-            )
-            
             # Check for NaT values
             nat_count = df['Datetime'].isna().sum()
             if nat_count > 0:
@@ -232,8 +241,8 @@ class SM20Processor(DataSourceProcessor):
         
         # Clean and standardize
         df = self.standardize_column_names(df)
-        df = clean_whitespace(df)
-        df = validate_data_quality(df, self.source_type)
+        df, quality_report = clean_and_profile(df, self.source_type)
+        log_quality_report(quality_report)
         
         # Create datetime column
         df = self.create_datetime_column(df)
@@ -256,9 +265,9 @@ class SM20Processor(DataSourceProcessor):
 class CDHDRProcessor(DataSourceProcessor):
     """Processor for CDHDR change document header data."""
     
-    def __init__(self):
+    def __init__(self, context=None):
         """Initialize CDHDR processor."""
-        super().__init__("CDHDR")
+        super().__init__("CDHDR", context)
     
     @handle_exception
     def validate_cdhdr_data(self, df):
@@ -308,7 +317,7 @@ class CDHDRProcessor(DataSourceProcessor):
                 time_col = time_cols[0]
             elif 'DATETIME' in df.columns:
                 log_message("Using pre-existing DATETIME column")
-                df['Datetime'] = pd.to_datetime(df['DATETIME'], errors='coerce')
+                df['Datetime'] = build_datetime_series(df, None, None, datetime_col='DATETIME')
                 df = df.dropna(subset=['Datetime'])
                 return df
             else:
@@ -322,16 +331,13 @@ class CDHDRProcessor(DataSourceProcessor):
         try:
             log_message("Creating datetime column from date and time fields")
             
-            # Ensure both columns are strings
+            # Parse native values with detected formats, reusing DATETIME from data prep
+            df['Datetime'] = build_datetime_series(df, date_col, time_col, datetime_col='DATETIME')
+            
+            # Keep date and time as display strings
             df[date_col] = df[date_col].astype(str)
             df[time_col] = df[time_col].astype(str)
             
-            # Create datetime values
-            df['Datetime'] = pd.to_datetime(
-                df[date_col] + ' ' + df[time_col],
-                errors='coerce'
-            )
-            
             # Check for NaT values
             nat_count = df['Datetime'].isna().sum()
             if nat_count > 0:
@@ -371,8 +377,8 @@ class CDHDRProcessor(DataSourceProcessor):
         
         # Clean and standardize
         df = self.standardize_column_names(df)
-        df = clean_whitespace(df)
-        df = validate_data_quality(df, self.source_type)
+        df, quality_report = clean_and_profile(df, self.source_type)
+        log_quality_report(quality_report)
         
         # Create datetime column
         df = self.create_datetime_column(df)
@@ -395,9 +401,9 @@ class CDHDRProcessor(DataSourceProcessor):
 class CDPOSProcessor(DataSourceProcessor):
     """Processor for CDPOS change document item data."""
     
-    def __init__(self):
+    def __init__(self, context=None):
         """Initialize CDPOS processor."""
-        super().__init__("CDPOS")
+        super().__init__("CDPOS", context)
     
     @handle_exception
     def validate_cdpos_data(self, df):
@@ -471,8 +477,8 @@ class CDPOSProcessor(DataSourceProcessor):
         
         # Clean and standardize
         df = self.standardize_column_names(df)
-        df = clean_whitespace(df)
-        df = validate_data_quality(df, self.source_type)
+        df, quality_report = clean_and_profile(df, self.source_type)
+        log_quality_report(quality_report)
         
         # Standardize change indicators
         df = self.standardize_change_indicators(df)
@@ -495,17 +501,23 @@ class CDPOSProcessor(DataSourceProcessor):
 class SessionMerger:
     """Main class for merging SAP logs into a unified session timeline."""
     
-    def __init__(self):
-        """Initialize session merger."""
-        self.sm20_processor = SM20Processor()
-        self.cdhdr_processor = CDHDRProcessor()
-        self.cdpos_processor = CDPOSProcessor()
+    def __init__(self, context=None):
+        """
+        Initialize session merger.
+        
+        Args:
+            context (AuditContext): Run context (defaults to the global configuration)
+        """
+        self.context = context or AuditContext.default()
+        self.sm20_processor = SM20Processor(self.context)
+        self.cdhdr_processor = CDHDRProcessor(self.context)
+        self.cdpos_processor = CDPOSProcessor(self.context)
         
         # Column mappings for output
         self.session_cols = COLUMNS["session"]
         
         # Define fields to exclude
-        self.exclude_fields = SETTINGS["exclude_fields"]
+        self.exclude_fields = self.context.settings["exclude_fields"]
     
     @handle_exception
     def find_sysaid_column(self, df):
@@ -518,7 +530,7 @@ class SessionMerger:
         Returns:
             str or None: Column name to use for SysAid tickets
         """
-        for col in SYSAID["column_options"]:
+        for col in self.context.sysaid["column_options"]:
             if col in df.columns:
                 # Check if the column has any non-empty values
                 if df[col].notna().any() and (df[col] != '').any():
@@ -526,9 +538,9 @@ class SessionMerger:
                     return col
         
         # Case-insensitive search if strict matching fails
-        if SETTINGS["column_renaming"]["case_sensitive"] is False:
+        if self.context.settings["column_renaming"]["case_sensitive"] is False:
             df_cols_lower = [c.upper() for c in df.columns]
-            for col in SYSAID["column_options"]:
+            for col in self.context.sysaid["column_options"]:
                 if col.upper() in df_cols_lower:
                     idx = df_cols_lower.index(col.upper())
                     col_name = df.columns[idx]
@@ -762,8 +774,7 @@ class SessionMerger:
             return self.assign_session_ids_by_sysaid(df, sysaid_col, time_col, session_col)
         else:
             # Check if SysAid integration is required in config
-            from sap_audit_config import CONFIG
-            if CONFIG.get("enable_sysaid", True):
+            if self.context.config.get("enable_sysaid", True):
                 # Only raise error if SysAid is required
                 error_msg = "CRITICAL ERROR: No SysAid column found. SysAid integration is required for processing."
                 log_message(error_msg, "ERROR")
@@ -836,15 +847,13 @@ class SessionMerger:
                     log_message(f"CDPOS: Using '{closest[0]}' instead of '{col}'")
                     cdpos[col] = cdpos[closest[0]]
         
-        # Merge on change document number as per requirements
+        # Join on the change document key (object class, object id, change number)
         try:
-            merged = pd.merge(
-                cdhdr,
-                cdpos,
-                left_on=COLUMNS["cdhdr"]["change_number"],
-                right_on=COLUMNS["cdpos"]["change_number"],
-                how='left'
-            )
+            join_config = self.context.settings["change_document_join"]
+            merged, estimate = join_change_documents(cdhdr, cdpos, max_expansion=join_config["max_expansion"],
+                                                     on_explosion=join_config["on_explosion"])
+            if not {COLUMNS["cdhdr"]["object"], COLUMNS["cdhdr"]["object_id"]} <= set(estimate["key_columns"]):
+                log_message(f"Change document key incomplete, joined on {', '.join(estimate['key_columns'])} only", "WARNING")
             
             # Update source for rows with CDPOS data
             if COLUMNS["cdpos"]["table_name"] in merged.columns:
@@ -1123,6 +1132,15 @@ class SessionMerger:
         log_message("Assigning session IDs to combined timeline...")
         timeline = self.assign_session_ids(timeline, self.session_cols["user"], "Datetime", sysaid_col=sysaid_col)
         
+        # Link change documents to the SM20 events that produced them
+        correlation = self.context.settings["correlation"]
+        if correlation["enabled"]:
+            timeline = correlate_change_documents(
+                timeline, window_seconds=correlation["window_seconds"], match_tcode=correlation["match_tcode"],
+                user_col=self.session_cols["user"], tcode_col=self.session_cols["tcode"],
+                time_col="Datetime", session_col=self.session_cols["id"]
+            )
+        
         # Sort timeline
         timeline = self.sort_timeline(timeline)
         
@@ -1257,6 +1275,9 @@ class SessionMerger:
                 worksheet.freeze_panes(1, 0)
             
             log_message(f"Excel output successfully generated: {output_file}")
+            
+            # Typed copy for tools that reload the timeline (no Excel parsing)
+            write_sidecar(output_timeline, output_file)
             return True
         except Exception as e:
             log_error(e, f"Error generating Excel output")
@@ -1278,7 +1299,7 @@ class SessionMerger:
         
         try:
             # For tests/integration, look for CSV files in test_input directory first (these are created by DataPrepManager)
-            input_dir = os.path.dirname(PATHS['sm20_input'])
+            input_dir = os.path.dirname(self.context.paths['sm20_input'])
             
             # Step 1: Load and process SM20 data
             sm20_csv_path = os.path.join(input_dir, 'SM20.csv')
@@ -1286,8 +1307,8 @@ class SessionMerger:
                 log_message(f"Processing SM20 data from CSV: {sm20_csv_path}")
                 sm20 = self.sm20_processor.process(sm20_csv_path)
             else:
-                log_message(f"Processing SM20 data from original source: {PATHS['sm20_input']}")
-                sm20 = self.sm20_processor.process(PATHS["sm20_input"])
+                log_message(f"Processing SM20 data from original source: {self.context.paths['sm20_input']}")
+                sm20 = self.sm20_processor.process(self.context.paths["sm20_input"])
             
             # Step 2: Load and process CDHDR data
             cdhdr_csv_path = os.path.join(input_dir, 'CDHDR.csv')
@@ -1295,8 +1316,8 @@ class SessionMerger:
                 log_message(f"Processing CDHDR data from CSV: {cdhdr_csv_path}")
                 cdhdr = self.cdhdr_processor.process(cdhdr_csv_path)
             else:
-                log_message(f"Processing CDHDR data from original source: {PATHS['cdhdr_input']}")
-                cdhdr = self.cdhdr_processor.process(PATHS["cdhdr_input"])
+                log_message(f"Processing CDHDR data from original source: {self.context.paths['cdhdr_input']}")
+                cdhdr = self.cdhdr_processor.process(self.context.paths["cdhdr_input"])
             
             # Step 3: Load and process CDPOS data
             cdpos_csv_path = os.path.join(input_dir, 'CDPOS.csv')
@@ -1304,8 +1325,8 @@ class SessionMerger:
                 log_message(f"Processing CDPOS data from CSV: {cdpos_csv_path}")
                 cdpos = self.cdpos_processor.process(cdpos_csv_path)
             else:
-                log_message(f"Processing CDPOS data from original source: {PATHS['cdpos_input']}")
-                cdpos = self.cdpos_processor.process(PATHS["cdpos_input"])
+                log_message(f"Processing CDPOS data from original source: {self.context.paths['cdpos_input']}")
+                cdpos = self.cdpos_processor.process(self.context.paths["cdpos_input"])
             
             # Step 4: Merge CDHDR with CDPOS
             log_message("Merging CDHDR with CDPOS data")
@@ -1352,7 +1373,7 @@ class SessionMerger:
                 return False
                 
             # Generate Excel output
-            output_file = PATHS["session_timeline"]
+            output_file = self.context.paths["session_timeline"]
             success = self.generate_excel_output(timeline, output_file)
             
             # Calculate elapsed time
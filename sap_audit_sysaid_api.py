@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - SysAid API Client Module
+
+This module provides a concurrent client for the SysAid REST API, used by the
+"api" SysAid data source strategy.
+
+Key features:
+- Pages are fetched concurrently under a bounded asyncio semaphore
+- Pooled keep-alive connections shared by all requests
+- Exponential back-off with jitter on throttling, server errors and timeouts
+- Fetches only the ticket IDs referenced in the current timeline when given
+- Delta fetches of tickets modified since a timestamp
+- Safe to call from code already running an event loop (the fetch then runs
+  on its own loop in a worker thread)
+
+The client drives a pooled requests.Session from an asyncio event loop through
+a thread executor, so no additional HTTP dependency is required.
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from sap_audit_utils import log_message
+
+# HTTP status codes worth retrying (throttling and transient server errors)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Keys that may wrap the ticket list in a JSON object response
+RESPONSE_LIST_KEYS = ["data", "items", "results", "tickets"]
+
+# Record fields identifying a ticket, used to spot pages the server repeats
+RECORD_ID_KEYS = ["Ticket", "Ticket #", "TicketID", "ID", "id", "ticket"]
+
+
+class SysAidApiError(Exception):
+    """Raised when a SysAid API request fails permanently."""
+    pass
+
+
+class SysAidApiClient:
+    """
+    Concurrent, paginated SysAid API client with connection pooling.
+
+    Ticket lists are requested as pages using offset/limit query parameters.
+    Servers that ignore the paging parameters (returning the whole list on
+    every request) or cap the page size below page_size are detected, and
+    paging stops after max_pages pages.
+    When ticket IDs are supplied they are split into pages of at most
+    page_size IDs and only those tickets are requested.
+    """
+
+    def __init__(self, base_url, api_key="", page_size=100, max_concurrency=8,
+                 max_retries=3, backoff_base=2.0, backoff_max=30.0, timeout=30.0,
+                 ids_param="ids", modified_since_param="modified_since", session=None,
+                 max_pages=1000):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: URL of the ticket list endpoint
+            api_key: Bearer token for the Authorization header
+            page_size: Maximum tickets (or ticket IDs) per request
+            max_concurrency: Maximum requests in flight and pooled connections
+            max_retries: Maximum attempts per page
+            backoff_base: Base delay in seconds for exponential back-off
+            backoff_max: Upper bound for a single back-off delay in seconds
+            timeout: Per-request timeout in seconds
+            ids_param: Query parameter used to request specific ticket IDs
+            modified_since_param: Query parameter used for delta fetches
+            session: Optional pre-configured requests.Session
+            max_pages: Maximum pages requested when fetching all tickets
+        """
+        self.base_url = base_url
+        self.api_key = api_key
+        self.page_size = max(1, int(page_size))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_retries = max(1, int(max_retries))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.ids_param = ids_param
+        self.modified_since_param = modified_since_param
+        self.max_pages = max(1, int(max_pages))
+        self.session = session or self._create_session()
+
+        # Request statistics for logging, updated from the executor threads
+        self._stats_lock = threading.Lock()
+        self.request_count = 0
+        self.retry_count = 0
+
+    def _create_session(self):
+        """
+        Create a requests session with a connection pool sized for concurrency.
+
+        Returns:
+            requests.Session: Session with keep-alive connection pooling
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        if self.api_key:
+            session.headers["Authorization"] = f"Bearer {self.api_key}"
+        session.headers["Accept"] = "application/json"
+
+        return session
+
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def fetch_tickets(self, ticket_ids=None, modified_since=None):
+        """
+        Fetch tickets from the API.
+
+        Args:
+            ticket_ids: Optional iterable of ticket IDs to fetch; all tickets
+                are fetched page by page when omitted
+            modified_since: Optional timestamp; when fetching all tickets, only
+                tickets modified since then are requested
+
+        Returns:
+            list: Ticket records (dicts)
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.fetch_tickets_async(ticket_ids, modified_since))
+
+        # asyncio.run() cannot nest inside a running loop (the service, a
+        # notebook), so run the fetch on a fresh loop in a worker thread
+        with ThreadPoolExecutor(max_workers=1) as runner:
+            return runner.submit(asyncio.run, self.fetch_tickets_async(ticket_ids, modified_since)).result()
+
+    async def fetch_tickets_async(self, ticket_ids=None, modified_since=None):
+        """
+        Fetch tickets from the API concurrently.
+
+        Args:
+            ticket_ids: Optional iterable of ticket IDs to fetch
+            modified_since: Optional timestamp for a delta fetch
+
+        Returns:
+            list: Ticket records (dicts)
+        """
+        start_time = time.time()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            if ticket_ids is not None:
+                records = await self._fetch_by_ids(ticket_ids, semaphore, executor)
+            else:
+                extra_params = {self.modified_since_param: modified_since} if modified_since else None
+                records = await self._fetch_all_pages(semaphore, executor, extra_params)
+
+        log_message(f"Fetched {len(records)} SysAid tickets in {self.request_count} requests "
+                    f"({self.retry_count} retries) in {time.time() - start_time:.2f}s")
+        return records
+
+    async def _fetch_by_ids(self, ticket_ids, semaphore, executor):
+        """
+        Fetch specific tickets, one page of IDs per request.
+
+        Args:
+            ticket_ids: Iterable of ticket IDs
+            semaphore: Semaphore bounding requests in flight
+            executor: Executor running the blocking requests
+
+        Returns:
+            list: Ticket records
+        """
+        unique_ids = sorted({str(ticket_id) for ticket_id in ticket_ids})
+        if not unique_ids:
+            return []
+
+        chunks = [unique_ids[i:i + self.page_size] for i in range(0, len(unique_ids), self.page_size)]
+        log_message(f"Requesting {len(unique_ids)} SysAid tickets in {len(chunks)} pages")
+
+        pages = await asyncio.gather(*[
+            self._fetch_page({self.ids_param: ",".join(chunk), "limit": len(chunk)}, semaphore, executor)
+            for chunk in chunks
+        ])
+        return [record for page in pages for record in page]
+
+    async def _fetch_all_pages(self, semaphore, executor, extra_params=None):
+        """
+        Fetch every ticket, requesting pages in concurrent waves.
+
+        A wave of max_concurrency pages is requested at once; fetching stops
+        at the first short (final) page. Paging also stops when the server
+        ignores it: a page longer than page_size or one repeating tickets
+        already seen is the whole list again. A short first page may mean the
+        server caps the page size, so the next offset is probed once with
+        the page size the server returned.
+
+        Args:
+            semaphore: Semaphore bounding requests in flight
+            executor: Executor running the blocking requests
+            extra_params: Optional query parameters added to every page
+
+        Returns:
+            list: Ticket records
+        """
+        records = []
+        seen = set()
+        offset = 0
+        page_size = self.page_size
+        pages_fetched = 0
+
+        while True:
+            offsets = [offset + i * page_size for i in range(self.max_concurrency)]
+            pages = await asyncio.gather(*[
+                self._fetch_page(dict(extra_params or {}, offset=page_offset, limit=self.page_size),
+                                 semaphore, executor)
+                for page_offset in offsets
+            ])
+
+            for page in pages:
+                pages_fetched += 1
+                page_ids = [self._record_id(record) for record in page]
+                new_records = [record for record, record_id in zip(page, page_ids) if record_id not in seen]
+                records.extend(new_records)
+                seen.update(page_ids)
+
+                if len(page) > self.page_size or len(new_records) < len(page):
+                    log_message(f"SysAid API ignores offset/limit paging, using the {len(records)} tickets "
+                                f"received in {pages_fetched} requests", "WARNING")
+                    return records
+                if len(page) < page_size:
+                    if pages_fetched == 1 and page and page_size == self.page_size:
+                        # Possibly capped below page_size; probe the next offset
+                        page_size = len(page)
+                        break
+                    return records
+                if pages_fetched >= self.max_pages:
+                    log_message(f"Stopped SysAid API paging after {self.max_pages} pages "
+                                f"({len(records)} tickets); raise max_pages if more are expected", "WARNING")
+                    return records
+            else:
+                offset = offsets[-1] + page_size
+                continue
+
+            # Restart after the probe decision, at the end of what was received
+            offset = len(records)
+
+    @staticmethod
+    def _record_id(record):
+        """
+        Identify a ticket record by its ticket number, or its content if it has none.
+
+        Args:
+            record: Ticket record
+
+        Returns:
+            str: Record identity
+        """
+        if isinstance(record, dict):
+            for key in RECORD_ID_KEYS:
+                if record.get(key) not in (None, ""):
+                    return str(record[key])
+        return json.dumps(record, sort_keys=True, default=str)
+
+    async def _fetch_page(self, params, semaphore, executor):
+        """
+        Fetch a single page while holding the concurrency semaphore.
+
+        Args:
+            params: Query parameters for the page
+            semaphore: Semaphore bounding requests in flight
+            executor: Executor running the blocking request
+
+        Returns:
+            list: Ticket records on the page
+        """
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(1, self.max_retries + 1):
+            async with semaphore:
+                retry, result = await loop.run_in_executor(executor, self._get_page, params)
+
+            if not retry:
+                return result
+
+            if attempt < self.max_retries:
+                with self._stats_lock:
+                    self.retry_count += 1
+                delay = self._backoff_delay(attempt)
+                log_message(f"SysAid API page {params} failed ({result}), retrying in {delay:.2f}s "
+                            f"(attempt {attempt} of {self.max_retries})", "WARNING")
+                await asyncio.sleep(delay)
+
+        raise SysAidApiError(f"All {self.max_retries} attempts failed for SysAid API page {params}: {result}")
+
+    def _get_page(self, params):
+        """
+        Perform one blocking GET request.
+
+        Args:
+            params: Query parameters
+
+        Returns:
+            Tuple of (retry, result) where result is the record list on success
+            or a short error description when the request should be retried
+        """
+        with self._stats_lock:
+            self.request_count += 1
+
+        try:
+            response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            return True, str(e)
+
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            return True, f"HTTP {response.status_code}"
+
+        if response.status_code != 200:
+            raise SysAidApiError(f"SysAid API request failed with status code "
+                                 f"{response.status_code}: {response.text[:200]}")
+
+        return False, self._extract_records(response.json())
+
+    def _backoff_delay(self, attempt):
+        """
+        Compute an exponential back-off delay with full jitter.
+
+        Args:
+            attempt: Number of the attempt that just failed (1-based)
+
+        Returns:
+            float: Delay in seconds
+        """
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    @staticmethod
+    def _extract_records(payload):
+        """
+        Extract the ticket list from a JSON response.
+
+        Args:
+            payload: Decoded JSON response
+
+        Returns:
+            list: Ticket records
+        """
+        if isinstance(payload, list):
+            return payload
+
+        if isinstance(payload, dict):
+            for key in RESPONSE_LIST_KEYS:
+                if isinstance(payload.get(key), list):
+                    return payload[key]
+
+        raise SysAidApiError(f"Unexpected SysAid API response type: {type(payload).__name__}")
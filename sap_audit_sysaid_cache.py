@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - SysAid Cache Module
+
+This module provides the persistent caches used by the SysAid integration:
+1. SysAidTicketCache - per-ticket cache for SysAid API data (SQLite)
+2. SessionMapCache - session-to-ticket map keyed by stable session fingerprints
+
+Key features:
+- One row per standardized ticket with its fetch time, status and modify time
+- Per-status time-to-live; closed tickets never expire
+- Bulk lookups that split requested tickets into fresh and stale/missing
+- Short-lived negative entries for tickets the API did not return, so
+  deleted or mistyped ticket numbers are not requested on every run
+- Last-sync bookkeeping for delta sync on modified-since timestamps
+- Session fingerprints (user, first timestamp, ticket) that survive the
+  per-run renumbering of session IDs
+- Compact, memory-mapped binary session map with atomic writes and LRU eviction
+"""
+
+import os
+import json
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from sap_audit_utils import log_message
+
+# Statuses treated as final: tickets in these states are never refetched
+DEFAULT_CLOSED_STATUSES = ["closed", "verified closed", "cancelled", "canceled"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    ticket      TEXT PRIMARY KEY,
+    status      TEXT,
+    modified_at TEXT,
+    fetched_at  REAL NOT NULL,
+    data        TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS not_found (
+    ticket     TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SysAidTicketCache:
+    """
+    Persistent per-ticket SysAid cache backed by SQLite.
+
+    Tickets are keyed by their standardized ticket number. Freshness is
+    decided per ticket from its status: closed statuses never expire, statuses
+    listed in status_ttl use their own TTL and everything else uses default_ttl.
+    Tickets the API did not return are remembered for not_found_ttl.
+    """
+
+    def __init__(self, db_path, default_ttl=86400, status_ttl=None, closed_statuses=None,
+                 not_found_ttl=3600):
+        """
+        Open (and create if needed) the cache database.
+
+        Args:
+            db_path: Path to the SQLite database file
+            default_ttl: TTL in seconds for statuses without a specific TTL
+            status_ttl: Optional dict of {status: ttl_seconds}
+            closed_statuses: Statuses that never expire
+            not_found_ttl: Seconds before a ticket the API did not return is
+                requested again
+        """
+        self.db_path = db_path
+        self.default_ttl = default_ttl
+        self.not_found_ttl = not_found_ttl
+        self.status_ttl = {str(k).lower(): v for k, v in (status_ttl or {}).items()}
+        self.closed_statuses = {s.lower() for s in (closed_statuses or DEFAULT_CLOSED_STATUSES)}
+
+        cache_dir = os.path.dirname(db_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def ttl_for_status(self, status):
+        """
+        Get the TTL for a ticket status.
+
+        Args:
+            status: Ticket status (any case)
+
+        Returns:
+            float or None: TTL in seconds, or None if the ticket never expires
+        """
+        status = str(status or "").strip().lower()
+        if status in self.closed_statuses:
+            return None
+        return self.status_ttl.get(status, self.default_ttl)
+
+    def _is_fresh(self, status, fetched_at, now):
+        ttl = self.ttl_for_status(status)
+        return ttl is None or (now - fetched_at) <= ttl
+
+    def lookup(self, ticket_ids):
+        """
+        Look up many tickets at once.
+
+        Args:
+            ticket_ids: Iterable of standardized ticket IDs
+
+        Returns:
+            Tuple of (records, stale_ids) where records is a list of cached
+            ticket dicts that are still fresh and stale_ids lists the requested
+            tickets that are missing or expired (tickets recently reported as
+            not found are neither)
+        """
+        wanted = sorted({str(ticket_id) for ticket_id in ticket_ids})
+        if not wanted:
+            return [], []
+
+        # Join against a temporary table instead of a long IN (...) list
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (ticket TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM wanted")
+        self.conn.executemany("INSERT OR IGNORE INTO wanted (ticket) VALUES (?)", [(t,) for t in wanted])
+        rows = self.conn.execute(
+            "SELECT t.ticket, t.status, t.fetched_at, t.data FROM tickets t JOIN wanted w ON t.ticket = w.ticket"
+        ).fetchall()
+
+        now = time.time()
+        records = []
+        fresh_ids = set()
+        for ticket, status, fetched_at, data in rows:
+            if self._is_fresh(status, fetched_at, now):
+                records.append(json.loads(data))
+                fresh_ids.add(ticket)
+
+        not_found = self.conn.execute(
+            "SELECT n.ticket FROM not_found n JOIN wanted w ON n.ticket = w.ticket WHERE n.fetched_at >= ?",
+            (now - self.not_found_ttl,)
+        ).fetchall()
+        fresh_ids.update(ticket for (ticket,) in not_found)
+
+        stale_ids = [ticket for ticket in wanted if ticket not in fresh_ids]
+        return records, stale_ids
+
+    def all_records(self):
+        """
+        Get every cached ticket regardless of age.
+
+        Returns:
+            list: Cached ticket dicts
+        """
+        return [json.loads(data) for (data,) in self.conn.execute("SELECT data FROM tickets ORDER BY ticket")]
+
+    def upsert(self, sysaid_df, status_col=None, modified_col=None):
+        """
+        Insert or replace tickets from a standardized SysAid DataFrame.
+
+        Args:
+            sysaid_df: DataFrame with a 'Standardized_SysAid' column
+            status_col: Name of the status column (optional)
+            modified_col: Name of the modify-time column (optional)
+
+        Returns:
+            int: Number of tickets written
+        """
+        if sysaid_df is None or len(sysaid_df) == 0:
+            return 0
+
+        now = time.time()
+        tickets = sysaid_df['Standardized_SysAid'].astype(str).tolist()
+        statuses = sysaid_df[status_col].astype(str).tolist() if status_col in sysaid_df.columns else [None] * len(tickets)
+        modified = sysaid_df[modified_col].astype(str).tolist() if modified_col in sysaid_df.columns else [None] * len(tickets)
+        payloads = [json.dumps(record, default=str) for record in sysaid_df.to_dict(orient="records")]
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO tickets (ticket, status, modified_at, fetched_at, data) VALUES (?, ?, ?, ?, ?)",
+            [row + (now,) + (payload,) for row, payload in zip(zip(tickets, statuses, modified), payloads)]
+        )
+        self.conn.executemany("DELETE FROM not_found WHERE ticket = ?", [(t,) for t in tickets])
+        self.conn.commit()
+        return len(tickets)
+
+    def mark_not_found(self, ticket_ids):
+        """
+        Remember tickets that were requested but not returned by the API.
+
+        Args:
+            ticket_ids: Standardized ticket IDs
+
+        Returns:
+            int: Number of tickets recorded
+        """
+        now = time.time()
+        rows = [(str(ticket_id), now) for ticket_id in ticket_ids]
+        self.conn.executemany("INSERT OR REPLACE INTO not_found (ticket, fetched_at) VALUES (?, ?)", rows)
+        self.conn.commit()
+        return len(rows)
+
+    def get_last_sync(self):
+        """
+        Get the time of the last successful sync.
+
+        Returns:
+            str or None: ISO timestamp (UTC) of the last sync
+        """
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'last_sync'").fetchone()
+        return row[0] if row else None
+
+    def set_last_sync(self, timestamp):
+        """
+        Record the time of a successful sync.
+
+        Args:
+            timestamp: ISO timestamp (UTC) taken before the sync started
+        """
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_sync', ?)", (timestamp,))
+        self.conn.commit()
+
+    def count(self):
+        """Return the number of cached tickets."""
+        return self.conn.execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+
+
+# Session map file format; bump the version when SESSION_MAP_DTYPE changes
+SESSION_MAP_VERSION = 1
+SESSION_MAP_DTYPE = np.dtype([
+    ("fingerprint", "<u8"),
+    ("ticket", "<U64"),
+    ("last_used", "<f8")
+])
+
+# Recency is only refreshed for entries last used longer ago than this, so
+# runs that only hit recently used entries leave the file untouched
+SESSION_MAP_RECENCY_RESOLUTION = 86400
+
+
+def session_fingerprints(df, session_col, user_col=None, time_col=None, sysaid_col=None):
+    """
+    Compute a stable fingerprint for every session.
+
+    The fingerprint hashes the session's user, first timestamp and first
+    SysAid reference, so the same session gets the same key in every run even
+    though session IDs (S0001, S0002, ...) are renumbered each time. Missing
+    columns are left out of the key.
+
+    Args:
+        df: Session timeline DataFrame
+        session_col: Name of the session column
+        user_col: Name of the user column (optional)
+        time_col: Name of the datetime column (optional)
+        sysaid_col: Name of the raw SysAid column (optional)
+
+    Returns:
+        Series of uint64 fingerprints indexed by session ID (as string)
+    """
+    key_cols = [col for col in (user_col, time_col, sysaid_col) if col and col in df.columns]
+    if not key_cols:
+        # Nothing stable to key on; fall back to the session ID itself
+        key_cols = [session_col]
+
+    ordered = df.sort_values(time_col, kind="stable") if time_col in key_cols else df
+    first = ordered.groupby(ordered[session_col].astype(str), sort=False)[key_cols].first()
+    fingerprints = pd.util.hash_pandas_object(first.astype(str), index=False)
+    return pd.Series(fingerprints.to_numpy(dtype=np.uint64), index=first.index)
+
+
+class SessionMapCache:
+    """
+    Session-to-SysAid map keyed by session fingerprint.
+
+    Entries are kept in a NumPy structured array sorted by fingerprint, so
+    lookups for a whole timeline are a single vectorized binary search. The
+    file is memory-mapped on load, rewritten atomically (temp file + rename)
+    and bounded to max_entries by evicting the least recently used entries.
+    Recency is tracked at a resolution of SESSION_MAP_RECENCY_RESOLUTION
+    seconds, so the file is only rewritten on inserts, evictions or the first
+    hit of an entry in a day.
+    """
+
+    def __init__(self, path, max_entries=100000):
+        """
+        Open the session map cache.
+
+        Args:
+            path: Path to the .npy cache file
+            max_entries: Maximum number of sessions kept
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._entries = self._load()
+        self._dirty = False
+
+    def _load(self):
+        """
+        Load (memory-map) the cache file.
+
+        Returns:
+            numpy structured array of entries (empty if missing or incompatible)
+        """
+        if not os.path.exists(self.path):
+            return np.empty(0, dtype=SESSION_MAP_DTYPE)
+
+        try:
+            entries = np.load(self.path, mmap_mode="r")
+            if entries.dtype != SESSION_MAP_DTYPE:
+                log_message(f"Ignoring session map cache with incompatible format: {self.path}", "WARNING")
+                return np.empty(0, dtype=SESSION_MAP_DTYPE)
+            return entries
+        except Exception as e:
+            log_message(f"Error loading session map cache: {str(e)}", "WARNING")
+            return np.empty(0, dtype=SESSION_MAP_DTYPE)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, fingerprints):
+        """
+        Look up tickets for many sessions at once.
+
+        Args:
+            fingerprints: Array-like of uint64 session fingerprints
+
+        Returns:
+            numpy object array of tickets, with None where no entry exists
+        """
+        fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        keys = self._entries["fingerprint"]
+        if len(keys) == 0:
+            return np.full(len(fingerprints), None, dtype=object)
+
+        positions = np.minimum(np.searchsorted(keys, fingerprints), len(keys) - 1)
+        found = keys[positions] == fingerprints
+
+        tickets = np.full(len(fingerprints), None, dtype=object)
+        tickets[found] = self._entries["ticket"][positions[found]]
+
+        # Refresh recency of hit entries for LRU eviction, skipping entries
+        # already used recently so all-hit runs do not rewrite the file
+        now = time.time()
+        hits = np.unique(positions[found])
+        aged = hits[self._entries["last_used"][hits] < now - SESSION_MAP_RECENCY_RESOLUTION]
+        if len(aged):
+            self._materialize()
+            self._entries["last_used"][aged] = now
+            self._dirty = True
+
+        return tickets
+
+    def update(self, fingerprints, tickets):
+        """
+        Insert or replace entries.
+
+        Args:
+            fingerprints: Array-like of uint64 session fingerprints
+            tickets: Array-like of tickets aligned with fingerprints
+        """
+        fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        if len(fingerprints) == 0:
+            return
+
+        new_entries = np.empty(len(fingerprints), dtype=SESSION_MAP_DTYPE)
+        new_entries["fingerprint"] = fingerprints
+        new_entries["ticket"] = np.asarray(tickets, dtype=str)
+        new_entries["last_used"] = time.time()
+
+        # New entries come last, so keeping the last duplicate lets them win
+        merged = np.concatenate([np.asarray(self._entries), new_entries])
+        order = np.argsort(merged["fingerprint"], kind="stable")
+        merged = merged[order]
+        is_last = np.append(merged["fingerprint"][1:] != merged["fingerprint"][:-1], True)
+        merged = merged[is_last]
+
+        # Evict least recently used entries beyond the size bound
+        if len(merged) > self.max_entries:
+            keep = np.sort(np.argsort(merged["last_used"], kind="stable")[-self.max_entries:])
+            log_message(f"Evicting {len(merged) - self.max_entries} least recently used session map entries")
+            merged = merged[keep]
+
+        self._entries = merged
+        self._dirty = True
+
+    def save(self):
+        """
+        Write the cache atomically if anything changed.
+
+        Returns:
+            bool: True if the file was written
+        """
+        if not self._dirty:
+            return False
+
+        cache_dir = os.path.dirname(self.path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        # Release the memory map before replacing the file it points to
+        self._materialize()
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.save(f, self._entries)
+        os.replace(temp_path, self.path)
+
+        self._dirty = False
+        return True
+
+    def _materialize(self):
+        """Copy memory-mapped entries into memory so they can be modified."""
+        if isinstance(self._entries, np.memmap):
+            self._entries = np.array(self._entries)
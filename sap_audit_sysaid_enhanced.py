@@ -16,6 +16,9 @@ import json
 import re
 from datetime import datetime
 
+# Shared SysAid normalization (single implementation for all SysAid paths)
+from sap_audit_utils import standardize_sysaid_value, standardize_sysaid_series, resolve_session_sysaid
+
 # Import common utilities
 try:
     from sap_audit_utils import log_message
@@ -83,30 +86,17 @@ def standardize_sysaid(value):
     - Values with SR/CR prefixes (SR-120568)
     - Plain numeric values (120568)
     - Empty or None values (returns "UNKNOWN")
-    """
-    if not value or pd.isna(value) or str(value).strip() == '':
-        return "UNKNOWN"
-    
-    value = str(value).strip()
-    
-    # Log original value in debug mode
-    if DEBUG:
-        log_message(f"Standardizing SysAid: '{value}'", "DEBUG")
     
-    # Remove hash prefix
-    value = re.sub(r'^#', '', value)
-    
-    # Remove SR- or CR- prefixes
-    value = re.sub(r'^(SR|CR)-', '', value)
-    
-    # Remove commas
-    value = value.replace(',', '')
+    Delegates to the shared implementation in sap_audit_utils; use
+    standardize_sysaid_series for whole columns.
+    """
+    standardized = standardize_sysaid_value(value)
     
     # Log the standardized value in debug mode
     if DEBUG:
-        log_message(f"Standardized to: '{value}'", "DEBUG")
+        log_message(f"Standardized SysAid '{value}' to '{standardized}'", "DEBUG")
     
-    return value
+    return standardized
 
 def get_sysaid_column(df, column_options):
     """
@@ -195,7 +185,7 @@ def load_sysaid_data():
         sysaid_df[SYSAID_TICKET_COL] = sysaid_df[SYSAID_TICKET_COL].astype(str)
         
         # Add standardized column
-        sysaid_df['Standardized_SysAid'] = sysaid_df[SYSAID_TICKET_COL].apply(standardize_sysaid)
+        sysaid_df['Standardized_SysAid'] = standardize_sysaid_series(sysaid_df[SYSAID_TICKET_COL])
         
         # Record count for completeness tracking
         record_count = len(sysaid_df)
@@ -260,53 +250,20 @@ def map_sessions_to_sysaid(df, session_col, sysaid_col):
         session_to_sysaid = cached_map
         log_message(f"Using cached session mapping with {len(cached_map)} entries")
     
-    # Get unique session IDs
-    session_ids = df[session_col].unique()
-    log_message(f"Mapping {len(session_ids)} unique sessions to SysAid values")
+    # Resolve every session in one grouped pass
+    resolved = resolve_session_sysaid(df, session_col, sysaid_col)
+    log_message(f"Mapping {len(resolved)} unique sessions to SysAid values")
     
-    # Keep track of new or updated mappings
-    updated_mappings = False
+    # Cached known tickets win; everything else takes the freshly resolved value
+    cached = pd.Series(session_to_sysaid, dtype=object).reindex(resolved.index)
+    needs_update = cached.isna() | (cached == "UNKNOWN")
+    if DEBUG:
+        log_message(f"Using cached mappings for {int((~needs_update).sum())} sessions", "DEBUG")
+    updates = resolved[needs_update]
+    session_to_sysaid.update(updates.to_dict())
     
-    for session_id in session_ids:
-        # Skip if already in cached map
-        if str(session_id) in session_to_sysaid and session_to_sysaid[str(session_id)] != "UNKNOWN":
-            if DEBUG:
-                log_message(f"Using cached mapping for session {session_id}: {session_to_sysaid[str(session_id)]}", "DEBUG")
-            continue
-        
-        subset = df[df[session_col] == session_id]
-        sysaid_values = subset[sysaid_col].dropna().unique()
-        
-        # Skip if no SysAid values
-        if len(sysaid_values) == 0:
-            session_to_sysaid[str(session_id)] = "UNKNOWN"
-            continue
-        
-        # Standardize all SysAid values in this session
-        std_values = [standardize_sysaid(val) for val in sysaid_values]
-        unique_std_values = list(set(std_values))
-        
-        # Remove UNKNOWN from the unique values
-        non_unknown = [val for val in unique_std_values if val != "UNKNOWN"]
-        
-        # If we have non-UNKNOWN values, use those
-        if non_unknown:
-            # If only one, use it
-            if len(non_unknown) == 1:
-                session_to_sysaid[str(session_id)] = non_unknown[0]
-            else:
-                # Multiple non-UNKNOWN, take the most frequent
-                value_counts = {}
-                for val in std_values:
-                    if val != "UNKNOWN":
-                        value_counts[val] = value_counts.get(val, 0) + 1
-                
-                most_common = max(value_counts.items(), key=lambda x: x[1])[0]
-                session_to_sysaid[str(session_id)] = most_common
-        else:
-            session_to_sysaid[str(session_id)] = "UNKNOWN"
-        
-        updated_mappings = True
+    # Only rewrite the cache when a mapping actually changed
+    updated_mappings = bool((updates != cached[needs_update]).any())
     
     # Log the mapping results
     log_message(f"Session to SysAid mapping results:")
@@ -469,7 +426,7 @@ def merge_sysaid_data(session_df, sysaid_df):
                 log_message(f"Found SysAid column in session data: {SAP_SYSAID_COL}")
                 
                 # Add standardized SysAid column
-                result_df['Standardized_SysAid'] = result_df[SAP_SYSAID_COL].apply(standardize_sysaid)
+                result_df['Standardized_SysAid'] = standardize_sysaid_series(result_df[SAP_SYSAID_COL])
                 log_message("Added standardized SysAid column to session data")
                 
                 # Map sessions to SysAid values
@@ -20,39 +20,30 @@ import pandas as pd
 import json
 import re
 import time
-from datetime import datetime
+from datetime import datetime, timezone
 from abc import ABC, abstractmethod
-import requests
 from typing import Dict, List, Optional, Union, Any, Tuple
 
 # Import configuration and utilities
-from sap_audit_config import PATHS, SYSAID
+from sap_audit_context import AuditContext
 from sap_audit_utils import (
     log_message, log_section, log_error, handle_exception,
-    clean_whitespace, validate_required_columns
+    clean_whitespace, validate_required_columns,
+    standardize_sysaid_value, standardize_sysaid_series,
+    resolve_session_sysaid, SYSAID_UNKNOWN
+)
+from sap_audit_sysaid_api import SysAidApiClient
+from sap_audit_sysaid_cache import (
+    SysAidTicketCache, DEFAULT_CLOSED_STATUSES,
+    SessionMapCache, SESSION_MAP_VERSION, session_fingerprints
 )
-
-# Import record counter if available
-try:
-    from sap_audit_record_counts import record_counter
-except ImportError:
-    # Placeholder if record counter is not available
-    class RecordCounter:
-        def update_source_counts(self, source_type, file_name, original_count, final_count):
-            log_message(f"Record counts: {source_type} - {file_name}: {original_count} → {final_count}")
-        
-        def update_timeline_count(self, total_records, source_counts=None):
-            pass
-        
-        def get_counts_for_report(self):
-            return {"completeness_score": 0, "source_files": []}
-    
-    record_counter = RecordCounter()
 
 # Constants
 SYSAID_TICKET_COL_OPTIONS = ['Ticket', 'Ticket #', 'TicketID', 'ID', 'ticket', 'SysAid #', 'SYSAID#', 'SYSAID']
 SESSION_COL_OPTIONS = ['Session ID', 'SESSION ID', 'SessionID', 'Session', 'Session ID with Date']
 SAP_SYSAID_COL_OPTIONS = ['SYSAID#', 'SysAid#', 'SYSAID', 'SysAid', 'Ticket', 'Ticket #']
+USER_COL_OPTIONS = ['User', 'USER', 'Username', 'USERNAME']
+DATETIME_COL_OPTIONS = ['Datetime', 'DATETIME', 'Timestamp']
 
 
 class SysAidDataStrategy(ABC):
@@ -63,21 +54,27 @@ class SysAidDataStrategy(ABC):
     such as from files or APIs.
     """
     
-    def __init__(self, config=None):
+    def __init__(self, config=None, context=None):
         """
         Initialize with optional custom configuration.
         
         Args:
             config: Dictionary with configuration overrides
+            context: AuditContext of the run (defaults to the global configuration)
         """
-        self.config = config or SYSAID
-        self.paths = PATHS
+        self.context = context or AuditContext.default()
+        self.config = config or self.context.sysaid
+        self.paths = self.context.paths
     
     @abstractmethod
-    def load_data(self):
+    def load_data(self, ticket_ids=None):
         """
         Load SysAid ticket information.
         
+        Args:
+            ticket_ids: Optional standardized ticket IDs referenced by the timeline;
+                strategies that can fetch selectively only load these tickets
+            
         Returns:
             DataFrame with SysAid data, or None if loading fails
         """
@@ -100,21 +97,19 @@ class SysAidDataStrategy(ABC):
         Returns:
             str: Standardized ticket number
         """
-        if not value or pd.isna(value) or str(value).strip() == '':
-            return "UNKNOWN"
-        
-        value = str(value).strip()
-        
-        # Remove hash prefix
-        value = re.sub(r'^#', '', value)
-        
-        # Remove SR- or CR- prefixes
-        value = re.sub(r'^(SR|CR)-', '', value)
-        
-        # Remove commas
-        value = value.replace(',', '')
+        return standardize_sysaid_value(value)
+    
+    def standardize_sysaid_column(self, values):
+        """
+        Standardize a whole column of SysAid ticket numbers.
         
-        return value
+        Args:
+            values: Series of raw SysAid ticket values
+            
+        Returns:
+            Series: Standardized ticket numbers aligned to the input index
+        """
+        return standardize_sysaid_series(values)
     
     def get_column_match(self, df, column_options):
         """
@@ -147,10 +142,13 @@ class SysAidFileStrategy(SysAidDataStrategy):
     Strategy for loading SysAid data from an Excel file.
     """
     
-    def load_data(self):
+    def load_data(self, ticket_ids=None):
         """
         Load SysAid ticket information from an Excel file.
         
+        The whole export is always loaded; ticket_ids is accepted for
+        interface compatibility.
+        
         Returns:
             DataFrame with SysAid data, or None if loading fails
         """
@@ -187,7 +185,7 @@ class SysAidFileStrategy(SysAidDataStrategy):
             sysaid_df[ticket_col] = sysaid_df[ticket_col].astype(str)
             
             # Add standardized column
-            sysaid_df['Standardized_SysAid'] = sysaid_df[ticket_col].apply(self.standardize_sysaid)
+            sysaid_df['Standardized_SysAid'] = self.standardize_sysaid_column(sysaid_df[ticket_col])
             
             # Record count for completeness tracking
             record_count = len(sysaid_df)
@@ -198,7 +196,7 @@ class SysAidFileStrategy(SysAidDataStrategy):
             log_message(f"Found {unique_std_tickets} unique standardized SysAid tickets")
             
             # Update record counter
-            record_counter.update_source_counts(
+            self.context.record_counter.update_source_counts(
                 source_type="sysaid",
                 file_name=file_path,
                 original_count=record_count,
@@ -217,62 +215,62 @@ class SysAidApiStrategy(SysAidDataStrategy):
     Strategy for loading SysAid data from an API.
     """
     
-    def __init__(self, config=None):
+    def __init__(self, config=None, context=None):
         """
         Initialize the API strategy with configuration.
         
         Args:
             config: Dictionary with configuration overrides
+            context: AuditContext of the run (defaults to the global configuration)
         """
-        super().__init__(config)
+        super().__init__(config, context)
         self.api_url = self.config.get("api_url", "")
         self.api_key = self.config.get("api_key", "")
         self.username = self.config.get("username", "")
         self.password = self.config.get("password", "")
-        self.cache_file = os.path.join(self.paths.get("cache_dir", "cache"), "sysaid_api_cache.json")
+        self.cache_file = os.path.join(self.paths.get("cache_dir", "cache"), "sysaid_ticket_cache.db")
         self.max_retries = self.config.get("max_retries", 3)
         self.retry_delay = self.config.get("retry_delay", 2)
         self.cache_ttl = self.config.get("cache_ttl", 86400)  # 24 hours in seconds
+        self.status_ttl = self.config.get("status_ttl", {})
+        self.not_found_ttl = self.config.get("not_found_ttl", 3600)
+        self.closed_statuses = self.config.get("closed_statuses", DEFAULT_CLOSED_STATUSES)
+        self.status_column = self.config.get("status_column", "Status")
+        self.modified_column = self.config.get("modified_column", "Modify time")
+        self.sync_interval = self.config.get("sync_interval", 3600)  # Minimum seconds between delta syncs
+        self.page_size = self.config.get("page_size", 100)
+        self.max_concurrency = self.config.get("max_concurrency", 8)
+        self.request_timeout = self.config.get("request_timeout", 30)
+        self.max_pages = self.config.get("max_pages", 1000)
     
-    def load_data(self):
+    def load_data(self, ticket_ids=None):
         """
-        Load SysAid ticket information from the API.
+        Load SysAid ticket information from the API through the per-ticket cache.
+        
+        With ticket_ids, fresh tickets are served from the cache and only
+        missing or expired ones are fetched. Without ticket_ids, the cache is
+        brought up to date with a delta sync and all cached tickets are returned.
+        
+        Args:
+            ticket_ids: Optional standardized ticket IDs to load; all tickets
+                are loaded when omitted
         
         Returns:
             DataFrame with SysAid data, or None if loading fails
         """
-        # First check if we have a valid cached result
-        cached_data = self._load_from_cache()
-        if cached_data is not None:
-            return cached_data
-        
         try:
-            # Make API request with retries
-            data = self._request_with_retry()
-            
-            if not data:
-                log_message("No data received from SysAid API", "WARNING")
-                return None
-            
-            # Convert to DataFrame
-            sysaid_df = pd.DataFrame(data)
-            
-            # Find the ticket column from our list of options
-            ticket_col = self.get_column_match(sysaid_df, SYSAID_TICKET_COL_OPTIONS)
+            with self._open_cache() as cache:
+                if ticket_ids is not None:
+                    records = self._load_tickets(cache, ticket_ids)
+                else:
+                    self._sync_cache(cache)
+                    records = cache.all_records()
             
-            # If no ticket column found, can't proceed
-            if not ticket_col:
-                log_message(f"No ticket column found in API response. Looked for: {', '.join(SYSAID_TICKET_COL_OPTIONS)}", "WARNING")
+            if not records:
+                log_message("No SysAid data available from API or cache", "WARNING")
                 return None
             
-            # Ensure SysAid ticket column is a string
-            sysaid_df[ticket_col] = sysaid_df[ticket_col].astype(str)
-            
-            # Add standardized column
-            sysaid_df['Standardized_SysAid'] = sysaid_df[ticket_col].apply(self.standardize_sysaid)
-            
-            # Cache the result
-            self._save_to_cache(sysaid_df)
+            sysaid_df = pd.DataFrame(records)
             
             # Record count for completeness tracking
             record_count = len(sysaid_df)
@@ -283,7 +281,7 @@ class SysAidApiStrategy(SysAidDataStrategy):
             log_message(f"Found {unique_std_tickets} unique standardized SysAid tickets")
             
             # Update record counter
-            record_counter.update_source_counts(
+            self.context.record_counter.update_source_counts(
                 source_type="sysaid_api",
                 file_name="api_request",
                 original_count=record_count,
@@ -296,115 +294,161 @@ class SysAidApiStrategy(SysAidDataStrategy):
             log_error(e, "Error loading SysAid data from API")
             return None
     
-    def _request_with_retry(self):
+    def _open_cache(self):
         """
-        Make API request with retries on failure.
+        Open the persistent per-ticket cache.
         
         Returns:
-            dict: API response data
+            SysAidTicketCache: Open cache
+        """
+        return SysAidTicketCache(
+            self.cache_file,
+            default_ttl=self.cache_ttl,
+            status_ttl=self.status_ttl,
+            closed_statuses=self.closed_statuses,
+            not_found_ttl=self.not_found_ttl
+        )
+    
+    def _load_tickets(self, cache, ticket_ids):
         """
-        attempt = 0
-        last_error = None
+        Load specific tickets, fetching only those missing or expired in the cache.
         
-        while attempt < self.max_retries:
-            attempt += 1
-            
-            try:
-                log_message(f"SysAid API request attempt {attempt} of {self.max_retries}...")
-                
-                # Make the API request
-                response = requests.get(
-                    self.api_url,
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    timeout=30
-                )
-                
-                # Check if we got a valid response
-                if response.status_code == 200:
-                    data = response.json()
-                    log_message(f"API request successful: received {len(data)} records")
-                    return data
-                else:
-                    log_message(f"API request failed with status code {response.status_code}: {response.text}", "WARNING")
-                    
-            except Exception as e:
-                last_error = e
-                log_message(f"API request error: {str(e)}", "WARNING")
+        Args:
+            cache: Open SysAidTicketCache
+            ticket_ids: Standardized ticket IDs to load
             
-            # If we're going to retry, wait a bit
-            if attempt < self.max_retries:
-                wait_time = self.retry_delay * attempt
-                log_message(f"Retrying in {wait_time} seconds...")
-                time.sleep(wait_time)
+        Returns:
+            list: Ticket records
+        """
+        records, stale_ids = cache.lookup(ticket_ids)
+        log_message(f"SysAid cache: {len(records)} tickets fresh, {len(stale_ids)} missing or expired")
         
-        # If we get here, all attempts failed
-        log_error(last_error, "All API request attempts failed")
-        return None
+        if not stale_ids:
+            return records
+        
+        data = self._request_with_retry(stale_ids)
+        if data is None:
+            return records
+        
+        fetched_df = self._prepare_frame(data)
+        returned_ids = set()
+        if fetched_df is not None:
+            cache.upsert(fetched_df, self.status_column, self.modified_column)
+            records.extend(fetched_df.to_dict(orient="records"))
+            returned_ids = set(fetched_df['Standardized_SysAid'].astype(str))
+        
+        # Remember deleted, mistyped or invisible tickets so warm runs skip them
+        not_found = [ticket for ticket in stale_ids if ticket not in returned_ids]
+        if not_found:
+            cache.mark_not_found(not_found)
+            log_message(f"{len(not_found)} SysAid tickets not returned by the API, "
+                        f"not requesting them again for {self.not_found_ttl} seconds")
+        
+        return records
     
-    def _load_from_cache(self):
+    def _sync_cache(self, cache):
         """
-        Load SysAid data from cache file if valid.
+        Bring the cache up to date with a delta sync.
         
-        Returns:
-            DataFrame: Cached SysAid data, or None if cache is invalid
+        The first sync fetches every ticket; later syncs only request tickets
+        modified since the previous sync, and are skipped entirely if the
+        previous sync is more recent than sync_interval.
+        
+        Args:
+            cache: Open SysAidTicketCache
+        """
+        last_sync = cache.get_last_sync()
+        if last_sync:
+            age = (datetime.now(timezone.utc) - datetime.fromisoformat(last_sync)).total_seconds()
+            if age < self.sync_interval:
+                log_message(f"SysAid cache synced {age:.0f} seconds ago, skipping API sync")
+                return
+            log_message(f"Delta sync of SysAid tickets modified since {last_sync}")
+        else:
+            log_message("No previous SysAid sync found, fetching all tickets")
+        
+        # Take the timestamp before fetching so changes made during the sync are not missed
+        sync_started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        data = self._request_with_retry(modified_since=last_sync)
+        if data is None:
+            return
+        
+        fetched_df = self._prepare_frame(data)
+        if fetched_df is not None:
+            written = cache.upsert(fetched_df, self.status_column, self.modified_column)
+            log_message(f"Updated {written} SysAid tickets in cache ({cache.count()} cached)")
+        cache.set_last_sync(sync_started)
+    
+    def _prepare_frame(self, data):
         """
-        try:
-            # Check if cache file exists
-            if not os.path.exists(self.cache_file):
-                return None
-            
-            # Check cache file age
-            file_age = time.time() - os.path.getmtime(self.cache_file)
-            if file_age > self.cache_ttl:
-                log_message(f"Cache file expired ({file_age:.1f} seconds old)", "INFO")
-                return None
-            
-            # Load cache
-            log_message(f"Loading SysAid data from cache: {self.cache_file}")
-            with open(self.cache_file, 'r') as f:
-                cache_data = json.load(f)
-            
-            # Convert cache to DataFrame
-            cache_df = pd.DataFrame(cache_data["data"])
-            
-            # Validate cache
-            if len(cache_df) == 0:
-                log_message("Cache file contains no data", "WARNING")
-                return None
-            
-            log_message(f"Loaded {len(cache_df)} SysAid records from cache (created {cache_data['timestamp']})")
-            return cache_df
+        Convert API records into a DataFrame with standardized ticket numbers.
+        
+        Args:
+            data: List of API ticket records
             
-        except Exception as e:
-            log_message(f"Error loading from cache: {str(e)}", "WARNING")
+        Returns:
+            DataFrame, or None if there is no data or no ticket column
+        """
+        if not data:
+            return None
+        
+        sysaid_df = pd.DataFrame(data)
+        
+        # Find the ticket column from our list of options
+        ticket_col = self.get_column_match(sysaid_df, SYSAID_TICKET_COL_OPTIONS)
+        
+        # If no ticket column found, can't proceed
+        if not ticket_col:
+            log_message(f"No ticket column found in API response. Looked for: {', '.join(SYSAID_TICKET_COL_OPTIONS)}", "WARNING")
             return None
+        
+        # Ensure SysAid ticket column is a string
+        sysaid_df[ticket_col] = sysaid_df[ticket_col].astype(str)
+        
+        # Add standardized column
+        sysaid_df['Standardized_SysAid'] = self.standardize_sysaid_column(sysaid_df[ticket_col])
+        
+        return sysaid_df
+    
+    def _create_client(self):
+        """
+        Create a concurrent API client from the strategy configuration.
+        
+        Returns:
+            SysAidApiClient: Configured client
+        """
+        return SysAidApiClient(
+            self.api_url,
+            api_key=self.api_key,
+            page_size=self.page_size,
+            max_concurrency=self.max_concurrency,
+            max_retries=self.max_retries,
+            backoff_base=self.retry_delay,
+            timeout=self.request_timeout,
+            max_pages=self.max_pages
+        )
     
-    def _save_to_cache(self, sysaid_df):
+    def _request_with_retry(self, ticket_ids=None, modified_since=None):
         """
-        Save SysAid data to cache file.
+        Fetch tickets from the API with concurrent, retried page requests.
         
         Args:
-            sysaid_df: DataFrame with SysAid data
+            ticket_ids: Optional ticket IDs to fetch; all tickets when omitted
+            modified_since: Optional timestamp for a delta fetch of all tickets
+        
+        Returns:
+            list: API response records, or None if the requests failed
         """
+        if not self.api_url:
+            log_message("SysAid API URL not configured", "WARNING")
+            return None
+        
         try:
-            # Create cache directory if needed
-            cache_dir = os.path.dirname(self.cache_file)
-            os.makedirs(cache_dir, exist_ok=True)
-            
-            # Prepare cache data
-            cache_data = {
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "data": sysaid_df.to_dict(orient="records")
-            }
-            
-            # Save to cache file
-            with open(self.cache_file, 'w') as f:
-                json.dump(cache_data, f)
-            
-            log_message(f"Saved {len(sysaid_df)} SysAid records to cache")
-            
+            with self._create_client() as client:
+                return client.fetch_tickets(ticket_ids, modified_since)
         except Exception as e:
-            log_message(f"Error saving to cache: {str(e)}", "WARNING")
+            log_error(e, "All API request attempts failed")
+            return None
 
 
 class SysAidIntegrator:
@@ -413,7 +457,7 @@ class SysAidIntegrator:
     Uses Strategy pattern for different data sources.
     """
     
-    def __init__(self, data_source_strategy="file", config=None):
+    def __init__(self, data_source_strategy="file", config=None, context=None):
         """
         Initialize with specified data source strategy.
         
@@ -422,11 +466,13 @@ class SysAidIntegrator:
                 "file" - Load from exported file
                 "api" - Load from API
             config: Dictionary with configuration overrides
+            context: AuditContext of the run (defaults to the global configuration)
         """
-        self.config = config or SYSAID
-        self.paths = PATHS
+        self.context = context or AuditContext.default()
+        self.config = config or self.context.sysaid
         self.strategy = self._create_strategy(data_source_strategy)
-        self.session_map_cache = os.path.join(self.paths.get("cache_dir", "cache"), "sysaid_session_map.json")
+        self.bind_context(self.context)
+        self.session_map_max_entries = self.config.get("session_map_max_entries", 100000)
         self._sysaid_data = None
         self._sysaid_lookup = {}
     
@@ -441,22 +487,43 @@ class SysAidIntegrator:
             SysAidDataStrategy: Configured strategy object
         """
         if strategy_type.lower() == "api":
-            return SysAidApiStrategy(self.config)
+            return SysAidApiStrategy(self.config, self.context)
         else:
-            return SysAidFileStrategy(self.config)
+            return SysAidFileStrategy(self.config, self.context)
+    
+    def bind_context(self, context):
+        """
+        Attach the integrator (and its loaded SysAid data) to another run.
+        
+        Counts and caches of later calls go to the new run; SysAid data that
+        was already loaded is kept.
+        
+        Args:
+            context: AuditContext of the run
+        """
+        self.context = context
+        self.paths = context.paths
+        self.strategy.context = context
+        self.strategy.paths = context.paths
+        self.session_map_cache = os.path.join(
+            self.paths.get("cache_dir", "cache"), f"sysaid_session_map.v{SESSION_MAP_VERSION}.npy"
+        )
     
     @handle_exception
-    def load_sysaid_data(self):
+    def load_sysaid_data(self, ticket_ids=None):
         """
         Load SysAid ticket data using the configured strategy.
         
+        Args:
+            ticket_ids: Optional standardized ticket IDs referenced by the timeline
+        
         Returns:
             DataFrame with SysAid data
         """
         log_section("Loading SysAid Data")
         
         # Use the strategy to load data
-        self._sysaid_data = self.strategy.load_data()
+        self._sysaid_data = self.strategy.load_data(ticket_ids)
         
         # Build lookup for quick reference
         if self._sysaid_data is not None:
@@ -484,14 +551,14 @@ class SysAidIntegrator:
         # Create a copy of the session data
         enhanced_df = session_df.copy()
         
-        # Load SysAid data if not already loaded
-        if self._sysaid_data is None:
-            self.load_sysaid_data()
-        
         # Get column mappings
         session_col = self._get_column_match(enhanced_df, SESSION_COL_OPTIONS)
         sysaid_col = self._get_column_match(enhanced_df, SAP_SYSAID_COL_OPTIONS)
         
+        # Load SysAid data if not already loaded, limited to the referenced tickets
+        if self._sysaid_data is None:
+            self.load_sysaid_data(self._get_referenced_tickets(enhanced_df, sysaid_col))
+        
         # Add SysAid ticket column if it doesn't exist
         if 'SYSAID #' not in enhanced_df.columns:
             enhanced_df['SYSAID #'] = ""
@@ -518,6 +585,23 @@ class SysAidIntegrator:
         
         return enhanced_df
     
+    def _get_referenced_tickets(self, df, sysaid_col):
+        """
+        Get the standardized ticket IDs referenced in the timeline.
+        
+        Args:
+            df: Session timeline DataFrame
+            sysaid_col: Name of SysAid column (optional)
+            
+        Returns:
+            list: Referenced ticket IDs, or None if the timeline has no SysAid column
+        """
+        if not sysaid_col or sysaid_col not in df.columns:
+            return None
+        
+        tickets = standardize_sysaid_series(df[sysaid_col]).unique()
+        return [ticket for ticket in tickets if ticket != SYSAID_UNKNOWN]
+    
     def _build_sysaid_lookup(self):
         """
         Build a lookup dictionary for quick SysAid ticket matching.
@@ -598,6 +682,11 @@ class SysAidIntegrator:
         """
         Map session IDs to SysAid values.
         
+        Sessions are resolved in one grouped pass and matched against the
+        session map cache by a stable fingerprint (user, first timestamp and
+        first SysAid reference), so cached tickets follow the same session
+        across runs even though session IDs are renumbered.
+        
         Args:
             df: Session data DataFrame
             session_col: Name of session column
@@ -606,64 +695,30 @@ class SysAidIntegrator:
         Returns:
             Dict mapping session IDs to SysAid values
         """
-        session_to_sysaid = {}
+        # Resolve every session in one grouped pass
+        resolved = resolve_session_sysaid(df, session_col, sysaid_col)
+        log_message(f"Mapping {len(resolved)} unique sessions to SysAid values")
         
-        # Try to load existing mapping first
-        cached_map = self._load_session_map_cache()
-        if cached_map:
-            session_to_sysaid = cached_map
+        # Fingerprint sessions and look them all up in the cache at once
+        fingerprints = session_fingerprints(
+            df, session_col,
+            user_col=self._get_column_match(df, USER_COL_OPTIONS),
+            time_col=self._get_column_match(df, DATETIME_COL_OPTIONS),
+            sysaid_col=sysaid_col
+        ).reindex(resolved.index)
+        cache = self._load_session_map_cache()
+        cached = pd.Series(cache.lookup(fingerprints.to_numpy()), index=resolved.index, dtype=object)
         
-        # Get unique session IDs
-        session_ids = df[session_col].unique()
-        log_message(f"Mapping {len(session_ids)} unique sessions to SysAid values")
+        # Cached known tickets win; everything else takes the freshly resolved value
+        use_cached = cached.notna() & (cached != SYSAID_UNKNOWN)
+        mapping = resolved.where(~use_cached, cached)
+        log_message(f"  Sessions matched in cache: {int(use_cached.sum())}")
         
-        # Keep track of new or updated mappings
-        updated_mappings = False
+        # Store newly resolved known tickets
+        new_known = ~use_cached & (resolved != SYSAID_UNKNOWN)
+        cache.update(fingerprints[new_known].to_numpy(), resolved[new_known].to_numpy())
         
-        for session_id in session_ids:
-            # Skip if already in cached map
-            if str(session_id) in session_to_sysaid and session_to_sysaid[str(session_id)] != "UNKNOWN":
-                continue
-            
-            subset = df[df[session_col] == session_id]
-            
-            # If we have a SysAid column, use it for mapping
-            if sysaid_col and sysaid_col in df.columns:
-                sysaid_values = subset[sysaid_col].dropna().unique()
-                
-                # Skip if no SysAid values
-                if len(sysaid_values) == 0:
-                    session_to_sysaid[str(session_id)] = "UNKNOWN"
-                    continue
-                
-                # Standardize all SysAid values in this session
-                std_values = [self.strategy.standardize_sysaid(val) for val in sysaid_values]
-                unique_std_values = list(set(std_values))
-                
-                # Remove UNKNOWN from the unique values
-                non_unknown = [val for val in unique_std_values if val != "UNKNOWN"]
-                
-                # If we have non-UNKNOWN values, use those
-                if non_unknown:
-                    # If only one, use it
-                    if len(non_unknown) == 1:
-                        session_to_sysaid[str(session_id)] = non_unknown[0]
-                    else:
-                        # Multiple non-UNKNOWN, take the most frequent
-                        value_counts = {}
-                        for val in std_values:
-                            if val != "UNKNOWN":
-                                value_counts[val] = value_counts.get(val, 0) + 1
-                        
-                        most_common = max(value_counts.items(), key=lambda x: x[1])[0]
-                        session_to_sysaid[str(session_id)] = most_common
-                else:
-                    session_to_sysaid[str(session_id)] = "UNKNOWN"
-            else:
-                # No SysAid column to map from
-                session_to_sysaid[str(session_id)] = "UNKNOWN"
-            
-            updated_mappings = True
+        session_to_sysaid = mapping.to_dict()
         
         # Log the mapping results
         log_message("Session to SysAid mapping results:")
@@ -674,8 +729,7 @@ class SysAidIntegrator:
         log_message(f"  Sessions with unknown SysAid: {unknown_count}")
         
         # Save updated mapping
-        if updated_mappings:
-            self._save_session_map_cache(session_to_sysaid)
+        self._save_session_map_cache(cache)
         
         return session_to_sysaid
     
@@ -765,7 +819,7 @@ class SysAidIntegrator:
         ticket_count = 0
         
         # Add standardized SysAid column
-        df['Standardized_SysAid'] = df[sysaid_col].apply(self.strategy.standardize_sysaid)
+        df['Standardized_SysAid'] = self.strategy.standardize_sysaid_column(df[sysaid_col])
         
         # Apply SysAid data based on standardized values
         for idx, row in df.iterrows():
@@ -795,36 +849,22 @@ class SysAidIntegrator:
         Load the cached session-to-SysAid mapping.
         
         Returns:
-            Dict: Cached mapping, or empty dict if not available
+            SessionMapCache: Cache keyed by session fingerprint
         """
-        try:
-            if os.path.exists(self.session_map_cache):
-                log_message(f"Loading cached session-to-SysAid mapping")
-                with open(self.session_map_cache, 'r') as f:
-                    session_map = json.load(f)
-                
-                log_message(f"Loaded mapping with {len(session_map)} sessions")
-                return session_map
-        except Exception as e:
-            log_message(f"Error loading cached session map: {str(e)}", "WARNING")
-        
-        return {}
+        cache = SessionMapCache(self.session_map_cache, max_entries=self.session_map_max_entries)
+        if len(cache):
+            log_message(f"Loaded cached session-to-SysAid mapping with {len(cache)} sessions")
+        return cache
     
-    def _save_session_map_cache(self, session_map):
+    def _save_session_map_cache(self, cache):
         """
         Save the session-to-SysAid mapping for future use.
         
         Args:
-            session_map: Dict mapping session IDs to SysAid values
+            cache: SessionMapCache to write (only written if it changed)
         """
         try:
-            # Create cache directory if needed
-            cache_dir = os.path.dirname(self.session_map_cache)
-            os.makedirs(cache_dir, exist_ok=True)
-            
-            log_message(f"Saving session-to-SysAid mapping with {len(session_map)} entries")
-            with open(self.session_map_cache, 'w') as f:
-                json.dump(session_map, f, indent=2)
-            log_message(f"Session mapping saved to cache: {self.session_map_cache}")
+            if cache.save():
+                log_message(f"Session mapping saved to cache: {self.session_map_cache} ({len(cache)} entries)")
         except Exception as e:
             log_message(f"Error saving session map: {str(e)}", "WARNING")
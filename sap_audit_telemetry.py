@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Progress and Telemetry Module
+
+This module collects progress of the pipeline stages and of long-running
+steps inside them (risk detectors, per-session pattern analysis) and
+publishes it while the audit runs.
+
+Key features:
+- Progress tasks with rows processed, rows per second, ETA and the
+  session currently being processed
+- Stage timings and row counts fed from the stage scheduler's events
+- Terminal progress display on stderr (one refreshed line on a terminal)
+- Metrics file in Prometheus text format or JSON, rewritten atomically
+  every few seconds by a background thread, so a local scraper also sees
+  a step that stopped making progress (seconds_since_progress keeps rising)
+- Near zero cost when no output is enabled: advancing a task only updates
+  two numbers
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+from sap_audit_logging import current_stage
+
+# Metrics file formats
+FORMAT_PROMETHEUS = "prometheus"
+FORMAT_JSON = "json"
+
+# Metric name prefix in Prometheus output
+METRIC_PREFIX = "sap_audit"
+
+# Finished tasks kept for reporting (a long-lived default context runs many)
+MAX_FINISHED_TASKS = 100
+
+
+class ProgressTask:
+    """
+    Progress of one step, e.g. a risk detector working through the timeline.
+
+    Only the thread running the step advances it; readers take snapshots.
+    """
+
+    def __init__(self, telemetry, name, total=None, unit="rows", stage=None):
+        """
+        Start a task.
+
+        Args:
+            telemetry: Owning Telemetry
+            name: Task name
+            total: Expected units, if known (enables the ETA)
+            unit: Unit of work (rows, sessions, files, sources)
+            stage: Pipeline stage running the task
+        """
+        self.telemetry = telemetry
+        self.name = name
+        self.total = total
+        self.unit = unit
+        self.stage = stage
+        self.done = 0
+        self.session = None
+        self.started = time.time()
+        self.last_progress = self.started
+        self.finished = None
+
+    def advance(self, count=1, session=None):
+        """
+        Record processed units.
+
+        Args:
+            count: Units processed since the last call
+            session: Session currently being processed
+        """
+        self.done += count
+        if session is not None:
+            self.session = session
+        self.last_progress = time.time()
+        self.telemetry._changed(self)
+
+    def update(self, done, session=None):
+        """
+        Set the processed units.
+
+        Args:
+            done: Units processed so far
+            session: Session currently being processed
+        """
+        self.advance(done - self.done, session)
+
+    def finish(self):
+        """Mark the task as finished."""
+        if self.finished is None:
+            self.finished = time.time()
+            if self.total is not None:
+                self.done = max(self.done, self.total)
+            self.telemetry._changed(self, force=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish()
+        return False
+
+    def snapshot(self, now=None):
+        """
+        Return the task's progress.
+
+        Args:
+            now: Time to compute rates against (defaults to the current time)
+
+        Returns:
+            dict: name, stage, unit, done, total, rate, eta_seconds, session,
+                  elapsed_seconds, seconds_since_progress, active
+        """
+        now = now or time.time()
+        end = self.finished or now
+        elapsed = max(end - self.started, 1e-9)
+        rate = self.done / elapsed
+        eta = None
+        if self.finished is None and self.total is not None and rate > 0:
+            eta = max(self.total - self.done, 0) / rate
+        return {
+            "name": self.name,
+            "stage": self.stage,
+            "unit": self.unit,
+            "done": self.done,
+            "total": self.total,
+            "rate": rate,
+            "eta_seconds": eta,
+            "session": self.session,
+            "elapsed_seconds": end - self.started,
+            "seconds_since_progress": 0.0 if self.finished else now - self.last_progress,
+            "active": self.finished is None
+        }
+
+
+class Telemetry:
+    """
+    Progress of one audit run, passed to stages through the AuditContext.
+    """
+
+    def __init__(self):
+        """Initialize without outputs."""
+        self.tasks = []
+        self.stages = {}
+        self.started = time.time()
+        self._reporters = []
+        self._lock = threading.Lock()
+
+    def task(self, name, total=None, unit="rows"):
+        """
+        Start a progress task in the current pipeline stage.
+
+        Args:
+            name: Task name
+            total: Expected units, if known
+            unit: Unit of work
+
+        Returns:
+            ProgressTask: The task (also a context manager that finishes it)
+        """
+        task = ProgressTask(self, name, total, unit, current_stage())
+        with self._lock:
+            finished = [t for t in self.tasks if t.finished is not None]
+            if len(finished) > MAX_FINISHED_TASKS:
+                dropped = set(map(id, finished[:-MAX_FINISHED_TASKS]))
+                self.tasks = [t for t in self.tasks if id(t) not in dropped]
+            self.tasks.append(task)
+        self._changed(task, force=True)
+        return task
+
+    def stage_event(self, event, rows=None):
+        """
+        Record a stage event from the stage scheduler.
+
+        Args:
+            event: Scheduler event (stage, status, start, end, duration)
+            rows: Rows in the timeline after the stage, if known
+        """
+        with self._lock:
+            entry = self.stages.setdefault(event["stage"], {"stage": event["stage"]})
+            entry.update(status=event["status"], duration=event.get("duration"),
+                         started=entry.get("started") or time.time())
+            if rows is not None:
+                entry["rows"] = rows
+        for reporter in list(self._reporters):
+            reporter.update(self, force=True)
+
+    def add_reporter(self, reporter):
+        """Publish progress to a reporter (TerminalProgress or MetricsFile)."""
+        self._reporters.append(reporter)
+        reporter.update(self, force=True)
+
+    def close(self):
+        """Publish the final state and stop the reporters."""
+        reporters, self._reporters = self._reporters, []
+        for reporter in reporters:
+            reporter.close(self)
+
+    def _changed(self, task, force=False):
+        """Pass a task change to the reporters (they throttle themselves)."""
+        for reporter in self._reporters:
+            reporter.update(self, task, force)
+
+    def snapshot(self):
+        """
+        Return the progress of the run.
+
+        Returns:
+            dict: updated (epoch seconds), elapsed_seconds, stages, tasks
+        """
+        now = time.time()
+        with self._lock:
+            tasks = list(self.tasks)
+            stages = [dict(entry) for entry in self.stages.values()]
+        for entry in stages:
+            duration = entry.get("duration")
+            entry["rate"] = entry["rows"] / duration if entry.get("rows") and duration else None
+        return {
+            "updated": now,
+            "elapsed_seconds": now - self.started,
+            "stages": stages,
+            "tasks": [task.snapshot(now) for task in tasks]
+        }
+
+
+def _format_seconds(seconds):
+    """Format a duration as h:mm:ss or m:ss."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def format_progress(task):
+    """
+    Format a task snapshot as one progress line.
+
+    Args:
+        task: Task snapshot
+
+    Returns:
+        str: e.g. "[risk_assessment] debug_sessions 120/500 sessions (45/s, ETA 0:08) session S0001"
+    """
+    done = f"{task['done']}/{task['total']}" if task["total"] is not None else str(task["done"])
+    line = f"[{task['stage'] or '-'}] {task['name']} {done} {task['unit']} ({task['rate']:,.0f}/s"
+    if task["eta_seconds"] is not None:
+        line += f", ETA {_format_seconds(task['eta_seconds'])}"
+    line += ")"
+    if task["session"] is not None:
+        line += f" session {task['session']}"
+    return line
+
+
+class TerminalProgress:
+    """
+    Progress display on stderr: one refreshed line on a terminal, plain lines otherwise.
+    """
+
+    def __init__(self, stream=None, interval=0.5):
+        """
+        Initialize the display.
+
+        Args:
+            stream: Output stream (defaults to sys.stderr)
+            interval: Shortest time between refreshes in seconds
+        """
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.refresh = self.stream.isatty() if hasattr(self.stream, "isatty") else False
+        self._last = 0.0
+        self._width = 0
+
+    def update(self, telemetry, task=None, force=False):
+        """Redraw the progress of a task if the refresh interval has passed."""
+        now = time.time()
+        if task is None or (not force and now - self._last < self.interval):
+            return
+        self._last = now
+        line = format_progress(task.snapshot(now))
+        if self.refresh:
+            self.stream.write("\r" + line.ljust(self._width))
+            self._width = len(line)
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def close(self, telemetry):
+        """End the refreshed line."""
+        if self.refresh and self._width:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+def _label_value(value):
+    """Escape a Prometheus label value."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus(snapshot):
+    """
+    Render a telemetry snapshot in the Prometheus text exposition format.
+
+    Args:
+        snapshot: Telemetry snapshot
+
+    Returns:
+        str: Metrics text
+    """
+    metrics = [
+        ("stage_duration_seconds", "Stage duration", "gauge"),
+        ("stage_rows", "Timeline rows after the stage", "gauge"),
+        ("task_done", "Units processed by the task", "gauge"),
+        ("task_total", "Units the task expects to process", "gauge"),
+        ("task_rate", "Units processed per second", "gauge"),
+        ("task_eta_seconds", "Estimated seconds until the task finishes", "gauge"),
+        ("task_seconds_since_progress", "Seconds since the task last made progress", "gauge"),
+        ("task_active", "Whether the task is still running", "gauge"),
+        ("task_info", "Session currently processed by the task", "gauge")
+    ]
+    samples = {name: [] for name, _, _ in metrics}
+
+    for stage in snapshot["stages"]:
+        labels = f'stage="{_label_value(stage["stage"])}",status="{_label_value(stage["status"])}"'
+        if stage.get("duration") is not None:
+            samples["stage_duration_seconds"].append((labels, stage["duration"]))
+        if stage.get("rows") is not None:
+            samples["stage_rows"].append((labels, stage["rows"]))
+
+    for task in snapshot["tasks"]:
+        labels = (f'task="{_label_value(task["name"])}",stage="{_label_value(task["stage"] or "")}",'
+                  f'unit="{_label_value(task["unit"])}"')
+        samples["task_done"].append((labels, task["done"]))
+        if task["total"] is not None:
+            samples["task_total"].append((labels, task["total"]))
+        samples["task_rate"].append((labels, task["rate"]))
+        if task["eta_seconds"] is not None:
+            samples["task_eta_seconds"].append((labels, task["eta_seconds"]))
+        samples["task_seconds_since_progress"].append((labels, task["seconds_since_progress"]))
+        samples["task_active"].append((labels, int(task["active"])))
+        if task["session"] is not None:
+            samples["task_info"].append((f'{labels},session="{_label_value(task["session"])}"', 1))
+
+    lines = []
+    for name, description, metric_type in metrics:
+        full_name = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {full_name} {description}")
+        lines.append(f"# TYPE {full_name} {metric_type}")
+        lines.extend(f"{full_name}{{{labels}}} {float(value):g}" for labels, value in samples[name])
+    lines.append(f"# HELP {METRIC_PREFIX}_last_update_timestamp_seconds Time the metrics were written")
+    lines.append(f"# TYPE {METRIC_PREFIX}_last_update_timestamp_seconds gauge")
+    lines.append(f"{METRIC_PREFIX}_last_update_timestamp_seconds {snapshot['updated']:.3f}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsFile:
+    """
+    Metrics file rewritten every few seconds for a local scraper.
+    """
+
+    def __init__(self, path, metrics_format=FORMAT_PROMETHEUS, interval=5.0):
+        """
+        Initialize the writer; the background thread starts with the first update.
+
+        Args:
+            path: Metrics file path
+            metrics_format: "prometheus" or "json"
+            interval: Seconds between rewrites
+        """
+        self.path = path
+        self.metrics_format = metrics_format
+        self.interval = interval
+        self._telemetry = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def write(self, telemetry):
+        """Write the current metrics atomically."""
+        snapshot = telemetry.snapshot()
+        if self.metrics_format == FORMAT_JSON:
+            content = json.dumps(snapshot, indent=2, default=str)
+        else:
+            content = render_prometheus(snapshot)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write(self._telemetry)
+            except OSError:
+                # A locked or removed file is retried at the next interval
+                pass
+
+    def update(self, telemetry, task=None, force=False):
+        """Start the periodic writer; stage changes are written at once."""
+        self._telemetry = telemetry
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audit-metrics", daemon=True)
+            self._thread.start()
+        if force and task is None:
+            self.write(telemetry)
+
+    def close(self, telemetry):
+        """Stop the writer and write the final metrics."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write(telemetry)
+
+
+def create_reporters(settings):
+    """
+    Create the reporters enabled in the telemetry settings.
+
+    Args:
+        settings: Telemetry settings (SETTINGS["telemetry"] with any overrides)
+
+    Returns:
+        list: Reporter instances
+    """
+    reporters = []
+    if settings.get("progress"):
+        reporters.append(TerminalProgress())
+    if settings.get("metrics_file"):
+        reporters.append(MetricsFile(settings["metrics_file"], settings.get("metrics_format", FORMAT_PROMETHEUS),
+                                     float(settings.get("interval", 5))))
+    return reporters
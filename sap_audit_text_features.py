@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Text Feature Cache Module
+
+This module provides a shared cache of keyword features for the free-text
+columns of the audit timeline (Description, risk_description, audit log
+message text, variables).
+
+Key features:
+- Registry of named keyword regexes shared by all flag consumers
+- Each text column is factorized and lowercased once per DataFrame
+- Keyword regexes are evaluated on unique strings only
+- Per-string results are memoized across DataFrames, so the analyzer and the
+  output generator share regex work on the same templated messages
+- Boolean feature columns exposed per text column
+
+SM20 messages are templated and have few distinct values, so regex work
+scales with the number of distinct messages rather than the number of rows.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from sap_audit_utils import log_message
+
+# Registered keyword features: name -> (compiled pattern, case_sensitive).
+# Case-insensitive patterns are written in lowercase and matched against
+# lowercased text.
+TEXT_FEATURES = {}
+
+# Memoized results per feature: feature name -> {text: bool}
+_FEATURE_RESULTS = {}
+
+# Upper bound on memoized strings per feature before that memo is reset
+MAX_MEMO_ENTRIES = 200000
+
+
+def register_text_feature(name, pattern, case_sensitive=False):
+    """
+    Register a named keyword regex.
+
+    Args:
+        name: Feature name used by consumers
+        pattern: Regular expression; lowercase unless case_sensitive
+        case_sensitive: Match against the original rather than lowercased text
+    """
+    TEXT_FEATURES[name] = (re.compile(pattern), case_sensitive)
+    _FEATURE_RESULTS.pop(name, None)
+
+
+def clear_feature_memo():
+    """Drop all memoized per-string feature results."""
+    _FEATURE_RESULTS.clear()
+
+
+# Table maintenance
+register_text_feature("table_maintenance_risk", r"table maintenance|modify table|database table|data dictionary")
+register_text_feature("table_maintenance_message", r"table|maintenance|field|data dictionary")
+register_text_feature("table_object", r"table|field")
+register_text_feature("change_verb", r"change|update|modify|create|delete|insert")
+
+# Change activity families
+register_text_feature("change_insert", r"insert|create|new|add")
+register_text_feature("change_update", r"update|modif|change")
+register_text_feature("change_delete", r"delete|remov")
+
+# Transport
+register_text_feature("transport_risk", r"transport|release|import|stms|development|request|package|tr")
+register_text_feature("transport_description",
+                      r"transport|release|import|stms|development|request|package|workbench|tr")
+
+# Debugging
+register_text_feature("debug_risk", r"debug|breakpoint|code inspection|trace|abap|function module")
+register_text_feature("debug_text", r"debug|breakpoint|trace|abap|development|function module")
+register_text_feature("debug_description", r"debug|breakpoint|trace|abap|function module")
+register_text_feature("debug_variable", r"debug|d!debug|break|trace")
+register_text_feature("debug_marker", r"I!|D!|G!", case_sensitive=True)
+
+# Display and sensitivity
+register_text_feature("display_message", r"display|view|show|read|query|report")
+register_text_feature("sensitive_message", r"change|update|modify|create|delete|sensitive|critical|high risk")
+register_text_feature("display_risk", r"view|display|information viewing|standard system usage|read-only")
+register_text_feature("sensitive_risk", r"sensitive|critical|high risk|unusual|suspicious")
+
+
+def _unique_feature(name, uniques, lowered):
+    """
+    Evaluate one feature on unique strings, reusing memoized results.
+
+    Args:
+        name: Registered feature name
+        uniques: Unique original strings
+        lowered: The same strings lowercased
+
+    Returns:
+        numpy.ndarray: Boolean result per unique string
+    """
+    pattern, case_sensitive = TEXT_FEATURES[name]
+    texts = uniques if case_sensitive else lowered
+
+    memo = _FEATURE_RESULTS.setdefault(name, {})
+    if len(memo) > MAX_MEMO_ENTRIES:
+        memo.clear()
+
+    results = np.empty(len(texts), dtype=bool)
+    for i, text in enumerate(texts):
+        matched = memo.get(text)
+        if matched is None:
+            matched = memo[text] = pattern.search(text) is not None
+        results[i] = matched
+    return results
+
+
+class TextFeatureCache:
+    """
+    Factorized text columns of one DataFrame with lazily computed features.
+
+    Each column is converted to strings, factorized and lowercased once on
+    first use. Features are evaluated on the unique values and broadcast back
+    to the rows through the factorized codes.
+    """
+
+    def __init__(self, df):
+        """
+        Initialize the cache.
+
+        Args:
+            df: DataFrame whose text columns are queried
+        """
+        self.df = df
+        self._columns = {}
+        self._features = {}
+
+    def _factorize(self, col):
+        """Return (codes, uniques, lowered uniques) for a column."""
+        if col not in self._columns:
+            codes, uniques = pd.factorize(self.df[col].fillna('').astype(str))
+            uniques = np.asarray(uniques, dtype=object)
+            self._columns[col] = (codes, uniques, [value.lower() for value in uniques])
+        return self._columns[col]
+
+    def _unique_mask(self, col, name):
+        """Return the boolean result of a feature per unique value of a column."""
+        key = (col, name)
+        if key not in self._features:
+            _, uniques, lowered = self._factorize(col)
+            self._features[key] = _unique_feature(name, uniques, lowered)
+        return self._features[key]
+
+    def _broadcast(self, col, unique_results, dtype=object):
+        codes = self._factorize(col)[0]
+        return np.asarray(unique_results, dtype=dtype)[codes]
+
+    def unique_count(self, col):
+        """Return the number of distinct strings in a column."""
+        return len(self._factorize(col)[1])
+
+    def values(self, col):
+        """Return the column as a Series of strings."""
+        codes, uniques, _ = self._factorize(col)
+        return pd.Series(uniques[codes], index=self.df.index)
+
+    def isin(self, col, values):
+        """Return a boolean array of rows whose string value is in values."""
+        wanted = set(values)
+        uniques = self._factorize(col)[1]
+        return self._broadcast(col, [value in wanted for value in uniques], bool)
+
+    def map_upper(self, col, mapping):
+        """Map the uppercased column values through mapping, "" when unmapped."""
+        uniques = self._factorize(col)[1]
+        return pd.Series(self._broadcast(col, [mapping.get(value.upper(), "") for value in uniques]),
+                         index=self.df.index)
+
+    def feature(self, col, name):
+        """
+        Return a boolean array of rows matching a registered feature.
+
+        Args:
+            col: Column name
+            name: Registered feature name
+
+        Returns:
+            numpy.ndarray: Boolean match per row
+        """
+        return self._broadcast(col, self._unique_mask(col, name), bool)
+
+    def contains(self, col, name, require=None, exclude=None):
+        """
+        Combine registered features into one boolean row mask.
+
+        Args:
+            col: Column name
+            name: Feature that must match
+            require: Optional feature that must also match
+            exclude: Optional feature that must not match
+
+        Returns:
+            numpy.ndarray: Boolean match per row
+        """
+        mask = self._unique_mask(col, name)
+        if require is not None:
+            mask = mask & self._unique_mask(col, require)
+        if exclude is not None:
+            mask = mask & ~self._unique_mask(col, exclude)
+        return self._broadcast(col, mask, bool)
+
+    def classify(self, col, families):
+        """
+        Label rows with the first feature family that matches.
+
+        Args:
+            col: Column name
+            families: List of (feature name, label) tuples in priority order
+
+        Returns:
+            numpy.ndarray: Label per row, "" when no family matches
+        """
+        labels = np.full(self.unique_count(col), "", dtype=object)
+        for name, label in reversed(families):
+            labels[self._unique_mask(col, name)] = label
+        return self._broadcast(col, labels)
+
+    def feature_frame(self, col, names=None):
+        """
+        Expose registered features of a column as boolean DataFrame columns.
+
+        Args:
+            col: Column name
+            names: Optional feature names; all registered features by default
+
+        Returns:
+            DataFrame: One boolean column per feature, indexed like df
+        """
+        names = list(names) if names is not None else list(TEXT_FEATURES)
+        frame = pd.DataFrame({name: self.feature(col, name) for name in names}, index=self.df.index)
+        log_message(f"Evaluated {len(names)} text features on {self.unique_count(col)} distinct "
+                    f"'{col}' values for {len(frame)} rows", "DEBUG")
+        return frame
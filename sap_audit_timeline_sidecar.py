@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Timeline Sidecar Module
+
+This module keeps a typed copy of a session timeline workbook next to it,
+so tools that work from an existing timeline (sap_audit_tool.py --mode
+existing, monitor_new_fields.py, count_sysaid_in_timeline.py) do not have
+to parse the Excel file again.
+
+Key features:
+- Sidecar stored as a pickled DataFrame next to the workbook: columns keep
+  their dtypes (datetimes, categoricals, numbers) without an extra
+  dependency, and loading it is a fraction of the cost of parsing xlsx
+- JSON manifest with a SHA-256 content hash of the sidecar and the
+  signature (size, mtime, SHA-256) of the workbook it mirrors
+- The sidecar is only used while the workbook is unchanged and the
+  content hash matches; otherwise the workbook is read and the sidecar
+  rebuilt
+- Atomic writes, so an interrupted save never leaves a half-written sidecar
+- Load times logged, with the time saved against the Excel read
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from sap_audit_utils import log_message
+
+# Bump when the sidecar layout changes
+SIDECAR_VERSION = 1
+
+# Sheet holding the timeline in SAP_Session_Timeline.xlsx
+TIMELINE_SHEET = "Session_Timeline"
+
+
+def sidecar_paths(excel_path):
+    """
+    Return the sidecar and manifest paths of a timeline workbook.
+
+    Args:
+        excel_path: Timeline workbook path
+
+    Returns:
+        Tuple of (sidecar path, manifest path)
+    """
+    stem = os.path.splitext(excel_path)[0]
+    return f"{stem}.timeline.pkl", f"{stem}.timeline.json"
+
+
+def _file_hash(path):
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _excel_signature(excel_path):
+    """Return the size, mtime and content hash of a workbook."""
+    stat = os.stat(excel_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": _file_hash(excel_path)}
+
+
+def _read_manifest(manifest_path):
+    """Read a sidecar manifest, returning None if it is missing or unusable."""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == SIDECAR_VERSION else None
+
+
+def write_sidecar(df, excel_path, excel_load_seconds=None):
+    """
+    Save the typed sidecar of a timeline workbook.
+
+    Call after the workbook has been written, so the manifest records the
+    workbook as it is on disk.
+
+    Args:
+        df: Timeline as written to the workbook
+        excel_path: Timeline workbook path
+        excel_load_seconds: Time a read of the workbook took, if measured
+
+    Returns:
+        str: Sidecar path, or None if it could not be written
+    """
+    data_path, manifest_path = sidecar_paths(excel_path)
+    try:
+        df.to_pickle(f"{data_path}.tmp")
+        manifest = {
+            "version": SIDECAR_VERSION,
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+            "rows": len(df),
+            "columns": len(df.columns),
+            "content_hash": _file_hash(f"{data_path}.tmp"),
+            "excel": _excel_signature(excel_path) if os.path.exists(excel_path) else None,
+            "excel_load_seconds": excel_load_seconds
+        }
+        os.replace(f"{data_path}.tmp", data_path)
+        with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+    except (OSError, TypeError, ValueError) as e:
+        log_message(f"Timeline sidecar not written: {e}", "WARNING")
+        return None
+    log_message(f"Timeline sidecar saved to {data_path}")
+    return data_path
+
+
+def _load_sidecar(excel_path):
+    """
+    Load the sidecar of a workbook if it is current.
+
+    Returns:
+        Tuple of (DataFrame or None, manifest or None)
+    """
+    data_path, manifest_path = sidecar_paths(excel_path)
+    manifest = _read_manifest(manifest_path)
+    if manifest is None or not os.path.exists(data_path):
+        return None, None
+
+    excel = manifest.get("excel")
+    if os.path.exists(excel_path):
+        stat = os.stat(excel_path)
+        if excel is None or stat.st_size != excel["size"]:
+            return None, manifest
+        # A copied or touched workbook keeps its sidecar if the content is the same
+        if stat.st_mtime_ns != excel["mtime_ns"] and _file_hash(excel_path) != excel["sha256"]:
+            return None, manifest
+
+    if _file_hash(data_path) != manifest["content_hash"]:
+        log_message(f"Timeline sidecar {data_path} does not match its content hash, ignoring it", "WARNING")
+        return None, manifest
+    try:
+        return pd.read_pickle(data_path), manifest
+    except Exception as e:
+        log_message(f"Timeline sidecar {data_path} could not be read: {e}", "WARNING")
+        return None, manifest
+
+
+def read_timeline(path, sheet_name=TIMELINE_SHEET):
+    """
+    Load a session timeline, preferring its typed sidecar.
+
+    Falls back to the workbook when there is no current sidecar and then
+    writes one, so the next load is fast.
+
+    Args:
+        path: Timeline workbook (or its sidecar)
+        sheet_name: Workbook sheet to read when falling back to Excel (the
+                    first sheet if the workbook has no timeline sheet)
+
+    Returns:
+        DataFrame: The timeline
+    """
+    if path.endswith(".timeline.pkl"):
+        path = f"{path[:-len('.timeline.pkl')]}.xlsx"
+
+    start = time.perf_counter()
+    df, manifest = _load_sidecar(path)
+    elapsed = time.perf_counter() - start
+    if df is not None:
+        message = f"Loaded {len(df)} timeline rows from sidecar in {elapsed:.2f}s"
+        excel_seconds = manifest.get("excel_load_seconds")
+        if excel_seconds:
+            message += f" (Excel read: {excel_seconds:.2f}s, {excel_seconds - elapsed:.2f}s saved)"
+        log_message(message)
+        return df
+
+    start = time.perf_counter()
+    with pd.ExcelFile(path) as workbook:
+        df = workbook.parse(sheet_name if sheet_name in workbook.sheet_names else 0)
+    elapsed = time.perf_counter() - start
+    log_message(f"Loaded {len(df)} timeline rows from {path} in {elapsed:.2f}s (no current sidecar)")
+    write_sidecar(df, path, excel_load_seconds=elapsed)
+    return df
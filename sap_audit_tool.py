@@ -8,6 +8,7 @@ of the SAP Audit workflow.
 
 Usage:
   python sap_audit_tool.py [options]
+  python sap_audit_tool.py query [filters]
 
 Options:
   --mode MODE          Processing mode: full, prep, merge, existing
@@ -15,6 +16,13 @@ Options:
   --output FILE        Override output file path
   --format FORMAT      Output format: excel, csv
   --sysaid STRATEGY    SysAid strategy: file, api
+  --resume             Continue a failed full run from its last checkpoint
+
+Query filters (events of earlier runs, from the audit warehouse):
+  --user, --session, --tcode, --table, --risk-level, --period (repeatable)
+  --from, --to         Event time range
+  --limit N            Maximum number of events
+  --output FILE        Write the events to a CSV file
 
 Examples:
   python sap_audit_tool.py                    # Run full audit process
@@ -23,6 +31,9 @@ Examples:
   python sap_audit_tool.py --mode existing    # Process from existing timeline file
                       --timeline FILE.xlsx
   python sap_audit_tool.py --format csv       # Generate CSV output
+  python sap_audit_tool.py --resume           # Resume a failed full run
+  python sap_audit_tool.py query --user FF_PTP --risk-level critical
+                      --from 2025-03-01 --to 2025-03-31
 """
 
 import sys
@@ -31,23 +42,15 @@ import time
 import argparse
 from datetime import datetime
 
-# Import configurations
+# Import configuration (lightweight; the processing modules, pandas included,
+# are imported by main() only after the arguments have been parsed)
 try:
     from sap_audit_config import PATHS, SETTINGS
-    from sap_audit_utils import log_message, log_section, log_error, handle_exception
 except ImportError as e:
     print(f"ERROR: Required modules not found: {e}")
     print("Please ensure all core configuration modules are available.")
     sys.exit(1)
 
-# Import controller (which will import all required components)
-try:
-    from sap_audit_controller import AuditController
-except ImportError as e:
-    print(f"ERROR: Cannot import AuditController: {e}")
-    print("The SAP Audit Controller module is required to run this tool.")
-    sys.exit(1)
-
 # Constants
 MODES = {
     "full": "Run full audit process",
@@ -74,10 +77,87 @@ def parse_args():
                         help=f"Output format: {', '.join(OUTPUT_FORMATS)}")
     parser.add_argument("--sysaid", choices=SYSAID_STRATEGIES, default="file",
                         help=f"SysAid data strategy: {', '.join(SYSAID_STRATEGIES)}")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue a failed full run from its last good stage checkpoint")
+    parser.add_argument("--progress", action="store_true",
+                        help="Show stage and detector progress on stderr")
+    parser.add_argument("--metrics-file",
+                        help="Write progress metrics to this file while the audit runs")
+    parser.add_argument("--metrics-format", choices=["prometheus", "json"],
+                        help="Metrics file format (default: prometheus)")
     
     return parser.parse_args()
 
 
+def parse_query_args(argv):
+    """Parse the arguments of the query command."""
+    parser = argparse.ArgumentParser(prog="sap_audit_tool.py query",
+                                     description="Query the events of earlier runs in the audit warehouse")
+    parser.add_argument("--user", action="append", help="User name")
+    parser.add_argument("--session", action="append", help="Session ID, with or without the date")
+    parser.add_argument("--tcode", action="append", help="Transaction code")
+    parser.add_argument("--table", action="append", help="Table name")
+    parser.add_argument("--risk-level", action="append", help="Risk level (critical, high, medium, low)")
+    parser.add_argument("--period", action="append", help="Audit period (e.g. a period folder name)")
+    parser.add_argument("--from", dest="start", help="Earliest event time (e.g. 2025-03-01 or \"2025-03-01 08:00\")")
+    parser.add_argument("--to", dest="end", help="Latest event time; a date includes the whole day")
+    parser.add_argument("--limit", type=int, default=100, help="Maximum number of events (0 for all)")
+    parser.add_argument("--output", help="Write the events to this CSV file")
+    parser.add_argument("--warehouse", help="Warehouse file (default: the configured one)")
+    return parser.parse_args(argv)
+
+
+def run_query(args):
+    """
+    Look up events in the audit warehouse and print or save them.
+    
+    Args:
+        args: Parsed query arguments
+        
+    Returns:
+        bool: Success status
+    """
+    import pandas as pd
+    from sap_audit_utils import log_message
+    from sap_audit_warehouse import AuditWarehouse
+    
+    for option, value in (("--from", args.start), ("--to", args.end)):
+        if value is None:
+            continue
+        try:
+            valid = not pd.isna(pd.Timestamp(value))
+        except ValueError:
+            valid = False
+        if not valid:
+            log_message(f"Invalid {option} time: {value} (expected e.g. 2025-03-01 or \"2025-03-01 08:00\")",
+                        "ERROR")
+            return False
+    
+    warehouse_path = args.warehouse or PATHS["warehouse"]
+    if not os.path.exists(warehouse_path):
+        log_message(f"Audit warehouse not found: {warehouse_path}", "ERROR")
+        return False
+    
+    start = time.perf_counter()
+    with AuditWarehouse(warehouse_path) as warehouse:
+        events = warehouse.find_events(user=args.user, session=args.session, tcode=args.tcode,
+                                       table=args.table, risk_level=args.risk_level, start=args.start,
+                                       end=args.end, period=args.period, limit=args.limit)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    if args.output:
+        events.to_csv(args.output, index=False, encoding=SETTINGS["encoding"])
+        log_message(f"{len(events)} events written to {args.output} ({elapsed_ms:.0f} ms)")
+        return True
+    
+    columns = ["event_time", "period", "user_name", "session_id", "event_code", "tcode", "table_name",
+               "field_name", "risk_level", "sysaid"]
+    if not events.empty:
+        print(events[columns].fillna("").to_string(index=False))
+    log_message(f"{len(events)} events found ({elapsed_ms:.0f} ms)")
+    return True
+
+
 def create_config_from_args(args):
     """Create configuration dictionary from command line arguments."""
     config = {}
@@ -96,6 +176,16 @@ def create_config_from_args(args):
     if args.timeline:
         config["timeline_file"] = args.timeline
     
+    # Resume a full run from its checkpoints
+    config["resume"] = args.resume
+    
+    # Progress display and metrics file
+    config["progress"] = args.progress
+    if args.metrics_file:
+        config["metrics_file"] = args.metrics_file
+    if args.metrics_format:
+        config["metrics_format"] = args.metrics_format
+    
     return config
 
 
@@ -115,15 +205,43 @@ def display_mode_info(mode):
     print(f"\nProcessing Mode: {mode} - {mode_description}\n")
 
 
-@handle_exception
 def main():
     """Main function to execute the SAP audit process."""
+    # The query command reads the warehouse and runs no audit
+    if sys.argv[1:2] == ["query"]:
+        return run_query(parse_query_args(sys.argv[2:]))
+    
     # Display banner
     display_banner()
     
     # Parse command line arguments
     args = parse_args()
     
+    # Import the processing modules now that there is work to do
+    try:
+        from sap_audit_utils import handle_exception
+        from sap_audit_controller import AuditController
+    except ImportError as e:
+        print(f"ERROR: Cannot import AuditController: {e}")
+        print("The SAP Audit Controller module is required to run this tool.")
+        return False
+    
+    return handle_exception(run)(args)
+
+
+def run(args):
+    """
+    Execute the selected processing mode.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        bool: Success status
+    """
+    from sap_audit_utils import log_message, log_section, log_error
+    from sap_audit_controller import AuditController
+    
     # Display mode information
     display_mode_info(args.mode)
     
@@ -131,6 +249,8 @@ def main():
     version = SETTINGS.get("version", "1.0.0")
     log_section(f"SAP Audit Tool v{version}")
     log_message(f"Starting in {args.mode} mode")
+    if args.resume and args.mode != "full":
+        log_message("--resume only applies to full mode and is ignored", "WARNING")
     
     # Create configuration from arguments
     config = create_config_from_args(args)
@@ -156,9 +276,9 @@ def main():
                 return False
                 
             try:
-                # Load the existing timeline
-                import pandas as pd
-                existing_timeline = pd.read_excel(args.timeline)
+                # Load the existing timeline (from its typed sidecar when current)
+                from sap_audit_timeline_sidecar import read_timeline
+                existing_timeline = read_timeline(args.timeline)
                 log_message(f"Loaded existing timeline with {len(existing_timeline)} records")
                 
                 # Set the session data and continue with risk assessment
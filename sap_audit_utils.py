@@ -9,34 +9,33 @@ These include logging functions, exception handling, data cleaning, and validati
 import sys
 import os
 import glob
-import traceback
+import json
+import multiprocessing
 import pandas as pd
 import numpy as np
+from pandas.util import hash_pandas_object
 from datetime import datetime
 from functools import wraps
 from typing import Tuple, List, Dict, Any, Optional, Callable
 
-def log_message(message, level="INFO"):
-    """
-    Log a message with timestamp and level.
-    
-    Args:
-        message: The message to log
-        level: The log level (INFO, WARNING, ERROR, DEBUG)
-    """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] {level}: {message}")
+# Logging is implemented in sap_audit_logging; log_message and log_section
+# are re-exported here for the modules that import them from this module
+from sap_audit_logging import log_message, log_section, log_exception
 
-def log_section(section_name):
+def process_pool_context():
     """
-    Log a section header for better visual separation in logs.
+    Get the multiprocessing context for worker pools.
     
-    Args:
-        section_name: The name of the section
+    Pools are started while other threads run (pipeline stages, the logging
+    listener, service threads), and forking a multithreaded process can leave
+    the child blocked on a lock held by one of them. Workers are therefore
+    started from a fork server, or spawned where that is not available.
+    
+    Returns:
+        multiprocessing context for ProcessPoolExecutor(mp_context=...)
     """
-    print("\n" + "="*80)
-    print(f" {section_name} ".center(80, "-"))
-    print("="*80 + "\n")
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
 
 def log_error(exception, message=None):
     """
@@ -47,13 +46,9 @@ def log_error(exception, message=None):
         message: Optional context message
     """
     if message:
-        log_message(f"{message}: {str(exception)}", "ERROR")
+        log_exception(exception, f"{message}: {str(exception)}")
     else:
-        log_message(f"Error: {str(exception)}", "ERROR")
-    
-    # Get and log the traceback
-    tb_lines = traceback.format_exception(type(exception), exception, exception.__traceback__)
-    print("".join(tb_lines))
+        log_exception(exception, f"Error: {str(exception)}")
 
 def handle_exception(func):
     """
@@ -205,6 +200,193 @@ def format_datetime(dt, format=None):
     except:
         return str(dt)
 
+# Candidate export formats, in priority order. The first format that parses
+# the most sampled values is used for the whole column.
+DATE_FORMATS = ["%Y-%m-%d", "%d.%m.%Y", "%m/%d/%Y", "%d/%m/%Y", "%Y%m%d", "%Y.%m.%d"]
+TIME_FORMATS = ["%H:%M:%S", "%H%M%S", "%H:%M", "%I:%M:%S %p", "%I:%M %p"]
+DATETIME_FORMATS = [f"{date_format} {time_format}" for date_format in DATE_FORMATS
+                    for time_format in ("%H:%M:%S", "%H:%M", "%I:%M:%S %p")] + ["%Y-%m-%dT%H:%M:%S"]
+
+# Day zero of Excel serial dates (accounts for the 1900 leap year bug)
+EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+
+# Largest Excel serial date (9999-12-31); SAP YYYYMMDD numbers are all above it
+EXCEL_MAX_SERIAL = 2958465
+
+def detect_datetime_format(values, candidates, sample_size=500):
+    """
+    Detect the format of a date/time text column from a sample of its values.
+    
+    Args:
+        values: Series of date/time strings
+        candidates: Formats to try, in priority order
+        sample_size: Number of distinct values to test
+        
+    Returns:
+        str: Format parsing the most sampled values, or None if none match
+    """
+    sample = values.dropna().astype(str).str.strip()
+    sample = pd.Series(sample[sample != ""].unique()[:sample_size])
+    if sample.empty:
+        return None
+    
+    best_format, best_count = None, 0
+    for fmt in candidates:
+        count = pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()
+        if count > best_count:
+            best_format, best_count = fmt, count
+            if count == len(sample):
+                break
+    return best_format
+
+def _parse_text(values, candidates):
+    """Parse a text column with its detected format, inferring only for rows that do not match."""
+    text = values.astype(str).str.strip().where(values.notna())
+    fmt = detect_datetime_format(text, candidates)
+    if fmt is None:
+        return pd.to_datetime(text, errors='coerce', format='mixed')
+    
+    parsed = pd.to_datetime(text, format=fmt, errors='coerce')
+    leftover = parsed.isna() & text.notna() & (text != "")
+    if leftover.any():
+        parsed[leftover] = pd.to_datetime(text[leftover], errors='coerce', format='mixed')
+    return parsed
+
+def _is_object_kind(values, kinds):
+    """Check whether the non-null values of an object column are all of the given inferred kinds."""
+    return values.dtype == object and pd.api.types.infer_dtype(values, skipna=True) in kinds
+
+def _is_numeric_column(values):
+    """Check whether a column holds numbers (not booleans)."""
+    return pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+
+def _parse_numeric_dates(values):
+    """
+    Convert numbers to datetimes by range.
+    
+    Whole numbers from 19000101 are SAP YYYYMMDD dates, numbers up to
+    EXCEL_MAX_SERIAL are Excel serials (with the time as day fraction) and
+    anything else is NaT.
+    """
+    numbers = values.astype(float)
+    result = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    
+    sap = (numbers >= 19000101) & (numbers <= 99991231) & (numbers % 1 == 0)
+    if sap.any():
+        result[sap] = pd.to_datetime(numbers[sap].astype("int64").astype(str), format="%Y%m%d", errors='coerce')
+    excel = (numbers >= 0) & (numbers <= EXCEL_MAX_SERIAL)
+    if excel.any():
+        result[excel] = EXCEL_EPOCH + pd.to_timedelta((numbers[excel] * 86400).round(), unit='s')
+    return result
+
+def parse_datetime_series(values):
+    """
+    Convert a combined date/time column to datetimes.
+    
+    Native datetime values are used as they are, numbers are read as SAP
+    YYYYMMDD dates or Excel serials by range and text is parsed with a
+    detected format.
+    
+    Args:
+        values: Series of timestamps, numbers or strings
+        
+    Returns:
+        Series: datetime64 values (NaT where unparseable)
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    if _is_numeric_column(values):
+        return _parse_numeric_dates(values)
+    if _is_object_kind(values, ("datetime", "datetime64", "date")):
+        return pd.to_datetime(values, errors='coerce')
+    return _parse_text(values, DATETIME_FORMATS + DATE_FORMATS)
+
+def parse_date_series(values):
+    """
+    Convert a date column to midnight datetimes.
+    
+    Args:
+        values: Series of dates, YYYYMMDD numbers, Excel serials or date strings
+        
+    Returns:
+        Series: datetime64 values at midnight (NaT where unparseable)
+    """
+    if _is_numeric_column(values):
+        return _parse_numeric_dates(values).dt.normalize()
+    if pd.api.types.is_datetime64_any_dtype(values) or _is_object_kind(values, ("datetime", "datetime64", "date")):
+        return pd.to_datetime(values, errors='coerce').dt.normalize()
+    # Dates that went through a datetime column may carry a midnight time
+    return _parse_text(values, DATE_FORMATS + DATETIME_FORMATS).dt.normalize()
+
+def parse_time_series(values):
+    """
+    Convert a time column to time-of-day offsets.
+    
+    Excel day fractions and SAP HHMMSS integers are converted with integer
+    arithmetic, datetime.time objects through their distinct values only.
+    In a column of whole HHMMSS numbers, values that are not valid HHMMSS
+    times are read as Excel serials and keep only their day fraction.
+    
+    Args:
+        values: Series of times, Excel fractions, HHMMSS integers or time strings
+        
+    Returns:
+        Series: timedelta64 offsets from midnight (NaT where unparseable)
+    """
+    if pd.api.types.is_timedelta64_dtype(values):
+        return values
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values - values.dt.normalize()
+    if _is_numeric_column(values):
+        numbers = values.astype(float)
+        seconds = ((numbers % 1) * 86400).round()
+        if numbers.max(skipna=True) >= 1:
+            # SAP exports times as HHMMSS numbers once leading zeros are lost
+            hhmmss = ((numbers % 1 == 0) & (numbers <= 235959)
+                      & (numbers // 100 % 100 < 60) & (numbers % 100 < 60))
+            sap_seconds = (numbers // 10000) * 3600 + (numbers // 100 % 100) * 60 + numbers % 100
+            seconds = sap_seconds.where(hhmmss, seconds)
+        return pd.to_timedelta(seconds, unit='s')
+    if _is_object_kind(values, ("time",)):
+        codes, uniques = pd.factorize(values)
+        seconds = np.array([t.hour * 3600 + t.minute * 60 + t.second for t in uniques], dtype=float)
+        return pd.Series(pd.to_timedelta(np.where(codes >= 0, seconds[codes], np.nan), unit='s'), index=values.index)
+    if _is_object_kind(values, ("datetime", "datetime64")):
+        parsed = pd.to_datetime(values, errors='coerce')
+        return parsed - parsed.dt.normalize()
+    
+    parsed = _parse_text(values, TIME_FORMATS)
+    return parsed - parsed.dt.normalize()
+
+def build_datetime_series(df, date_col, time_col, datetime_col=None):
+    """
+    Build datetimes from a combined column and/or separate date and time columns.
+    
+    An existing combined column is reused; date and time are only combined
+    for rows it leaves empty. Formats are detected once per column and no
+    string concatenation is involved.
+    
+    Args:
+        df: DataFrame to read from
+        date_col: Name of the date column
+        time_col: Name of the time column
+        datetime_col: Optional name of an existing combined date/time column
+        
+    Returns:
+        Series: datetime64 values, or None if the columns are missing
+    """
+    result = None
+    if datetime_col and datetime_col in df.columns:
+        result = parse_datetime_series(df[datetime_col])
+        if result.notna().all():
+            return result
+    
+    if date_col in df.columns and time_col in df.columns:
+        combined = parse_date_series(df[date_col]) + parse_time_series(df[time_col])
+        result = combined if result is None else result.fillna(combined)
+    
+    return result
+
 def add_timestamp_column(df, date_col, time_col, output_col="Datetime"):
     """
     Add a proper datetime column from separate date and time columns.
@@ -224,12 +406,7 @@ def add_timestamp_column(df, date_col, time_col, output_col="Datetime"):
         
     try:
         df_copy = df.copy()
-        # Convert to string first to handle different formats
-        date_str = df_copy[date_col].astype(str)
-        time_str = df_copy[time_col].astype(str)
-        
-        # Combine date and time
-        df_copy[output_col] = pd.to_datetime(date_str + ' ' + time_str, errors='coerce')
+        df_copy[output_col] = build_datetime_series(df_copy, date_col, time_col)
         
         # Check for NaT values
         nat_count = df_copy[output_col].isna().sum()
@@ -287,8 +464,8 @@ def log_stats(data_or_context, context_or_data=None):
                 top_missing = df[cols_with_missing].isna().sum().sort_values(ascending=False).head(3)
                 log_message(f"  - Top columns with missing values: {', '.join([f'{col} ({count})' for col, count in top_missing.items()])}")
         
-        # Duplicate rows
-        duplicate_rows = df.duplicated().sum()
+        # Duplicate rows (natural-key duplicates are counted by DuplicateDetector)
+        duplicate_rows = pd.Series(hash_pandas_object(df, index=False)).duplicated().sum()
         if duplicate_rows > 0:
             duplicate_pct = (duplicate_rows / total_rows) * 100
             log_message(f"  - Duplicate Rows: {duplicate_rows} ({duplicate_pct:.2f}%)")
@@ -314,6 +491,159 @@ def log_stats(data_or_context, context_or_data=None):
         # Handle other cases or provide a useful error
         log_message(f"Invalid data type for log_stats: {type(data_or_context).__name__}", "WARNING")
 
+# Text values treated as missing once stripped (artifacts of str() on NaN/None/NaT)
+NULL_TOKENS = ["nan", "None", "NaT"]
+
+def _is_text_column(values):
+    """Check whether a column holds text (object or string dtype, not native dates or times)."""
+    if isinstance(values.dtype, pd.StringDtype):
+        return True
+    return values.dtype == object and not _is_object_kind(values, ("datetime", "datetime64", "date", "time"))
+
+def _clean_text_column(values):
+    """
+    Clean one text column and collect its quality metrics.
+    
+    The column is factorized once; stripping, non-breaking space replacement
+    and null normalization run on the distinct values only and are broadcast
+    back through the codes.
+    
+    Args:
+        values: Text column to clean
+        
+    Returns:
+        Tuple of (cleaned values, row codes of the cleaned values, metrics dict)
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    
+    raw = pd.Series(np.asarray(uniques, dtype=object), dtype=object).astype(str)
+    has_nbsp = raw.str.contains('\xa0', regex=False).to_numpy(dtype=bool)
+    cleaned = raw.str.replace('\xa0', ' ', regex=False).str.strip()
+    null_token = cleaned.isin(NULL_TOKENS).to_numpy(dtype=bool)
+    trimmed = (cleaned.str.len() != raw.str.len()).to_numpy(dtype=bool) & ~null_token
+    cleaned[null_token] = ''
+    
+    # Missing rows (code -1) pick up the trailing empty string
+    lookup = np.append(cleaned.to_numpy(dtype=object), '')
+    lookup_codes, _ = pd.factorize(lookup)
+    missing = int((codes < 0).sum())
+    blank = lookup[:-1] == ''
+    
+    metrics = {
+        "dtype": str(values.dtype),
+        "missing": missing,
+        "null_tokens": int(counts[null_token].sum()),
+        "nbsp": int(counts[has_nbsp].sum()),
+        "trimmed": int(counts[trimmed].sum()),
+        "empty": missing + int(counts[blank].sum()),
+        "unique": int(np.unique(lookup_codes[:-1][~blank]).size)
+    }
+    return lookup[codes], lookup_codes[codes], metrics
+
+def clean_and_profile(df, context="", drop_columns=None):
+    """
+    Clean a DataFrame and collect data quality metrics in a single pass.
+    
+    Each column is visited once: text columns are stripped, non-breaking
+    spaces replaced and missing values or null tokens normalized to empty
+    strings, while missing, whitespace and duplicate-row metrics are
+    collected along the way. The DataFrame is modified in place; no
+    intermediate copies are made.
+    
+    Args:
+        df: DataFrame to clean (modified in place)
+        context: Source name recorded in the report
+        drop_columns: Optional column names removed before cleaning
+        
+    Returns:
+        Tuple of (cleaned DataFrame, quality report dict)
+    """
+    report = {
+        "context": context,
+        "rows": 0 if df is None else len(df),
+        "columns": 0,
+        "dropped_columns": [],
+        "missing_values": 0,
+        "duplicate_rows": 0,
+        "numeric_columns_with_missing": [],
+        "column_metrics": {}
+    }
+    if df is None or df.empty:
+        return df, report
+    
+    for col in drop_columns or []:
+        if col in df.columns:
+            del df[col]
+            report["dropped_columns"].append(col)
+    report["columns"] = len(df.columns)
+    
+    # Row identity built up column by column from factorized codes
+    row_key = np.zeros(len(df), dtype=np.int64)
+    
+    for position, col in enumerate(df.columns):
+        values = df.iloc[:, position]
+        if _is_text_column(values):
+            cleaned, row_codes, metrics = _clean_text_column(values)
+            df.isetitem(position, cleaned)
+        else:
+            row_codes, uniques = pd.factorize(values, use_na_sentinel=True)
+            missing = int((row_codes < 0).sum())
+            metrics = {"dtype": str(values.dtype), "missing": missing, "unique": len(uniques)}
+            if missing and pd.api.types.is_numeric_dtype(values):
+                report["numeric_columns_with_missing"].append(col)
+        
+        report["column_metrics"][col] = metrics
+        report["missing_values"] += metrics["missing"]
+        row_key, _ = pd.factorize(row_key * (int(row_codes.max(initial=-1)) + 2) + row_codes + 1)
+    
+    report["duplicate_rows"] = len(df) - (int(row_key.max()) + 1)
+    return df, report
+
+def log_quality_report(report):
+    """
+    Log a data quality report produced by clean_and_profile.
+    
+    Args:
+        report: Quality report dictionary
+    """
+    context_str = f" for {report['context']}" if report.get("context") else ""
+    metrics = report["column_metrics"]
+    
+    if report["missing_values"]:
+        log_message(f"Found {report['missing_values']} missing values{context_str}", "WARNING")
+    for label, key in [("Normalized null tokens", "null_tokens"), ("Replaced non-breaking spaces", "nbsp"),
+                       ("Removed leading/trailing whitespace", "trimmed")]:
+        affected = {col: m[key] for col, m in metrics.items() if m.get(key)}
+        if affected:
+            log_message(f"  - {label} in {sum(affected.values())} values across {len(affected)} columns")
+    if report["numeric_columns_with_missing"]:
+        log_message(f"  - Warning: Numeric columns with NaN values: {', '.join(report['numeric_columns_with_missing'])}", "WARNING")
+    if report["duplicate_rows"]:
+        log_message(f"Found {report['duplicate_rows']} duplicate rows{context_str}", "WARNING")
+        log_message("  - Keeping duplicate rows as they may represent valid repeated events")
+
+def save_quality_reports(reports, file_path):
+    """
+    Save data quality reports to a JSON file.
+    
+    Args:
+        reports: Dictionary of source name -> quality report
+        file_path: Path of the JSON file
+        
+    Returns:
+        bool: True if the file was written
+    """
+    try:
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        with open(file_path, "w") as f:
+            json.dump({"generated": datetime.now().isoformat(timespec="seconds"), "sources": reports}, f, indent=4)
+        log_message(f"Data quality report saved to {file_path}")
+        return True
+    except Exception as e:
+        log_error(e, "Error saving data quality report")
+        return False
+
 def validate_data_quality(df, context=""):
     """
     Perform data quality checks on a DataFrame.
@@ -329,74 +659,29 @@ def validate_data_quality(df, context=""):
         log_message(f"Cannot validate empty DataFrame{' for ' + context if context else ''}", "WARNING")
         return df
         
-    df_result = df.copy()
-    context_str = f" for {context}" if context else ""
-    
-    # Check for and handle missing values
-    missing_count = df_result.isna().sum().sum()
-    if missing_count > 0:
-        log_message(f"Found {missing_count} missing values{context_str}", "WARNING")
-        
-        # Replace missing values with empty strings for object columns
-        for col in df_result.select_dtypes(include=['object']).columns:
-            null_count = df_result[col].isna().sum()
-            if null_count > 0:
-                log_message(f"  - Replacing {null_count} NaN values with empty strings in column '{col}'")
-                df_result[col] = df_result[col].fillna('')
-        
-        # For numeric columns, we leave NaN values as is to maintain data integrity
-        # but we log which columns have them
-        numeric_cols_with_na = [
-            col for col in df_result.select_dtypes(include=['number']).columns
-            if df_result[col].isna().any()
-        ]
-        
-        if numeric_cols_with_na:
-            log_message(f"  - Warning: Numeric columns with NaN values: {', '.join(numeric_cols_with_na)}", "WARNING")
-    
-    # Check for duplicate rows
-    duplicate_count = df_result.duplicated().sum()
-    if duplicate_count > 0:
-        log_message(f"Found {duplicate_count} duplicate rows{context_str}", "WARNING")
-        log_message("  - Keeping duplicate rows as they may represent valid repeated events")
+    df_result, report = clean_and_profile(df.copy(), context)
+    log_quality_report(report)
+    return df_result
+
+def find_matching_files(pattern, directory=None):
+    """
+    Find all files matching the given pattern.
     
-    # Handle problematic whitespace in string columns
-    string_cols = df_result.select_dtypes(include=['object']).columns
-    for col in string_cols:
-        # First make sure we're dealing with string data
-        # Convert column to string type safely, but only if it's an object type column
-        if df_result[col].dtype == 'object':
-            # Check for non-string objects and convert to strings
-            has_non_string = False
-            for val in df_result[col].dropna().head(10):  # Check a few values
-                if not isinstance(val, str):
-                    has_non_string = True
-                    break
-                    
-            if has_non_string:
-                # Convert to string type before applying string operations
-                try:
-                    df_result[col] = df_result[col].astype(str)
-                except Exception as e:
-                    log_message(f"  - Warning: Could not convert column '{col}' to string: {str(e)}", "WARNING")
-                    continue  # Skip this column
-            
-            try:
-                # Replace any non-breaking spaces with regular spaces
-                unusual_count = df_result[col].str.contains('\xa0', na=False).sum()
-                if unusual_count > 0:
-                    log_message(f"  - Replacing non-breaking spaces in {unusual_count} rows of column '{col}'")
-                    df_result[col] = df_result[col].str.replace('\xa0', ' ', regex=False)
-                    
-                # Remove leading/trailing spaces
-                leading_trailing_count = (df_result[col].str.len() != df_result[col].str.strip().str.len()).sum()
-                if leading_trailing_count > 0:
-                    log_message(f"  - Removing leading/trailing whitespace in {leading_trailing_count} rows of column '{col}'")
-                    df_result[col] = df_result[col].str.strip()
-            except Exception as e:
-                log_message(f"  - Warning: String operation failed on column '{col}': {str(e)}", "WARNING")
+    Args:
+        pattern: Glob pattern to match files
+        directory: Directory to search in (optional, uses pattern as is if not provided)
+        
+    Returns:
+        List of matching paths sorted by name (empty if none match)
+    """
+    search_pattern = os.path.join(directory, pattern) if directory else pattern
+    matching_files = sorted(glob.glob(search_pattern))
     
-    return df_result
+    if not matching_files:
+        log_message(f"No files found matching pattern: {search_pattern}", "WARNING")
+    else:
+        log_message(f"Found {len(matching_files)} files matching pattern: {search_pattern}")
+    return matching_files
 
 def find_latest_file(pattern, directory=None):
     """
@@ -605,3 +890,102 @@ def standardize_column_values(df, column, mapping, default=""):
     )
     
     return df_copy
+
+# Value used for missing or blank SysAid ticket references
+SYSAID_UNKNOWN = "UNKNOWN"
+
+def standardize_sysaid_value(value):
+    """
+    Standardize a single SysAid ticket number.
+    
+    Properly handles:
+    - Values with hash prefixes (#120,568)
+    - Values with commas (120,568)
+    - Values with SR/CR prefixes (SR-120568)
+    - Plain numeric values (120568)
+    - Empty or None values (returns "UNKNOWN")
+    
+    Args:
+        value: The SysAid ticket value to standardize
+        
+    Returns:
+        str: Standardized ticket number
+    """
+    return standardize_sysaid_series(pd.Series([value], dtype=object)).iloc[0]
+
+def standardize_sysaid_series(values):
+    """
+    Standardize SysAid ticket numbers for a whole column at once.
+    
+    The column is factorized first so the string operations only run on the
+    distinct values; the results are then mapped back to every row by code.
+    SysAid references repeat heavily in SM20/CDHDR exports, so the work
+    scales with the number of distinct tickets rather than rows.
+    
+    Args:
+        values: Series (or array-like) of raw SysAid ticket values
+        
+    Returns:
+        Series of standardized ticket numbers aligned to the input index
+    """
+    if not isinstance(values, pd.Series):
+        values = pd.Series(values, dtype=object)
+    
+    if len(values) == 0:
+        return pd.Series([], index=values.index, dtype=object)
+    
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    
+    # Falsy values (0, False, '') are treated as missing, like the scalar rules
+    raw = pd.Series(np.asarray(uniques, dtype=object), dtype=object)
+    falsy = np.fromiter((not v for v in raw), dtype=bool, count=len(raw))
+    
+    text = raw.astype(str).str.strip()
+    standardized = (
+        text.str.replace(r'^#', '', regex=True)
+            .str.replace(r'^(SR|CR)-', '', regex=True)
+            .str.replace(',', '', regex=False)
+    )
+    
+    lookup = np.where(falsy | (text == '').to_numpy(), SYSAID_UNKNOWN, standardized.to_numpy(dtype=object))
+    # Append UNKNOWN so the NA sentinel (-1) resolves to it
+    lookup = np.append(lookup.astype(object), SYSAID_UNKNOWN)
+    
+    return pd.Series(lookup[codes], index=values.index, dtype=object)
+
+def resolve_session_sysaid(df, session_col, sysaid_col=None):
+    """
+    Resolve the SysAid ticket for every session in a single grouped pass.
+    
+    Each session gets its most frequent non-UNKNOWN standardized ticket;
+    ties go to the ticket seen first. Sessions without any known ticket
+    (or frames without a SysAid column) resolve to UNKNOWN.
+    
+    Args:
+        df: DataFrame with session and SysAid columns
+        session_col: Name of the session column
+        sysaid_col: Name of the SysAid column (optional)
+        
+    Returns:
+        Series of standardized tickets indexed by session ID (as string)
+    """
+    sessions = df[session_col].astype(str)
+    all_sessions = pd.Index(sessions.unique(), name=session_col)
+    
+    if not sysaid_col or sysaid_col not in df.columns:
+        return pd.Series(SYSAID_UNKNOWN, index=all_sessions, dtype=object)
+    
+    tickets = standardize_sysaid_series(df[sysaid_col])
+    known = tickets != SYSAID_UNKNOWN
+    
+    counts = (
+        pd.DataFrame({"session": sessions[known], "ticket": tickets[known]})
+        .groupby(["session", "ticket"], sort=False)
+        .size()
+        .reset_index(name="count")
+    )
+    # Stable sort keeps first-seen order among tickets with equal counts
+    best = counts.sort_values("count", ascending=False, kind="stable").drop_duplicates("session")
+    
+    resolved = pd.Series(best["ticket"].to_numpy(dtype=object), index=best["session"].to_numpy())
+    return resolved.reindex(all_sessions).fillna(SYSAID_UNKNOWN).astype(object)
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+SAP Audit Tool - Audit Warehouse Module
+
+This module keeps the risk-assessed timeline and findings of every audit
+run in an embedded SQLite database, so trend and period-over-period
+questions are answered with SQL instead of re-opening old reports.
+
+Key features:
+- Runs table with the summary of every run (no limit on the history,
+  unlike the ten runs kept in SAP_Audit_Metadata.json)
+- Typed events table partitioned by audit period (the period folder of a
+  batch run, e.g. "MAr DEBUG", or the start month of a run on the default
+  input folder); re-running a period replaces it, so its events are never
+  counted twice
+- Every period is placed in the month it starts in, so monthly trends work
+  even though SAP export windows rarely match calendar months
+- Findings table with one row per flagged event and category (debug
+  activity, high-risk transactions, data changes, critical and high risk)
+- Indexes on period, user and category for the trend queries, and on
+  user, session, transaction, table, risk level and event time for event
+  lookups
+- Query API: event lookups by user, session, transaction, table, risk
+  level and time range (find_events), period trends, users with findings
+  in consecutive months, period-over-period deltas per user, and plain SQL
+- Safe for the batch runner's worker processes (WAL journal, writers wait
+  for each other)
+"""
+
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from sap_audit_config import PATHS, COLUMNS, SYSAID
+from sap_audit_utils import log_message
+
+# Seconds a writer waits for another process holding the write lock
+BUSY_TIMEOUT = 120
+
+# SQLite page cache per connection in KB
+CACHE_SIZE_KB = 256 * 1024
+
+# Events table columns: (column, SQL type, timeline column)
+EVENT_COLUMNS = [
+    ("event_time", "TEXT", COLUMNS["session"]["datetime"]),
+    ("user_name", "TEXT", COLUMNS["session"]["user"]),
+    ("session_id", "TEXT", COLUMNS["session"]["id_with_date"]),
+    ("source", "TEXT", COLUMNS["session"]["source"]),
+    ("event_code", "TEXT", "Event"),
+    ("tcode", "TEXT", COLUMNS["session"]["tcode"]),
+    ("table_name", "TEXT", COLUMNS["session"]["table"]),
+    ("field_name", "TEXT", COLUMNS["session"]["field"]),
+    ("change_indicator", "TEXT", COLUMNS["session"]["change_indicator"]),
+    ("old_value", "TEXT", COLUMNS["session"]["old_value"]),
+    ("new_value", "TEXT", COLUMNS["session"]["new_value"]),
+    ("description", "TEXT", COLUMNS["session"]["description"]),
+    ("risk_level", "TEXT", "risk_level"),
+    ("sap_risk_level", "TEXT", "sap_risk_level"),
+    ("activity_type", "TEXT", "activity_type"),
+    ("risk_description", "TEXT", "risk_description"),
+    ("sysaid", "TEXT", None)
+]
+
+# SAP identifiers stored in upper case so find_events filters match any input case
+UPPERCASE_EVENT_COLUMNS = {"user_name", "tcode", "table_name"}
+
+# Finding categories taken from the analyzer's flag columns (non-empty = finding)
+FINDING_FLAGS = {
+    "debug": "Debugging_Related_Event",
+    "high_risk_tcode": "High_Risk_TCode",
+    "change": "Change_Activity"
+}
+
+# Finding categories taken from the risk level
+FINDING_RISK_LEVELS = {
+    "critical_risk": "Critical",
+    "high_risk": "High"
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    period TEXT NOT NULL,
+    month TEXT NOT NULL,
+    loaded_at TEXT NOT NULL,
+    input_dir TEXT,
+    report_path TEXT,
+    first_event TEXT,
+    last_event TEXT,
+    events INTEGER NOT NULL,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS events (
+    event_id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL,
+    period TEXT NOT NULL,
+    month TEXT NOT NULL,
+    month_index INTEGER NOT NULL,
+    {", ".join(f"{name} {sql_type}" for name, sql_type, _ in EVENT_COLUMNS)}
+);
+CREATE TABLE IF NOT EXISTS findings (
+    event_id INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    period TEXT NOT NULL,
+    month TEXT NOT NULL,
+    month_index INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    detail TEXT,
+    user_name TEXT,
+    session_id TEXT,
+    event_time TEXT,
+    risk_level TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_period ON events (period);
+CREATE INDEX IF NOT EXISTS idx_events_month_user ON events (month, user_name);
+CREATE INDEX IF NOT EXISTS idx_events_user ON events (user_name, event_time);
+CREATE INDEX IF NOT EXISTS idx_events_session ON events (session_id, event_time);
+CREATE INDEX IF NOT EXISTS idx_events_tcode ON events (tcode, event_time);
+CREATE INDEX IF NOT EXISTS idx_events_table ON events (table_name, event_time);
+CREATE INDEX IF NOT EXISTS idx_events_risk ON events (risk_level, event_time);
+CREATE INDEX IF NOT EXISTS idx_events_time ON events (event_time);
+CREATE INDEX IF NOT EXISTS idx_findings_period ON findings (period);
+CREATE INDEX IF NOT EXISTS idx_findings_category ON findings (category, month_index, user_name);
+CREATE INDEX IF NOT EXISTS idx_findings_user ON findings (user_name, month_index);
+"""
+
+
+class AuditWarehouse:
+    """
+    SQLite store of the timelines and findings of all audit runs.
+    """
+
+    def __init__(self, path=None):
+        """
+        Open (and create if needed) the warehouse.
+
+        Args:
+            path: Database file (defaults to PATHS["warehouse"])
+        """
+        self.path = path or PATHS["warehouse"]
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent with NORMAL sync; a larger page cache keeps
+        # index updates of big loads in memory
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _event_frame(self, timeline):
+        """
+        Convert a timeline to the events table layout.
+
+        Args:
+            timeline: Risk-assessed timeline
+
+        Returns:
+            DataFrame: Rows with an event time (as datetimes), in the events column order
+        """
+        events = pd.DataFrame(index=timeline.index)
+        sysaid_column = next((column for column in [SYSAID["output_column"]] + SYSAID["column_options"]
+                              if column in timeline.columns), None)
+        for name, _, column in EVENT_COLUMNS:
+            column = sysaid_column if name == "sysaid" else column
+            if column is None or column not in timeline.columns:
+                events[name] = None
+            elif name == "event_time":
+                events[name] = pd.to_datetime(timeline[column], errors="coerce")
+            else:
+                values = timeline[column]
+                present = values.notna() & (values.astype(str).str.strip() != "")
+                values = values.astype(str)
+                if name in UPPERCASE_EVENT_COLUMNS:
+                    values = values.str.strip().str.upper()
+                events[name] = values.where(present, None)
+
+        return events[events["event_time"].notna()]
+
+    def _finding_frame(self, timeline, events):
+        """
+        Build the findings rows of the loaded events.
+
+        Args:
+            timeline: Risk-assessed timeline
+            events: Events frame (with event_id) from _event_frame
+
+        Returns:
+            DataFrame: One row per event and finding category
+        """
+        frames = []
+        for category, column in FINDING_FLAGS.items():
+            if column in timeline.columns:
+                detail = timeline.loc[events.index, column].fillna("").astype(str).str.strip()
+                flagged = detail != ""
+                frames.append(events.loc[flagged].assign(category=category, detail=detail[flagged]))
+        for category, level in FINDING_RISK_LEVELS.items():
+            flagged = events["risk_level"] == level
+            frames.append(events.loc[flagged].assign(category=category, detail=level))
+        if not frames:
+            return pd.DataFrame()
+        findings = pd.concat(frames)
+        return findings[["event_id", "run_id", "period", "month", "month_index", "category", "detail",
+                         "user_name", "session_id", "event_time", "risk_level"]]
+
+    def load_run(self, timeline, period=None, input_dir=None, report_path=None, summary=None):
+        """
+        Store the timeline and findings of a run.
+
+        The run's events and findings replace those stored for the same
+        period by earlier runs; the runs table keeps every run.
+
+        Args:
+            timeline: Risk-assessed timeline
+            period: Audit period name (e.g. the period folder name);
+                    defaults to the run's start month ("YYYY-MM")
+            input_dir: Input folder of the run
+            report_path: Report written by the run
+            summary: Dict stored with the run (e.g. record counts)
+
+        Returns:
+            int: Run ID (None if the timeline has no dated events)
+        """
+        start = time.time()
+        timeline = timeline.reset_index(drop=True)
+        events = self._event_frame(timeline)
+        if len(events) < len(timeline):
+            log_message(f"{len(timeline) - len(events)} timeline rows without a valid datetime not stored", "WARNING")
+        if events.empty:
+            log_message("No timeline events to store in the warehouse", "WARNING")
+            return None
+        
+        first_event = events["event_time"].min()
+        month = first_event.strftime("%Y-%m")
+        period = period or month
+        # Rows in time order keep the time-ordered indexes cheap to update
+        events = events.sort_values("event_time", kind="stable")
+        events.insert(0, "month_index", first_event.year * 12 + first_event.month - 1)
+        events.insert(0, "month", month)
+        events.insert(0, "period", period)
+        events["event_time"] = events["event_time"].dt.strftime("%Y-%m-%d %H:%M:%S")
+
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute(
+                "INSERT INTO runs (period, month, loaded_at, input_dir, report_path, first_event, last_event, "
+                "events, summary) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (period, month, datetime.now().isoformat(timespec="seconds"), input_dir, report_path,
+                 events["event_time"].min(), events["event_time"].max(), len(events),
+                 json.dumps(summary or {}, default=str)))
+            run_id = cursor.lastrowid
+
+            cursor.execute("DELETE FROM events WHERE period = ?", (period,))
+            cursor.execute("DELETE FROM findings WHERE period = ?", (period,))
+
+            first_id = cursor.execute("SELECT COALESCE(MAX(event_id), 0) + 1 FROM events").fetchone()[0]
+            events.insert(0, "run_id", run_id)
+            events.insert(0, "event_id", range(first_id, first_id + len(events)))
+
+            columns = list(events.columns)
+            cursor.executemany(
+                f"INSERT INTO events ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                events.astype(object).where(events.notna(), None).itertuples(index=False, name=None))
+
+            findings = self._finding_frame(timeline, events)
+            if not findings.empty:
+                cursor.executemany(
+                    f"INSERT INTO findings ({', '.join(findings.columns)}) "
+                    f"VALUES ({', '.join('?' * len(findings.columns))})",
+                    findings.astype(object).where(findings.notna(), None).itertuples(index=False, name=None))
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        # Refresh the index statistics the query planner picks indexes by
+        self.connection.execute("PRAGMA optimize")
+
+        log_message(f"Stored {len(events)} events and {len(findings)} findings of period {period} ({month}) "
+                    f"in the warehouse ({time.time() - start:.1f}s)")
+        return run_id
+
+    def query(self, sql, params=()):
+        """
+        Run a SQL query against the warehouse.
+
+        Args:
+            sql: SELECT statement
+            params: Query parameters
+
+        Returns:
+            DataFrame: Query result
+        """
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def find_events(self, user=None, session=None, tcode=None, table=None, risk_level=None,
+                    start=None, end=None, period=None, limit=None):
+        """
+        Look up timeline events; every filter is answered from an index.
+
+        Filters take a value or a list of values. User, transaction and
+        table names are matched in upper case, risk levels in title case
+        ("critical" finds "Critical"). A session ID without its date
+        ("S0002") finds the session on every date.
+
+        Args:
+            user: User name(s)
+            session: Session ID(s), with or without the date
+            tcode: Transaction code(s)
+            table: Table name(s)
+            risk_level: Risk level(s)
+            start: Earliest event time (anything pandas can parse)
+            end: Latest event time; a date alone includes the whole day
+            period: Audit period name(s)
+            limit: Maximum number of events
+
+        Returns:
+            DataFrame: Matching events ordered by event time
+        """
+        conditions, params = [], []
+
+        def add_values(column, values, convert=None):
+            if values is None:
+                return
+            values = [values] if isinstance(values, str) else list(values)
+            values = [convert(value) if convert else value for value in values]
+            conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+
+        add_values("user_name", user, str.upper)
+        add_values("tcode", tcode, str.upper)
+        add_values("table_name", table, str.upper)
+        add_values("risk_level", risk_level, str.capitalize)
+        add_values("period", period)
+
+        if session is not None:
+            sessions = [session] if isinstance(session, str) else list(session)
+            matches = []
+            for session_id in sessions:
+                # "S0002 (2025-03-04)" sorts between "S0002 (" and "S0002 )"
+                matches.append("session_id = ? OR (session_id >= ? AND session_id < ?)")
+                params.extend([session_id, f"{session_id} (", f"{session_id} )"])
+            conditions.append("(" + " OR ".join(matches) + ")")
+
+        if start is not None:
+            conditions.append("event_time >= ?")
+            params.append(pd.Timestamp(start).strftime("%Y-%m-%d %H:%M:%S"))
+        if end is not None:
+            end_time = pd.Timestamp(end)
+            if isinstance(end, str) and len(end.strip()) <= 10:
+                end_time += pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+            conditions.append("event_time <= ?")
+            params.append(end_time.strftime("%Y-%m-%d %H:%M:%S"))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"SELECT * FROM events {where} ORDER BY event_time, event_id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return self.query(sql, params).drop(columns=["month_index"])
+
+    def runs(self):
+        """
+        Return all stored runs, newest first.
+
+        Returns:
+            DataFrame: Runs table
+        """
+        return self.query("SELECT * FROM runs ORDER BY run_id DESC")
+
+    def period_trend(self, category=None):
+        """
+        Count findings per month and category.
+
+        Args:
+            category: Only this finding category
+
+        Returns:
+            DataFrame: month, category, findings, users, sessions, periods
+        """
+        where, params = ("WHERE category = ?", (category,)) if category else ("", ())
+        return self.query(
+            "SELECT month, category, COUNT(*) AS findings, COUNT(DISTINCT user_name) AS users, "
+            "COUNT(DISTINCT session_id) AS sessions, GROUP_CONCAT(DISTINCT period) AS periods "
+            f"FROM findings {where} GROUP BY month, category ORDER BY month, category", params)
+
+    def users_with_consecutive_findings(self, category, months=3):
+        """
+        Find users with findings of a category in consecutive months.
+
+        Args:
+            category: Finding category (e.g. "debug")
+            months: Minimum number of consecutive months
+
+        Returns:
+            DataFrame: user_name, first_month, last_month, months, findings
+                       (one row per run of consecutive months)
+        """
+        return self.query(
+            """
+            WITH user_months AS (
+                SELECT user_name, month_index, MIN(month) AS month, COUNT(*) AS findings
+                FROM findings WHERE category = ? GROUP BY user_name, month_index
+            ), streaks AS (
+                SELECT *, month_index - ROW_NUMBER() OVER (PARTITION BY user_name ORDER BY month_index) AS streak
+                FROM user_months
+            )
+            SELECT user_name, MIN(month) AS first_month, MAX(month) AS last_month,
+                   COUNT(*) AS months, SUM(findings) AS findings
+            FROM streaks GROUP BY user_name, streak HAVING COUNT(*) >= ?
+            ORDER BY months DESC, user_name
+            """, (category, months))
+
+    def period_delta(self, month_from, month_to, category=None):
+        """
+        Compare the findings per user of two months.
+
+        Args:
+            month_from: Earlier month ("YYYY-MM")
+            month_to: Later month ("YYYY-MM")
+            category: Only this finding category
+
+        Returns:
+            DataFrame: user_name, category, findings in each month and the change
+        """
+        where, params = ("AND category = ?", (category,)) if category else ("", ())
+        return self.query(
+            f"""
+            SELECT user_name, category,
+                   SUM(month = ?) AS findings_from, SUM(month = ?) AS findings_to,
+                   SUM(month = ?) - SUM(month = ?) AS change
+            FROM findings WHERE month IN (?, ?) {where}
+            GROUP BY user_name, category ORDER BY ABS(change) DESC, user_name, category
+            """, (month_from, month_to, month_to, month_from, month_from, month_to) + params)
+
+
+def store_run(timeline, period=None, input_dir=None, report_path=None, summary=None, path=None):
+    """
+    Store one run in the warehouse (used by the controller at the end of a run).
+
+    Args:
+        timeline: Risk-assessed timeline
+        period: Audit period name; defaults to the run's start month
+        input_dir: Input folder of the run
+        report_path: Report written by the run
+        summary: Dict stored with the run
+        path: Warehouse file (defaults to PATHS["warehouse"])
+
+    Returns:
+        int: Run ID
+    """
+    with AuditWarehouse(path) as warehouse:
+        return warehouse.load_run(timeline, period, input_dir, report_path, summary)
@@ -18,6 +18,8 @@ from datetime import datetime
 import os
 import sys
 
+from sap_audit_utils import standardize_sysaid_value, standardize_sysaid_series, SYSAID_UNKNOWN
+
 # Configuration
 DEBUG = True
 
@@ -36,30 +38,17 @@ def standardize_sysaid(value):
     - Values with SR/CR prefixes (SR-120568)
     - Plain numeric values (120568)
     - Empty or None values (returns "UNKNOWN")
-    """
-    if not value or pd.isna(value) or str(value).strip() == '':
-        return "UNKNOWN"
-    
-    value = str(value).strip()
-    
-    # Log original value in debug mode
-    if DEBUG:
-        log_message(f"Standardizing SysAid: '{value}'", "DEBUG")
     
-    # Remove hash prefix
-    value = re.sub(r'^#', '', value)
-    
-    # Remove SR- or CR- prefixes
-    value = re.sub(r'^(SR|CR)-', '', value)
-    
-    # Remove commas
-    value = value.replace(',', '')
+    Delegates to the shared implementation in sap_audit_utils; use
+    standardize_sysaid_series for whole columns.
+    """
+    standardized = standardize_sysaid_value(value)
     
     # Log the standardized value in debug mode
     if DEBUG:
-        log_message(f"Standardized to: '{value}'", "DEBUG")
+        log_message(f"Standardized SysAid '{value}' to '{standardized}'", "DEBUG")
     
-    return value
+    return standardized
 
 def map_sessions_to_sysaid(df, session_col, sysaid_col):
     """
@@ -73,12 +62,16 @@ def map_sessions_to_sysaid(df, session_col, sysaid_col):
     session_ids = df[session_col].unique()
     log_message(f"Mapping {len(session_ids)} unique sessions to SysAid values")
     
+    # Standardize each distinct SysAid value once; missing values map to UNKNOWN
+    raw_values = pd.Series(df[sysaid_col].dropna().unique(), dtype=object)
+    std_lookup = dict(zip(raw_values, standardize_sysaid_series(raw_values)))
+    
     for session_id in session_ids:
         subset = df[df[session_col] == session_id]
         sysaid_values = subset[sysaid_col].unique()
         
         # Standardize all SysAid values in this session
-        std_values = [standardize_sysaid(val) for val in sysaid_values]
+        std_values = [std_lookup.get(val, SYSAID_UNKNOWN) for val in sysaid_values]
         unique_std_values = list(set(std_values))
         
         # If we have multiple values including UNKNOWN, prioritize non-UNKNOWN
@@ -184,7 +177,10 @@ def process_timeline_file(file_path, output_path=None):
         
         # Standardize all SysAid values
         log_message("Standardizing SysAid values...")
-        df['Standardized_SysAid'] = df[sysaid_col].apply(standardize_sysaid)
+        df['Standardized_SysAid'] = standardize_sysaid_series(df[sysaid_col])
+        if DEBUG:
+            log_message(f"Standardized {df[sysaid_col].nunique()} distinct raw values into "
+                        f"{df['Standardized_SysAid'].nunique()} tickets", "DEBUG")
         
         # Map sessions to SysAid values
         session_to_sysaid = map_sessions_to_sysaid(df, session_col, sysaid_col)
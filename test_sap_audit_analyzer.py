@@ -156,6 +156,17 @@ class TestSAPAuditAnalyzer(unittest.TestCase):
         change_activity = self.analyzer._identify_change_activity(modified_data)
         self.assertEqual(change_activity.iloc[2], "01 - Insert", "Event BU should be identified as Insert")
     
+    def test_identify_flags_with_sorted_index(self):
+        """Test that flags follow their rows when the index is not a RangeIndex."""
+        sorted_data = self.sample_data.sort_values("TCode")
+
+        high_risk = self.analyzer._identify_high_risk_tcodes(sorted_data)
+        change_activity = self.analyzer._identify_change_activity(sorted_data)
+
+        self.assertEqual(high_risk.loc[5], "Debugging", "/H should keep its category after sorting")
+        self.assertEqual(high_risk.loc[2], "", "FB03 should not be identified as high risk")
+        self.assertEqual(change_activity.loc[4], "02 - Update", "Change indicator U should follow its row")
+
     def test_identify_transport_events(self):
         """Test identification of transport-related events."""
         # Modify sample data to include transport events
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the SAP Audit multi-period batch runner.
+
+This script verifies the batch runner:
+1. Tests resolving period folders from names and glob patterns
+2. Tests the consolidated index written for several periods
+
+Usage:
+    python test_sap_audit_batch.py
+"""
+
+import os
+import sys
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import sap_audit_batch
+from sap_audit_batch import resolve_period_folders, write_index
+
+# Redirect stdout to capture log messages
+original_stdout = sys.stdout
+
+
+class TestBatchRunner(unittest.TestCase):
+    """Test cases for the batch runner."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        for name in ["FEB- Good", "Mar FF", "MAr DEBUG"]:
+            os.makedirs(os.path.join(self.test_dir, name))
+        with open(os.path.join(self.test_dir, "SM20.csv"), "w", encoding="utf-8") as f:
+            f.write("USER\n")
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        sys.stdout = original_stdout
+        shutil.rmtree(self.test_dir)
+
+    def test_resolve_period_folders(self):
+        """Test that folder names and globs resolve against the input directory."""
+        folders = resolve_period_folders(input_dir=self.test_dir)
+        self.assertEqual([os.path.basename(f) for f in folders], ["FEB- Good", "MAr DEBUG", "Mar FF"])
+
+        folders = resolve_period_folders(["Mar*", "FEB- Good", "missing"], input_dir=self.test_dir)
+        self.assertEqual([os.path.basename(f) for f in folders], ["FEB- Good", "Mar FF"])
+
+    def test_batch_writes_consolidated_index(self):
+        """Test that every period appears in the JSON and CSV index in folder order."""
+        def fake_audit_period(input_dir, output_dir, config=None):
+            period = os.path.basename(input_dir)
+            return {"period": period, "input_dir": input_dir, "output_dir": output_dir,
+                    "success": period != "Mar FF", "records": 10, "high": 2, "error": ""}
+
+        def thread_pool(max_workers, mp_context=None):
+            return ThreadPoolExecutor(max_workers=max_workers)
+
+        folders = resolve_period_folders(input_dir=self.test_dir)
+        output_root = os.path.join(self.test_dir, "batch")
+        with mock.patch.object(sap_audit_batch, "ProcessPoolExecutor", thread_pool), \
+                mock.patch.object(sap_audit_batch, "audit_period", fake_audit_period):
+            results = sap_audit_batch.run_batch(folders, output_root, workers=2)
+
+        self.assertEqual([entry["success"] for entry in results], [True, True, False])
+        with open(os.path.join(output_root, "batch_index.json"), encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)["periods"]), 3)
+        with open(os.path.join(output_root, "batch_index.csv"), newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(rows[2]["period"], "Mar FF")
+        self.assertEqual(rows[0]["output_dir"], os.path.join(output_root, "FEB- Good"))
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT BATCH RUNNER - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()
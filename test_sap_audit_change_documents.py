@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the SAP Audit change document join module.
+
+This script verifies the CDHDR-CDPOS join engine:
+1. Tests that the composite key keeps items of other objects apart
+2. Tests dtype alignment of numeric and zero-padded change numbers
+3. Tests the cardinality estimate and the explosion guard
+
+Usage:
+    python test_sap_audit_change_documents.py
+"""
+
+import os
+import sys
+import unittest
+from io import StringIO
+
+import pandas as pd
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sap_audit_change_documents import join_change_documents, JoinExplosionError
+
+# Redirect stdout to capture log messages
+original_stdout = sys.stdout
+
+
+class TestJoinChangeDocuments(unittest.TestCase):
+    """Test cases for join_change_documents."""
+
+    def setUp(self):
+        self.cdhdr = pd.DataFrame({
+            'OBJECT': ['LIEFERUNG', 'EINKBELEG', 'MATERIAL'],
+            'OBJECT VALUE': ['180017030', '4500000001', 'MAT1'],
+            'DOC.NUMBER': [3237822, 3237822, 3237900],
+            'USER': ['USER1', 'USER2', 'USER3']
+        })
+        self.cdpos = pd.DataFrame({
+            'OBJECT': ['EINKBELEG', 'LIEFERUNG', 'LIEFERUNG', 'KRED'],
+            'OBJECT VALUE': ['4500000001', '180017030', '180017030', 'V1'],
+            'DOC.NUMBER': ['0003237822', '0003237822', '0003237822', '0003237999'],
+            'TABLE NAME': ['EKPO', 'LIKP', 'LIKP', 'LFA1'],
+            'FIELD NAME': ['MENGE', 'TDUHR', 'VLSTK', 'NAME1']
+        })
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        sys.stdout = original_stdout
+
+    def test_composite_key_join(self):
+        """Test that headers only get the items of their own object."""
+        joined, estimate = join_change_documents(self.cdhdr, self.cdpos)
+
+        self.assertEqual(estimate['key_columns'], ['OBJECT', 'OBJECT VALUE', 'DOC.NUMBER'])
+        self.assertEqual(list(joined['USER']), ['USER1', 'USER1', 'USER2', 'USER3'])
+        self.assertEqual(list(joined['FIELD NAME'].fillna('')), ['TDUHR', 'VLSTK', 'MENGE', ''])
+        self.assertEqual(list(joined['DOC.NUMBER']), [3237822, 3237822, 3237822, 3237900])
+
+    def test_estimate_matches_join(self):
+        """Test that the estimate predicts the joined row count."""
+        joined, estimate = join_change_documents(self.cdhdr, self.cdpos, key_columns=['DOC.NUMBER'])
+
+        self.assertEqual(estimate['rows'], len(joined))
+        self.assertEqual(estimate['rows'], 7)
+        self.assertEqual(estimate['one_to_many_rows'], 4)
+
+    def test_explosion_guard(self):
+        """Test that a many-to-many join warns or aborts."""
+        with self.assertRaises(JoinExplosionError):
+            join_change_documents(self.cdhdr, self.cdpos, key_columns=['DOC.NUMBER'],
+                                  max_expansion=1.5, on_explosion='abort')
+
+        joined, _ = join_change_documents(self.cdhdr, self.cdpos, key_columns=['DOC.NUMBER'],
+                                          max_expansion=1.5, on_explosion='warn')
+        self.assertEqual(len(joined), 7)
+        self.assertIn("WARNING", sys.stdout.getvalue())
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT CHANGE DOCUMENT JOIN - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()
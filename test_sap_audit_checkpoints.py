@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test script for the SAP Audit checkpoint module.
+
+This script verifies stage checkpoints and resume:
+1. Tests that timeline checkpoints keep their column types
+2. Tests that the resume point stops at a stale checkpoint
+3. Tests that checkpoints of a run with other inputs are not resumed
+4. Tests that a resumed controller run skips restored stages
+
+Usage:
+    python test_sap_audit_checkpoints.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+from unittest import mock
+
+import pandas as pd
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sap_audit_checkpoints import CheckpointStore, run_fingerprint
+from sap_audit_controller import AuditController
+
+# Redirect stdout to capture log messages
+original_stdout = sys.stdout
+
+
+class TestCheckpointStore(unittest.TestCase):
+    """Test cases for the CheckpointStore class."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.store = CheckpointStore(os.path.join(self.test_dir, "checkpoints"))
+        self.prepared = os.path.join(self.test_dir, "SM20.csv")
+        with open(self.prepared, "w", encoding="utf-8") as f:
+            f.write("USER,EVENT\nUSER1,AU3\n")
+        self.timeline = pd.DataFrame({
+            "Session ID": pd.Categorical(["S0001", "S0001"]),
+            "Datetime": pd.to_datetime(["2025-03-17 09:00:00", "2025-03-17 09:05:00"]),
+            "risk_score": [10, 90]
+        })
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        sys.stdout = original_stdout
+        shutil.rmtree(self.test_dir)
+
+    def test_checkpoint_keeps_column_types(self):
+        """Test that a saved timeline loads back with the same dtypes."""
+        self.assertTrue(self.store.save("risk_assessment", df=self.timeline, counts={"sm20": {"final_count": 2}}))
+
+        df, entry = self.store.load("risk_assessment")
+
+        pd.testing.assert_frame_equal(df, self.timeline)
+        self.assertEqual(entry["rows"], 2)
+        self.assertEqual(entry["counts"]["sm20"]["final_count"], 2)
+
+    def test_resume_point_stops_at_stale_checkpoint(self):
+        """Test that later checkpoints are ignored once prepared files changed."""
+        stages = ["data_preparation", "session_merging", "risk_assessment"]
+        self.store.save("data_preparation", files=[self.prepared])
+        self.store.save("session_merging", df=self.timeline)
+        self.assertEqual(self.store.resume_point(stages), "session_merging")
+
+        with open(self.prepared, "a", encoding="utf-8") as f:
+            f.write("USER2,AU1\n")
+        self.assertIsNone(self.store.resume_point(stages))
+
+        self.store.clear()
+        self.assertFalse(os.path.exists(self.store.directory))
+
+    def test_resume_point_requires_same_run(self):
+        """Test that another input folder, new exports or changed settings prevent a resume."""
+        stages = ["data_preparation", "session_merging"]
+        export = os.path.join(self.test_dir, "feb_sm20.xlsx")
+        with open(export, "wb") as f:
+            f.write(b"export")
+        run = run_fingerprint(self.test_dir, [export], {"enable_sysaid": False})
+        self.store.save("data_preparation", files=[self.prepared], run=run)
+        self.store.save("session_merging", df=self.timeline, run=run)
+
+        self.assertEqual(self.store.resume_point(stages, run=run), "session_merging")
+        self.assertIsNone(self.store.resume_point(
+            stages, run=run_fingerprint(os.path.join(self.test_dir, "other"), [export], {"enable_sysaid": False})))
+        self.assertIsNone(self.store.resume_point(
+            stages, run=run_fingerprint(self.test_dir, [export, self.prepared], {"enable_sysaid": False})))
+        self.assertIsNone(self.store.resume_point(
+            stages, run=run_fingerprint(self.test_dir, [export], {"enable_sysaid": True})))
+
+        with open(export, "ab") as f:
+            f.write(b" updated")
+        self.assertIsNone(self.store.resume_point(
+            stages, run=run_fingerprint(self.test_dir, [export], {"enable_sysaid": False})))
+
+    def test_resumed_run_skips_restored_stages(self):
+        """Test that a resumed run restores the timeline and only runs later stages."""
+        controller = AuditController({"resume": True, "parallel_processing": False, "enable_sysaid": False})
+        controller._checkpoints = self.store
+        run = controller._fingerprint_run()
+        self.store.save("data_preparation", run=run)
+        self.store.save("session_merging", df=self.timeline, run=run)
+        self.store.save("risk_assessment", df=self.timeline, run=run)
+
+        calls = []
+        def stage(name):
+            def run():
+                calls.append(name)
+                return True
+            return run
+
+        with mock.patch.multiple(controller, run_data_preparation=stage("prep"),
+                                 run_session_merging=stage("merge"), run_risk_assessment=stage("risk"),
+                                 run_sysaid_integration=stage("sysaid"), run_enhanced_analysis=stage("analysis"),
+                                 generate_output=stage("output"), load_reference_data=stage("reference"),
+                                 load_warehouse=stage("warehouse")):
+            self.assertTrue(controller.run_full_audit())
+
+        self.assertEqual(calls, ["sysaid", "analysis", "output", "warehouse"])
+        self.assertEqual(len(controller.session_data), 2)
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT CHECKPOINTS - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for the SAP Audit context module.
+
+This script verifies the audit context:
+1. Tests per-folder paths and patterns without touching the global ones
+   (and that only a per-run override replaces the run's output path)
+2. Tests that configuration files and counts stay in their context
+3. Tests two data preparations running at once in one process
+
+Usage:
+    python test_sap_audit_context.py
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest.mock import patch
+
+import pandas as pd
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sap_audit_config import CONFIG, PATHS, PATTERNS, SETTINGS
+from sap_audit_context import AuditContext
+from sap_audit_data_prep import DataPrepManager
+
+# Redirect stdout to capture log messages
+original_stdout = sys.stdout
+
+
+class TestAuditContext(unittest.TestCase):
+    """Test cases for the AuditContext class."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.saved_paths, self.saved_patterns = dict(PATHS), dict(PATTERNS)
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        sys.stdout = original_stdout
+        shutil.rmtree(self.test_dir)
+
+    def make_folder(self, name, users):
+        """Create an input folder holding one SM20 export."""
+        input_dir = os.path.join(self.test_dir, name)
+        os.makedirs(input_dir)
+        pd.DataFrame({
+            'USER': users,
+            'DATE': ['2025-03-01'] * len(users),
+            'TIME': ['10:00:00'] * len(users),
+            'EVENT': ['AU1'] * len(users),
+            'SOURCE TA': ['SE16'] * len(users)
+        }).to_excel(os.path.join(input_dir, f"PRD_sm20_{name}.xlsx"), index=False)
+        return input_dir
+
+    def test_for_folder(self):
+        """Test that a run's inputs, outputs and caches move to its folders."""
+        input_dir = os.path.join(self.test_dir, "Mar FF")
+        output_dir = os.path.join(self.test_dir, "out")
+
+        context = AuditContext.for_folder(input_dir, output_dir, {"output_format": "csv"})
+
+        self.assertEqual(context.paths["sm20_input"], os.path.join(input_dir, "SM20.csv"))
+        self.assertEqual(context.patterns["cdpos"], os.path.join(input_dir, "*_cdpos_*.xlsx"))
+        self.assertEqual(context.paths["audit_report"], os.path.join(output_dir, "SAP_Audit_Report.xlsx"))
+        self.assertEqual(context.paths["cache_dir"], os.path.join(output_dir, "cache"))
+        self.assertEqual(context.paths["tcodes_reference"], PATHS["tcodes_reference"])
+        self.assertEqual(context.config["output_path"], context.paths["audit_report"])
+        self.assertEqual(context.config["output_format"], "csv")
+
+        # The global configuration is untouched
+        self.assertEqual(dict(PATHS), self.saved_paths)
+        self.assertEqual(dict(PATTERNS), self.saved_patterns)
+        self.assertNotEqual(CONFIG.get("output_path"), context.config["output_path"])
+
+    def test_for_folder_output_path(self):
+        """Test that a global output path is not reused while a run override is honored."""
+        output_dir = os.path.join(self.test_dir, "out")
+        report_path = os.path.join(self.test_dir, "Mar FF.xlsx")
+
+        with patch.dict(CONFIG, {"output_path": os.path.join(self.test_dir, "global.xlsx")}):
+            context = AuditContext.for_folder(self.test_dir, output_dir)
+            override = AuditContext.for_folder(self.test_dir, output_dir, {"output_path": report_path})
+
+        self.assertEqual(context.config["output_path"], os.path.join(output_dir, "SAP_Audit_Report.xlsx"))
+        self.assertEqual(override.config["output_path"], report_path)
+
+    def test_isolated_state(self):
+        """Test that configuration files and record counts stay in their context."""
+        config_file = os.path.join(self.test_dir, "config.json")
+        with open(config_file, "w", encoding="utf-8") as f:
+            json.dump({"settings": {"correlation": {"window_seconds": 5}}}, f)
+        first, second = AuditContext(), AuditContext()
+
+        self.assertTrue(first.load_config_file(config_file))
+        first.record_counter.update_source_counts("sm20", "SM20.csv", 10, final_count=10)
+
+        self.assertEqual(first.settings["correlation"]["window_seconds"], 5)
+        self.assertNotEqual(second.settings["correlation"]["window_seconds"], 5)
+        self.assertNotEqual(SETTINGS["correlation"]["window_seconds"], 5)
+        self.assertEqual(second.record_counter.counts["sm20"]["original_count"], 0)
+        self.assertIs(AuditContext.default().paths, PATHS)
+
+    def test_concurrent_data_preparation(self):
+        """Test that two folders prepared at once keep their own files and counts."""
+        folders = {"feb": ["USER1", "USER2"], "mar": ["USER3", "USER4", "USER5"]}
+        contexts = {name: AuditContext.for_folder(self.make_folder(name, users),
+                                                  os.path.join(self.test_dir, f"{name}_out"))
+                    for name, users in folders.items()}
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for future in [executor.submit(DataPrepManager(context=context).process_input_files)
+                           for context in contexts.values()]:
+                future.result()
+
+        for name, users in folders.items():
+            context = contexts[name]
+            prepared = pd.read_csv(context.paths["sm20_input"], encoding="utf-8-sig")
+            self.assertEqual(sorted(prepared["USER"]), users)
+            self.assertEqual(context.record_counter.counts["sm20"]["original_count"], len(users))
+            self.assertEqual(context.record_counter.counts["sm20"]["file_name"], f"PRD_sm20_{name}.xlsx")
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT CONTEXT - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()
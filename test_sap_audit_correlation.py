@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the SAP Audit change correlation module.
+
+This script verifies linking of change documents to SM20 events:
+1. Tests linking to the nearest preceding event of the same user and tcode
+2. Tests that changes outside the window stay unlinked
+3. Tests the debugging session flag
+
+Usage:
+    python test_sap_audit_correlation.py
+"""
+
+import os
+import sys
+import unittest
+from io import StringIO
+
+import pandas as pd
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sap_audit_correlation import correlate_change_documents
+
+# Redirect stdout to capture log messages
+original_stdout = sys.stdout
+
+
+class TestCorrelateChangeDocuments(unittest.TestCase):
+    """Test cases for correlate_change_documents."""
+
+    def setUp(self):
+        self.timeline = pd.DataFrame({
+            "Session ID": ["S0001", "S0001", "S0001", "S0002", "S0002", "S0002"],
+            "User": ["USER1", "USER1", "USER1", "USER2", "USER2", "USER2"],
+            "Datetime": pd.to_datetime([
+                "2025-03-17 09:00:00", "2025-03-17 09:05:00", "2025-03-17 09:06:00",
+                "2025-03-17 10:00:00", "2025-03-17 10:01:00", "2025-03-17 11:00:00"]),
+            "Source": ["SM20", "SM20", "CDPOS", "SM20", "SM20", "CDHDR"],
+            "TCode": ["SU01", "SM30", "SM30", "SE38", "FB02", "FB02"],
+            "Event": ["AU3", "AU3", "", "CUK", "AU3", ""],
+            "Description": ["Start SU01", "Start SM30", "", "Debug", "Start FB02", ""],
+        })
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        sys.stdout = original_stdout
+
+    def test_links_preceding_event_with_same_tcode(self):
+        """Test that a change links to the nearest preceding event of its user and tcode."""
+        result = correlate_change_documents(self.timeline, window_seconds=900, match_tcode=True)
+
+        change = result.iloc[2]
+        self.assertEqual(change["Linked_Event_Description"], "Start SM30")
+        self.assertEqual(change["Linked_Session_ID"], "S0001")
+        self.assertEqual(change["Link_Gap_Seconds"], 60)
+        self.assertEqual(change["Linked_Debug_Session"], "No")
+        self.assertTrue(pd.isna(result.iloc[0]["Linked_Event_Datetime"]))
+
+    def test_changes_outside_window_stay_unlinked(self):
+        """Test that the tolerance excludes events older than the window."""
+        result = correlate_change_documents(self.timeline, window_seconds=900, match_tcode=True)
+        self.assertTrue(pd.isna(result.iloc[5]["Linked_Event_Datetime"]))
+
+        result = correlate_change_documents(self.timeline, window_seconds=3600, match_tcode=True)
+        self.assertEqual(result.iloc[5]["Linked_Event_Description"], "Start FB02")
+
+    def test_debug_session_flag(self):
+        """Test that a change is flagged when its event's session contains debugging."""
+        result = correlate_change_documents(self.timeline, window_seconds=3600, match_tcode=False)
+
+        self.assertEqual(result.iloc[5]["Linked_Event"], "AU3")
+        self.assertEqual(result.iloc[5]["Linked_Debug_Session"], "Yes")
+        self.assertEqual(result.iloc[2]["Linked_Debug_Session"], "No")
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT CHANGE CORRELATION - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()
@@ -9,14 +9,17 @@ verifying that the Factory pattern implementation and data processing work corre
 import os
 import sys
 import unittest
+import datetime
 import pandas as pd
 import tempfile
 import shutil
 from pathlib import Path
+from unittest import mock
 
 # Import the module to test
 import sap_audit_data_prep
-from sap_audit_config import COLUMNS
+from sap_audit_config import COLUMNS, PATTERNS
+from sap_audit_context import AuditContext
 
 class TestDataSourceProcessor(unittest.TestCase):
     """Test cases for the base DataSourceProcessor class."""
@@ -71,7 +74,85 @@ class TestDataSourceProcessor(unittest.TestCase):
             expected_series,
             check_names=False
         )
-    
+
+    def test_create_datetime_column_native_types(self):
+        """Test datetime creation from Excel serial dates, day fractions and HHMMSS numbers."""
+        df = pd.DataFrame({
+            'date': [45778.0, 45779.0],
+            'time': [0.5, 0.25],
+            'time_hhmmss': [100000, 93015]
+        })
+
+        result = self.processor.create_datetime_column(df.copy(), 'date', 'time')
+        self.assertEqual(list(result['DATETIME']),
+                         [pd.Timestamp('2025-05-01 12:00:00'), pd.Timestamp('2025-05-02 06:00:00')])
+
+        result = self.processor.create_datetime_column(df.copy(), 'date', 'time_hhmmss')
+        self.assertEqual(list(result['DATETIME']),
+                         [pd.Timestamp('2025-05-01 10:00:00'), pd.Timestamp('2025-05-02 09:30:15')])
+
+    def test_create_datetime_column_sap_integers(self):
+        """Test that integer YYYYMMDD dates and HHMMSS times are not read as Excel serials."""
+        df = pd.DataFrame({'date': [20250301, 20250302], 'time': [93000, 235959]})
+
+        result = self.processor.create_datetime_column(df, 'date', 'time')
+
+        self.assertEqual(list(result['DATETIME']),
+                         [pd.Timestamp('2025-03-01 09:30:00'), pd.Timestamp('2025-03-02 23:59:59')])
+
+    def test_clean_data_keeps_native_dates_and_times(self):
+        """Test that cleaning leaves datetime.date/time objects for datetime creation."""
+        df = pd.DataFrame({
+            'date': [datetime.date(2025, 5, 1), datetime.date(2025, 5, 2)],
+            'time': [datetime.time(10, 0), datetime.time(9, 30, 15)]
+        })
+
+        result = self.processor.create_datetime_column(self.processor.clean_data(df), 'date', 'time')
+
+        self.assertIsInstance(result['time'].iloc[0], datetime.time)
+        self.assertEqual(list(result['DATETIME']),
+                         [pd.Timestamp('2025-05-01 10:00:00'), pd.Timestamp('2025-05-02 09:30:15')])
+
+    def test_create_datetime_column_detects_format(self):
+        """Test that a day-first export is detected from the sample and reused DATETIME wins."""
+        df = pd.DataFrame({
+            'date': ['01/05/2025', '13/05/2025', None],
+            'time': ['10:00:00', '11:00:00', '12:00:00'],
+            'DATETIME': [None, None, '2025-05-20 08:00:00']
+        })
+
+        result = self.processor.create_datetime_column(df, 'date', 'time')
+
+        self.assertEqual(list(result['DATETIME']), [
+            pd.Timestamp('2025-05-01 10:00:00'),
+            pd.Timestamp('2025-05-13 11:00:00'),
+            pd.Timestamp('2025-05-20 08:00:00')
+        ])
+
+    def test_clean_data_quality_report(self):
+        """Test single-pass cleaning and the collected quality metrics."""
+        df = pd.DataFrame({
+            'USER': [' USER1', 'USER1', None, 'USER\xa02'],
+            'EVENT': ['AU1', 'AU1', 'nan', 'AU3'],
+            'COUNT': [1.0, 1.0, None, 2.0],
+            'COMMENTS': ['a', 'b', 'c', 'd']
+        })
+
+        result = self.processor.clean_data(df)
+        report = self.processor.quality_report
+
+        self.assertEqual(list(result['USER']), ['USER1', 'USER1', '', 'USER 2'])
+        self.assertEqual(list(result['EVENT']), ['AU1', 'AU1', '', 'AU3'])
+        self.assertNotIn('COMMENTS', result.columns)
+        self.assertEqual(report['dropped_columns'], ['COMMENTS'])
+        self.assertEqual(report['duplicate_rows'], result.duplicated().sum())
+        self.assertEqual(report['duplicate_rows'], 1)
+        self.assertEqual(report['numeric_columns_with_missing'], ['COUNT'])
+        self.assertEqual(report['column_metrics']['USER'],
+                         {'dtype': 'str', 'missing': 1, 'null_tokens': 0, 'nbsp': 1,
+                          'trimmed': 1, 'empty': 1, 'unique': 2})
+        self.assertEqual(report['column_metrics']['EVENT']['null_tokens'], 1)
+
     def test_add_missing_columns(self):
         """Test adding missing columns."""
         # List of required columns, including one that's missing
@@ -233,19 +314,13 @@ class TestIntegration(unittest.TestCase):
         self.input_dir = os.path.join(self.temp_dir, "input")
         os.makedirs(self.input_dir, exist_ok=True)
         
-        # Save the original PATTERNS
-        self.original_patterns = sap_audit_data_prep.PATTERNS.copy()
-        
-        # Replace patterns for testing
-        for key in sap_audit_data_prep.PATTERNS:
-            sap_audit_data_prep.PATTERNS[key] = os.path.join(
-                self.input_dir, f"*_{key}_*.xlsx")
+        # Point the run's input patterns at the test folder
+        self.context = AuditContext(patterns={
+            key: os.path.join(self.input_dir, f"*_{key}_*.xlsx") for key in PATTERNS
+        })
     
     def tearDown(self):
         """Clean up temporary test environment."""
-        # Restore original PATTERNS
-        sap_audit_data_prep.PATTERNS = self.original_patterns
-        
         # Remove temporary directory
         shutil.rmtree(self.temp_dir)
     
@@ -264,12 +339,61 @@ class TestIntegration(unittest.TestCase):
         df.to_excel(test_file, index=False)
         
         # Create SM20 processor
-        processor = sap_audit_data_prep.SM20Processor()
+        processor = sap_audit_data_prep.SM20Processor(self.context)
         
         # Test finding the file
         found_file = processor.find_input_file()
         self.assertEqual(found_file, test_file)
 
+    def test_multi_file_ingestion(self):
+        """Test that all weekly exports of several systems are read, tagged and counted."""
+        exports = {
+            "PRD_sm20_2025-W10.xlsx": ['USER1', 'USER2'],
+            "PRD_sm20_2025-W11.xlsx": ['USER3'],
+            "QAS_sm20_2025-W10.xlsx": ['USER4', 'USER5', 'USER6']
+        }
+        for file_name, users in exports.items():
+            pd.DataFrame({'USER': users, 'EVENT': ['AU1'] * len(users)}).to_excel(
+                os.path.join(self.input_dir, file_name), index=False)
+
+        self.context.settings["ingestion"].update(all_files=True, max_workers=2)
+        processor = sap_audit_data_prep.SM20Processor(self.context)
+        input_files = processor.find_input_files()
+        df = processor.read_source_files(input_files)
+
+        self.assertEqual(len(input_files), 3)
+        self.assertEqual(list(df['USER']), ['USER1', 'USER2', 'USER3', 'USER4', 'USER5', 'USER6'])
+        self.assertEqual(list(df['SOURCE SYSTEM']), ['PRD', 'PRD', 'PRD', 'QAS', 'QAS', 'QAS'])
+        self.assertEqual(list(df['SOURCE FILE'])[2], "PRD_sm20_2025-W11.xlsx")
+        self.assertEqual([entry['original_count'] for entry in processor.file_counts], [2, 1, 3])
+
+        with mock.patch.object(self.context, "record_counter") as counter:
+            processor.update_record_counts(input_files, 6, 6, df.iloc[1:])
+
+        self.assertEqual([entry['final_count'] for entry in processor.file_counts], [1, 1, 3])
+        counter.update_file_counts.assert_called_once_with("sm20", processor.file_counts)
+
+    def test_duplicates_reset_between_runs(self):
+        """Test that reprocessing the same files with one processor finds no new duplicates."""
+        input_file = os.path.join(self.input_dir, "PRD_sm20_2025-W10.xlsx")
+        output_file = os.path.join(self.temp_dir, "SM20.csv")
+        pd.DataFrame({
+            'USER': ['USER1', 'USER1', 'USER2'],
+            'DATE': ['2025-05-01'] * 3,
+            'TIME': ['10:00:00', '10:00:00', '11:00:00'],
+            'EVENT': ['AU1', 'AU1', 'AU3'],
+            'SOURCE TA': ['SE16', 'SE16', 'SM59'],
+            'AUDIT LOG MSG. TEXT': ['Message 1', 'Message 1', 'Message 2']
+        }).to_excel(input_file, index=False)
+
+        processor = sap_audit_data_prep.SM20Processor(self.context)
+        with mock.patch.object(self.context, "record_counter") as counter:
+            self.assertTrue(processor.process(input_file, output_file))
+            self.assertTrue(processor.process(input_file, output_file))
+
+        duplicate_counts = [call.args[1] for call in counter.update_duplicate_counts.call_args_list]
+        self.assertEqual(duplicate_counts, [1, 1])
+
 
 if __name__ == "__main__":
     unittest.main()
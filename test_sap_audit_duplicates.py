@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the SAP Audit duplicate event detection module.
+
+This script verifies natural-key duplicate detection:
+1. Tests that events differing only in a trailing NOTE are duplicates
+2. Tests incremental detection across files
+3. Tests count-only mode and the record counter statistics
+
+Usage:
+    python test_sap_audit_duplicates.py
+"""
+
+import os
+import sys
+import unittest
+from io import StringIO
+
+import pandas as pd
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sap_audit_duplicates import DuplicateDetector
+from sap_audit_record_counts import RecordCounter
+
+# Redirect stdout to capture log messages
+original_stdout = sys.stdout
+
+
+class TestDuplicateDetector(unittest.TestCase):
+    """Test cases for the DuplicateDetector class."""
+
+    def setUp(self):
+        self.key = ["USER", "DATETIME", "EVENT"]
+        self.df = pd.DataFrame({
+            "USER": ["USER1", "USER1", "USER1", "USER2"],
+            "DATETIME": pd.to_datetime(["2025-03-17 09:59:02"] * 3 + ["2025-03-17 09:59:02"]),
+            "EVENT": ["AU3", "AU3", "AU1", "AU3"],
+            "NOTE": ["", "Repeated", "", ""]
+        })
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        sys.stdout = original_stdout
+
+    def test_trailing_note_is_ignored(self):
+        """Test that rows differing only outside the natural key are duplicates."""
+        detector = DuplicateDetector("sm20", key_columns=self.key, dedupe=True)
+
+        result, stats = detector.apply(self.df)
+
+        self.assertEqual(stats["duplicates"], 1)
+        self.assertEqual(stats["removed"], 1)
+        self.assertEqual(list(result.index), [0, 2, 3])
+        self.assertEqual(self.df.duplicated().sum(), 0)
+
+    def test_detection_across_files(self):
+        """Test that keys seen in an earlier file flag repeats in a later one."""
+        detector = DuplicateDetector("sm20", key_columns=self.key, dedupe=False)
+        detector.detect(self.df)
+
+        later = self.df.iloc[[2, 3]].assign(NOTE="second export")
+        later = pd.concat([later, self.df.iloc[[0]].assign(USER="USER3")])
+
+        self.assertEqual(detector.detect(later).tolist(), [True, True, False])
+
+        detector.reset()
+        self.assertEqual(detector.detect(later).tolist(), [False, False, False])
+
+    def test_count_only_mode_and_record_counter(self):
+        """Test that count-only mode keeps rows and removed duplicates count as expected."""
+        detector = DuplicateDetector("sm20", key_columns=self.key + ["MISSING"], dedupe=False)
+        result, stats = detector.apply(self.df)
+
+        self.assertEqual(len(result), 4)
+        self.assertEqual(stats["key_columns"], self.key)
+
+        counter = RecordCounter()
+        counter.update_source_counts("sm20", "SM20.xlsx", original_count=4, final_count=3)
+        counter.update_duplicate_counts("sm20", duplicate_events=1, duplicates_removed=1)
+
+        self.assertEqual(counter.calculate_percentage("sm20"), 100.0)
+        self.assertEqual(counter.get_counts_for_report()["source_files"][0]["duplicates_removed"], 1)
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT DUPLICATE DETECTION - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the SAP Audit logging module.
+
+This script verifies the logging backend:
+1. Tests debug gating and lazy formatting of message arguments
+2. Tests per-stage log levels and the SUCCESS level
+3. Tests JSON lines output with stages, fields and tracebacks
+
+Usage:
+    python test_sap_audit_logging.py
+"""
+
+import os
+import sys
+import copy
+import json
+import unittest
+from io import StringIO
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sap_audit_config import SETTINGS
+from sap_audit_logging import configure_logging, flush_logging, log_message, log_stage, log_exception
+
+# Redirect stdout to capture log messages
+original_stdout = sys.stdout
+
+
+class CountingValue:
+    """Message argument that counts how often it is formatted."""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "value"
+
+
+class TestAuditLogging(unittest.TestCase):
+    """Test cases for the logging backend."""
+
+    def setUp(self):
+        self.settings = copy.deepcopy(SETTINGS)
+        self.settings["debug"] = False
+        self.settings["logging"].update(level="INFO", format="text", file="", stage_levels={})
+        configure_logging(self.settings)
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        flush_logging()
+        sys.stdout = original_stdout
+        configure_logging()
+
+    def output(self):
+        """Return everything written so far."""
+        flush_logging()
+        return sys.stdout.getvalue()
+
+    def test_debug_gating(self):
+        """Test that DEBUG messages and their arguments wait for debug mode."""
+        value = CountingValue()
+
+        log_message("Mapped %s", "DEBUG", value)
+        self.assertEqual(self.output(), "")
+        self.assertEqual(value.formatted, 0)
+
+        self.settings["debug"] = True
+        log_message("Mapped %s", "DEBUG", value)
+        self.assertRegex(self.output(), r"^\[\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\] DEBUG: Mapped value\n$")
+        self.assertEqual(value.formatted, 1)
+
+    def test_stage_levels(self):
+        """Test that a stage level applies only while the stage runs."""
+        self.settings["logging"]["stage_levels"] = {"data_preparation": "WARNING"}
+
+        with log_stage("data_preparation"):
+            log_message("prep info")
+            log_message("prep warning", "WARNING")
+        log_message("controller info")
+
+        output = self.output()
+        self.assertNotIn("prep info", output)
+        self.assertIn("WARNING: prep warning", output)
+        self.assertIn("INFO: controller info", output)
+
+    def test_success_level(self):
+        """Test that SUCCESS messages keep their label and pass the INFO level."""
+        log_message("Report written", "SUCCESS")
+        self.assertIn("] SUCCESS: Report written", self.output())
+
+        self.settings["logging"]["level"] = "WARNING"
+        log_message("Hidden", "SUCCESS")
+        self.assertNotIn("Hidden", self.output())
+
+    def test_json_lines(self):
+        """Test that JSON output has one parsable record per line."""
+        self.settings["logging"]["format"] = "json"
+        configure_logging(self.settings)
+
+        with log_stage("risk_assessment"):
+            log_message("Assessed %d rows", "INFO", 42, rows=42)
+            try:
+                raise ValueError("bad value")
+            except ValueError as e:
+                log_exception(e, "Risk assessment failed")
+
+        records = [json.loads(line) for line in self.output().splitlines()]
+        self.assertEqual([record["level"] for record in records], ["INFO", "ERROR"])
+        self.assertEqual(records[0]["message"], "Assessed 42 rows")
+        self.assertEqual(records[0]["rows"], 42)
+        self.assertEqual(records[0]["stage"], "risk_assessment")
+        self.assertIn("ValueError: bad value", records[1]["exception"])
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT LOGGING - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for the SAP Audit reference data service module.
+
+This script verifies the snapshot-backed reference data service:
+1. Tests lazy loading and snapshot creation
+2. Tests snapshot reuse without recompiling sources
+3. Tests validation by mtime and content hash
+4. Tests missing reference files
+
+Usage:
+    python test_sap_audit_reference_service.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+from unittest import mock
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import sap_audit_reference_service
+from sap_audit_reference_service import ReferenceDataService
+
+# Redirect stdout to capture log messages
+original_stdout = sys.stdout
+
+
+class TestReferenceDataService(unittest.TestCase):
+    """Test cases for the ReferenceDataService class."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.snapshot = os.path.join(self.test_dir, "reference_snapshot.pkl")
+        self.tcodes = os.path.join(self.test_dir, "TCodes.csv")
+        self.high_risk = os.path.join(self.test_dir, "HighRiskTCodes.csv")
+        self.write_file(self.tcodes, "TCode,TCode Description\nSM30,Table Maintenance\nSE38,ABAP Editor\n")
+        self.write_file(self.high_risk, "TCode,Category\nsm30,Table Maintenance\n")
+
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        sys.stdout = original_stdout
+        shutil.rmtree(self.test_dir)
+
+    def write_file(self, path, content):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def create_service(self):
+        return ReferenceDataService(self.snapshot, csv_paths={
+            "tcode_descriptions": self.tcodes,
+            "event_descriptions": os.path.join(self.test_dir, "Missing.csv"),
+            "table_descriptions": None,
+            "high_risk_tcodes": self.high_risk,
+            "high_risk_tables": None,
+        })
+
+    def test_lazy_load_compiles_snapshot(self):
+        """Test that nothing is read until first use, then a snapshot is written."""
+        service = self.create_service()
+        self.assertFalse(os.path.exists(self.snapshot))
+
+        self.assertEqual(service.get("tcode_descriptions")["SE38"], "ABAP Editor")
+        self.assertEqual(service.get("high_risk_tcodes"),
+                         {"codes": ["SM30"], "categories": {"SM30": "Table Maintenance"}})
+        self.assertIn("USR02", service.get("sensitive_tables"))
+        self.assertTrue(os.path.exists(self.snapshot))
+
+    def test_valid_snapshot_skips_compilation(self):
+        """Test that a valid snapshot is used without parsing the CSV files."""
+        self.create_service().get("tcode_descriptions")
+
+        with mock.patch.object(sap_audit_reference_service, "_read_reference_csv") as read_csv:
+            descriptions = self.create_service().get("tcode_descriptions")
+
+        read_csv.assert_not_called()
+        self.assertEqual(descriptions["SM30"], "Table Maintenance")
+
+    def test_touched_file_with_same_content_is_valid(self):
+        """Test that an mtime change alone is resolved by the content hash."""
+        self.create_service().get("tcode_descriptions")
+        stat = os.stat(self.tcodes)
+        os.utime(self.tcodes, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+        with mock.patch.object(ReferenceDataService, "_rebuild") as rebuild:
+            self.create_service().get("tcode_descriptions")
+
+        rebuild.assert_not_called()
+
+    def test_changed_file_rebuilds_snapshot(self):
+        """Test that changed content invalidates the snapshot."""
+        self.create_service().get("tcode_descriptions")
+        self.write_file(self.tcodes, "TCode,TCode Description\nSU01,User Maintenance\n")
+
+        descriptions = self.create_service().get("tcode_descriptions")
+
+        self.assertEqual(descriptions, {"SU01": "User Maintenance"})
+
+    def test_missing_file_returns_default(self):
+        """Test that datasets for missing files are unavailable."""
+        service = self.create_service()
+
+        self.assertIsNone(service.get("event_descriptions"))
+        self.assertEqual(service.get("table_descriptions", {}), {})
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT REFERENCE DATA SERVICE - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the SAP Audit local service module.
+
+This script verifies the audit service:
+1. Tests queueing a job over HTTP and streaming its progress
+2. Tests error responses for unknown jobs and missing folders
+
+Usage:
+    python test_sap_audit_service.py
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import sap_audit_service
+from sap_audit_service import AuditService, create_server
+
+# Redirect stdout to capture log messages
+original_stdout = sys.stdout
+
+
+def fake_run_audit(job_id, spec):
+    """Stand-in for a worker job that reports two stage events."""
+    for status in ["started", "completed"]:
+        sap_audit_service._emit(job_id, {"type": "stage", "stage": "data_preparation", "status": status})
+    return {"success": True, "output_path": os.path.join(spec["output_dir"], "SAP_Audit_Report.xlsx")}
+
+
+class TestAuditService(unittest.TestCase):
+    """Test cases for the AuditService class and its HTTP API."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.test_dir, "Mar FF")
+        os.makedirs(self.input_dir)
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        sys.stdout = original_stdout
+        shutil.rmtree(self.test_dir)
+
+    def test_job_over_http(self):
+        """Test that a queued job streams its events and completes."""
+        service = AuditService(workers=1, output_root=self.test_dir, executor=ThreadPoolExecutor(1))
+        sap_audit_service._progress_queue = service._progress
+        server = create_server(service, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        try:
+            with mock.patch.object(sap_audit_service, "_run_audit", fake_run_audit):
+                body = json.dumps({"input_dir": self.input_dir}).encode("utf-8")
+                with urlopen(Request(f"{base_url}/jobs", data=body)) as response:
+                    self.assertEqual(response.status, 202)
+                    job = json.load(response)
+
+                with urlopen(f"{base_url}/jobs/{job['id']}/events", timeout=10) as response:
+                    events = [json.loads(line) for line in response]
+
+            self.assertEqual(job["output_dir"], os.path.join(self.test_dir, "Mar FF"))
+            self.assertEqual([e["status"] for e in events], ["queued", "started", "completed", "completed"])
+            with urlopen(f"{base_url}/jobs/{job['id']}") as response:
+                self.assertTrue(json.load(response)["result"]["success"])
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.shutdown()
+            sap_audit_service._progress_queue = None
+
+    def test_error_responses(self):
+        """Test that unknown jobs and missing folders are rejected."""
+        service = AuditService(workers=1, executor=ThreadPoolExecutor(1))
+        server = create_server(service, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        try:
+            with self.assertRaises(HTTPError) as context:
+                urlopen(f"{base_url}/jobs/unknown")
+            self.assertEqual(context.exception.code, 404)
+
+            body = json.dumps({"input_dir": os.path.join(self.test_dir, "missing")}).encode("utf-8")
+            with self.assertRaises(HTTPError) as context:
+                urlopen(Request(f"{base_url}/jobs", data=body))
+            self.assertEqual(context.exception.code, 400)
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.shutdown()
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT SERVICE - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()
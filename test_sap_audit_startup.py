@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for SAP Audit Tool startup behaviour.
+
+This script verifies that non-processing commands start without importing
+the processing stack:
+1. Tests that --help of each entry point avoids heavy imports
+2. Tests that importing the configuration has no side effects
+3. Tests parsing of -X importtime output
+
+Usage:
+    python test_sap_audit_startup.py
+"""
+
+import os
+import sys
+import subprocess
+import tempfile
+import unittest
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from benchmark_startup import STARTUP_COMMANDS, trace_command, heavy_imports, parse_importtime
+
+
+class TestStartup(unittest.TestCase):
+    """Test cases for entry point startup."""
+
+    def test_help_commands_avoid_heavy_imports(self):
+        """Test that --help and config imports do not import the processing stack."""
+        for label, command in STARTUP_COMMANDS.items():
+            if label == "import sap_audit_controller":
+                continue
+            with self.subTest(command=label):
+                imports = trace_command(command)
+                self.assertTrue(imports, "importtime output should be captured")
+                self.assertEqual(heavy_imports(imports), [])
+
+    def test_config_import_creates_no_directories(self):
+        """Test that importing the configuration does not create directories."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_dir = os.path.join(temp_dir, "output")
+            env = dict(os.environ, SAP_AUDIT_OUTPUT_DIR=output_dir)
+
+            subprocess.run([sys.executable, "-c", "import sap_audit_config"], env=env, check=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True)
+
+            self.assertFalse(os.path.exists(output_dir))
+
+    def test_parse_importtime(self):
+        """Test that importtime lines are parsed with their nesting depth."""
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _io\n"
+            "import time:       300 |        420 | sap_audit_config\n"
+        )
+        self.assertEqual(parse_importtime(stderr), [("_io", 120, 120, 1), ("sap_audit_config", 300, 420, 0)])
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT STARTUP - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()
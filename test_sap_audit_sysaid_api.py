@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Test script for the SAP Audit SysAid API client module.
+
+This script runs the client against a local stub HTTP server:
+1. Tests paginated fetching of all tickets
+2. Tests fetching only referenced ticket IDs
+3. Tests retry with back-off on transient failures
+4. Tests the per-ticket cache (TTLs, bulk lookups, delta sync)
+5. Tests the API strategy end to end
+
+Usage:
+    python test_sap_audit_sysaid_api.py
+"""
+
+import os
+import sys
+import json
+import asyncio
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from io import StringIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sap_audit_sysaid_api import SysAidApiClient, SysAidApiError
+from sap_audit_sysaid_cache import SysAidTicketCache
+from sap_audit_sysaid_integrator import SysAidApiStrategy
+
+# Redirect stdout to capture log messages
+original_stdout = sys.stdout
+
+# Tickets served by the stub server
+STUB_TICKETS = [
+    {"Ticket": str(100000 + i), "Title": f"Ticket {i}", "Status": "Closed" if i % 2 else "Open"}
+    for i in range(250)
+]
+
+
+class StubSysAidHandler(BaseHTTPRequestHandler):
+    """Serves STUB_TICKETS with offset/limit and ids query parameters."""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            if server.failures_remaining > 0:
+                server.failures_remaining -= 1
+                self.send_response(503)
+                self.end_headers()
+                return
+
+        params = parse_qs(urlparse(self.path).query)
+        if server.paging == "ignored":
+            page = STUB_TICKETS
+        elif server.paging == "capped" and "ids" not in params:
+            offset = int(params.get("offset", ["0"])[0])
+            page = STUB_TICKETS[offset:offset + 30]
+        elif "modified_since" in params:
+            page = []
+        elif "ids" in params:
+            wanted = set(params["ids"][0].split(","))
+            page = [ticket for ticket in STUB_TICKETS if ticket["Ticket"] in wanted]
+        else:
+            offset = int(params.get("offset", ["0"])[0])
+            limit = int(params.get("limit", ["100"])[0])
+            page = STUB_TICKETS[offset:offset + limit]
+
+        body = json.dumps({"data": page}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Silence request logging."""
+        pass
+
+
+class StubServerTestCase(unittest.TestCase):
+    """Base class that runs a stub SysAid server for each test."""
+
+    def setUp(self):
+        """Start the stub server on a free local port."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubSysAidHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.failures_remaining = 0
+        self.server.paging = "offset"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v1/sr"
+
+        self.output = StringIO()
+        sys.stdout = self.output
+
+    def tearDown(self):
+        """Stop the stub server."""
+        self.server.shutdown()
+        self.server.server_close()
+        sys.stdout = original_stdout
+
+    def create_client(self, **kwargs):
+        settings = {"page_size": 50, "max_concurrency": 4, "backoff_base": 0.01}
+        settings.update(kwargs)
+        return SysAidApiClient(self.url, **settings)
+
+
+class TestSysAidApiClient(StubServerTestCase):
+    """Test cases for the concurrent SysAid API client."""
+
+    def test_fetch_all_pages(self):
+        """Test that every page is fetched until a short page is returned."""
+        with self.create_client() as client:
+            records = client.fetch_tickets()
+
+        self.assertEqual([r["Ticket"] for r in records], [t["Ticket"] for t in STUB_TICKETS])
+
+    def test_server_ignoring_paging(self):
+        """Test that paging stops when every request returns the whole list."""
+        self.server.paging = "ignored"
+        with self.create_client(page_size=300, max_concurrency=2) as client:
+            records = client.fetch_tickets(modified_since="2025-03-01T00:00:00")
+        self.assertEqual(len(records), len(STUB_TICKETS))
+
+        self.server.requests.clear()
+        with self.create_client(page_size=50, max_concurrency=2) as client:
+            records = client.fetch_tickets()
+        self.assertEqual(len(records), len(STUB_TICKETS))
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_capped_page_size_and_page_limit(self):
+        """Test that a server-side page cap is followed and max_pages bounds paging."""
+        self.server.paging = "capped"
+        with self.create_client(page_size=100, max_concurrency=2) as client:
+            records = client.fetch_tickets()
+        self.assertEqual([r["Ticket"] for r in records], [t["Ticket"] for t in STUB_TICKETS])
+
+        with self.create_client(page_size=30, max_concurrency=2, max_pages=3) as client:
+            records = client.fetch_tickets()
+        self.assertEqual(len(records), 90)
+
+    def test_fetch_referenced_ids_only(self):
+        """Test that only the requested ticket IDs are fetched."""
+        wanted = ["100003", "100120", "100249", "100003"]
+        with self.create_client(page_size=2) as client:
+            records = client.fetch_tickets(wanted)
+
+        self.assertEqual(sorted(r["Ticket"] for r in records), ["100003", "100120", "100249"])
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_retries_transient_failures(self):
+        """Test that 503 responses are retried with back-off."""
+        self.server.failures_remaining = 2
+        with self.create_client(max_retries=3) as client:
+            records = client.fetch_tickets(["100001"])
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(client.retry_count, 2)
+
+    def test_gives_up_after_max_retries(self):
+        """Test that persistent failures raise SysAidApiError."""
+        self.server.failures_remaining = 10
+        with self.create_client(max_retries=2) as client:
+            with self.assertRaises(SysAidApiError):
+                client.fetch_tickets(["100001"])
+
+    def test_fetch_inside_running_loop(self):
+        """Test that a fetch from a running event loop does not fail."""
+        async def fetch_from_loop(client):
+            return client.fetch_tickets(["100001", "100002"])
+
+        with self.create_client(page_size=1) as client:
+            records = asyncio.run(fetch_from_loop(client))
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(client.request_count, 2)
+
+    def test_backoff_is_bounded(self):
+        """Test that jittered back-off stays within the exponential ceiling."""
+        client = SysAidApiClient(self.url, backoff_base=1.0, backoff_max=5.0)
+        for attempt in range(1, 8):
+            delay = client._backoff_delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(5.0, 2 ** (attempt - 1)))
+        client.close()
+
+
+class TestSysAidTicketCache(unittest.TestCase):
+    """Test cases for the per-ticket SysAid cache."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = SysAidTicketCache(os.path.join(self.cache_dir, "tickets.db"), default_ttl=60)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.cache_dir)
+
+    def test_bulk_lookup_splits_fresh_and_missing(self):
+        """Test that lookups return cached tickets and report missing ones."""
+        df = pd.DataFrame({"Ticket": ["1", "2"], "Status": ["Open", "Closed"], "Standardized_SysAid": ["1", "2"]})
+        self.cache.upsert(df, "Status")
+
+        records, stale = self.cache.lookup(["1", "2", "3"])
+
+        self.assertEqual(sorted(r["Ticket"] for r in records), ["1", "2"])
+        self.assertEqual(stale, ["3"])
+
+    def test_closed_tickets_never_expire(self):
+        """Test that open tickets expire after their TTL while closed ones do not."""
+        df = pd.DataFrame({"Ticket": ["1", "2"], "Status": ["Open", "Verified closed"], "Standardized_SysAid": ["1", "2"]})
+        self.cache.upsert(df, "Status")
+        self.cache.conn.execute("UPDATE tickets SET fetched_at = ?", (time.time() - 3600,))
+
+        records, stale = self.cache.lookup(["1", "2"])
+
+        self.assertEqual([r["Ticket"] for r in records], ["2"])
+        self.assertEqual(stale, ["1"])
+        self.assertIsNone(self.cache.ttl_for_status("CLOSED"))
+
+    def test_per_status_ttl(self):
+        """Test that status-specific TTLs override the default."""
+        cache = SysAidTicketCache(os.path.join(self.cache_dir, "ttl.db"), default_ttl=60,
+                                  status_ttl={"In progress": 5})
+        self.assertEqual(cache.ttl_for_status("in progress"), 5)
+        self.assertEqual(cache.ttl_for_status("Open"), 60)
+        cache.close()
+
+
+class TestSysAidApiStrategy(StubServerTestCase):
+    """Test cases for the API data source strategy."""
+
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        super().tearDown()
+
+    def create_strategy(self):
+        strategy = SysAidApiStrategy({"api_url": self.url, "page_size": 100, "retry_delay": 0.01})
+        strategy.cache_file = os.path.join(self.cache_dir, "sysaid_ticket_cache.db")
+        return strategy
+
+    def test_load_referenced_tickets(self):
+        """Test that the strategy loads and standardizes only referenced tickets."""
+        sysaid_df = self.create_strategy().load_data(["100010", "100011"])
+
+        self.assertEqual(sorted(sysaid_df["Standardized_SysAid"]), ["100010", "100011"])
+
+    def test_warm_run_makes_no_requests(self):
+        """Test that a second run for cached tickets does not touch the network."""
+        self.create_strategy().load_data(["100010", "100011"])
+        request_count = len(self.server.requests)
+
+        sysaid_df = self.create_strategy().load_data(["100010", "100011"])
+
+        self.assertEqual(len(self.server.requests), request_count)
+        self.assertEqual(len(sysaid_df), 2)
+
+    def test_only_missing_tickets_are_fetched(self):
+        """Test that only tickets absent from the cache are requested."""
+        self.create_strategy().load_data(["100010"])
+        self.server.requests.clear()
+
+        sysaid_df = self.create_strategy().load_data(["100010", "100020"])
+
+        self.assertEqual(len(sysaid_df), 2)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertIn("100020", self.server.requests[0])
+        self.assertNotIn("100010", self.server.requests[0])
+
+    def test_unknown_tickets_are_not_refetched(self):
+        """Test that a warm run does not request tickets the API did not return."""
+        self.create_strategy().load_data(["100010", "999999"])
+        self.server.requests.clear()
+
+        sysaid_df = self.create_strategy().load_data(["100010", "999999"])
+
+        self.assertEqual(len(self.server.requests), 0)
+        self.assertEqual(list(sysaid_df["Standardized_SysAid"]), ["100010"])
+
+        strategy = self.create_strategy()
+        strategy.not_found_ttl = -1
+        strategy.load_data(["100010", "999999"])
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertIn("999999", self.server.requests[0])
+
+    def test_delta_sync_uses_modified_since(self):
+        """Test that a full load after an old sync only requests modified tickets."""
+        strategy = self.create_strategy()
+        self.assertEqual(len(strategy.load_data()), len(STUB_TICKETS))
+
+        strategy.sync_interval = 0
+        self.server.requests.clear()
+        sysaid_df = strategy.load_data()
+
+        self.assertEqual(len(sysaid_df), len(STUB_TICKETS))
+        self.assertTrue(all("modified_since" in path for path in self.server.requests))
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT SYSAID API CLIENT - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()
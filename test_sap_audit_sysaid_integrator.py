@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Test script for the SAP Audit SysAid Integrator module.
+
+This script tests the refactored SysAid integration:
+1. Tests standardization of SysAid ticket values
+2. Tests session-to-SysAid mapping
+3. Tests the fingerprinted session map cache
+
+Usage:
+    python test_sap_audit_sysaid_integrator.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sap_audit_utils import standardize_sysaid_series, standardize_sysaid_value, resolve_session_sysaid
+from sap_audit_sysaid_integrator import SysAidIntegrator, SysAidFileStrategy
+from sap_audit_sysaid_cache import SessionMapCache, SESSION_MAP_RECENCY_RESOLUTION, session_fingerprints
+
+# Redirect stdout to capture log messages
+original_stdout = sys.stdout
+
+
+class TestSysAidStandardization(unittest.TestCase):
+    """Test cases for SysAid ticket standardization."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.output = StringIO()
+        sys.stdout = self.output
+
+    def tearDown(self):
+        """Restore stdout."""
+        sys.stdout = original_stdout
+
+    def test_standardize_series_formats(self):
+        """Test that all supported ticket formats are normalized."""
+        raw = pd.Series(['#120,568', 'SR-120568', ' CR-42 ', '120568', '#SR-7', None, np.nan, '', 0],
+                        index=list('abcdefghi'))
+        result = standardize_sysaid_series(raw)
+
+        self.assertEqual(list(result.index), list(raw.index))
+        self.assertEqual(result.tolist(), ['120568', '120568', '42', '120568', '7',
+                                           'UNKNOWN', 'UNKNOWN', 'UNKNOWN', 'UNKNOWN'])
+
+    def test_series_matches_scalar(self):
+        """Test that the vectorized and scalar forms agree."""
+        raw = pd.Series(['#1,234', 'CR-99', 'abc', None, 555])
+        vectorized = standardize_sysaid_series(raw).tolist()
+        scalar = [standardize_sysaid_value(value) for value in raw]
+        self.assertEqual(vectorized, scalar)
+
+    def test_strategy_uses_shared_normalizer(self):
+        """Test that the strategy column helper returns the shared result."""
+        strategy = SysAidFileStrategy()
+        raw = pd.Series(['#100', 'SR-100', None])
+        self.assertEqual(strategy.standardize_sysaid_column(raw).tolist(), ['100', '100', 'UNKNOWN'])
+        self.assertEqual(strategy.standardize_sysaid('#1,000'), '1000')
+
+
+class TestSessionMapping(unittest.TestCase):
+    """Test cases for session-to-SysAid mapping."""
+
+    def setUp(self):
+        """Set up test environment with an isolated cache directory."""
+        self.test_dir = tempfile.mkdtemp()
+        self.integrator = SysAidIntegrator()
+        self.integrator.session_map_cache = os.path.join(self.test_dir, "sysaid_session_map.npy")
+
+        self.output = StringIO()
+        sys.stdout = self.output
+
+    def tearDown(self):
+        """Clean up after test."""
+        shutil.rmtree(self.test_dir)
+        sys.stdout = original_stdout
+
+    def test_map_sessions_prefers_known_tickets(self):
+        """Test that sessions resolve to their most frequent known ticket."""
+        df = pd.DataFrame({
+            'Session ID': ['S0001', 'S0001', 'S0001', 'S0002', 'S0002', 'S0003'],
+            'SYSAID#': ['#100', 'SR-100', '', None, 'CR-200', None]
+        })
+        mapping = self.integrator._map_sessions_to_sysaid(df, 'Session ID', 'SYSAID#')
+
+        self.assertEqual(mapping['S0001'], '100')
+        self.assertEqual(mapping['S0002'], '200')
+        self.assertEqual(mapping['S0003'], 'UNKNOWN')
+
+    def test_resolver_picks_most_frequent_ticket(self):
+        """Test that the grouped resolver counts rows and breaks ties by first occurrence."""
+        df = pd.DataFrame({
+            'Session ID': ['S1', 'S1', 'S1', 'S2', 'S2', 'S3'],
+            'SYSAID#': ['100', '#200', 'SR-200', '300', '400', '']
+        })
+        resolved = resolve_session_sysaid(df, 'Session ID', 'SYSAID#')
+
+        self.assertEqual(resolved.to_dict(), {'S1': '200', 'S2': '300', 'S3': 'UNKNOWN'})
+
+    def test_resolver_without_sysaid_column(self):
+        """Test that every session is UNKNOWN when there is no SysAid column."""
+        df = pd.DataFrame({'Session ID': ['S1', 'S2', 'S1']})
+        resolved = resolve_session_sysaid(df, 'Session ID')
+
+        self.assertEqual(resolved.to_dict(), {'S1': 'UNKNOWN', 'S2': 'UNKNOWN'})
+
+    def create_timeline(self, session_ids):
+        return pd.DataFrame({
+            'Session ID': session_ids,
+            'User': ['ALICE', 'ALICE', 'BOB'],
+            'Datetime': pd.to_datetime(['2025-03-01 08:00', '2025-03-01 09:00', '2025-03-02 10:00']),
+            'SYSAID#': ['', '111', None]
+        })
+
+    def test_cache_survives_session_renumbering(self):
+        """Test that cached tickets follow sessions by fingerprint, not session ID."""
+        first_run = self.create_timeline(['S0001', 'S0001', 'S0002'])
+        fingerprints = session_fingerprints(first_run, 'Session ID', 'User', 'Datetime', 'SYSAID#')
+        cache = SessionMapCache(self.integrator.session_map_cache)
+        cache.update([fingerprints['S0002']], ['999'])
+        cache.save()
+
+        # Same sessions, renumbered in the next run
+        second_run = self.create_timeline(['S0002', 'S0002', 'S0001'])
+        mapping = self.integrator._map_sessions_to_sysaid(second_run, 'Session ID', 'SYSAID#')
+
+        self.assertEqual(mapping, {'S0002': '111', 'S0001': '999'})
+
+    def test_cache_does_not_leak_stale_session_ids(self):
+        """Test that only sessions of the current timeline are returned."""
+        self.integrator._map_sessions_to_sysaid(self.create_timeline(['S0001', 'S0001', 'S0002']),
+                                                'Session ID', 'SYSAID#')
+        mapping = self.integrator._map_sessions_to_sysaid(
+            pd.DataFrame({'Session ID': ['S0009'], 'User': ['CAROL'],
+                          'Datetime': pd.to_datetime(['2025-04-01']), 'SYSAID#': ['']}),
+            'Session ID', 'SYSAID#')
+
+        self.assertEqual(mapping, {'S0009': 'UNKNOWN'})
+
+
+class TestSessionMapCache(unittest.TestCase):
+    """Test cases for the fingerprinted session map cache."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "session_map.npy")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_bulk_lookup_and_persistence(self):
+        """Test that entries round-trip through an atomic save."""
+        cache = SessionMapCache(self.path)
+        cache.update(np.array([30, 10, 20], dtype=np.uint64), ['C', 'A', 'B'])
+        self.assertTrue(cache.save())
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+        reloaded = SessionMapCache(self.path)
+        self.assertEqual(reloaded.lookup([20, 99, 10]).tolist(), ['B', None, 'A'])
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entries are evicted first."""
+        cache = SessionMapCache(self.path, max_entries=2)
+        cache.update([1], ['A'])
+        cache.update([2], ['B'])
+        cache._entries["last_used"] -= 2 * SESSION_MAP_RECENCY_RESOLUTION
+        cache.lookup([1])
+        cache.update([3], ['C'])
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.lookup([1, 2, 3]).tolist(), ['A', None, 'C'])
+
+    def test_all_hit_lookup_leaves_file_untouched(self):
+        """Test that looking up recently used entries does not rewrite the file."""
+        cache = SessionMapCache(self.path)
+        cache.update([1, 2], ['A', 'B'])
+        cache.save()
+        mtime = os.stat(self.path).st_mtime_ns
+
+        reloaded = SessionMapCache(self.path)
+        self.assertEqual(reloaded.lookup([1, 2]).tolist(), ['A', 'B'])
+        self.assertFalse(reloaded.save())
+        self.assertEqual(os.stat(self.path).st_mtime_ns, mtime)
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT SYSAID INTEGRATOR - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()
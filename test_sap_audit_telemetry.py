@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the SAP Audit telemetry module.
+
+This script verifies the progress telemetry:
+1. Tests task rates, ETA and the current session
+2. Tests the Prometheus and JSON metrics files
+3. Tests stage events and progress reported from a running stage
+
+Usage:
+    python test_sap_audit_telemetry.py
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+from unittest.mock import patch
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sap_audit_logging import log_stage
+from sap_audit_telemetry import Telemetry, TerminalProgress, MetricsFile, format_progress
+
+# Redirect stdout to capture log messages
+original_stdout = sys.stdout
+
+
+class TestTelemetry(unittest.TestCase):
+    """Test cases for the Telemetry class and its reporters."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        sys.stdout = original_stdout
+        shutil.rmtree(self.test_dir)
+
+    def test_task_progress(self):
+        """Test rows per second, ETA and the current session of a task."""
+        telemetry = Telemetry()
+        with patch("sap_audit_telemetry.time.time", return_value=100.0):
+            task = telemetry.task("debug_session_patterns", total=100, unit="sessions")
+        with patch("sap_audit_telemetry.time.time", return_value=110.0):
+            task.advance(20, session="S0001_2025-03-01")
+        with patch("sap_audit_telemetry.time.time", return_value=130.0):
+            snapshot = task.snapshot()
+
+        self.assertEqual(snapshot["done"], 20)
+        self.assertAlmostEqual(snapshot["rate"], 20 / 30)
+        self.assertAlmostEqual(snapshot["eta_seconds"], 80 / (20 / 30))
+        self.assertAlmostEqual(snapshot["seconds_since_progress"], 20)
+        self.assertEqual(snapshot["session"], "S0001_2025-03-01")
+        self.assertTrue(snapshot["active"])
+        self.assertIn("20/100 sessions", format_progress(snapshot))
+        self.assertIn("session S0001_2025-03-01", format_progress(snapshot))
+
+        task.finish()
+        snapshot = task.snapshot()
+        self.assertEqual(snapshot["done"], 100)
+        self.assertIsNone(snapshot["eta_seconds"])
+        self.assertFalse(snapshot["active"])
+
+    def test_metrics_files(self):
+        """Test the Prometheus and JSON metrics files."""
+        prometheus_path = os.path.join(self.test_dir, "metrics.prom")
+        json_path = os.path.join(self.test_dir, "metrics.json")
+        telemetry = Telemetry()
+        telemetry.add_reporter(MetricsFile(prometheus_path, interval=60))
+        telemetry.add_reporter(MetricsFile(json_path, "json", interval=60))
+
+        task = telemetry.task("debug_risks", total=10)
+        task.advance(4, session='S"1')
+        telemetry.close()
+
+        with open(prometheus_path, encoding="utf-8") as f:
+            metrics = f.read()
+        self.assertIn("# TYPE sap_audit_task_done gauge", metrics)
+        self.assertIn('sap_audit_task_done{task="debug_risks",stage="",unit="rows"} 4', metrics)
+        self.assertIn('sap_audit_task_total{task="debug_risks",stage="",unit="rows"} 10', metrics)
+        self.assertIn('session="S\\"1"} 1', metrics)
+        self.assertIn("sap_audit_task_seconds_since_progress", metrics)
+
+        with open(json_path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        self.assertEqual(snapshot["tasks"][0]["name"], "debug_risks")
+        self.assertEqual(snapshot["tasks"][0]["done"], 4)
+
+    def test_stage_events(self):
+        """Test that stage events and tasks started in a stage are reported."""
+        stream = StringIO()
+        telemetry = Telemetry()
+        telemetry.add_reporter(TerminalProgress(stream, interval=0))
+
+        telemetry.stage_event({"stage": "risk_assessment", "status": "started"})
+        with log_stage("risk_assessment"):
+            with telemetry.task("table_risks", total=50) as task:
+                task.advance(50)
+        telemetry.stage_event({"stage": "risk_assessment", "status": "completed", "duration": 2.0}, rows=50)
+        telemetry.close()
+
+        snapshot = telemetry.snapshot()
+        self.assertEqual(snapshot["stages"][0]["status"], "completed")
+        self.assertEqual(snapshot["stages"][0]["rows"], 50)
+        self.assertEqual(snapshot["stages"][0]["rate"], 25)
+        self.assertEqual(snapshot["tasks"][0]["stage"], "risk_assessment")
+        self.assertIn("[risk_assessment] table_risks 50/50 rows", stream.getvalue())
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT TELEMETRY - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for the SAP Audit text feature cache module.
+
+This script verifies the shared text feature cache:
+1. Tests feature evaluation on unique values only
+2. Tests combined and prioritized features
+3. Tests the boolean feature frame
+
+Usage:
+    python test_sap_audit_text_features.py
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import sap_audit_text_features
+from sap_audit_text_features import TextFeatureCache, register_text_feature, clear_feature_memo
+
+
+class TestTextFeatureCache(unittest.TestCase):
+    """Test cases for the TextFeatureCache class."""
+
+    def setUp(self):
+        clear_feature_memo()
+        self.df = pd.DataFrame({
+            "Description": ["Transport request released", "Display document", None,
+                            "Transport request released", "Changed table field"],
+            "Variable_2": ["D!", "d!", "", None, "G!"]
+        }, index=[10, 4, 7, 2, 9])
+
+    def test_regex_runs_once_per_unique_value(self):
+        """Test that each feature is evaluated once per distinct string, across frames."""
+        register_text_feature("test_counter", r"transport")
+        pattern = sap_audit_text_features.TEXT_FEATURES["test_counter"][0]
+        counting = mock.Mock(wraps=pattern)
+
+        with mock.patch.dict(sap_audit_text_features.TEXT_FEATURES, {"test_counter": (counting, False)}):
+            first = TextFeatureCache(self.df).feature("Description", "test_counter")
+            TextFeatureCache(self.df.copy()).feature("Description", "test_counter")
+
+        self.assertEqual(first.tolist(), [True, False, False, True, False])
+        self.assertEqual(counting.search.call_count, 4)
+
+    def test_case_sensitive_feature(self):
+        """Test that case-sensitive features match the original text."""
+        markers = TextFeatureCache(self.df).feature("Variable_2", "debug_marker")
+        self.assertEqual(markers.tolist(), [True, False, False, False, True])
+
+    def test_contains_and_classify(self):
+        """Test required/excluded features and first-match classification."""
+        text = TextFeatureCache(self.df)
+
+        self.assertEqual(text.contains("Description", "table_object", require="change_verb").tolist(),
+                         [False, False, False, False, True])
+        self.assertEqual(text.classify("Description", [("change_insert", "Insert"), ("change_update", "Update")]).tolist(),
+                         ["", "", "", "", "Update"])
+
+    def test_feature_frame(self):
+        """Test that features are exposed as boolean columns aligned to the index."""
+        frame = TextFeatureCache(self.df).feature_frame("Description", ["transport_description", "display_risk"])
+
+        self.assertEqual(list(frame.index), [10, 4, 7, 2, 9])
+        self.assertEqual(frame["display_risk"].tolist(), [False, True, False, False, False])
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT TEXT FEATURES - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the SAP Audit timeline sidecar module.
+
+This script verifies the typed timeline sidecar:
+1. Tests that a current sidecar is loaded with its column types
+2. Tests that a changed workbook or sidecar falls back to Excel
+3. Tests that an Excel fallback writes a sidecar for the next load
+
+Usage:
+    python test_sap_audit_timeline_sidecar.py
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+from unittest.mock import patch
+
+import pandas as pd
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sap_audit_timeline_sidecar import read_timeline, sidecar_paths, write_sidecar
+
+# Redirect stdout to capture log messages
+original_stdout = sys.stdout
+
+
+class TestTimelineSidecar(unittest.TestCase):
+    """Test cases for the timeline sidecar functions."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.excel_path = os.path.join(self.test_dir, "SAP_Session_Timeline.xlsx")
+        self.timeline = pd.DataFrame({
+            "Session ID with Date": pd.Categorical(["S0001 (2025-03-17)", "S0001 (2025-03-17)"]),
+            "User": ["USER1", "USER1"],
+            "Datetime": pd.to_datetime(["2025-03-17 09:00:00", "2025-03-17 09:05:00"]),
+            "Field": ["BUKRS", None]
+        })
+        self.timeline.to_excel(self.excel_path, sheet_name="Session_Timeline", index=False)
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        sys.stdout = original_stdout
+        shutil.rmtree(self.test_dir)
+
+    def test_current_sidecar_is_used(self):
+        """Test that a sidecar of the unchanged workbook keeps the column types."""
+        self.assertEqual(write_sidecar(self.timeline, self.excel_path), sidecar_paths(self.excel_path)[0])
+
+        with patch("sap_audit_timeline_sidecar.log_message") as log:
+            df = read_timeline(self.excel_path)
+
+        pd.testing.assert_frame_equal(df, self.timeline)
+        self.assertIn("from sidecar", log.call_args[0][0])
+
+    def test_stale_sidecar_falls_back_to_excel(self):
+        """Test that a rewritten workbook or a damaged sidecar is not used."""
+        write_sidecar(self.timeline.head(1), self.excel_path)
+        self.timeline.assign(User="USER2").to_excel(self.excel_path, sheet_name="Session_Timeline", index=False)
+        self.assertEqual(list(read_timeline(self.excel_path)["User"]), ["USER2", "USER2"])
+
+        data_path, _ = sidecar_paths(self.excel_path)
+        with open(data_path, "ab") as f:
+            f.write(b"tampered")
+        with patch("sap_audit_timeline_sidecar.log_message") as log:
+            self.assertEqual(len(read_timeline(self.excel_path)), 2)
+        self.assertIn("does not match its content hash", log.call_args_list[0][0][0])
+
+    def test_excel_fallback_writes_sidecar(self):
+        """Test that reading the workbook leaves a sidecar with the Excel load time."""
+        first = read_timeline(self.excel_path)
+        _, manifest_path = sidecar_paths(self.excel_path)
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["rows"], 2)
+        self.assertIsNotNone(manifest["excel_load_seconds"])
+
+        with patch("sap_audit_timeline_sidecar.log_message") as log:
+            second = read_timeline(self.excel_path)
+        pd.testing.assert_frame_equal(first, second)
+        self.assertIn("saved)", log.call_args[0][0])
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT TIMELINE SIDECAR - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()
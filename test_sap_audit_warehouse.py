@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test script for the SAP Audit warehouse module.
+
+This script verifies the cross-run audit warehouse:
+1. Tests that a run's events and findings are stored under its period
+2. Tests that re-running a period replaces only that period
+3. Tests the consecutive-month and period delta queries
+4. Tests event lookups by user, session, risk level and time range
+5. Tests that the query command rejects invalid time ranges
+
+Usage:
+    python test_sap_audit_warehouse.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+from unittest.mock import patch
+
+import pandas as pd
+
+# Import the module to test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sap_audit_warehouse import AuditWarehouse
+from sap_audit_tool import parse_query_args, run_query
+
+# Redirect stdout to capture log messages
+original_stdout = sys.stdout
+
+
+def make_timeline(month, debug_users, other_users=("USER9",)):
+    """Build a risk-assessed timeline with one event per user in a month."""
+    users = list(debug_users) + list(other_users)
+    return pd.DataFrame({
+        "Session ID with Date": [f"S{i:04d} ({month}-10)" for i in range(len(users))],
+        "User": users,
+        "Datetime": pd.to_datetime([f"{month}-10 09:00:00"] * len(users)),
+        "Source": ["SM20"] * len(users),
+        "TCode": ["SE16"] * len(users),
+        "Table": [""] * len(users),
+        "risk_level": ["Critical"] * len(debug_users) + ["Low"] * len(other_users),
+        "risk_description": ["Debugging"] * len(debug_users) + [""] * len(other_users),
+        "Debugging_Related_Event": ["Yes"] * len(debug_users) + [""] * len(other_users),
+        "SYSAID#": ["#120"] + [None] * (len(users) - 1)
+    })
+
+
+class TestAuditWarehouse(unittest.TestCase):
+    """Test cases for the AuditWarehouse class."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.warehouse = AuditWarehouse(os.path.join(self.test_dir, "warehouse.db"))
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        sys.stdout = original_stdout
+        self.warehouse.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_load_run(self):
+        """Test that events and findings are stored under the run's period."""
+        timeline = pd.concat([make_timeline("2025-02", ["USER1"], ["USER8", "USER9"]),
+                              make_timeline("2025-03", ["USER2"])])
+
+        run_id = self.warehouse.load_run(timeline, period="FEB- Good", summary={"records": 5})
+
+        events = self.warehouse.query("SELECT * FROM events ORDER BY event_id")
+        self.assertEqual(len(events), 5)
+        self.assertEqual(set(events["period"]), {"FEB- Good"})
+        self.assertEqual(set(events["month"]), {"2025-02"})
+        self.assertEqual(events.loc[0, "event_time"], "2025-02-10 09:00:00")
+        self.assertEqual(events.loc[0, "sysaid"], "#120")
+        self.assertIsNone(events.loc[0, "table_name"])
+
+        findings = self.warehouse.query("SELECT category, user_name FROM findings ORDER BY category, user_name")
+        self.assertEqual(findings.values.tolist(), [["critical_risk", "USER1"], ["critical_risk", "USER2"],
+                                                    ["debug", "USER1"], ["debug", "USER2"]])
+
+        runs = self.warehouse.runs()
+        self.assertEqual(runs.loc[0, "run_id"], run_id)
+        self.assertEqual(runs.loc[0, "month"], "2025-02")
+        self.assertEqual(runs.loc[0, "last_event"], "2025-03-10 09:00:00")
+
+    def test_rerun_replaces_period(self):
+        """Test that a second run of a period replaces that period only."""
+        self.warehouse.load_run(make_timeline("2025-02", ["USER1"]))
+        self.warehouse.load_run(make_timeline("2025-03", ["USER1"]))
+        self.warehouse.load_run(make_timeline("2025-03", ["USER4"]), period="Mar FF")
+        self.warehouse.load_run(make_timeline("2025-03", ["USER2", "USER3"]))
+
+        counts = self.warehouse.query("SELECT period, month, COUNT(*) AS events FROM events GROUP BY period")
+        self.assertEqual(counts.values.tolist(), [["2025-02", "2025-02", 2], ["2025-03", "2025-03", 3],
+                                                  ["Mar FF", "2025-03", 2]])
+        self.assertEqual(len(self.warehouse.runs()), 4)
+
+    def test_trend_queries(self):
+        """Test consecutive-month findings and period deltas."""
+        self.warehouse.load_run(make_timeline("2024-12", ["USER1", "USER2"]))
+        self.warehouse.load_run(make_timeline("2025-01", ["USER1", "USER2"]))
+        self.warehouse.load_run(make_timeline("2025-02", ["USER1"]))
+        self.warehouse.load_run(make_timeline("2025-04", ["USER2"]))
+
+        streaks = self.warehouse.users_with_consecutive_findings("debug", months=3)
+        self.assertEqual(streaks.values.tolist(), [["USER1", "2024-12", "2025-02", 3, 3]])
+
+        delta = self.warehouse.period_delta("2025-01", "2025-02", "debug")
+        self.assertEqual(delta.set_index("user_name")["change"].to_dict(), {"USER2": -1, "USER1": 0})
+
+        trend = self.warehouse.period_trend("debug")
+        self.assertEqual(list(trend["findings"]), [2, 2, 1, 1])
+
+    def test_find_events(self):
+        """Test indexed event lookups."""
+        self.warehouse.load_run(make_timeline("2025-02", ["USER1"], ["USER2"]), period="FEB- Good")
+        self.warehouse.load_run(make_timeline("2025-03", ["USER1", "USER2"]), period="Mar FF")
+
+        events = self.warehouse.find_events(user="user1", risk_level="critical")
+        self.assertEqual(list(events["period"]), ["FEB- Good", "Mar FF"])
+
+        events = self.warehouse.find_events(session="S0001", start="2025-03-01", end="2025-03-10")
+        self.assertEqual(events[["user_name", "session_id"]].values.tolist(), [["USER2", "S0001 (2025-03-10)"]])
+
+        events = self.warehouse.find_events(user=["USER1", "USER2"], tcode="se16", period="FEB- Good")
+        self.assertEqual(len(events), 2)
+        self.assertEqual(len(self.warehouse.find_events(limit=3)), 3)
+        self.assertTrue(self.warehouse.find_events(table="BKPF").empty)
+
+    def test_find_events_lower_case_source(self):
+        """Test that lower-case users, transactions and tables in a timeline are found."""
+        timeline = make_timeline("2025-03", ["ff_ptp"]).assign(TCode=["se16", "SE16"], Table=["bkpf", ""])
+        self.warehouse.load_run(timeline, period="Mar FF")
+
+        events = self.warehouse.find_events(user="FF_PTP", tcode="SE16", table="bkpf")
+        self.assertEqual(events[["user_name", "tcode", "table_name"]].values.tolist(),
+                         [["FF_PTP", "SE16", "BKPF"]])
+        self.assertIsNone(self.warehouse.find_events(user="USER9")["table_name"].iloc[0])
+
+    def test_query_rejects_invalid_time(self):
+        """Test that the query command reports an unparseable --from or --to as an error."""
+        self.warehouse.load_run(make_timeline("2025-03", ["USER1"]), period="Mar FF")
+        warehouse_path = os.path.join(self.test_dir, "warehouse.db")
+
+        for option in ("--from", "--to"):
+            with patch("sap_audit_utils.log_message") as log:
+                self.assertFalse(run_query(parse_query_args(["--warehouse", warehouse_path, option, "notadate"])))
+            self.assertEqual(log.call_args[0], (f"Invalid {option} time: notadate (expected e.g. 2025-03-01 "
+                                                f"or \"2025-03-01 08:00\")", "ERROR"))
+
+        with patch("sap_audit_utils.log_message") as log:
+            self.assertTrue(run_query(parse_query_args(["--warehouse", warehouse_path, "--from", "2025-03-01",
+                                                        "--output", os.path.join(self.test_dir, "events.csv")])))
+        self.assertIn("2 events written", log.call_args[0][0])
+
+
+def run_tests():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print(" SAP AUDIT WAREHOUSE - TEST SUITE ".center(80, "*"))
+    print("="*80 + "\n")
+    run_tests()